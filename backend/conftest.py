@@ -1,10 +1,11 @@
 from contextlib import asynccontextmanager
+import queue
 import uuid
 from decimal import Decimal
 
 import pytest
 from faker import Faker
-from unittest.mock import MagicMock
+from unittest.mock import MagicMock, patch
 
 import pytest_asyncio
 from sqlalchemy import create_engine
@@ -13,7 +14,9 @@ from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
 
 from src.db_models import Base, Instruments, Users as DBUser, Orders as DBOrder
 from src.enums import OrderStatus, OrderType, Side, StrategyType
-from src.engine import SpotEngine
+from src.engine import Command, CommandType, NewSingleOrder, SpotEngine
+from src.engine.balance_manager import BalanceManager
+from src.engine.codec import decode_events
 from src.engine.event_logger import EventLogger
 from src.engine.models import Event
 from src.engine.orders import Order
@@ -177,4 +180,79 @@ def mock_execution_context():
     ctx.engine = MagicMock()
     ctx.orderbook = MagicMock()
     ctx.order_store = MagicMock()
-    return ctx
+    ctx.instrument_id = "BTC-USD"
+    ctx.to_price.side_effect = lambda price: price
+    # Escrow is covered by the engine tests; strategies only see it succeed.
+    with patch("src.engine.utils.BalanceManager") as balance_manager:
+        balance_manager.reserve.return_value = True
+        yield ctx
+
+
+@pytest.fixture
+def event_queue():
+    """Installs a fresh queue for the engine's events."""
+    q = queue.Queue()
+    EventLogger.queue = q
+    yield q
+    EventLogger.queue = None
+    EventLogger._buffer = None
+
+
+@pytest.fixture
+def drain_events(event_queue):
+    """Returns a function emptying the event queue into decoded events."""
+
+    def _drain_events():
+        events = []
+        while not event_queue.empty():
+            events.extend(decode_events(event_queue.get_nowait()))
+        return events
+
+    return _drain_events
+
+
+@pytest.fixture
+def instrument_id():
+    """The instrument `users` and `place_order` trade. Override per module."""
+    return "BTC-USD"
+
+
+@pytest.fixture
+def users(instrument_id):
+    """A seller holding the instrument and a buyer holding cash."""
+    seller, buyer = f"s-{uuid.uuid4()}", f"b-{uuid.uuid4()}"
+    BalanceManager.increase_asset_balance(seller, instrument_id, 1_000)
+    BalanceManager.increase_cash_balance(buyer, 10_000)
+    return seller, buyer
+
+
+@pytest.fixture
+def place_order(instrument_id):
+    """Factory to submit a single order to an engine, returning its id."""
+    price_keys = {OrderType.LIMIT: "limit_price", OrderType.STOP: "stop_price"}
+
+    def _place_order(
+        engine, user_id, side, quantity, price, order_type=OrderType.LIMIT, **kwargs
+    ):
+        order = {
+            "order_id": str(uuid.uuid4()),
+            "user_id": user_id,
+            "order_type": order_type,
+            "side": side,
+            "quantity": quantity,
+            price_keys.get(order_type, "price"): price,
+            **kwargs,
+        }
+        engine.process_command(
+            Command(
+                command_type=CommandType.NEW_ORDER,
+                data=NewSingleOrder(
+                    strategy_type=StrategyType.SINGLE,
+                    instrument_id=instrument_id,
+                    order=order,
+                ),
+            )
+        )
+        return order["order_id"]
+
+    return _place_order
@@ -1,5 +1,5 @@
 import os
-from multiprocessing.queues import Queue as MPQueue
+from typing import TYPE_CHECKING
 from urllib.parse import quote
 
 from dotenv import load_dotenv
@@ -8,6 +8,10 @@ from redis.asyncio import Redis as RedisAsync
 from sqlalchemy import create_engine
 from sqlalchemy.ext.asyncio import create_async_engine
 
+if TYPE_CHECKING:
+    from engine.ingress import CommandIngress
+    from engine.router import ShardRouter
+
 
 PRODUCTION = False
 BASE_PATH = os.path.dirname(__file__)
@@ -40,6 +44,9 @@ INSTRUMENT_EVENT_CHANNEL = os.getenv("INSTRUMENT_EVENT_QUEUE", "channel-1")
 ORDER_UPDATE_CHANNEL = os.getenv("ORDER_UPDATE_QUEUE", "channel-2")
 CASH_BALANCE_HKEY = os.getenv("CASH_BALANCE_HKEY", "channel-3")
 CASH_ESCROW_HKEY = os.getenv("CASH_ESCROW_HKEY", "channel-4")
+ENGINE_METRICS_CHANNEL = os.getenv("ENGINE_METRICS_CHANNEL", "engine-metrics")
+# Latest metrics of every engine shard, keyed by shard.
+ENGINE_METRICS_HKEY = os.getenv("ENGINE_METRICS_HKEY", "engine-metrics")
 
 
 # Auth
@@ -53,4 +60,39 @@ PAGE_SIZE = 10
 
 
 # Engine
-COMMAND_QUEUE: MPQueue | None = None
+COMMAND_QUEUE: "CommandIngress | ShardRouter | None" = None
+# "queue" for multiprocessing queues, "ring" for shared memory ring buffers.
+IPC_TRANSPORT = os.getenv("IPC_TRANSPORT", "queue")
+RING_BUFFER_CAPACITY = int(os.getenv("RING_BUFFER_CAPACITY", str(1 << 22)))
+ENGINE_BATCH_SIZE = int(os.getenv("ENGINE_BATCH_SIZE", "256"))
+ENGINE_BATCH_TIMEOUT = float(os.getenv("ENGINE_BATCH_TIMEOUT", "0.002"))
+ENGINE_SHARDS = int(os.getenv("ENGINE_SHARDS", "1"))
+ENGINE_STATE_DIR = os.getenv(
+    "ENGINE_STATE_DIR", os.path.join(BASE_PATH, "..", "engine-state")
+)
+ENGINE_SNAPSHOT_INTERVAL = float(os.getenv("ENGINE_SNAPSHOT_INTERVAL", "60"))
+ENGINE_LEDGER_FLUSH_INTERVAL = float(os.getenv("ENGINE_LEDGER_FLUSH_INTERVAL", "0.05"))
+# Seconds between checks for expired GTD and DAY orders.
+ENGINE_EXPIRY_INTERVAL = float(os.getenv("ENGINE_EXPIRY_INTERVAL", "1"))
+# Time one command in every ENGINE_METRICS_SAMPLE_EVERY.
+ENGINE_METRICS_SAMPLE_EVERY = int(os.getenv("ENGINE_METRICS_SAMPLE_EVERY", "16"))
+ENGINE_METRICS_INTERVAL = float(os.getenv("ENGINE_METRICS_INTERVAL", "5"))
+# Commands queued for a shard past which new orders are refused with a 429,
+# and past which everything but cancels is refused with a 503.
+ENGINE_QUEUE_SOFT_LIMIT = int(os.getenv("ENGINE_QUEUE_SOFT_LIMIT", "10000"))
+ENGINE_QUEUE_HARD_LIMIT = int(os.getenv("ENGINE_QUEUE_HARD_LIMIT", "50000"))
+# Seconds refused clients are told to wait before retrying.
+ENGINE_RETRY_AFTER = int(os.getenv("ENGINE_RETRY_AFTER", "1"))
+
+# Event handler
+# Events applied per transaction, 1 commits each event on its own.
+EVENT_BATCH_SIZE = int(os.getenv("EVENT_BATCH_SIZE", "512"))
+# Seconds to wait for a batch to fill once its first event arrives.
+EVENT_BATCH_TIMEOUT = float(os.getenv("EVENT_BATCH_TIMEOUT", "0.01"))
+# Orders, users and asset balances the event handler keeps in memory.
+EVENT_CACHE_SIZE = int(os.getenv("EVENT_CACHE_SIZE", "100000"))
+# Event handler workers, each applying the events of the users hashed to it.
+EVENT_PARTITIONS = int(os.getenv("EVENT_PARTITIONS", "1"))
+# Latest metrics of every event handler partition, keyed by partition.
+EVENT_METRICS_HKEY = os.getenv("EVENT_METRICS_HKEY", "event-metrics")
+EVENT_METRICS_INTERVAL = float(os.getenv("EVENT_METRICS_INTERVAL", "5"))
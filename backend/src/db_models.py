@@ -84,6 +84,8 @@ class Instruments(Base):
     symbol: Mapped[str] = mapped_column(String(20), unique=True, nullable=False)
     tick_size: Mapped[float] = mapped_column(Float, nullable=False)
     starting_price: Mapped[float] = mapped_column(Float, nullable=False, default=100.0)
+    min_price: Mapped[float | None] = mapped_column(Float, nullable=True)
+    max_price: Mapped[float | None] = mapped_column(Float, nullable=True)
     status: Mapped[str] = mapped_column(
         String, nullable=False, default=InstrumentStatus.TRADABLE.value
     )
@@ -127,6 +129,9 @@ class Orders(Base):
     time_in_force: Mapped[str] = mapped_column(
         String, nullable=True
     )  # from TimeInForce enum .value
+    expires_at: Mapped[datetime | None] = mapped_column(
+        DateTime(timezone=True), nullable=True
+    )
     created_at: Mapped[datetime] = mapped_column(
         DateTime(timezone=True), nullable=False, default=get_datetime
     )
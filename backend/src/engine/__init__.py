@@ -7,7 +7,9 @@ from .models import (
     NewOTOOrder,
     NewSingleOrder,
     CancelOrderCommand,
+    CancelAllCommand,
     ModifyOrderCommand,
     NewInstrument,
+    ExpireOrders,
 )
 from .enums import CommandType
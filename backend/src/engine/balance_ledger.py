@@ -0,0 +1,186 @@
+from threading import Event, Lock, Thread
+from typing import Iterable
+
+from config import REDIS_CLIENT
+
+
+class BalanceLedger:
+    """
+    Engine-owned, in memory copy of the balance and escrow hashes kept in
+    Redis, keyed by (hkey, user_id).
+
+    Reads and writes from the matching loop only touch memory. Every write
+    is also added to a per-key delta, and a background thread sends the
+    coalesced deltas to Redis with HINCRBYFLOAT every `flush_interval`
+    seconds. Values are never re-read, so the engine must be the only
+    writer of any entry it holds: order escrow included, which it takes
+    itself rather than leaving to the HTTP API.
+
+    Entries are bulk loaded with `load` when the engine starts. An entry
+    that wasn't loaded is read from Redis the first time it's needed.
+
+    Hashes in `shared` are also written by other engine shards, e.g. cash,
+    which every shard spends. They're never held in memory: reads go to
+    Redis, writes are applied there straight away, and `reserve` checks
+    and escrows atomically in a script so that two shards can't both spend
+    the same balance.
+    """
+
+    # KEYS: balance hash, escrow hash. ARGV: user id, amount.
+    RESERVE_SCRIPT = """
+    local balance = tonumber(redis.call('HGET', KEYS[1], ARGV[1]) or '0')
+    local escrow = tonumber(redis.call('HGET', KEYS[2], ARGV[1]) or '0')
+    if tonumber(ARGV[2]) > balance - escrow then
+        return 0
+    end
+    redis.call('HINCRBYFLOAT', KEYS[2], ARGV[1], ARGV[2])
+    return 1
+    """
+
+    def __init__(
+        self, flush_interval: float = 0.05, shared: Iterable[str] = ()
+    ) -> None:
+        self.flush_interval = flush_interval
+        self.shared = frozenset(shared)
+        self._reserve = REDIS_CLIENT.register_script(self.RESERVE_SCRIPT)
+        self._values: dict[tuple[str, str], float] = {}
+        self._deltas: dict[tuple[str, str], float] = {}
+        self._lock = Lock()
+        self._stopped = Event()
+        self._thread: Thread | None = None
+
+    def load(self, hkeys: Iterable[str]) -> None:
+        """Reads every entry of the given hashes into memory."""
+        hkeys = list(hkeys)
+        with REDIS_CLIENT.pipeline(transaction=False) as pipe:
+            for hkey in hkeys:
+                pipe.hgetall(hkey)
+            results = pipe.execute()
+
+        for hkey, entries in zip(hkeys, results):
+            for user_id, value in entries.items():
+                self._values[(hkey, user_id.decode())] = float(value)
+
+    def get(self, hkey: str, user_id: str) -> float:
+        if hkey in self.shared:
+            return float(REDIS_CLIENT.hget(hkey, user_id) or 0)
+
+        key = (hkey, user_id)
+        value = self._values.get(key)
+        if value is None:
+            value = REDIS_CLIENT.hget(hkey, user_id)
+            value = float(value) if value is not None else 0.0
+            self._values[key] = value
+        return value
+
+    def incr(self, hkey: str, user_id: str, amount: float) -> float:
+        """Applies `amount` in memory and queues it for Redis. Returns the new value."""
+        if hkey in self.shared:
+            return float(REDIS_CLIENT.hincrbyfloat(hkey, user_id, amount))
+
+        key = (hkey, user_id)
+        value = self.get(hkey, user_id) + amount
+        self._values[key] = value
+        with self._lock:
+            self._deltas[key] = self._deltas.get(key, 0.0) + amount
+        return value
+
+    def reserve(
+        self, balance_hkey: str, escrow_hkey: str, user_id: str, amount: float
+    ) -> bool:
+        """
+        Adds `amount` to the user's escrow if that much of their balance
+        isn't escrowed already, returning False otherwise.
+        """
+        if escrow_hkey in self.shared:
+            return bool(
+                self._reserve(keys=[balance_hkey, escrow_hkey], args=[user_id, amount])
+            )
+
+        if amount > self.get(balance_hkey, user_id) - self.get(escrow_hkey, user_id):
+            return False
+        self.incr(escrow_hkey, user_id, amount)
+        return True
+
+    def entries(self) -> dict[tuple[str, str], float]:
+        """
+        Every value the engine holds, pending deltas included, such as for
+        a snapshot. Shared hashes are read from Redis.
+        """
+        entries = dict(self._values)
+        if self.shared:
+            hkeys = sorted(self.shared)
+            with REDIS_CLIENT.pipeline(transaction=False) as pipe:
+                for hkey in hkeys:
+                    pipe.hgetall(hkey)
+                results = pipe.execute()
+            for hkey, values in zip(hkeys, results):
+                for user_id, value in values.items():
+                    entries[(hkey, user_id.decode())] = float(value)
+        return entries
+
+    def restore(self, entries: dict[tuple[str, str], float]) -> None:
+        """Sets the given entries in memory, e.g. from a snapshot."""
+        self._values.update(entries)
+
+    def publish(self) -> None:
+        """
+        Overwrites Redis with every value held in memory. Pending deltas
+        are dropped, as the values already include them.
+        """
+        with self._lock:
+            self._deltas.clear()
+        if not self._values:
+            return
+
+        with REDIS_CLIENT.pipeline(transaction=False) as pipe:
+            for (hkey, user_id), value in self._values.items():
+                pipe.hset(hkey, user_id, value)
+            pipe.execute()
+
+    @property
+    def pending(self) -> int:
+        """Number of keys with changes not yet sent to Redis."""
+        return len(self._deltas)
+
+    def flush(self) -> None:
+        """Sends every pending delta to Redis in a single pipeline."""
+        with self._lock:
+            deltas, self._deltas = self._deltas, {}
+        if not deltas:
+            return
+
+        try:
+            with REDIS_CLIENT.pipeline(transaction=False) as pipe:
+                for (hkey, user_id), amount in deltas.items():
+                    pipe.hincrbyfloat(hkey, user_id, amount)
+                pipe.execute()
+        except Exception:
+            # Put the deltas back so that the next flush retries them.
+            with self._lock:
+                for key, amount in deltas.items():
+                    self._deltas[key] = self._deltas.get(key, 0.0) + amount
+            raise
+
+    def start(self) -> None:
+        """Starts the background thread that writes deltas behind."""
+        if self._thread is not None:
+            return
+        self._stopped.clear()
+        self._thread = Thread(target=self._run, name="balance-ledger", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Stops the background thread and sends whatever is still pending."""
+        if self._thread is not None:
+            self._stopped.set()
+            self._thread.join()
+            self._thread = None
+        self.flush()
+
+    def _run(self) -> None:
+        while not self._stopped.wait(self.flush_interval):
+            try:
+                self.flush()
+            except Exception as e:
+                print(f"[ERROR]: Failed to flush balance ledger: {e}")
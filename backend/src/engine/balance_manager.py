@@ -1,30 +1,80 @@
 from multiprocessing.queues import Queue as MPQueue
 
+from redis.client import Pipeline
+
 from config import REDIS_CLIENT, CASH_BALANCE_HKEY, CASH_ESCROW_HKEY
+from enums import Side
 from utils.utils import get_instrument_balance_hkey, get_instrument_escrows_hkey
+from .balance_ledger import BalanceLedger
 
 
 class BalanceManager:
     """
     Used as an in memory database for cash and asset balances with escrow tracking.
+
+    Between `begin_batch` and `end_batch` trade settlements are queued on a
+    single Redis pipeline instead of being sent one round trip at a time.
+    Reads of a balance with queued settlements flush the pipeline first, so
+    balance checks always see every prior trade.
+
+    When a `ledger` is installed, as the engine process does, every read
+    and write goes to it instead and Redis is only updated behind it.
     """
 
     queue: MPQueue | None = None
+    ledger: BalanceLedger | None = None
+    _pipeline: Pipeline | None = None
+    _pending: set[tuple[str, str]] = set()
 
     @classmethod
-    def get_available_cash_balance(cls, user_id: str) -> float:
-        """Return available cash balance = balance - escrow."""
-        balance = REDIS_CLIENT.hget(CASH_BALANCE_HKEY, user_id)
-        escrow = REDIS_CLIENT.hget(CASH_ESCROW_HKEY, user_id)
+    def begin_batch(cls) -> None:
+        if cls._pipeline is None:
+            cls._pipeline = REDIS_CLIENT.pipeline(transaction=False)
 
-        if balance is None:
-            REDIS_CLIENT.hset(CASH_BALANCE_HKEY, user_id, 0)
-        if escrow is None:
-            REDIS_CLIENT.hset(CASH_ESCROW_HKEY, user_id, 0)
+    @classmethod
+    def end_batch(cls) -> None:
+        try:
+            cls.flush()
+        finally:
+            cls._pipeline = None
+            cls._pending.clear()
+
+    @classmethod
+    def flush(cls) -> None:
+        """Sends every queued settlement to Redis."""
+        if cls._pipeline is not None and cls._pending:
+            cls._pipeline.execute()
+            cls._pending.clear()
+
+    @classmethod
+    def _sync(cls, hkey: str, user_id: str) -> None:
+        if (hkey, user_id) in cls._pending:
+            cls.flush()
+
+    @classmethod
+    def _get(cls, hkey: str, user_id: str) -> float:
+        """Reads one entry, creating it as 0 in Redis if it doesn't exist."""
+        if cls.ledger is not None:
+            return cls.ledger.get(hkey, user_id)
 
-        balance = float(balance) if balance is not None else 0.0
-        escrow = float(escrow) if escrow is not None else 0.0
+        cls._sync(hkey, user_id)
+        value = REDIS_CLIENT.hget(hkey, user_id)
+        if value is None:
+            REDIS_CLIENT.hset(hkey, user_id, 0)
+            return 0.0
+        return float(value)
+
+    @classmethod
+    def _incr(cls, hkey: str, user_id: str, amount: float) -> float:
+        if cls.ledger is not None:
+            return cls.ledger.incr(hkey, user_id, amount)
+        return float(REDIS_CLIENT.hincrbyfloat(hkey, user_id, amount))
 
+    @classmethod
+    def get_available_cash_balance(cls, user_id: str) -> float:
+        """Return available cash balance = balance - escrow."""
+        balance = cls._get(CASH_BALANCE_HKEY, user_id)
+        escrow = cls._get(CASH_ESCROW_HKEY, user_id)
         return balance - escrow
 
     @classmethod
@@ -37,66 +87,82 @@ class BalanceManager:
     
     @classmethod
     def get_cash_escrow(cls, user_id: str) -> float:
-        escrow = REDIS_CLIENT.hget(CASH_ESCROW_HKEY, user_id)
-        if escrow is None:
-            REDIS_CLIENT.hset(CASH_ESCROW_HKEY, user_id, 0)
-            return 0.0
-        return float(escrow)
+        return cls._get(CASH_ESCROW_HKEY, user_id)
 
     @classmethod
     def increase_cash_balance(cls, user_id: str, amount: float) -> float:
-        new_balance = REDIS_CLIENT.hincrbyfloat(CASH_BALANCE_HKEY, user_id, amount)
+        new_balance = cls._incr(CASH_BALANCE_HKEY, user_id, amount)
         if cls.queue is not None:
             cls.queue.put_nowait({"table": "Users", "data": {"cash_balance": amount}})
-        return float(new_balance)
+        return new_balance
 
     @classmethod
     def decrease_cash_balance(cls, user_id: str, amount: float) -> float:
-        new_balance = REDIS_CLIENT.hincrbyfloat(CASH_BALANCE_HKEY, user_id, -amount)
+        new_balance = cls._incr(CASH_BALANCE_HKEY, user_id, -amount)
         if cls.queue is not None:
             cls.queue.put_nowait({"table": "Users", "data": {"cash_balance": -amount}})
-        return float(new_balance)
+        return new_balance
 
     @classmethod
     def increase_cash_escrow(cls, user_id: str, amount: float) -> float:
-        new_escrow = REDIS_CLIENT.hincrbyfloat(CASH_ESCROW_HKEY, user_id, amount)
+        new_escrow = cls._incr(CASH_ESCROW_HKEY, user_id, amount)
         if cls.queue is not None:
             cls.queue.put_nowait({"table": "Users", "data": {"escrow_balance": amount}})
-        return float(new_escrow)
+        return new_escrow
 
     @classmethod
     def decrease_cash_escrow(cls, user_id: str, amount: float) -> float:
-        new_escrow = REDIS_CLIENT.hincrbyfloat(CASH_ESCROW_HKEY, user_id, -amount)
+        new_escrow = cls._incr(CASH_ESCROW_HKEY, user_id, -amount)
         if cls.queue is not None:
             cls.queue.put_nowait(
                 {"table": "Users", "data": {"escrow_balance": -amount}}
             )
-        return float(new_escrow)
+        return new_escrow
 
     @classmethod
     def get_available_asset_balance(cls, user_id: str, instrument_id: str) -> float:
         """Return available asset balance = balance - escrow."""
-        balance_hkey = get_instrument_balance_hkey(instrument_id)
-        escrow_hkey = get_instrument_escrows_hkey(instrument_id)
+        balance = cls._get(get_instrument_balance_hkey(instrument_id), user_id)
+        escrow = cls._get(get_instrument_escrows_hkey(instrument_id), user_id)
+        return balance - escrow
 
-        balance = REDIS_CLIENT.hget(balance_hkey, user_id)
-        escrow = REDIS_CLIENT.hget(escrow_hkey, user_id)
+    @classmethod
+    def get_available_balances(
+        cls, keys: list[tuple[str, str]]
+    ) -> list[tuple[float, float]]:
+        """
+        Returns the available cash and asset balance for each
+        (user_id, instrument_id), read on a single Redis pipeline.
+        """
+        if cls.ledger is not None:
+            return [
+                (
+                    cls.get_available_cash_balance(user_id),
+                    cls.get_available_asset_balance(user_id, instrument_id),
+                )
+                for user_id, instrument_id in keys
+            ]
 
-        if balance is None:
-            REDIS_CLIENT.hset(balance_hkey, user_id, 0)
-        if escrow is None:
-            REDIS_CLIENT.hset(escrow_hkey, user_id, 0)
+        cls.flush()
+        with REDIS_CLIENT.pipeline(transaction=False) as pipe:
+            for user_id, instrument_id in keys:
+                pipe.hget(CASH_BALANCE_HKEY, user_id)
+                pipe.hget(CASH_ESCROW_HKEY, user_id)
+                pipe.hget(get_instrument_balance_hkey(instrument_id), user_id)
+                pipe.hget(get_instrument_escrows_hkey(instrument_id), user_id)
+            values = [float(value or 0) for value in pipe.execute()]
 
-        balance = float(balance) if balance is not None else 0.0
-        escrow = float(escrow) if escrow is not None else 0.0
-        return balance - escrow
+        return [
+            (values[i] - values[i + 1], values[i + 2] - values[i + 3])
+            for i in range(0, len(values), 4)
+        ]
 
     @classmethod
     def increase_asset_balance(
         cls, user_id: str, instrument_id: str, amount: float
     ) -> float:
         hkey = get_instrument_balance_hkey(instrument_id)
-        new_balance = REDIS_CLIENT.hincrbyfloat(hkey, user_id, amount)
+        new_balance = cls._incr(hkey, user_id, amount)
         if cls.queue is not None:
             cls.queue.put_nowait(
                 {
@@ -104,14 +170,14 @@ class BalanceManager:
                     "data": {"instrument_id": instrument_id, "balance": amount},
                 }
             )
-        return float(new_balance)
+        return new_balance
 
     @classmethod
     def decrease_asset_balance(
         cls, user_id: str, instrument_id: str, amount: float
     ) -> float:
         hkey = get_instrument_balance_hkey(instrument_id)
-        new_balance = REDIS_CLIENT.hincrbyfloat(hkey, user_id, -amount)
+        new_balance = cls._incr(hkey, user_id, -amount)
         if cls.queue is not None:
             cls.queue.put_nowait(
                 {
@@ -119,14 +185,14 @@ class BalanceManager:
                     "data": {"instrument_id": instrument_id, "balance": -amount},
                 }
             )
-        return float(new_balance)
+        return new_balance
 
     @classmethod
     def increase_asset_escrow(
         cls, user_id: str, instrument_id: str, amount: float
     ) -> float:
         hkey = get_instrument_escrows_hkey(instrument_id)
-        new_escrow = REDIS_CLIENT.hincrbyfloat(hkey, user_id, amount)
+        new_escrow = cls._incr(hkey, user_id, amount)
         if cls.queue is not None:
             cls.queue.put_nowait(
                 {
@@ -134,14 +200,14 @@ class BalanceManager:
                     "data": {"instrument_id": instrument_id, "escrow_balance": amount},
                 }
             )
-        return float(new_escrow)
+        return new_escrow
 
     @classmethod
     def decrease_asset_escrow(
         cls, user_id: str, instrument_id: str, amount: float
     ) -> float:
         hkey = get_instrument_escrows_hkey(instrument_id)
-        new_escrow = REDIS_CLIENT.hincrbyfloat(hkey, user_id, -amount)
+        new_escrow = cls._incr(hkey, user_id, -amount)
         if cls.queue is not None:
             cls.queue.put_nowait(
                 {
@@ -149,31 +215,81 @@ class BalanceManager:
                     "data": {"instrument_id": instrument_id, "escrow_balance": -amount},
                 }
             )
-        return float(new_escrow)
+        return new_escrow
+
+    @classmethod
+    def reserve(
+        cls, user_id: str, instrument_id: str, side: Side, quantity: float, price: float
+    ) -> bool:
+        """
+        Escrows what an order for `quantity` at `price` needs to trade: cash
+        for a bid, the asset for an ask. Returns False, escrowing nothing,
+        if the user doesn't have it available.
+        """
+        if side == Side.BID:
+            amount = quantity * price
+            if cls.ledger is not None and CASH_ESCROW_HKEY in cls.ledger.shared:
+                # Other shards spend the same cash, so check and escrow at once.
+                return cls.ledger.reserve(
+                    CASH_BALANCE_HKEY, CASH_ESCROW_HKEY, user_id, amount
+                )
+            if amount > cls.get_available_cash_balance(user_id):
+                return False
+            cls.increase_cash_escrow(user_id, amount)
+            return True
+
+        if quantity > cls.get_available_asset_balance(user_id, instrument_id):
+            return False
+        cls.increase_asset_escrow(user_id, instrument_id, quantity)
+        return True
+
+    @classmethod
+    def release(
+        cls, user_id: str, instrument_id: str, side: Side, quantity: float, price: float
+    ) -> None:
+        """Returns what `reserve` escrowed for the same arguments."""
+        if side == Side.BID:
+            cls.decrease_cash_escrow(user_id, quantity * price)
+        else:
+            cls.decrease_asset_escrow(user_id, instrument_id, quantity)
 
     @classmethod
     def settle_ask(
         cls, user_id: str, instrument_id: str, quantity: float, price: float
     ):
-        with REDIS_CLIENT.pipeline() as pipe:
-            pipe.hincrbyfloat(
-                get_instrument_escrows_hkey(instrument_id), user_id, -quantity
-            )
-            pipe.hincrbyfloat(
-                get_instrument_balance_hkey(instrument_id), user_id, -quantity
-            )
-            pipe.hincrbyfloat(CASH_BALANCE_HKEY, user_id, quantity * price)
-            pipe.execute()
+        writes = (
+            (get_instrument_escrows_hkey(instrument_id), -quantity),
+            (get_instrument_balance_hkey(instrument_id), -quantity),
+            (CASH_BALANCE_HKEY, quantity * price),
+        )
+        cls._settle(user_id, writes)
 
     @classmethod
     def settle_bid(
         cls, user_id: str, instrument_id: str, quantity: float, price: float
     ):
         total_value = quantity * price
+        writes = (
+            (CASH_ESCROW_HKEY, -total_value),
+            (CASH_BALANCE_HKEY, -total_value),
+            (get_instrument_balance_hkey(instrument_id), quantity),
+        )
+        cls._settle(user_id, writes)
+
+    @classmethod
+    def _settle(cls, user_id: str, writes: tuple[tuple[str, float], ...]) -> None:
+        if cls.ledger is not None:
+            for hkey, amount in writes:
+                cls.ledger.incr(hkey, user_id, amount)
+            return
+
+        if cls._pipeline is not None:
+            for hkey, amount in writes:
+                cls._pipeline.hincrbyfloat(hkey, user_id, amount)
+                cls._pending.add((hkey, user_id))
+            return
+
         with REDIS_CLIENT.pipeline() as pipe:
-            pipe.hincrbyfloat(CASH_ESCROW_HKEY, user_id, -total_value)
-            pipe.hincrbyfloat(CASH_BALANCE_HKEY, user_id, -total_value)
-            pipe.hincrbyfloat(
-                get_instrument_balance_hkey(instrument_id), user_id, quantity
-            )
+            for hkey, amount in writes:
+                pipe.hincrbyfloat(hkey, user_id, amount)
             pipe.execute()
@@ -0,0 +1,526 @@
+"""
+Compact binary encoding for the commands and events that cross process
+boundaries (server -> engine -> event handler).
+
+Every message starts with the same header so it can be routed without
+decoding the body:
+
+    u8   message code (CommandType or EventType)
+    u8   sub code (StrategyType for NEW_ORDER, details mask for events)
+    u8   instrument id length, followed by the utf-8 instrument id
+
+Identifiers are written as a tag byte followed by either the 16 raw bytes
+of a canonical UUID string (tag 0) or a u8 length and utf-8 bytes (tag 1).
+Optional floats are written as NaN when absent.
+
+Command bodies:
+    NEW_ORDER       u8 order count, then per order: order_id, user_id,
+                    u8 order type, u8 side, u8 time in force (0 if unset),
+                    f64 quantity, f64 limit_price, f64 stop_price, f64 price,
+                    f64 expires_at (unix timestamp)
+    CANCEL_ORDER    order_id
+    CANCEL_ALL      user_id, with the Side as sub code (0 for both) and an
+                    empty instrument id for every instrument
+    MODIFY_ORDER    order_id, f64 limit_price, f64 stop_price
+                    (NaN leaves the price unchanged)
+    NEW_INSTRUMENT  f64 tick_size, f64 min_price, f64 max_price
+    EXPIRE_ORDERS   f64 now (unix timestamp), with an empty instrument id
+
+Event body: user_id, related_id, then the details fields flagged in the
+header's details mask, in the order of EVENT_DETAIL_FIELDS. The mask has
+room for the first six fields; when any later field is present bit 6 is
+set and a u8 extension mask for the rest follows related_id.
+
+Event batches use message code 0 and carry the instrument id shared by
+all their events, or an empty one when they span instruments, followed
+by a u32 event count and each encoded event prefixed with its u32 length.
+"""
+
+import math
+import struct
+from datetime import datetime
+
+from enums import (
+    EventType,
+    LiquidityRole,
+    OrderType,
+    Side,
+    StrategyType,
+    TimeInForce,
+)
+from .enums import CommandType
+from .models import (
+    MODIFY_SENTINEL,
+    CancelAllCommand,
+    CancelOrderCommand,
+    Command,
+    Event,
+    ExpireOrders,
+    ModifyOrderCommand,
+    NewInstrument,
+    NewOCOOrder,
+    NewOTOCOOrder,
+    NewOTOOrder,
+    NewSingleOrder,
+)
+
+
+_HEADER = struct.Struct("<BB")
+_U8 = struct.Struct("<B")
+_U16 = struct.Struct("<H")
+_U32 = struct.Struct("<I")
+_F64 = struct.Struct("<d")
+_ORDER = struct.Struct("<BBBddddd")
+_MODIFY = struct.Struct("<dd")
+_INSTRUMENT = struct.Struct("<ddd")
+
+_BATCH_CODE = 0
+_UUID_TAG = 0
+_STR_TAG = 1
+_DETAILS_PRESENT = 0x80
+_DETAILS_EXTENDED = 0x40
+_HEADER_DETAILS = 6
+
+NAN = float("nan")
+
+
+def _codes(enum_cls) -> tuple[dict, dict]:
+    to_code = {member: i for i, member in enumerate(enum_cls, start=1)}
+    return to_code, {code: member for member, code in to_code.items()}
+
+
+COMMAND_CODES, CODE_COMMANDS = _codes(CommandType)
+STRATEGY_CODES, CODE_STRATEGIES = _codes(StrategyType)
+EVENT_CODES, CODE_EVENTS = _codes(EventType)
+ORDER_TYPE_CODES, CODE_ORDER_TYPES = _codes(OrderType)
+SIDE_CODES, CODE_SIDES = _codes(Side)
+ROLE_CODES, CODE_ROLES = _codes(LiquidityRole)
+TIF_CODES, CODE_TIFS = _codes(TimeInForce)
+
+# (key, kind) for each details field an event may carry. The position of
+# a field is its bit in the details mask, so new fields must be appended.
+EVENT_DETAIL_FIELDS = (
+    ("executed_quantity", "f64"),
+    ("quantity", "f64"),
+    ("price", "f64"),
+    ("side", "side"),
+    ("role", "role"),
+    ("reason", "str"),
+    ("order_quantity", "f64"),
+    ("maker_user_id", "id"),
+    ("maker_order_id", "id"),
+    ("maker_executed_quantity", "f64"),
+    ("maker_order_quantity", "f64"),
+    ("filled_quantity", "f64"),
+)
+_DETAIL_BITS = {key: 1 << i for i, (key, _) in enumerate(EVENT_DETAIL_FIELDS)}
+
+
+##### Primitives ####
+
+
+def _opt_float(value: float | None) -> float:
+    return NAN if value is None else value
+
+
+def _from_opt_float(value: float) -> float | None:
+    return None if math.isnan(value) else value
+
+
+def _timestamp(value: datetime | str | float | None) -> float | None:
+    """Unix timestamp of a datetime, an ISO 8601 string or a timestamp."""
+    if value is None or isinstance(value, (int, float)):
+        return value
+    if isinstance(value, str):
+        value = datetime.fromisoformat(value)
+    return value.timestamp()
+
+
+def _pack_str8(parts: list, value: str) -> None:
+    raw = value.encode()
+    parts.append(_U8.pack(len(raw)))
+    parts.append(raw)
+
+
+def _unpack_str8(buf: memoryview, offset: int) -> tuple[str, int]:
+    length = buf[offset]
+    offset += 1
+    return str(buf[offset : offset + length], "utf-8"), offset + length
+
+
+def _uuid_bytes(value: str) -> bytes | None:
+    """Returns the raw bytes of a canonical (lowercase, hyphenated) UUID."""
+    if (
+        len(value) != 36
+        or value[8] != "-"
+        or value[13] != "-"
+        or value[18] != "-"
+        or value[23] != "-"
+        or value != value.lower()
+    ):
+        return None
+    try:
+        raw = bytes.fromhex(value.replace("-", ""))
+    except ValueError:
+        return None
+    return raw if len(raw) == 16 else None
+
+
+def _pack_id(parts: list, value: str) -> None:
+    value = str(value)
+    raw = _uuid_bytes(value)
+    if raw is not None:
+        parts.append(_U8.pack(_UUID_TAG))
+        parts.append(raw)
+        return
+
+    parts.append(_U8.pack(_STR_TAG))
+    _pack_str8(parts, value)
+
+
+def _unpack_id(buf: memoryview, offset: int) -> tuple[str, int]:
+    tag = buf[offset]
+    offset += 1
+    if tag == _UUID_TAG:
+        h = buf[offset : offset + 16].hex()
+        return f"{h[:8]}-{h[8:12]}-{h[12:16]}-{h[16:20]}-{h[20:]}", offset + 16
+    return _unpack_str8(buf, offset)
+
+
+def _pack_header(parts: list, code: int, sub_code: int, instrument_id: str) -> None:
+    parts.append(_HEADER.pack(code, sub_code))
+    _pack_str8(parts, instrument_id)
+
+
+def peek_instrument_id(data: bytes) -> str:
+    """Returns a message's instrument id without decoding its body."""
+    return _unpack_str8(memoryview(data), _HEADER.size)[0]
+
+
+##### Commands ####
+
+
+def _pack_order(parts: list, order: dict) -> None:
+    _pack_id(parts, order["order_id"])
+    _pack_id(parts, order["user_id"])
+    tif = order.get("time_in_force")
+    parts.append(
+        _ORDER.pack(
+            ORDER_TYPE_CODES[OrderType(order["order_type"])],
+            SIDE_CODES[Side(order["side"])],
+            TIF_CODES[TimeInForce(tif)] if tif is not None else 0,
+            order["quantity"],
+            _opt_float(order.get("limit_price")),
+            _opt_float(order.get("stop_price")),
+            _opt_float(order.get("price")),
+            _opt_float(_timestamp(order.get("expires_at"))),
+        )
+    )
+
+
+def _unpack_order(buf: memoryview, offset: int) -> tuple[dict, int]:
+    order_id, offset = _unpack_id(buf, offset)
+    user_id, offset = _unpack_id(buf, offset)
+    (
+        order_type,
+        side,
+        tif,
+        quantity,
+        limit_price,
+        stop_price,
+        price,
+        expires_at,
+    ) = _ORDER.unpack_from(buf, offset)
+    order = {
+        "order_id": order_id,
+        "user_id": user_id,
+        "order_type": CODE_ORDER_TYPES[order_type],
+        "side": CODE_SIDES[side],
+        "time_in_force": CODE_TIFS.get(tif),
+        "quantity": quantity,
+        "limit_price": _from_opt_float(limit_price),
+        "stop_price": _from_opt_float(stop_price),
+        "price": _from_opt_float(price),
+        "expires_at": _from_opt_float(expires_at),
+    }
+    return order, offset + _ORDER.size
+
+
+def _command_orders(data) -> list[dict]:
+    if isinstance(data, NewSingleOrder):
+        return [data.order]
+    if isinstance(data, NewOCOOrder):
+        return list(data.legs)
+    if isinstance(data, NewOTOOrder):
+        return [data.parent, data.child]
+    if isinstance(data, NewOTOCOOrder):
+        return [data.parent, *data.oco_legs]
+    raise ValueError(f"Unsupported order command: {type(data).__name__}")
+
+
+def _build_order_command(strategy_type: StrategyType, instrument_id: str, orders):
+    if strategy_type == StrategyType.SINGLE:
+        return NewSingleOrder.model_construct(
+            strategy_type=strategy_type, instrument_id=instrument_id, order=orders[0]
+        )
+    if strategy_type == StrategyType.OCO:
+        return NewOCOOrder.model_construct(
+            strategy_type=strategy_type, instrument_id=instrument_id, legs=orders
+        )
+    if strategy_type == StrategyType.OTO:
+        return NewOTOOrder.model_construct(
+            strategy_type=strategy_type,
+            instrument_id=instrument_id,
+            parent=orders[0],
+            child=orders[1],
+        )
+    return NewOTOCOOrder.model_construct(
+        strategy_type=strategy_type,
+        instrument_id=instrument_id,
+        parent=orders[0],
+        oco_legs=orders[1:],
+    )
+
+
+def encode_command(command: Command) -> bytes:
+    ctype = command.command_type
+    data = command.data
+    parts = []
+
+    if ctype == CommandType.NEW_ORDER:
+        orders = _command_orders(data)
+        strategy_code = STRATEGY_CODES[StrategyType(data.strategy_type)]
+        _pack_header(parts, COMMAND_CODES[ctype], strategy_code, data.instrument_id)
+        parts.append(_U8.pack(len(orders)))
+        for order in orders:
+            _pack_order(parts, order)
+
+    elif ctype == CommandType.CANCEL_ORDER:
+        _pack_header(parts, COMMAND_CODES[ctype], 0, data.symbol)
+        _pack_id(parts, data.order_id)
+
+    elif ctype == CommandType.CANCEL_ALL:
+        side_code = SIDE_CODES[Side(data.side)] if data.side is not None else 0
+        _pack_header(parts, COMMAND_CODES[ctype], side_code, data.symbol or "")
+        _pack_id(parts, data.user_id)
+
+    elif ctype == CommandType.MODIFY_ORDER:
+        _pack_header(parts, COMMAND_CODES[ctype], 0, data.symbol)
+        _pack_id(parts, data.order_id)
+        parts.append(
+            _MODIFY.pack(
+                NAN if data.limit_price == MODIFY_SENTINEL else data.limit_price,
+                NAN if data.stop_price == MODIFY_SENTINEL else data.stop_price,
+            )
+        )
+
+    elif ctype == CommandType.NEW_INSTRUMENT:
+        _pack_header(parts, COMMAND_CODES[ctype], 0, data.instrument_id)
+        parts.append(
+            _INSTRUMENT.pack(
+                _opt_float(data.tick_size),
+                _opt_float(data.min_price),
+                _opt_float(data.max_price),
+            )
+        )
+
+    elif ctype == CommandType.EXPIRE_ORDERS:
+        _pack_header(parts, COMMAND_CODES[ctype], 0, "")
+        parts.append(_F64.pack(data.now))
+
+    else:
+        raise ValueError(f"Unsupported command type: {ctype}")
+
+    return b"".join(parts)
+
+
+def decode_command(data: bytes) -> Command:
+    buf = memoryview(data)
+    code, sub_code = _HEADER.unpack_from(buf)
+    ctype = CODE_COMMANDS[code]
+    instrument_id, offset = _unpack_str8(buf, _HEADER.size)
+
+    if ctype == CommandType.NEW_ORDER:
+        count = buf[offset]
+        offset += 1
+        orders = []
+        for _ in range(count):
+            order, offset = _unpack_order(buf, offset)
+            orders.append(order)
+        cmd_data = _build_order_command(
+            CODE_STRATEGIES[sub_code], instrument_id, orders
+        )
+
+    elif ctype == CommandType.CANCEL_ORDER:
+        order_id, offset = _unpack_id(buf, offset)
+        cmd_data = CancelOrderCommand.model_construct(
+            order_id=order_id, symbol=instrument_id
+        )
+
+    elif ctype == CommandType.CANCEL_ALL:
+        user_id, offset = _unpack_id(buf, offset)
+        cmd_data = CancelAllCommand.model_construct(
+            user_id=user_id,
+            symbol=instrument_id or None,
+            side=CODE_SIDES.get(sub_code),
+        )
+
+    elif ctype == CommandType.MODIFY_ORDER:
+        order_id, offset = _unpack_id(buf, offset)
+        limit_price, stop_price = _MODIFY.unpack_from(buf, offset)
+        cmd_data = ModifyOrderCommand.model_construct(
+            order_id=order_id,
+            symbol=instrument_id,
+            limit_price=MODIFY_SENTINEL if math.isnan(limit_price) else limit_price,
+            stop_price=MODIFY_SENTINEL if math.isnan(stop_price) else stop_price,
+        )
+
+    elif ctype == CommandType.EXPIRE_ORDERS:
+        cmd_data = ExpireOrders.model_construct(now=_F64.unpack_from(buf, offset)[0])
+
+    else:
+        tick_size, min_price, max_price = _INSTRUMENT.unpack_from(buf, offset)
+        cmd_data = NewInstrument.model_construct(
+            instrument_id=instrument_id,
+            tick_size=_from_opt_float(tick_size),
+            min_price=_from_opt_float(min_price),
+            max_price=_from_opt_float(max_price),
+        )
+
+    return Command.model_construct(command_type=ctype, data=cmd_data)
+
+
+##### Events ####
+
+
+def encode_event(
+    event_type: EventType,
+    user_id: str,
+    related_id: str,
+    instrument_id: str,
+    details: dict | None = None,
+) -> bytes:
+    mask = 0
+    bits = 0
+    body = []
+
+    if details is not None:
+        mask = _DETAILS_PRESENT
+        for key in details:
+            bit = _DETAIL_BITS.get(key)
+            if bit is None:
+                raise ValueError(f"Unencodable event detail: {key}")
+            bits |= bit
+
+        for key, kind in EVENT_DETAIL_FIELDS:
+            if key not in details:
+                continue
+            value = details[key]
+            if kind == "f64":
+                body.append(_F64.pack(_opt_float(value)))
+            elif kind == "side":
+                body.append(_U8.pack(SIDE_CODES[Side(value)]))
+            elif kind == "role":
+                body.append(_U8.pack(ROLE_CODES[LiquidityRole(value)]))
+            elif kind == "id":
+                _pack_id(body, value)
+            else:
+                raw = str(value).encode()
+                body.append(_U16.pack(len(raw)))
+                body.append(raw)
+
+        extended = bits >> _HEADER_DETAILS
+        mask |= bits & (_DETAILS_EXTENDED - 1)
+        if extended:
+            mask |= _DETAILS_EXTENDED
+            body.insert(0, _U8.pack(extended))
+
+    parts = []
+    _pack_header(parts, EVENT_CODES[EventType(event_type)], mask, instrument_id)
+    _pack_id(parts, user_id)
+    _pack_id(parts, related_id)
+    parts.extend(body)
+    return b"".join(parts)
+
+
+def decode_event(data: bytes) -> Event:
+    buf = memoryview(data)
+    code, mask = _HEADER.unpack_from(buf)
+    event_type = CODE_EVENTS[code]
+    instrument_id, offset = _unpack_str8(buf, _HEADER.size)
+    user_id, offset = _unpack_id(buf, offset)
+    related_id, offset = _unpack_id(buf, offset)
+
+    details = None
+    if mask & _DETAILS_PRESENT:
+        details = {}
+        bits = mask & (_DETAILS_EXTENDED - 1)
+        if mask & _DETAILS_EXTENDED:
+            bits |= buf[offset] << _HEADER_DETAILS
+            offset += 1
+
+        for key, kind in EVENT_DETAIL_FIELDS:
+            if not bits & _DETAIL_BITS[key]:
+                continue
+            if kind == "f64":
+                details[key] = _from_opt_float(_F64.unpack_from(buf, offset)[0])
+                offset += _F64.size
+            elif kind == "side":
+                details[key] = CODE_SIDES[buf[offset]]
+                offset += 1
+            elif kind == "role":
+                details[key] = CODE_ROLES[buf[offset]].value
+                offset += 1
+            elif kind == "id":
+                details[key], offset = _unpack_id(buf, offset)
+            else:
+                length = _U16.unpack_from(buf, offset)[0]
+                offset += _U16.size
+                details[key] = str(buf[offset : offset + length], "utf-8")
+                offset += length
+
+    return Event.model_construct(
+        event_type=event_type,
+        user_id=user_id,
+        related_id=related_id,
+        instrument_id=instrument_id,
+        details=details,
+    )
+
+
+def encode_event_batch(frames: list[bytes]) -> bytes:
+    """Packs events already encoded by `encode_event` into one message."""
+    instrument_ids = {peek_instrument_id(frame) for frame in frames}
+    instrument_id = instrument_ids.pop() if len(instrument_ids) == 1 else ""
+
+    parts = []
+    _pack_header(parts, _BATCH_CODE, 0, instrument_id)
+    parts.append(_U32.pack(len(frames)))
+    for frame in frames:
+        parts.append(_U32.pack(len(frame)))
+        parts.append(frame)
+    return b"".join(parts)
+
+
+def split_events(data: bytes) -> list[bytes | memoryview]:
+    """Returns the events of a single event or event batch, still encoded."""
+    if data[0] != _BATCH_CODE:
+        return [data]
+
+    buf = memoryview(data)
+    _, offset = _unpack_str8(buf, _HEADER.size)
+    count = _U32.unpack_from(buf, offset)[0]
+    offset += _U32.size
+
+    frames = []
+    for _ in range(count):
+        length = _U32.unpack_from(buf, offset)[0]
+        offset += _U32.size
+        frames.append(buf[offset : offset + length])
+        offset += length
+    return frames
+
+
+def decode_events(data: bytes) -> list[Event]:
+    """Decodes either a single event or an event batch."""
+    return [decode_event(frame) for frame in split_events(data)]
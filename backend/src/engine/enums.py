@@ -6,6 +6,8 @@ class CommandType(Enum):
     CANCEL_ORDER = "CANCEL_ORDER"
     MODIFY_ORDER = "MODIFY_ORDER"
     NEW_INSTRUMENT = "NEW_INSTRUMENT"
+    EXPIRE_ORDERS = "EXPIRE_ORDERS"
+    CANCEL_ALL = "CANCEL_ALL"
 
 
 class MatchOutcome(Enum):
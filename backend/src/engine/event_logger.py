@@ -1,15 +1,66 @@
 from multiprocessing.queues import Queue as MPQueue
 
 from enums import EventType
-from .models import Event
+from .codec import encode_event, encode_event_batch
 
 
 class EventLogger:
+    """
+    Encodes engine events and puts them on the event queue.
+
+    Between `begin_batch` and `end_batch` events are buffered and sent as
+    a single batch message instead of one queue put per event.
+
+    `emitted` counts every event logged while a queue is installed.
+    """
+
     queue: MPQueue | None = None
+    emitted: int = 0
+    _buffer: list[bytes] | None = None
+
+    @classmethod
+    def begin_batch(cls) -> None:
+        if cls._buffer is None:
+            cls._buffer = []
+
+    @classmethod
+    def end_batch(cls) -> None:
+        try:
+            cls.flush()
+        finally:
+            cls._buffer = None
+
+    @classmethod
+    def flush(cls) -> None:
+        """Sends every buffered event as one message."""
+        if not cls._buffer:
+            return
+
+        frames = cls._buffer
+        cls._buffer = []
+        if cls.queue is None:
+            return
+        if len(frames) == 1:
+            cls.queue.put_nowait(frames[0])
+        else:
+            cls.queue.put_nowait(encode_event_batch(frames))
 
     @classmethod
-    def log_event(cls, etype: EventType, **kw) -> None:
-        ev = Event(event_type=etype, **kw)
+    def log_event(
+        cls,
+        etype: EventType,
+        *,
+        user_id: str,
+        related_id: str,
+        instrument_id: str,
+        details: dict | None = None,
+    ) -> None:
+        if cls.queue is None:
+            return
 
-        if cls.queue is not None:
-            cls.queue.put_nowait(ev)
+        cls.emitted += 1
+        frame = encode_event(etype, user_id, related_id, instrument_id, details)
+        if cls._buffer is not None:
+            cls._buffer.append(frame)
+        else:
+            cls.queue.put_nowait(frame)
@@ -1,6 +1,23 @@
+from decimal import Decimal
+
+from utils.utils import is_tick_multiple
+from .orderbook import StopBook
+
+
 class ExecutionContext:
     """
-    An empty container object passed to strategy handlers
+    A container object passed to strategy handlers.
+
+    When a `tick_size` is supplied the context runs in tick-normalised
+    mode: every price inside the engine (book keys, order prices and
+    trade prices) is an integer number of ticks. `to_ticks` and `to_price`
+    convert at the edges. Prices that aren't a multiple of the tick size
+    are turned away with `on_tick` before they're converted, never rounded.
+    Without a `tick_size` both are no-ops and prices stay as the floats
+    received in commands.
+
+    Stop orders wait in `stop_book` until the last trade price, kept by
+    `orderbook.price`, crosses their stop price.
     """
 
     def __init__(
@@ -10,8 +27,38 @@ class ExecutionContext:
         orderbook: "OrderBook",
         order_store: "OrderStore",
         instrument_id: str,
+        tick_size: float | None = None,
+        stop_book: StopBook | None = None,
     ) -> None:
+        if tick_size is not None and tick_size <= 0:
+            raise ValueError(f"Invalid tick size: {tick_size}")
+
         self.engine = engine
         self.orderbook = orderbook
         self.order_store = order_store
+        self.stop_book = stop_book if stop_book is not None else StopBook()
         self.instrument_id = instrument_id
+        self.tick_size = tick_size
+        self._price_precision = (
+            max(0, -Decimal(str(tick_size)).normalize().as_tuple().exponent)
+            if tick_size is not None
+            else None
+        )
+
+    def on_tick(self, price: float | None) -> bool:
+        """Whether an external price is a multiple of the tick size."""
+        if price is None or self.tick_size is None:
+            return True
+        return is_tick_multiple(price, self.tick_size)
+
+    def to_ticks(self, price: float | None) -> int | float | None:
+        """Converts an external price into the engine's internal representation."""
+        if price is None or self.tick_size is None:
+            return price
+        return round(price / self.tick_size)
+
+    def to_price(self, ticks: int | float | None) -> float | None:
+        """Converts an internal price back into an external price."""
+        if ticks is None or self.tick_size is None:
+            return ticks
+        return round(ticks * self.tick_size, self._price_precision)
@@ -0,0 +1,89 @@
+from multiprocessing.sharedctypes import RawValue
+
+from .enums import CommandType
+
+
+# Never turned away, so users can always pull their orders.
+ALWAYS_ADMITTED = (CommandType.CANCEL_ORDER, CommandType.CANCEL_ALL)
+
+
+class IngressOverloaded(Exception):
+    """Raised when an engine shard is too far behind to accept a command."""
+
+    def __init__(self, message: str, status_code: int, retry_after: int) -> None:
+        super().__init__(message)
+        self.status_code = status_code
+        self.retry_after = retry_after
+
+
+class CommandIngress:
+    """
+    Front door to one engine shard's command queue.
+
+    Counts the commands put on the queue and taken off it in shared memory
+    so that the server can see how many the engine has yet to take, and
+    turn work away with `admit` before the backlog grows without bound.
+    Each counter has a single writer, the server for `accepted` and the
+    engine for `taken`, so neither needs a lock. Stands in for the queue
+    on both sides.
+
+    Past `soft_limit` queued commands new orders are refused with a 429,
+    and past `hard_limit` everything but cancels is refused with a 503.
+    """
+
+    def __init__(
+        self,
+        queue,
+        soft_limit: int,
+        hard_limit: int,
+        retry_after: int = 1,
+    ) -> None:
+        if not 0 < soft_limit <= hard_limit:
+            raise ValueError(
+                f"Invalid watermarks: soft {soft_limit}, hard {hard_limit}"
+            )
+
+        self.queue = queue
+        self.soft_limit = soft_limit
+        self.hard_limit = hard_limit
+        self.retry_after = retry_after
+        self._accepted = RawValue("Q", 0)
+        self._taken = RawValue("Q", 0)
+
+    @property
+    def depth(self) -> int:
+        """Commands put on the queue that the engine hasn't taken yet."""
+        return self._accepted.value - self._taken.value
+
+    def admit(self, command_type: CommandType, instrument_id: str | None = None):
+        """Raises IngressOverloaded if a `command_type` command should be refused."""
+        if command_type in ALWAYS_ADMITTED:
+            return
+
+        depth = self.depth
+        if depth >= self.hard_limit:
+            raise IngressOverloaded(
+                "Engine overloaded, try again later.", 503, self.retry_after
+            )
+        if command_type == CommandType.NEW_ORDER and depth >= self.soft_limit:
+            raise IngressOverloaded(
+                "Too many pending orders, try again later.", 429, self.retry_after
+            )
+
+    def put(self, data: bytes, block: bool = True, timeout: float | None = None):
+        self.queue.put(data, block, timeout)
+        self._accepted.value += 1
+
+    def put_nowait(self, data: bytes) -> None:
+        self.queue.put_nowait(data)
+        self._accepted.value += 1
+
+    def get(self, block: bool = True, timeout: float | None = None) -> bytes:
+        data = self.queue.get(block, timeout)
+        self._taken.value += 1
+        return data
+
+    def get_nowait(self) -> bytes:
+        data = self.queue.get_nowait()
+        self._taken.value += 1
+        return data
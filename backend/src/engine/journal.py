@@ -0,0 +1,118 @@
+import mmap
+import os
+import struct
+from typing import Iterator
+
+
+_BASE_SEQ = struct.Struct("<Q")
+_RECORD = struct.Struct("<IQ")
+_LENGTH = struct.Struct("<I")
+_MARKER_SEQ = 0
+
+
+class CommandJournal:
+    """
+    Append-only, memory-mapped log of encoded commands.
+
+    The file starts with the sequence number that precedes its first
+    record, followed by records of a u32 payload length, a u64 sequence
+    number and the payload. A zero length marks the end of the log. Each
+    append writes the terminator after its payload before committing its
+    own length, so a record torn by a crash reads as the end of the log.
+
+    A record with sequence number 0 is a marker rather than a command. Its
+    payload is the sequence number of the last command whose events had
+    been sent when it was written, which `published` holds.
+
+    Writes land in the page cache, so they survive the engine process
+    dying. `sync` forces them to disk.
+    """
+
+    def __init__(self, path: str, initial_size: int = 1 << 24) -> None:
+        self.path = path
+        self._fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o644)
+        self._size = max(os.fstat(self._fd).st_size, initial_size)
+        os.ftruncate(self._fd, self._size)
+        self._mm = mmap.mmap(self._fd, self._size)
+
+        self.seq = self.published = _BASE_SEQ.unpack_from(self._mm, 0)[0]
+        self._offset = _BASE_SEQ.size
+        for seq, start, end in self._scan():
+            if seq == _MARKER_SEQ:
+                self.published = _BASE_SEQ.unpack_from(self._mm, start)[0]
+            else:
+                self.seq = seq
+            self._offset = end
+
+    def _scan(self) -> Iterator[tuple[int, int, int]]:
+        """Yields (seq, payload offset, record end) for every committed record."""
+        offset = _BASE_SEQ.size
+        while offset + _RECORD.size <= self._size:
+            length, seq = _RECORD.unpack_from(self._mm, offset)
+            end = offset + _RECORD.size + length
+            if length == 0 or end > self._size:
+                return
+            yield seq, offset + _RECORD.size, end
+            offset = end
+
+    def _grow(self, needed: int) -> None:
+        size = self._size
+        while size < needed:
+            size *= 2
+        self._mm.close()
+        os.ftruncate(self._fd, size)
+        self._size = size
+        self._mm = mmap.mmap(self._fd, size)
+
+    def append(self, data: bytes) -> int:
+        """Appends an encoded command and returns its sequence number."""
+        seq = self.seq + 1
+        self._write(seq, data)
+        self.seq = seq
+        return seq
+
+    def mark_published(self) -> None:
+        """
+        Records that the events of every command appended so far have been
+        sent, so a replay knows which commands' events never left.
+        """
+        if self.published == self.seq:
+            return
+        self._write(_MARKER_SEQ, _BASE_SEQ.pack(self.seq))
+        self.published = self.seq
+
+    def _write(self, seq: int, data: bytes) -> None:
+        start = self._offset + _RECORD.size
+        end = start + len(data)
+        if end + _LENGTH.size > self._size:
+            self._grow(end + _LENGTH.size)
+
+        mm = self._mm
+        mm[start:end] = data
+        _LENGTH.pack_into(mm, end, 0)
+        _RECORD.pack_into(mm, self._offset, len(data), seq)
+        self._offset = end
+
+    def replay(self, after: int = 0) -> Iterator[tuple[int, bytes]]:
+        """Yields (seq, command) for every record with a sequence above `after`."""
+        for seq, start, end in self._scan():
+            if seq > after and seq != _MARKER_SEQ:
+                yield seq, self._mm[start:end]
+
+    def reset(self) -> None:
+        """
+        Drops every record, typically once a snapshot covers them, whose
+        events must then have been sent. Sequence numbers carry on from
+        where they were.
+        """
+        self.published = self.seq
+        _BASE_SEQ.pack_into(self._mm, 0, self.seq)
+        _LENGTH.pack_into(self._mm, _BASE_SEQ.size, 0)
+        self._offset = _BASE_SEQ.size
+
+    def sync(self) -> None:
+        self._mm.flush()
+
+    def close(self) -> None:
+        self._mm.close()
+        os.close(self._fd)
@@ -3,7 +3,7 @@ from ..event_logger import EventLogger
 from ..execution_context import ExecutionContext
 from ..models import MODIFY_SENTINEL, ModifyOrderCommand
 from ..orders import Order
-from ..utils import limit_crossable, stop_crossable
+from ..utils import limit_crossable, price_in_band, reprice_escrow, stop_crossable
 
 
 class ModifyOrderMixin:
@@ -24,14 +24,20 @@ class ModifyOrderMixin:
     def _validate_modify(
         self, details: ModifyOrderCommand, order: Order, ctx: ExecutionContext
     ) -> bool:
-        log_modify_reject = lambda: EventLogger.log_event(
-            EventType.ORDER_MODIFY_REJECTED,
-            user_id=order.user_id,
-            related_id=order.id,
-            instrument_id=ctx.instrument_id,
-            details={"reason": "Modification would cross the spread."},
+        log_modify_reject = lambda reason="Modification would cross the spread.": (
+            EventLogger.log_event(
+                EventType.ORDER_MODIFY_REJECTED,
+                user_id=order.user_id,
+                related_id=order.id,
+                instrument_id=ctx.instrument_id,
+                details={"reason": reason},
+            )
         )
 
+        if not price_in_band(self._get_modified_price(details, order), ctx.orderbook):
+            log_modify_reject("Price outside the instrument's band.")
+            return False
+
         if (
             details.limit_price != MODIFY_SENTINEL
             and order.order_type == OrderType.LIMIT
@@ -54,13 +60,24 @@ class ModifyOrderMixin:
             return
 
         new_price = self._get_modified_price(details, order)
-        ctx.orderbook.remove(order, order.price)
+        book = ctx.stop_book if order in ctx.stop_book else ctx.orderbook
+        if book is ctx.orderbook and not reprice_escrow(order, new_price, ctx):
+            EventLogger.log_event(
+                EventType.ORDER_MODIFY_REJECTED,
+                user_id=order.user_id,
+                related_id=order.id,
+                instrument_id=ctx.instrument_id,
+                details={"reason": "Insufficient funds."},
+            )
+            return
+
+        book.remove(order, order.price)
         order.price = new_price
-        ctx.orderbook.append(order, order.price)
+        book.append(order, order.price)
         EventLogger.log_event(
             EventType.ORDER_MODIFIED,
             user_id=order.user_id,
             related_id=order.id,
             instrument_id=ctx.instrument_id,
-            details={"price": new_price},
+            details={"price": ctx.to_price(new_price)},
         )
@@ -1,6 +1,6 @@
 from pydantic import Field
 
-from enums import EventType, StrategyType
+from enums import EventType, Side, StrategyType
 from models import CustomBaseModel
 from .enums import CommandType
 
@@ -41,6 +41,12 @@ class CancelOrderCommand(CustomBaseModel):
     symbol: str
 
 
+class CancelAllCommand(CustomBaseModel):
+    user_id: str
+    symbol: str | None = None  # Every instrument when unset
+    side: Side | None = None  # Both sides when unset
+
+
 class ModifyOrderCommand(CustomBaseModel):
     order_id: str
     symbol: str
@@ -50,6 +56,13 @@ class ModifyOrderCommand(CustomBaseModel):
 
 class NewInstrument(CustomBaseModel):
     instrument_id: str
+    tick_size: float | None = None
+    min_price: float | None = None
+    max_price: float | None = None
+
+
+class ExpireOrders(CustomBaseModel):
+    now: float  # Unix timestamp
 
 
 class Event(CustomBaseModel):
@@ -1 +1,3 @@
-from .orderbook import OrderBook
\ No newline at end of file
+from .ladder_orderbook import LadderOrderBook
+from .orderbook import OrderBook
+from .stop_book import StopBook
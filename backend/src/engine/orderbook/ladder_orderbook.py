@@ -0,0 +1,389 @@
+from typing import Iterable
+
+from enums import Side
+from .price_level import PriceLevel
+from .price_level_node import PriceLevelNodePool
+from ..orders.order import Order
+from ..typing import DepthLevel
+
+
+WORD_BITS = 64
+WORD_SHIFT = 6
+WORD_INDEX_MASK = WORD_BITS - 1
+
+
+class OccupancyBitmap:
+    """
+    Two level bitmap recording which slots of a price ladder are occupied.
+
+    Each leaf word covers 64 slots and each summary word covers 64 leaf
+    words, so finding the nearest occupied slot in either direction
+    touches at most a couple of leaf words plus a scan of the summary.
+    """
+
+    def __init__(self, size: int) -> None:
+        self._size = size
+        n_leaves = (size >> WORD_SHIFT) + 1
+        self._leaves = [0] * n_leaves
+        self._summary = [0] * ((n_leaves >> WORD_SHIFT) + 1)
+
+    def set(self, idx: int) -> None:
+        w = idx >> WORD_SHIFT
+        self._leaves[w] |= 1 << (idx & WORD_INDEX_MASK)
+        self._summary[w >> WORD_SHIFT] |= 1 << (w & WORD_INDEX_MASK)
+
+    def clear(self, idx: int) -> None:
+        w = idx >> WORD_SHIFT
+        self._leaves[w] &= ~(1 << (idx & WORD_INDEX_MASK))
+        if not self._leaves[w]:
+            self._summary[w >> WORD_SHIFT] &= ~(1 << (w & WORD_INDEX_MASK))
+
+    def next_set(self, idx: int) -> int | None:
+        """Returns the lowest occupied slot >= idx, or None."""
+        if idx >= self._size:
+            return None
+        if idx < 0:
+            idx = 0
+
+        w = idx >> WORD_SHIFT
+        word = self._leaves[w] >> (idx & WORD_INDEX_MASK)
+        if word:
+            return idx + (word & -word).bit_length() - 1
+
+        w += 1
+        s = w >> WORD_SHIFT
+        if s >= len(self._summary):
+            return None
+
+        sword = self._summary[s] >> (w & WORD_INDEX_MASK)
+        if sword:
+            w += (sword & -sword).bit_length() - 1
+        else:
+            s += 1
+            while s < len(self._summary) and not self._summary[s]:
+                s += 1
+            if s == len(self._summary):
+                return None
+            sword = self._summary[s]
+            w = (s << WORD_SHIFT) + (sword & -sword).bit_length() - 1
+
+        word = self._leaves[w]
+        return (w << WORD_SHIFT) + (word & -word).bit_length() - 1
+
+    def prev_set(self, idx: int) -> int | None:
+        """Returns the highest occupied slot <= idx, or None."""
+        if idx < 0:
+            return None
+        if idx >= self._size:
+            idx = self._size - 1
+
+        w = idx >> WORD_SHIFT
+        word = self._leaves[w] & ((2 << (idx & WORD_INDEX_MASK)) - 1)
+        if word:
+            return (w << WORD_SHIFT) + word.bit_length() - 1
+
+        w -= 1
+        if w < 0:
+            return None
+
+        s = w >> WORD_SHIFT
+        sword = self._summary[s] & ((2 << (w & WORD_INDEX_MASK)) - 1)
+        while not sword:
+            s -= 1
+            if s < 0:
+                return None
+            sword = self._summary[s]
+
+        w = (s << WORD_SHIFT) + sword.bit_length() - 1
+        return (w << WORD_SHIFT) + self._leaves[w].bit_length() - 1
+
+
+class LadderOrderBook:
+    """
+    Order book for instruments with a bounded price band. Price levels live
+    in a dense array of slots indexed by their tick offset from the band's
+    lower bound, and an occupancy bitmap per side tracks which slots hold
+    orders so the next best price is found by scanning words instead of
+    searching a sorted structure.
+
+    Exposes the same interface as OrderBook. Prices must be integer ticks
+    within [min_price, max_price].
+
+    Attributes:
+        _min_price (int): Lowest price in the band.
+        _max_price (int): Highest price in the band.
+        _cur_price (int): The current market price of the instrument.
+        _starting_price (int): The initial price when the book was created.
+        _best_bid_price (int | None): Highest bid price available.
+        _best_ask_price (int | None): Lowest ask price available.
+        _bid_slots (list[PriceLevel | None]): Bid levels indexed by tick offset.
+        _ask_slots (list[PriceLevel | None]): Ask levels indexed by tick offset.
+        _bid_bits (OccupancyBitmap): Occupied bid slots.
+        _ask_bits (OccupancyBitmap): Occupied ask slots.
+    """
+
+    def __init__(self, min_price: int, max_price: int, price: int = 100) -> None:
+        if max_price < min_price:
+            raise ValueError(f"Invalid price band: [{min_price}, {max_price}]")
+
+        size = max_price - min_price + 1
+        self._min_price = min_price
+        self._max_price = max_price
+        self._bid_slots: list[PriceLevel | None] = [None] * size
+        self._ask_slots: list[PriceLevel | None] = [None] * size
+        self._bid_bits = OccupancyBitmap(size)
+        self._ask_bits = OccupancyBitmap(size)
+
+        self._best_bid_price = None
+        self._best_ask_price = None
+        self._starting_price = price
+        self._cur_price = price
+
+    @property
+    def price(self) -> int:
+        return self._cur_price
+
+    @property
+    def min_price(self) -> int:
+        return self._min_price
+
+    @property
+    def max_price(self) -> int:
+        return self._max_price
+
+    @property
+    def bids(self) -> dict[int, PriceLevel]:
+        """Occupied bid levels in ascending price order. O(levels)."""
+        return {p: self._bid_slots[p - self._min_price] for p in self.bid_levels}
+
+    @property
+    def asks(self) -> dict[int, PriceLevel]:
+        """Occupied ask levels in ascending price order. O(levels)."""
+        return {p: self._ask_slots[p - self._min_price] for p in self.ask_levels}
+
+    @property
+    def bid_levels(self) -> list[int]:
+        return self._occupied_prices(self._bid_bits)
+
+    @property
+    def ask_levels(self) -> list[int]:
+        return self._occupied_prices(self._ask_bits)
+
+    @property
+    def best_bid(self) -> int | None:
+        return self._best_bid_price
+
+    @property
+    def best_ask(self) -> int | None:
+        return self._best_ask_price
+
+    def append(self, order: Order, price: int) -> None:
+        """
+        Adds an order to the order book at the specified price level.
+
+        Updates the best bid or ask price accordingly.
+
+        Args:
+            order (Order): The order to be added.
+            price (int): Price level, in ticks, at which to place the order.
+
+        Raises:
+            ValueError: If the price is not an integer within the band or
+                the order side is invalid.
+        """
+        if not isinstance(price, int):
+            raise ValueError(f"Invalid price: {price} - type: {type(price)}")
+        if price < self._min_price or price > self._max_price:
+            raise ValueError(
+                f"Price {price} outside band [{self._min_price}, {self._max_price}]"
+            )
+
+        idx = price - self._min_price
+
+        if order.side == Side.BID:
+            slots, bits = self._bid_slots, self._bid_bits
+            if self._best_bid_price is None or price > self._best_bid_price:
+                self._best_bid_price = price
+        elif order.side == Side.ASK:
+            slots, bits = self._ask_slots, self._ask_bits
+            if self._best_ask_price is None or price < self._best_ask_price:
+                self._best_ask_price = price
+        else:
+            raise ValueError(f"Invalid order side: {order.side}")
+
+        level = slots[idx]
+        if level is None:
+            level = slots[idx] = PriceLevel()
+
+        level.append(order)
+        bits.set(idx)
+
+    def remove(self, order: Order, price: int) -> bool:
+        """
+        Removes an order from its associated price level.
+
+        If the price level becomes empty its slot is marked free, and the
+        best bid/ask price is moved to the next occupied slot.
+
+        Args:
+            order (Order): The order to remove.
+            price (int): The price level from which to remove the order.
+
+        Returns:
+            bool: Whether the order was on the book.
+        """
+        if order.side == Side.BID:
+            slots, bits = self._bid_slots, self._bid_bits
+        elif order.side == Side.ASK:
+            slots, bits = self._ask_slots, self._ask_bits
+        else:
+            return False
+
+        if price < self._min_price or price > self._max_price:
+            return False
+
+        idx = price - self._min_price
+        level = slots[idx]
+        # Already taken off by its strategy, e.g. an OCO leg that filled.
+        if level is None or order not in level:
+            return False
+
+        level.remove(order)
+
+        if not level:
+            bits.clear(idx)
+
+            if order.side == Side.BID:
+                if price == self._best_bid_price:
+                    nxt = bits.prev_set(idx - 1)
+                    self._best_bid_price = (
+                        None if nxt is None else nxt + self._min_price
+                    )
+            elif price == self._best_ask_price:
+                nxt = bits.next_set(idx + 1)
+                self._best_ask_price = None if nxt is None else nxt + self._min_price
+
+        return True
+
+    def reduce(self, order: Order, price: int, quantity: int) -> None:
+        """
+        Records a fill of `quantity` against a resting order, keeping its
+        level's aggregate quantity in step with the order's remaining quantity.
+        """
+        if price < self._min_price or price > self._max_price:
+            return
+
+        slots = self._bid_slots if order.side == Side.BID else self._ask_slots
+        level = slots[price - self._min_price]
+        if level:
+            level.reduce(quantity)
+
+    def depth(self, side: Side, n: int) -> list[DepthLevel]:
+        """
+        Returns the top `n` levels on a side, best price first, using each
+        level's running aggregates.
+
+        Args:
+            side (Side)
+            n (int): Maximum number of levels to return.
+
+        Returns:
+            list[DepthLevel]: (price, quantity, order_count) per level.
+        """
+        if side == Side.BID:
+            slots, step, offset = self._bid_slots, self._bid_bits.prev_set, -1
+            best = self._best_bid_price
+        else:
+            slots, step, offset = self._ask_slots, self._ask_bits.next_set, 1
+            best = self._best_ask_price
+
+        idx = None if best is None else best - self._min_price
+
+        levels = []
+        while idx is not None and len(levels) < n:
+            level = slots[idx]
+            levels.append(
+                DepthLevel(
+                    idx + self._min_price, level.total_remaining_qty, level.order_count
+                )
+            )
+            idx = step(idx + offset)
+
+        return levels
+
+    def available_quantity(
+        self, side: Side, limit: int | None, quantity: float
+    ) -> float:
+        """
+        Sums the remaining quantity resting on `side` at prices no worse
+        than `limit`, best price first, stopping once `quantity` is reached.
+        Reads each level's running aggregate, so it never walks orders.
+
+        Args:
+            side (Side): The side being taken from.
+            limit (int | None): Worst acceptable price, or None for any.
+            quantity (float): Quantity wanted.
+
+        Returns:
+            float: The quantity available, capped at the first level
+                that reaches `quantity`.
+        """
+        if side == Side.BID:
+            slots, step, offset = self._bid_slots, self._bid_bits.prev_set, -1
+            best = self._best_bid_price
+            within = lambda idx: limit is None or idx + self._min_price >= limit
+        else:
+            slots, step, offset = self._ask_slots, self._ask_bits.next_set, 1
+            best = self._best_ask_price
+            within = lambda idx: limit is None or idx + self._min_price <= limit
+
+        idx = None if best is None else best - self._min_price
+
+        available = 0
+        while idx is not None and within(idx):
+            available += slots[idx].total_remaining_qty
+            if available >= quantity:
+                break
+            idx = step(idx + offset)
+        return available
+
+    def set_price(self, price: int) -> None:
+        self._cur_price = price
+
+    def get_orders(self, price: int, side: Side) -> Iterable[Order] | None:
+        """
+        Retrieves all orders at a specific price level in the specified book.
+
+        Args:
+            price (int): The price level to query.
+            side (Side)
+
+        Returns:
+            Iterable[Order] | None: An iterable of orders at the price level, or an empty iterator
+                if none exist.
+        """
+        if price is None or price < self._min_price or price > self._max_price:
+            return iter([])
+
+        slots = self._bid_slots if side == Side.BID else self._ask_slots
+        level = slots[price - self._min_price]
+        if not level:
+            return iter([])
+
+        # Nodes removed mid-iteration stay linked until every reader is done.
+        PriceLevelNodePool.begin_read()
+        try:
+            cur = level.head
+            while cur:
+                yield cur.order
+                cur = cur.next
+        finally:
+            PriceLevelNodePool.end_read()
+
+    def _occupied_prices(self, bits: OccupancyBitmap) -> list[int]:
+        prices = []
+        idx = bits.next_set(0)
+        while idx is not None:
+            prices.append(idx + self._min_price)
+            idx = bits.next_set(idx + 1)
+        return prices
@@ -1,10 +1,13 @@
+from itertools import islice
 from typing import Iterable, KeysView
 
 from sortedcontainers.sorteddict import SortedDict
 
 from enums import Side
 from .price_level import PriceLevel
+from .price_level_node import PriceLevelNodePool
 from ..orders.order import Order
+from ..typing import DepthLevel
 
 
 class OrderBook:
@@ -91,7 +94,7 @@ class OrderBook:
 
         book.setdefault(price, PriceLevel()).append(order)
 
-    def remove(self, order: Order, price: float) -> None:
+    def remove(self, order: Order, price: float) -> bool:
         """
         Removes an order from its associated price level.
 
@@ -101,18 +104,22 @@ class OrderBook:
         Args:
             order (Order): Orderhe order to remove.
             price (float): Orderhe price level from which to remove the order.
+
+        Returns:
+            bool: Whether the order was on the book.
         """
         if order.side == Side.BID:
             book = self._bids
         elif order.side == Side.ASK:
             book = self._asks
         else:
-            return
+            return False
 
-        if price not in book:
-            return
+        level = book.get(price)
+        # Already taken off by its strategy, e.g. an OCO leg that filled.
+        if level is None or order not in level:
+            return False
 
-        level = book[price]
         level.remove(order)
 
         if not level:
@@ -129,6 +136,71 @@ class OrderBook:
 
             book.pop(price)
 
+        return True
+
+    def reduce(self, order: Order, price: float, quantity: int) -> None:
+        """
+        Records a fill of `quantity` against a resting order, keeping its
+        level's aggregate quantity in step with the order's remaining quantity.
+        """
+        book = self._bids if order.side == Side.BID else self._asks
+        level = book.get(price)
+        if level is not None:
+            level.reduce(quantity)
+
+    def depth(self, side: Side, n: int) -> list[DepthLevel]:
+        """
+        Returns the top `n` levels on a side, best price first, using each
+        level's running aggregates.
+
+        Args:
+            side (Side)
+            n (int): Maximum number of levels to return.
+
+        Returns:
+            list[DepthLevel]: (price, quantity, order_count) per level.
+        """
+        if side == Side.BID:
+            items = reversed(self._bids.items())
+        else:
+            items = iter(self._asks.items())
+
+        return [
+            DepthLevel(price, level.total_remaining_qty, level.order_count)
+            for price, level in islice(items, n)
+        ]
+
+    def available_quantity(
+        self, side: Side, limit: float | None, quantity: float
+    ) -> float:
+        """
+        Sums the remaining quantity resting on `side` at prices no worse
+        than `limit`, best price first, stopping once `quantity` is reached.
+        Reads each level's running aggregate, so it never walks orders.
+
+        Args:
+            side (Side): The side being taken from.
+            limit (float | None): Worst acceptable price, or None for any.
+            quantity (float): Quantity wanted.
+
+        Returns:
+            float: The quantity available, capped at the first level
+                that reaches `quantity`.
+        """
+        if side == Side.BID:
+            book = self._bids
+            prices = book.irange(minimum=limit, reverse=True)
+        else:
+            book = self._asks
+            prices = book.irange(maximum=limit)
+
+        available = 0
+        for price in prices:
+            available += book[price].total_remaining_qty
+            if available >= quantity:
+                break
+        return available
+
     def set_price(self, price: float) -> None:
         self._cur_price = round(price, 2)
 
@@ -150,8 +222,12 @@ class OrderBook:
             return iter([])
 
         level = b[price]
-        cur = level.head
-
-        while cur:
-            yield cur.order
-            cur = cur.next
+        # Nodes removed mid-iteration stay linked until every reader is done.
+        PriceLevelNodePool.begin_read()
+        try:
+            cur = level.head
+            while cur:
+                yield cur.order
+                cur = cur.next
+        finally:
+            PriceLevelNodePool.end_read()
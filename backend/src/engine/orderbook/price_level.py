@@ -1,4 +1,4 @@
-from .price_level_node import PriceLevelNode
+from .price_level_node import PriceLevelNode, PriceLevelNodePool
 from ..orders import Order
 
 
@@ -10,21 +10,28 @@ class PriceLevel:
     Maintains insertion order for matching priority (FIFO)
     and provides efficient append and removal operations.
 
-    Each order is wrapped in a PriceLevelNode and tracked via
-    a lookup dictionary for O(1) access.
+    Each order is wrapped in a PriceLevelNode, drawn from the shared
+    PriceLevelNodePool, and tracked via a lookup dictionary for O(1) access.
+
+    The level's total remaining quantity and order count are kept up to
+    date on append, remove and `reduce` so depth queries never walk nodes.
     """
 
+    __slots__ = ("_head", "_tail", "_tracker", "_total_remaining_qty", "_order_count")
+
     def __init__(self) -> None:
         self._head: PriceLevelNode | None = None
         self._tail: PriceLevelNode | None = None
         self._tracker: dict[str, PriceLevelNode] = {}
+        self._total_remaining_qty = 0
+        self._order_count = 0
 
     def append(self, order: Order) -> None:
         """Adds a new order to the end of the level. Raises ValueError if duplicate."""
         if order.id in self._tracker:
             raise ValueError(f"Order with id {order.id} already on level.")
 
-        new_node = PriceLevelNode(order)
+        new_node = PriceLevelNodePool.acquire(order)
 
         if self._head is None:
             self._head = new_node
@@ -35,6 +42,8 @@ class PriceLevel:
             self._tail = new_node
 
         self._tracker[order.id] = new_node
+        self._total_remaining_qty += order.quantity - order.executed_quantity
+        self._order_count += 1
 
     def remove(self, order: Order) -> None:
         """Removes the specified order from the level. Safe against head/tail removals."""
@@ -53,10 +62,20 @@ class PriceLevel:
             self._tail = orders_node.prev
 
         self._tracker.pop(order.id)
+        self._total_remaining_qty -= order.quantity - order.executed_quantity
+        self._order_count -= 1
+        PriceLevelNodePool.release(orders_node)
+
+    def reduce(self, quantity: int) -> None:
+        """Records a fill of `quantity` against an order resting on the level."""
+        self._total_remaining_qty -= quantity
 
     def __bool__(self) -> bool:
         return self._head is not None
 
+    def __contains__(self, order: Order) -> bool:
+        return order.id in self._tracker
+
     @property
     def head(self) -> PriceLevelNode | None:
         return self._head
@@ -65,6 +84,14 @@ class PriceLevel:
     def tail(self) -> PriceLevelNode | None:
         return self._tail
 
+    @property
+    def total_remaining_qty(self) -> int:
+        return self._total_remaining_qty
+
+    @property
+    def order_count(self) -> int:
+        return self._order_count
+
     @property
     def tracker(self) -> dict[str, PriceLevelNode]:
         return self._tracker
@@ -9,6 +9,8 @@ class PriceLevelNode:
     a PriceLevel.
     """
 
+    __slots__ = ("order", "prev", "next")
+
     def __init__(
         self,
         order: Order,
@@ -18,3 +20,60 @@ class PriceLevelNode:
         self.order = order
         self.prev = prev
         self.next = next
+
+
+class PriceLevelNodePool:
+    """
+    Free list of PriceLevelNodes shared by every price level, so that order
+    churn reuses nodes instead of allocating and collecting them.
+
+    Nodes removed while an order book iterator is walking a level are only
+    reclaimed once every iterator has finished. A removed node keeps its
+    `next` pointer until then, which lets an iterator step off a node that
+    was removed underneath it, as happens when a maker order fills during
+    matching.
+
+    Attributes:
+        max_size (int): Upper bound on the number of idle nodes retained.
+    """
+
+    max_size: int = 100_000
+    _free: list[PriceLevelNode] = []
+    _pending: list[PriceLevelNode] = []
+    _readers: int = 0
+
+    @classmethod
+    def acquire(cls, order: Order) -> PriceLevelNode:
+        if cls._free:
+            node = cls._free.pop()
+            node.order = order
+            return node
+        return PriceLevelNode(order)
+
+    @classmethod
+    def release(cls, node: PriceLevelNode) -> None:
+        if cls._readers:
+            cls._pending.append(node)
+        elif len(cls._free) < cls.max_size:
+            node.order = node.prev = node.next = None
+            cls._free.append(node)
+
+    @classmethod
+    def begin_read(cls) -> None:
+        cls._readers += 1
+
+    @classmethod
+    def end_read(cls) -> None:
+        cls._readers -= 1
+        if cls._readers or not cls._pending:
+            return
+
+        pending, cls._pending = cls._pending, []
+        for node in pending:
+            cls.release(node)
+
+    @classmethod
+    def clear(cls) -> None:
+        cls._free.clear()
+        cls._pending.clear()
+        cls._readers = 0
@@ -0,0 +1,87 @@
+from typing import Iterable, KeysView
+
+from sortedcontainers.sorteddict import SortedDict
+
+from enums import Side
+from ..orders.order import Order
+
+
+class StopBook:
+    """
+    Holds stop orders that haven't triggered yet, indexed by trigger price.
+
+    Buy stops trigger once the last trade price rises to their stop price
+    and sell stops once it falls to theirs, so each side is a sorted index
+    of trigger price to the orders waiting at it in arrival order.
+    `triggered` finds the k stops crossed by a price in O(log n + k).
+
+    Attributes:
+        _bids (SortedDict[float, dict[str, Order]]): Buy stops by trigger price.
+        _asks (SortedDict[float, dict[str, Order]]): Sell stops by trigger price.
+        _prices (dict[str, float]): Trigger price of every held order by id.
+    """
+
+    def __init__(self) -> None:
+        self._bids: SortedDict = SortedDict()
+        self._asks: SortedDict = SortedDict()
+        self._prices: dict[str, float] = {}
+
+    @property
+    def bid_levels(self) -> KeysView[float]:
+        return self._bids.keys()
+
+    @property
+    def ask_levels(self) -> KeysView[float]:
+        return self._asks.keys()
+
+    def __contains__(self, order: Order) -> bool:
+        return order.id in self._prices
+
+    def __len__(self) -> int:
+        return len(self._prices)
+
+    def append(self, order: Order, price: float) -> None:
+        if order.side == Side.BID:
+            book = self._bids
+        elif order.side == Side.ASK:
+            book = self._asks
+        else:
+            raise ValueError(f"Invalid order side: {order.side}")
+
+        if order.id in self._prices:
+            raise ValueError(f"Order with id {order.id} already in stop book.")
+
+        book.setdefault(price, {})[order.id] = order
+        self._prices[order.id] = price
+
+    def remove(self, order: Order, price: float) -> None:
+        book = self._bids if order.side == Side.BID else self._asks
+        level = book.get(price)
+        if level is None or level.pop(order.id, None) is None:
+            return
+
+        self._prices.pop(order.id)
+        if not level:
+            book.pop(price)
+
+    def triggered(self, price: float | None) -> list[Order]:
+        """
+        Returns every stop triggered at `price`: buy stops at or below it,
+        lowest first, then sell stops at or above it, highest first. They
+        stay in the book until removed.
+        """
+        if price is None:
+            return []
+
+        orders = []
+        for book, prices in (
+            (self._bids, self._bids.irange(maximum=price)),
+            (self._asks, self._asks.irange(minimum=price, reverse=True)),
+        ):
+            for level_price in prices:
+                orders.extend(book[level_price].values())
+        return orders
+
+    def get_orders(self, price: float, side: Side) -> Iterable[Order]:
+        book = self._bids if side == Side.BID else self._asks
+        return iter(book.get(price, {}).values())
@@ -4,6 +4,8 @@ from .order import Order
 
 
 class OCOOrder(Order):
+    __slots__ = ("counterparty",)
+
     def __init__(
         self,
         id_,
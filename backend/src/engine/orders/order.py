@@ -2,6 +2,17 @@ from enums import OrderType, Side, StrategyType
 
 
 class Order:
+    __slots__ = (
+        "id",
+        "user_id",
+        "strategy_type",
+        "order_type",
+        "side",
+        "quantity",
+        "executed_quantity",
+        "price",
+    )
+
     def __init__(
         self,
         id_: str,
@@ -5,6 +5,8 @@ from .order import Order
 
 
 class OTOOrder(Order):
+    __slots__ = ("parent", "child", "triggered")
+
     def __init__(
         self,
         id_: str,
@@ -5,6 +5,8 @@ from .order import Order
 
 
 class OTOCOOrder(Order):
+    __slots__ = ("parent", "child_a", "child_b", "counterparty", "triggered")
+
     def __init__(
         self,
         id_: str,
@@ -16,8 +16,13 @@ class StrategyProtocol(Protocol):
     ):
         """Handles the actions necessary when an order is filled."""
 
-    def cancel(self, order: Order, ctx: ExecutionContext):
-        """Handles the cancelling of the order"""
+    def cancel(
+        self, order: Order, ctx: ExecutionContext, reason: str | None = None
+    ):
+        """
+        Handles the cancelling of the order. `reason` is reported in the
+        cancellation events, falling back to the strategy's own.
+        """
 
     def modify(self, details: ModifyOrderCommand, order: Order, ctx: ExecutionContext):
         """Handles the modification of the order"""
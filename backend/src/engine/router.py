@@ -0,0 +1,57 @@
+from zlib import crc32
+
+from .codec import peek_instrument_id
+from .enums import CommandType
+
+
+def shard_for(instrument_id: str, shards: int) -> int:
+    """
+    Returns the shard that owns an instrument. Uses crc32 rather than
+    `hash` so that every process agrees regardless of hash seeding.
+    """
+    return crc32(instrument_id.encode()) % shards
+
+
+class ShardRouter:
+    """
+    Puts encoded commands on the queue of the engine shard that owns their
+    instrument, and commands without an instrument, such as an unfiltered
+    CANCEL_ALL, on every shard's queue. Exposes `put_nowait` and `admit`
+    so it can stand in for a single shard's CommandIngress.
+    """
+
+    def __init__(self, queues: list) -> None:
+        if not queues:
+            raise ValueError("At least one shard queue is required")
+        self.queues = queues
+
+    @property
+    def shards(self) -> int:
+        return len(self.queues)
+
+    def queue_for(self, instrument_id: str):
+        return self.queues[shard_for(instrument_id, len(self.queues))]
+
+    def admit(self, command_type: CommandType, instrument_id: str | None = None):
+        """Asks the owning shard, or every shard without an instrument."""
+        if instrument_id:
+            self.queue_for(instrument_id).admit(command_type, instrument_id)
+            return
+        for q in self.queues:
+            q.admit(command_type)
+
+    def put(self, data: bytes, block: bool = True, timeout: float | None = None):
+        instrument_id = peek_instrument_id(data)
+        if instrument_id:
+            self.queue_for(instrument_id).put(data, block, timeout)
+            return
+        for q in self.queues:
+            q.put(data, block, timeout)
+
+    def put_nowait(self, data: bytes) -> None:
+        instrument_id = peek_instrument_id(data)
+        if instrument_id:
+            self.queue_for(instrument_id).put_nowait(data)
+            return
+        for q in self.queues:
+            q.put_nowait(data)
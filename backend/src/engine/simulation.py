@@ -0,0 +1,260 @@
+"""
+Offline replay of encoded commands through a SpotEngine with nothing
+behind it: events are encoded and dropped and balances live in memory,
+so a run is bounded by matching alone. Used by the `replay` CLI to
+measure throughput, per command latency and to compare the final books
+of two runs.
+"""
+
+import hashlib
+import random
+import time
+from typing import Iterable, Iterator
+from uuid import UUID
+
+from config import CASH_ESCROW_HKEY
+from enums import OrderType, Side, StrategyType
+from .balance_ledger import BalanceLedger
+from .balance_manager import BalanceManager
+from .codec import decode_command, encode_command, peek_instrument_id
+from .enums import CommandType
+from .event_logger import EventLogger
+from .metrics import PERCENTILES, command_label
+from .models import (
+    CancelOrderCommand,
+    Command,
+    ModifyOrderCommand,
+    NewInstrument,
+    NewSingleOrder,
+)
+from .snapshot import capture_context
+from .spot_engine import SpotEngine
+
+
+class NullQueue:
+    """Event queue that counts what is put on it and keeps nothing."""
+
+    def __init__(self) -> None:
+        self.messages = 0
+
+    def put_nowait(self, data: bytes) -> None:
+        self.messages += 1
+
+
+class MemoryLedger(BalanceLedger):
+    """
+    BalanceLedger that never touches Redis. Entries missing from memory
+    start at `starting_balance`, except escrows which start at 0, so every
+    simulated user can afford their orders.
+    """
+
+    def __init__(self, starting_balance: float = 1e15) -> None:
+        super().__init__()
+        self.starting_balance = starting_balance
+
+    def get(self, hkey: str, user_id: str) -> float:
+        key = (hkey, user_id)
+        value = self._values.get(key)
+        if value is None:
+            is_escrow = hkey == CASH_ESCROW_HKEY or hkey.endswith(".escrows")
+            value = 0.0 if is_escrow else self.starting_balance
+            self._values[key] = value
+        return value
+
+    def flush(self) -> None:
+        self._deltas.clear()
+
+
+class SimulationReport:
+    def __init__(
+        self,
+        commands: int,
+        elapsed: float,
+        latencies: dict[str, list[int]],
+        messages: int,
+        digest: str,
+    ) -> None:
+        """
+        Args:
+            commands (int): Number of commands processed.
+            elapsed (float): Seconds spent processing them.
+            latencies (dict[str, list[int]]): Nanosecond latencies keyed
+                by command label. Empty when commands were batched.
+            messages (int): Event queue messages the engine sent.
+            digest (str): `book_digest` of the engine after the run.
+        """
+        self.commands = commands
+        self.elapsed = elapsed
+        self.latencies = latencies
+        self.messages = messages
+        self.digest = digest
+
+    @property
+    def throughput(self) -> float:
+        """Commands per second."""
+        return self.commands / self.elapsed if self.elapsed else 0.0
+
+    def percentiles(self) -> dict[str, dict[str, float]]:
+        """Latency percentiles in microseconds, per command label."""
+        result = {}
+        for label, samples in sorted(self.latencies.items()):
+            samples = sorted(samples)
+            stats = {"count": len(samples)}
+            for pct in PERCENTILES:
+                # Nearest rank.
+                idx = max(0, min(len(samples) - 1, int(len(samples) * pct / 100)))
+                stats[f"p{pct:g}"] = samples[idx] / 1_000
+            stats["max"] = samples[-1] / 1_000
+            result[label] = stats
+        return result
+
+
+def book_digest(engine: SpotEngine) -> str:
+    """
+    SHA-256 over every context's book, order store and order links. Two
+    engines fed the same commands from the same state have equal digests.
+    """
+    h = hashlib.sha256()
+    for instrument_id in sorted(engine.contexts):
+        h.update(repr(capture_context(engine.contexts[instrument_id])).encode())
+    return h.hexdigest()
+
+
+def generate_commands(
+    count: int,
+    instrument_ids: list[str],
+    *,
+    seed: int = 0,
+    users: int = 100,
+    price: float = 100.0,
+    spread: int = 50,
+    tick_size: float = 0.01,
+) -> Iterator[bytes]:
+    """
+    Yields `count` encoded commands of a synthetic order flow, the same
+    ones for the same arguments.
+
+    Roughly 70% are limit orders within `spread` ticks either side of
+    `price`, 10% market orders and the rest cancels and modifies of
+    earlier limit orders, which may since have filled.
+    """
+    rng = random.Random(seed)
+    resting: dict[str, list[str]] = {iid: [] for iid in instrument_ids}
+
+    for _ in range(count):
+        instrument_id = rng.choice(instrument_ids)
+        order_ids = resting[instrument_id]
+        roll = rng.random()
+
+        if order_ids and roll >= 0.95:
+            command = Command(
+                command_type=CommandType.MODIFY_ORDER,
+                data=ModifyOrderCommand(
+                    order_id=rng.choice(order_ids),
+                    symbol=instrument_id,
+                    limit_price=round(
+                        price + rng.randint(-spread, spread) * tick_size, 8
+                    ),
+                ),
+            )
+        elif order_ids and roll >= 0.8:
+            idx = rng.randrange(len(order_ids))
+            order_ids[idx], order_ids[-1] = order_ids[-1], order_ids[idx]
+            command = Command(
+                command_type=CommandType.CANCEL_ORDER,
+                data=CancelOrderCommand(order_id=order_ids.pop(), symbol=instrument_id),
+            )
+        else:
+            side = rng.choice((Side.BID, Side.ASK))
+            order_id = str(UUID(int=rng.getrandbits(128), version=4))
+            order = {
+                "order_id": order_id,
+                "user_id": f"user-{rng.randrange(users)}",
+                "side": side,
+                "quantity": rng.randint(1, 20),
+            }
+            if roll >= 0.7:
+                order["order_type"] = OrderType.MARKET
+                order["price"] = price
+            else:
+                # Skewed so that some limit orders cross the spread.
+                offset = rng.randint(-spread // 5, spread)
+                if side == Side.BID:
+                    offset = -offset
+                order["order_type"] = OrderType.LIMIT
+                order["limit_price"] = round(price + offset * tick_size, 8)
+                order_ids.append(order_id)
+
+            command = Command(
+                command_type=CommandType.NEW_ORDER,
+                data=NewSingleOrder(
+                    strategy_type=StrategyType.SINGLE,
+                    instrument_id=instrument_id,
+                    order=order,
+                ),
+            )
+
+        yield encode_command(command)
+
+
+def ensure_instruments(engine: SpotEngine, raw: Iterable[bytes]) -> None:
+    """Creates float priced instruments for commands the engine can't route."""
+    for data in raw:
+        instrument_id = peek_instrument_id(data)
+        # Engine wide commands, such as EXPIRE_ORDERS, carry no instrument.
+        if instrument_id and instrument_id not in engine.contexts:
+            engine.process_command(
+                Command(
+                    command_type=CommandType.NEW_INSTRUMENT,
+                    data=NewInstrument(instrument_id=instrument_id),
+                )
+            )
+
+
+def run_simulation(
+    engine: SpotEngine, raw: list[bytes], batch_size: int = 1
+) -> SimulationReport:
+    """
+    Feeds encoded commands through `engine` with null sinks installed.
+    They're decoded up front so that decoding isn't timed.
+
+    With a `batch_size` above 1 commands go through `process_commands` as
+    in the engine process, and only throughput is measured.
+    """
+    commands = [decode_command(data) for data in raw]
+    sink = NullQueue()
+    latencies: dict[str, list[int]] = {}
+
+    queue, EventLogger.queue = EventLogger.queue, sink
+    ledger, BalanceManager.ledger = BalanceManager.ledger, MemoryLedger()
+    try:
+        if batch_size > 1:
+            start = time.perf_counter()
+            for i in range(0, len(commands), batch_size):
+                engine.process_commands(commands[i : i + batch_size])
+            elapsed = time.perf_counter() - start
+        else:
+            clock = time.perf_counter_ns
+            process = engine.process_command
+            elapsed_ns = 0
+            for command in commands:
+                t0 = clock()
+                process(command)
+                taken = clock() - t0
+                elapsed_ns += taken
+                label = command_label(command)
+                if label not in latencies:
+                    latencies[label] = []
+                latencies[label].append(taken)
+            elapsed = elapsed_ns / 1e9
+    finally:
+        EventLogger.queue = queue
+        BalanceManager.ledger = ledger
+
+    return SimulationReport(
+        commands=len(commands),
+        elapsed=elapsed,
+        latencies=latencies,
+        messages=sink.messages,
+        digest=book_digest(engine),
+    )
@@ -0,0 +1,285 @@
+"""
+Binary snapshots of every ExecutionContext, used with the CommandJournal
+to restore an engine after a restart.
+
+A context is flattened into plain tuples so that pickling it neither
+recurses through the books' linked lists nor the orders' contingent
+links: every reachable order is written once, and links, book levels and
+the order store refer to orders by their index in that table.
+"""
+
+import os
+import pickle
+
+from config import CASH_ESCROW_HKEY
+from enums import Side
+from .balance_ledger import BalanceLedger
+from .balance_manager import BalanceManager
+from .codec import decode_command
+from .enums import CommandType
+from .event_logger import EventLogger
+from .execution_context import ExecutionContext
+from .journal import CommandJournal
+from .models import Command, NewInstrument
+from .orderbook import LadderOrderBook
+from .orders import OCOOrder, OTOCOOrder, OTOOrder, Order
+
+
+SNAPSHOT_VERSION = 5
+
+_KINDS = (Order, OCOOrder, OTOOrder, OTOCOOrder)
+_KIND_CODES = {cls: code for code, cls in enumerate(_KINDS)}
+_LINKS = {
+    Order: (),
+    OCOOrder: ("counterparty",),
+    OTOOrder: ("parent", "child"),
+    OTOCOOrder: ("parent", "child_a", "child_b", "counterparty"),
+}
+_FIELDS = (
+    "id",
+    "user_id",
+    "strategy_type",
+    "order_type",
+    "side",
+    "quantity",
+    "executed_quantity",
+    "price",
+)
+
+
+class ReplayLedger(BalanceLedger):
+    """
+    Ledger a journal tail is replayed against. Escrow is only ever written
+    by the engine, so an escrow missing from the snapshot was 0 when it was
+    taken. Balances missing from it, e.g. of users who signed up since, can
+    only be read from Redis.
+    """
+
+    def get(self, hkey: str, user_id: str) -> float:
+        key = (hkey, user_id)
+        if key not in self._values and (
+            hkey == CASH_ESCROW_HKEY or hkey.endswith(".escrows")
+        ):
+            self._values[key] = 0.0
+        return super().get(hkey, user_id)
+
+
+def capture_context(ctx: ExecutionContext) -> dict:
+    """Flattens a context's book, stop book, order store and order links."""
+    ob, stop_book = ctx.orderbook, ctx.stop_book
+    orders: list[Order] = []
+    index: dict[int, int] = {}
+
+    def visit(order: Order) -> int:
+        stack = [order]
+        while stack:
+            cur = stack.pop()
+            if id(cur) in index:
+                continue
+            index[id(cur)] = len(orders)
+            orders.append(cur)
+            for attr in _LINKS[type(cur)]:
+                linked = getattr(cur, attr)
+                if linked is not None:
+                    stack.append(linked)
+        return index[id(order)]
+
+    levels = {}
+    for key, book, side, prices in (
+        ("bids", ob, Side.BID, ob.bid_levels),
+        ("asks", ob, Side.ASK, ob.ask_levels),
+        ("bid_stops", stop_book, Side.BID, stop_book.bid_levels),
+        ("ask_stops", stop_book, Side.ASK, stop_book.ask_levels),
+    ):
+        levels[key] = [
+            (price, [visit(o) for o in book.get_orders(price, side)])
+            for price in list(prices)
+        ]
+    store = [visit(o) for o in ctx.order_store]
+
+    table = []
+    for order in orders:
+        cls = type(order)
+        links = tuple(
+            index[id(linked)] if (linked := getattr(order, attr)) is not None else -1
+            for attr in _LINKS[cls]
+        )
+        table.append(
+            (
+                _KIND_CODES[cls],
+                *(getattr(order, f) for f in _FIELDS),
+                links,
+                getattr(order, "triggered", None),
+            )
+        )
+
+    band = None
+    if isinstance(ob, LadderOrderBook):
+        band = (ctx.to_price(ob.min_price), ctx.to_price(ob.max_price))
+
+    return {
+        "instrument_id": ctx.instrument_id,
+        "tick_size": ctx.tick_size,
+        "band": band,
+        "price": ob.price,
+        "orders": table,
+        "store": store,
+        **levels,
+    }
+
+
+def restore_context(engine, state: dict) -> ExecutionContext:
+    """
+    Rebuilds a captured context inside `engine`. The instrument is created
+    if the engine doesn't have it yet, and its book is expected to be empty.
+    """
+    instrument_id = state["instrument_id"]
+    if instrument_id not in engine.contexts:
+        min_price, max_price = state["band"] or (None, None)
+        engine.process_command(
+            Command(
+                command_type=CommandType.NEW_INSTRUMENT,
+                data=NewInstrument(
+                    instrument_id=instrument_id,
+                    tick_size=state["tick_size"],
+                    min_price=min_price,
+                    max_price=max_price,
+                ),
+            )
+        )
+    ctx = engine.contexts[instrument_id]
+
+    orders = []
+    for kind, *values, _, triggered in state["orders"]:
+        cls = _KINDS[kind]
+        order = cls.__new__(cls)
+        for field, value in zip(_FIELDS, values):
+            setattr(order, field, value)
+        if triggered is not None:
+            order.triggered = triggered
+        orders.append(order)
+
+    for order, row in zip(orders, state["orders"]):
+        links = row[-2]
+        for attr, idx in zip(_LINKS[type(order)], links):
+            setattr(order, attr, orders[idx] if idx != -1 else None)
+
+    ctx.orderbook.set_price(state["price"])
+    for key, book in (
+        ("bids", ctx.orderbook),
+        ("asks", ctx.orderbook),
+        ("bid_stops", ctx.stop_book),
+        ("ask_stops", ctx.stop_book),
+    ):
+        for price, idxs in state[key]:
+            for idx in idxs:
+                book.append(orders[idx], price)
+    for idx in state["store"]:
+        ctx.order_store.add(orders[idx])
+
+    return ctx
+
+
+def write_snapshot(path: str, engine, seq: int) -> None:
+    """
+    Writes every context of `engine`, the expiry times of its resting
+    orders and the balances in its ledger along with `seq`, the sequence
+    number of the last journaled command it reflects. The file is replaced
+    atomically so a crash mid-write leaves the previous snapshot intact.
+    """
+    ctxs = engine.contexts
+    ledger = BalanceManager.ledger
+    state = {
+        "version": SNAPSHOT_VERSION,
+        "seq": seq,
+        "balances": ledger.entries() if ledger is not None else {},
+        "contexts": [capture_context(ctx) for ctx in ctxs.values()],
+        "expiry_clock": engine.expiries.now,
+        # Orders filled or cancelled since being scheduled are left out.
+        "expiries": [
+            (instrument_id, order_id, deadline)
+            for (instrument_id, order_id), deadline in engine.expiries.items()
+            if ctxs[instrument_id].order_store.get(order_id) is not None
+        ],
+    }
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "wb") as f:
+        pickle.dump(state, f, protocol=pickle.HIGHEST_PROTOCOL)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+
+
+def load_snapshot(path: str, engine, ledger: BalanceLedger | None = None) -> int:
+    """
+    Restores every context in the snapshot at `path` into `engine`, and its
+    balances into `ledger` if given. Returns the journal sequence number it
+    covers, or 0 without a snapshot.
+    """
+    if not os.path.exists(path):
+        return 0
+
+    with open(path, "rb") as f:
+        state = pickle.load(f)
+    if state["version"] != SNAPSHOT_VERSION:
+        raise ValueError(f"Unsupported snapshot version: {state['version']}")
+
+    for ctx_state in state["contexts"]:
+        restore_context(engine, ctx_state)
+    if ledger is not None:
+        ledger.restore(state["balances"])
+
+    if state["expiry_clock"] is not None:
+        engine.expiries.advance(state["expiry_clock"])
+    for instrument_id, order_id, deadline in state["expiries"]:
+        engine.expiries.schedule((instrument_id, order_id), deadline)
+    return state["seq"]
+
+
+def recover_engine(
+    engine,
+    snapshot_path: str,
+    journal: CommandJournal,
+    ledger: BalanceLedger | None = None,
+) -> int:
+    """
+    Loads the latest snapshot into `engine` and replays the journal tail on
+    top of it, returning the number of commands replayed.
+
+    The tail is replayed against the balances in the snapshot rather than
+    what Redis holds after the crash, so every command sees the balances it
+    saw the first time and has the same outcome. Events of the commands up
+    to the journal's last published marker were sent before the restart, so
+    they go nowhere. The rest never left the engine, e.g. a batch cut short
+    by the crash, and are sent to the event queue now.
+
+    The replayed balances include changes the engine never got to write to
+    Redis. With a `ledger`, they're restored into it and written to Redis,
+    except for hashes it shares with other shards, which were written as
+    they changed.
+    """
+    replay_ledger = ReplayLedger()
+    seq = load_snapshot(snapshot_path, engine, replay_ledger)
+
+    queue = EventLogger.queue
+    previous, BalanceManager.ledger = BalanceManager.ledger, replay_ledger
+    replayed = 0
+    try:
+        for command_seq, raw in journal.replay(seq):
+            EventLogger.queue = queue if command_seq > journal.published else None
+            engine.process_command(decode_command(raw))
+            replayed += 1
+    finally:
+        EventLogger.queue = queue
+        BalanceManager.ledger = previous
+
+    if ledger is not None:
+        ledger.restore(
+            {
+                key: value
+                for key, value in replay_ledger.entries().items()
+                if key[0] not in ledger.shared
+            }
+        )
+        ledger.publish()
+    return replayed
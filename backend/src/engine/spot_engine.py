@@ -1,16 +1,23 @@
-from enums import EventType, LiquidityRole, OrderType, Side, StrategyType
+import time
+from typing import Iterable
+
+from enums import EventType, OrderType, Side, StrategyType
 from .balance_manager import BalanceManager
 from .enums import CommandType, MatchOutcome
 from .event_logger import EventLogger
 from .execution_context import ExecutionContext
+from .metrics import EngineMetrics, command_label
 from .models import (
+    MODIFY_SENTINEL,
     Command,
+    CancelAllCommand,
     CancelOrderCommand,
+    ExpireOrders,
     ModifyOrderCommand,
     NewInstrument,
     NewOrderCommand,
 )
-from .orderbook import OrderBook
+from .orderbook import LadderOrderBook, OrderBook
 from .orders import Order
 from .protocols import EngineProtocol, StrategyProtocol
 from .stores import OrderStore
@@ -20,11 +27,43 @@ from .strategies import (
     OTOStrategy,
     OTOCOStrategy,
 )
+from .timer_wheel import TimerWheel
 from .typing import MatchResult
+from .utils import (
+    order_priced,
+    order_prices_in_band,
+    order_prices_on_tick,
+    order_prices_to_ticks,
+    price_in_band,
+    release_escrow,
+    reserve_escrow,
+    rest_order,
+)
+
+
+OFF_TICK_REASON = "Price is not a multiple of the tick size."
+UNPRICED_REASON = "Order has no price."
+OUT_OF_BAND_REASON = "Price is outside the instrument's price band."
 
 
 class SpotEngine(EngineProtocol):
-    def __init__(self, instrument_ids: list[str] = None):
+    def __init__(
+        self,
+        instrument_ids: list[str] = None,
+        instruments: list[NewInstrument] | None = None,
+        metrics: EngineMetrics | None = None,
+    ):
+        """
+        Args:
+            instrument_ids (list[str], optional): Instruments traded with raw
+                float prices.
+            instruments (list[NewInstrument], optional): Instruments with their
+                configuration. Those carrying a tick_size are traded in
+                tick-normalised mode, and those that also carry a price
+                band are backed by a LadderOrderBook.
+            metrics (EngineMetrics, optional): Where latencies and counters
+                are recorded. Defaults to a new EngineMetrics.
+        """
         self._strategy_handlers: dict[StrategyType, StrategyProtocol] = {
             StrategyType.SINGLE: SingleOrderStrategy(),
             StrategyType.OCO: OCOStrategy(),
@@ -33,27 +72,95 @@ class SpotEngine(EngineProtocol):
         }
         self._balance_manager = BalanceManager()
         self._ctxs: dict[str, ExecutionContext] = {}
-
-        if instrument_ids:
-            for iid in instrument_ids:
-                self._ctxs[iid] = ExecutionContext(
-                    engine=self,
-                    orderbook=OrderBook(),
-                    order_store=OrderStore(),
-                    instrument_id=iid,
-                )
-
-    def process_command(self, command: Command) -> None:
-        """Main entry point for processing all incoming commands."""
-        handlers = {
+        # (instrument_id, order_id) of resting orders keyed by expiry time.
+        self._expiries = TimerWheel()
+        self._command_handlers = {
             CommandType.NEW_ORDER: self._handle_new_order,
             CommandType.CANCEL_ORDER: self._handle_cancel_order,
             CommandType.MODIFY_ORDER: self._handle_modify_order,
             CommandType.NEW_INSTRUMENT: self._handle_new_instrument,
+            CommandType.EXPIRE_ORDERS: self._handle_expire_orders,
+            CommandType.CANCEL_ALL: self._handle_cancel_all,
         }
-        handler = handlers.get(command.command_type)
-        if handler:
+        self._metrics = metrics if metrics is not None else EngineMetrics()
+        # Whether the command being processed was sampled for timing.
+        self._timing = False
+
+        if instrument_ids:
+            for iid in instrument_ids:
+                self._handle_new_instrument(NewInstrument(instrument_id=iid))
+
+        if instruments:
+            for details in instruments:
+                self._handle_new_instrument(details)
+
+    @property
+    def contexts(self) -> dict[str, ExecutionContext]:
+        """Execution contexts keyed by instrument id."""
+        return self._ctxs
+
+    @property
+    def expiries(self) -> TimerWheel:
+        """Expiry times of resting GTD and DAY orders."""
+        return self._expiries
+
+    @property
+    def metrics(self) -> EngineMetrics:
+        return self._metrics
+
+    def process_command(self, command: Command) -> None:
+        """
+        Main entry point for processing all incoming commands. Events the
+        command emits are sent together once it has been handled.
+        """
+        EventLogger.begin_batch()
+        emitted = EventLogger.emitted
+        try:
+            self._dispatch(command)
+        finally:
+            self._metrics.events += EventLogger.emitted - emitted
+            EventLogger.end_batch()
+
+    def process_commands(self, batch: Iterable[Command]) -> None:
+        """
+        Processes a batch of commands in order. Work that only needs doing
+        once per batch, such as sending balance settlements to Redis and
+        events to the event queue, is deferred until the whole batch has
+        been handled. Balances are flushed first so that consumers of the
+        events read settled balances.
+        """
+        dispatch = self._dispatch
+        BalanceManager.begin_batch()
+        EventLogger.begin_batch()
+        emitted = EventLogger.emitted
+        try:
+            for command in batch:
+                dispatch(command)
+        finally:
+            self._metrics.events += EventLogger.emitted - emitted
+            try:
+                BalanceManager.end_batch()
+            finally:
+                EventLogger.end_batch()
+
+    def _dispatch(self, command: Command) -> None:
+        handler = self._command_handlers.get(command.command_type)
+        if handler is None:
+            return
+
+        metrics = self._metrics
+        if not metrics.sample():
+            handler(command.data)
+            return
+
+        self._timing = True
+        start = time.perf_counter_ns()
+        try:
             handler(command.data)
+        finally:
+            elapsed = time.perf_counter_ns() - start
+            self._timing = False
+            metrics.record(f"command.{command_label(command)}", elapsed)
 
     def _handle_new_order(self, details: NewOrderCommand) -> None:
         ctx = self._ctxs.get(details.instrument_id)
@@ -61,7 +168,68 @@ class SpotEngine(EngineProtocol):
         if not ctx or not strategy:
             return
 
+        orders = [
+            order
+            for _, value in details
+            for order in (value if isinstance(value, list) else [value])
+            if isinstance(order, dict)
+        ]
+        if not all(order_priced(order) for order in orders):
+            # Escrow and matching both need the price, e.g. the reference
+            # price of a market order.
+            for order in orders:
+                self._reject_order(order, ctx, UNPRICED_REASON)
+            return
+
+        if ctx.tick_size is not None:
+            if not all(order_prices_on_tick(order, ctx) for order in orders):
+                # Rounding would trade the order at a price other than the
+                # one recorded for it, so it's turned away instead.
+                for order in orders:
+                    self._reject_order(order, ctx, OFF_TICK_REASON)
+                return
+
+            # Prices are converted to ticks once, here, at the engine's edge.
+            for order in orders:
+                order_prices_to_ticks(order, ctx)
+
+            if isinstance(ctx.orderbook, LadderOrderBook) and not all(
+                order_prices_in_band(order, ctx.orderbook) for order in orders
+            ):
+                for order in orders:
+                    self._reject_order(order, ctx, OUT_OF_BAND_REASON)
+                return
+
         strategy.handle_new(details, ctx)
+        self._schedule_expiries(details, ctx)
+        self._trigger_stops(ctx)
+
+    def _reject_order(self, order: dict, ctx: ExecutionContext, reason: str) -> None:
+        EventLogger.log_event(
+            EventType.ORDER_CANCELLED,
+            user_id=order["user_id"],
+            related_id=order["order_id"],
+            instrument_id=ctx.instrument_id,
+            details={
+                "executed_quantity": 0,
+                "quantity": order["quantity"],
+                "reason": reason,
+            },
+        )
+
+    def _schedule_expiries(self, details: NewOrderCommand, ctx: ExecutionContext):
+        """Schedules the expiry of the orders in `details` left resting."""
+        for _, value in details:
+            orders = value if isinstance(value, list) else [value]
+            for order in orders:
+                if (
+                    isinstance(order, dict)
+                    and order.get("expires_at") is not None
+                    and ctx.order_store.get(order["order_id"]) is not None
+                ):
+                    self._expiries.schedule(
+                        (ctx.instrument_id, order["order_id"]), order["expires_at"]
+                    )
 
     def _handle_cancel_order(self, details: CancelOrderCommand) -> None:
         ctx = self._ctxs.get(details.symbol)
@@ -73,7 +241,25 @@ class SpotEngine(EngineProtocol):
             return
 
         strategy = self._strategy_handlers.get(order.strategy_type)
-        strategy.cancel(order, ctx)
+        strategy.cancel(order, ctx, "Client requested cancel.")
+
+    def _handle_cancel_all(self, details: CancelAllCommand) -> None:
+        if details.symbol is None:
+            ctxs = self._ctxs.values()
+        else:
+            ctx = self._ctxs.get(details.symbol)
+            ctxs = (ctx,) if ctx else ()
+
+        for ctx in ctxs:
+            for order in ctx.order_store.get_user_orders(details.user_id):
+                if details.side is not None and order.side != details.side:
+                    continue
+                if ctx.order_store.get(order.id) is None:
+                    # Already cancelled along with a linked order.
+                    continue
+
+                strategy = self._strategy_handlers.get(order.strategy_type)
+                strategy.cancel(order, ctx, "Client requested cancel.")
 
     def _handle_modify_order(self, details: ModifyOrderCommand) -> None:
         ctx = self._ctxs.get(details.symbol)
@@ -84,46 +270,162 @@ class SpotEngine(EngineProtocol):
         if not order:
             return
 
+        if ctx.tick_size is not None:
+            prices = {
+                key: getattr(details, key)
+                for key in ("limit_price", "stop_price")
+                if getattr(details, key) != MODIFY_SENTINEL
+            }
+            if not all(ctx.on_tick(price) for price in prices.values()):
+                EventLogger.log_event(
+                    EventType.ORDER_MODIFY_REJECTED,
+                    user_id=order.user_id,
+                    related_id=order.id,
+                    instrument_id=ctx.instrument_id,
+                    details={"reason": OFF_TICK_REASON},
+                )
+                return
+
+            details = details.model_copy(
+                update={key: ctx.to_ticks(price) for key, price in prices.items()}
+            )
+            if not all(
+                price_in_band(getattr(details, key), ctx.orderbook) for key in prices
+            ):
+                EventLogger.log_event(
+                    EventType.ORDER_MODIFY_REJECTED,
+                    user_id=order.user_id,
+                    related_id=order.id,
+                    instrument_id=ctx.instrument_id,
+                    details={"reason": OUT_OF_BAND_REASON},
+                )
+                return
+
         strategy = self._strategy_handlers.get(order.strategy_type)
         strategy.modify(details, order, ctx)
 
+    def _handle_expire_orders(self, details: ExpireOrders) -> None:
+        """Cancels every order whose expiry time is at or before `details.now`."""
+        for instrument_id, order_id in self._expiries.advance(details.now):
+            ctx = self._ctxs.get(instrument_id)
+            order = ctx.order_store.get(order_id) if ctx else None
+            if order is None:
+                # Filled or cancelled since it was scheduled.
+                continue
+
+            strategy = self._strategy_handlers.get(order.strategy_type)
+            strategy.cancel(order, ctx, "Order expired.")
+
     def _handle_new_instrument(self, details: NewInstrument):
-        self._ctxs[details.instrument_id] = ExecutionContext(
+        ctx = ExecutionContext(
             engine=self,
-            orderbook=OrderBook(),
+            orderbook=None,
             order_store=OrderStore(),
             instrument_id=details.instrument_id,
+            tick_size=details.tick_size,
         )
+        # The book's starting price must share the context's price unit.
+        if (
+            details.tick_size is not None
+            and details.min_price is not None
+            and details.max_price is not None
+        ):
+            ctx.orderbook = LadderOrderBook(
+                ctx.to_ticks(details.min_price),
+                ctx.to_ticks(details.max_price),
+                price=ctx.to_ticks(100.0),
+            )
+        else:
+            ctx.orderbook = OrderBook(price=ctx.to_ticks(100.0))
+        self._ctxs[details.instrument_id] = ctx
 
     def match(self, taker_order: Order, ctx: ExecutionContext) -> MatchResult:
         """
         Public method for strategies to submit an order for immediate matching.
         This fulfills the EngineProtocol requirement cleanly.
         """
-        if not self._check_sufficient_balance(
-            taker_order, taker_order.quantity, taker_order.price, ctx.instrument_id
-        ):
+        if self._timing:
+            start = time.perf_counter_ns()
+            reserved = self._reserve_taker_escrow(taker_order, ctx)
+            self._metrics.record("reserve_escrow", time.perf_counter_ns() - start)
+        else:
+            reserved = self._reserve_taker_escrow(taker_order, ctx)
+
+        if not reserved:
             handler = self._strategy_handlers[taker_order.strategy_type]
             handler.cancel(taker_order, ctx)
             return MatchResult(
                 outcome=MatchOutcome.UNAUTHORISED, quantity=0, price=None
             )
 
-        return self._match(taker_order, ctx)
+        if self._timing:
+            start = time.perf_counter_ns()
+            result = self._match(taker_order, ctx)
+            self._metrics.record("match", time.perf_counter_ns() - start)
+        else:
+            result = self._match(taker_order, ctx)
+        # Whatever is left is escrowed again if the order goes on to rest.
+        release_escrow(taker_order, ctx)
+        return result
+
+    def _trigger_stops(self, ctx: ExecutionContext) -> None:
+        """
+        Sends every stop crossed by the last trade price into matching, and
+        keeps going while the trades they make cross further stops. A
+        triggered stop that isn't fully filled rests in the order book.
+        """
+        stop_book = ctx.stop_book
+        while True:
+            orders = stop_book.triggered(ctx.orderbook.price)
+            if not orders:
+                return
+
+            for order in orders:
+                # An earlier activation may have cancelled it, e.g. by
+                # filling its OCO counterparty.
+                if order not in stop_book:
+                    continue
+
+                result = self.match(order, ctx)
+                if order not in stop_book:
+                    # Cancelled by its strategy, e.g. for insufficient funds.
+                    continue
+
+                stop_book.remove(order, order.price)
+                if result.outcome in (
+                    MatchOutcome.FAILURE,
+                    MatchOutcome.PARTIAL,
+                ) and not rest_order(order, ctx):
+                    handler = self._strategy_handlers[order.strategy_type]
+                    handler.cancel(order, ctx)
 
     def _match(self, taker_order: Order, ctx: ExecutionContext) -> MatchResult:
         opposite_side = Side.ASK if taker_order.side == Side.BID else Side.BID
         ob = ctx.orderbook
         last_best_price = None
+        # Limit orders never trade through their limit price.
+        limit = taker_order.price if taker_order.order_type == OrderType.LIMIT else None
+        levels = makers = 0
+        filled = filled_value = 0
+        timing = self._timing
 
         while taker_order.executed_quantity < taker_order.quantity:
             best_price = ob.best_ask if opposite_side is Side.ASK else ob.best_bid
             if last_best_price == best_price:
                 break
+            if limit is not None and best_price is not None:
+                if opposite_side is Side.ASK and best_price > limit:
+                    break
+                if opposite_side is Side.BID and best_price < limit:
+                    break
+
+            levels += 1
+            level_filled = taker_order.executed_quantity
 
             for maker_order in ob.get_orders(best_price, opposite_side):
                 if taker_order.executed_quantity >= taker_order.quantity:
                     break
+                makers += 1
 
                 unfilled_maker_qty = (
                     maker_order.quantity - maker_order.executed_quantity
@@ -133,29 +435,31 @@ class SpotEngine(EngineProtocol):
                     taker_order.quantity - taker_order.executed_quantity,
                 )
 
-                if not self._check_sufficient_balance(
-                    maker_order, trade_qty, best_price, ctx.instrument_id
-                ):
-                    handler = self._strategy_handlers[maker_order.strategy_type]
-                    handler.cancel(maker_order, ctx)
-                    continue
+                # Makers escrowed what they could trade when they rested.
+                if timing:
+                    start = time.perf_counter_ns()
+                    self._process_trade(
+                        taker_order, maker_order, trade_qty, best_price, ctx
+                    )
+                    self._metrics.record(
+                        "process_trade", time.perf_counter_ns() - start
+                    )
+                else:
+                    self._process_trade(
+                        taker_order, maker_order, trade_qty, best_price, ctx
+                    )
+
+            level_filled = taker_order.executed_quantity - level_filled
+            if level_filled:
+                filled += level_filled
+                filled_value += level_filled * ctx.to_price(best_price)
+            last_best_price = best_price
 
-                if maker_order.executed_quantity == 0:
-                    if maker_order.side == Side.BID:
-                        BalanceManager.increase_cash_escrow(
-                            maker_order.user_id,
-                            maker_order.quantity * maker_order.price,
-                        )
-                    else:
-                        BalanceManager.increase_asset_escrow(
-                            maker_order.user_id, ctx.instrument_id, maker_order.quantity
-                        )
-
-                self._process_trade(
-                    taker_order, maker_order, trade_qty, best_price, ctx
-                )
+        self._metrics.levels_crossed += levels
+        self._metrics.makers_touched += makers
 
-            last_best_price = best_price
+        if filled:
+            self._log_fill_summary(taker_order, filled, filled_value / filled, ctx)
 
         if taker_order.executed_quantity == taker_order.quantity:
             return MatchResult(
@@ -167,35 +471,13 @@ class SpotEngine(EngineProtocol):
             MatchOutcome.PARTIAL, taker_order.executed_quantity, last_best_price
         )
 
-    def _check_sufficient_balance(
-        self, order: Order, quantity: float, price: float, instrument_id: str
-    ) -> bool:
+    def _reserve_taker_escrow(self, order: Order, ctx: ExecutionContext) -> bool:
         """
-        Checks if the user has sufficient balance to execute this trade.
-
-        Args:
-            order (Order): Order being used in the trade.
-            quantity (float): Quantity being matched
-            price (float): _description_
-
-        Returns:
-            bool:
-                - True: Sufficient balance.
-                - False: Insufficient balance.
+        Escrows what the taker needs to trade its unfilled quantity at its
+        own price, market orders included, so that every balance change
+        goes through the engine. Returns False if the user can't cover it.
         """
-        if order.order_type == OrderType.MARKET:
-            # In a more complex system, balance checks would be made.
-            # For now we're assuming the amount for the trade was already
-            # escrowed at the HTTP API layer.
-            return True
-
-        if order.side == Side.ASK:
-            return quantity <= BalanceManager.get_available_asset_balance(
-                order.user_id, instrument_id
-            )
-
-        trade_value = quantity * price
-        return trade_value <= BalanceManager.get_available_cash_balance(order.user_id)
+        return reserve_escrow(order, ctx)
 
     def _process_trade(
         self,
@@ -208,23 +490,39 @@ class SpotEngine(EngineProtocol):
         """
         Handles the logic for a single trade event: updating quantities,
         notifying strategies, and removing filled orders.
+
+        `price` is in the book's internal representation and is only
+        converted back for balance settlement and emitted events.
         """
         taker_order.executed_quantity += quantity
         maker_order.executed_quantity += quantity
+        ctx.orderbook.reduce(maker_order, price, quantity)
+        ctx.orderbook.set_price(price)
+        trade_price = ctx.to_price(price)
 
         if taker_order.side == Side.BID:
+            # The taker escrowed at its own price, so hand back the difference.
+            escrow_price = ctx.to_price(taker_order.price)
+            if escrow_price != trade_price:
+                BalanceManager.release(
+                    taker_order.user_id,
+                    ctx.instrument_id,
+                    Side.BID,
+                    quantity,
+                    escrow_price - trade_price,
+                )
             BalanceManager.settle_bid(
-                taker_order.user_id, ctx.instrument_id, quantity, price
+                taker_order.user_id, ctx.instrument_id, quantity, trade_price
             )
             BalanceManager.settle_ask(
-                maker_order.user_id, ctx.instrument_id, quantity, price
+                maker_order.user_id, ctx.instrument_id, quantity, trade_price
             )
         else:
             BalanceManager.settle_ask(
-                taker_order.user_id, ctx.instrument_id, quantity, price
+                taker_order.user_id, ctx.instrument_id, quantity, trade_price
             )
             BalanceManager.settle_bid(
-                maker_order.user_id, ctx.instrument_id, quantity, price
+                maker_order.user_id, ctx.instrument_id, quantity, trade_price
             )
 
         taker_strategy = self._strategy_handlers[taker_order.strategy_type]
@@ -232,50 +530,44 @@ class SpotEngine(EngineProtocol):
         taker_strategy.handle_filled(quantity, price, taker_order, ctx)
         maker_strategy.handle_filled(quantity, price, maker_order, ctx)
 
-        self._log_fill_event(taker_order, price, ctx.instrument_id)
-        self._log_fill_event(maker_order, price, ctx.instrument_id)
-
         if maker_order.executed_quantity == maker_order.quantity:
             ctx.orderbook.remove(maker_order, price)
 
         EventLogger.log_event(
-            EventType.NEW_TRADE,
+            EventType.EXECUTION,
             user_id=taker_order.user_id,
             related_id=taker_order.id,
             instrument_id=ctx.instrument_id,
             details={
+                "executed_quantity": taker_order.executed_quantity,
                 "quantity": quantity,
-                "price": price,
-                "role": LiquidityRole.TAKER.value,
+                "price": trade_price,
+                "side": taker_order.side,
+                "order_quantity": taker_order.quantity,
+                "maker_user_id": maker_order.user_id,
+                "maker_order_id": maker_order.id,
+                "maker_executed_quantity": maker_order.executed_quantity,
+                "maker_order_quantity": maker_order.quantity,
             },
         )
+
+    def _log_fill_summary(
+        self, order: Order, quantity: float, price: float, ctx: ExecutionContext
+    ) -> None:
+        """
+        Emits the taker's state after a sweep: `quantity` filled across
+        every maker it touched at an average of `price`.
+        """
         EventLogger.log_event(
-            EventType.NEW_TRADE,
-            user_id=maker_order.user_id,
-            related_id=maker_order.id,
+            EventType.FILL_SUMMARY,
+            user_id=order.user_id,
+            related_id=order.id,
             instrument_id=ctx.instrument_id,
             details={
-                "quantity": quantity,
+                "executed_quantity": order.executed_quantity,
+                "quantity": order.quantity,
                 "price": price,
-                "role": LiquidityRole.MAKER.value,
+                "side": order.side,
+                "filled_quantity": quantity,
             },
         )
-
-    def _log_fill_event(self, order: Order, price: float, instrument_id: str) -> None:
-        ev_details = {
-            "executed_quantity": order.executed_quantity,
-            "quantity": order.quantity,
-            "price": price,
-        }
-        etype = (
-            EventType.ORDER_FILLED
-            if order.executed_quantity == order.quantity
-            else EventType.ORDER_PARTIALLY_FILLED
-        )
-        EventLogger.log_event(
-            etype,
-            user_id=order.user_id,
-            related_id=order.id,
-            instrument_id=instrument_id,
-            details=ev_details,
-        )
@@ -1,3 +1,5 @@
+from typing import Iterator
+
 from ..orders import Order
 from ..protocols import StoreProtocol
 
@@ -5,12 +7,35 @@ from ..protocols import StoreProtocol
 class OrderStore(StoreProtocol[Order]):
     def __init__(self):
         self._orders: dict[str, Order] = {}
+        # user_id -> the user's orders by id, so a user's orders can be
+        # found without scanning the whole store.
+        self._user_orders: dict[str, dict[str, Order]] = {}
 
     def add(self, value: Order) -> None:
-        self._orders.setdefault(value.id, value)
+        if value.id in self._orders:
+            return
+        self._orders[value.id] = value
+        self._user_orders.setdefault(value.user_id, {})[value.id] = value
 
     def remove(self, value: Order) -> None:
-        self._orders.pop(value.id, None)
+        order = self._orders.pop(value.id, None)
+        if order is None:
+            return
+
+        user_orders = self._user_orders[order.user_id]
+        del user_orders[order.id]
+        if not user_orders:
+            del self._user_orders[order.user_id]
 
     def get(self, value: str) -> Order | None:
         return self._orders.get(value)
+
+    def get_user_orders(self, user_id: str) -> list[Order]:
+        """Returns a copy of the user's orders, oldest first."""
+        return list(self._user_orders.get(user_id, {}).values())
+
+    def __iter__(self) -> Iterator[Order]:
+        return iter(self._orders.values())
+
+    def __len__(self) -> int:
+        return len(self._orders)
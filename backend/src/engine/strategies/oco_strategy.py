@@ -5,7 +5,7 @@ from ..mixins import ModifyOrderMixin
 from ..models import ModifyOrderCommand, NewOCOOrder
 from ..orders import OCOOrder
 from ..protocols import StrategyProtocol
-from ..utils import get_price_key
+from ..utils import append_order, get_price_key, remove_order
 
 
 class OCOStrategy(ModifyOrderMixin, StrategyProtocol):
@@ -35,8 +35,18 @@ class OCOStrategy(ModifyOrderMixin, StrategyProtocol):
         order_a.counterparty = order_b
         order_b.counterparty = order_a
 
-        ctx.orderbook.append(order_a, order_a.price)
-        ctx.orderbook.append(order_b, order_b.price)
+        if not append_order(order_a, ctx) or not append_order(order_b, ctx):
+            remove_order(order_a, ctx)
+            for order in (order_a, order_b):
+                EventLogger.log_event(
+                    EventType.ORDER_CANCELLED,
+                    user_id=order.user_id,
+                    related_id=order.id,
+                    instrument_id=ctx.instrument_id,
+                    details={"reason": "Insufficient funds"},
+                )
+            return
+
         ctx.order_store.add(order_a)
         ctx.order_store.add(order_b)
 
@@ -48,7 +58,7 @@ class OCOStrategy(ModifyOrderMixin, StrategyProtocol):
             details={
                 "executed_quantity": order_a.executed_quantity,
                 "quantity": order_a.quantity,
-                "price": order_a.price,
+                "price": ctx.to_price(order_a.price),
                 "side": order_a.side,
             },
         )
@@ -60,7 +70,7 @@ class OCOStrategy(ModifyOrderMixin, StrategyProtocol):
             details={
                 "executed_quantity": order_b.executed_quantity,
                 "quantity": order_b.quantity,
-                "price": order_b.price,
+                "price": ctx.to_price(order_b.price),
                 "side": order_b.side,
             },
         )
@@ -80,26 +90,31 @@ class OCOStrategy(ModifyOrderMixin, StrategyProtocol):
             details={"reason": f"OCO peer {order.id} was filled."},
         )
 
-    def cancel(self, order: OCOOrder, ctx: ExecutionContext) -> None:
+    def cancel(
+        self,
+        order: OCOOrder,
+        ctx: ExecutionContext,
+        reason: str = "Client requested cancel.",
+    ) -> None:
         self._cancel(order, ctx)
         EventLogger.log_event(
             EventType.ORDER_CANCELLED,
             user_id=order.user_id,
             related_id=order.id,
             instrument_id=ctx.instrument_id,
-            details={"reason": "Client requested cancel."},
+            details={"reason": reason},
         )
         EventLogger.log_event(
             EventType.ORDER_CANCELLED,
             user_id=order.user_id,
             related_id=order.counterparty.id,
             instrument_id=ctx.instrument_id,
-            details={"reason": "Client requested cancel."},
+            details={"reason": reason},
         )
 
     def _cancel(self, order: OCOOrder, ctx: ExecutionContext) -> None:
-        ctx.orderbook.remove(order, order.price)
-        ctx.orderbook.remove(order.counterparty, order.counterparty.price)
+        remove_order(order, ctx)
+        remove_order(order.counterparty, ctx)
         ctx.order_store.remove(order)
         ctx.order_store.remove(order.counterparty)
 
@@ -7,7 +7,7 @@ from ..models import ModifyOrderCommand, NewOTOOrder
 from ..orders import OTOOrder
 from ..protocols import StrategyProtocol
 from ..typing import MatchResult
-from ..utils import get_price_key, limit_crossable, stop_crossable
+from ..utils import append_order, get_price_key, limit_crossable, remove_order
 
 
 class OTOStrategy(ModifyOrderMixin, StrategyProtocol):
@@ -45,9 +45,8 @@ class OTOStrategy(ModifyOrderMixin, StrategyProtocol):
                 parent_data["limit_price"], parent.side, ctx.orderbook
             )
         if parent_data["order_type"] == OrderType.STOP:
-            matchable = stop_crossable(
-                parent_data["stop_price"], parent.side, ctx.orderbook
-            )
+            # Stops wait in the stop book until the last trade price reaches them.
+            matchable = False
 
         if matchable:
             result: MatchResult = ctx.engine.match(parent, ctx)
@@ -57,23 +56,27 @@ class OTOStrategy(ModifyOrderMixin, StrategyProtocol):
                 return
 
             if result.outcome == MatchOutcome.SUCCESS:
-                ctx.orderbook.append(child, child.price)
-                ctx.order_store.add(child)
+                # Already placed by handle_filled if the fill went through
+                # the engine.
+                if not child.triggered:
+                    ctx.order_store.add(child)
+                    self._place_child(child, ctx)
+                return
+
+        if not append_order(parent, ctx):
+            for order, reason in (
+                (parent, "Insufficient funds"),
+                (child, "Parent order cancelled."),
+            ):
                 EventLogger.log_event(
-                    EventType.ORDER_PLACED,
-                    user_id=child.user_id,
-                    related_id=child.id,
+                    EventType.ORDER_CANCELLED,
+                    user_id=order.user_id,
+                    related_id=order.id,
                     instrument_id=ctx.instrument_id,
-                    details={
-                        "executed_quantity": child.executed_quantity,
-                        "quantity": child.quantity,
-                        "price": child.price,
-                        "side": child.side,
-                    },
+                    details={"reason": reason},
                 )
-                return
+            return
 
-        ctx.orderbook.append(parent, parent.price)
         ctx.order_store.add(parent)
         ctx.order_store.add(child)
         EventLogger.log_event(
@@ -84,7 +87,7 @@ class OTOStrategy(ModifyOrderMixin, StrategyProtocol):
             details={
                 "executed_quantity": parent.executed_quantity,
                 "quantity": parent.quantity,
-                "price": parent.price,
+                "price": ctx.to_price(parent.price),
                 "side": parent.side,
             },
         )
@@ -96,27 +99,45 @@ class OTOStrategy(ModifyOrderMixin, StrategyProtocol):
         if order.child and order.executed_quantity == order.quantity:
             child = order.child
             child.triggered = True
-            ctx.orderbook.append(child, child.price)
+            ctx.order_store.add(child)
+            ctx.order_store.remove(order)
+            self._place_child(child, ctx)
+        elif order.executed_quantity == order.quantity:  # Child
+            remove_order(order, ctx)
             ctx.order_store.remove(order)
+
+    def _place_child(self, child: OTOOrder, ctx: ExecutionContext) -> None:
+        """Rests a child whose parent has filled, or cancels it if unfunded."""
+        if not append_order(child, ctx):
+            ctx.order_store.remove(child)
             EventLogger.log_event(
-                EventType.ORDER_PLACED,
+                EventType.ORDER_CANCELLED,
                 user_id=child.user_id,
                 related_id=child.id,
                 instrument_id=ctx.instrument_id,
-                details={
-                    "executed_quantity": child.executed_quantity,
-                    "quantity": child.quantity,
-                    "price": child.price,
-                    "side": child.side,
-                },
+                details={"reason": "Insufficient funds"},
             )
-        elif order.executed_quantity == order.quantity:  # Child
-            ctx.orderbook.remove(order, order.price)
-            ctx.order_store.remove(order)
+            return
 
-    def cancel(self, order: OTOOrder, ctx: ExecutionContext) -> None:
+        EventLogger.log_event(
+            EventType.ORDER_PLACED,
+            user_id=child.user_id,
+            related_id=child.id,
+            instrument_id=ctx.instrument_id,
+            details={
+                "executed_quantity": child.executed_quantity,
+                "quantity": child.quantity,
+                "price": ctx.to_price(child.price),
+                "side": child.side,
+            },
+        )
+
+    def cancel(
+        self, order: OTOOrder, ctx: ExecutionContext, reason: str | None = None
+    ) -> None:
+        details = {"reason": reason} if reason is not None else None
         if order.child:
-            ctx.orderbook.remove(order, order.price)
+            remove_order(order, ctx)
             ctx.order_store.remove(order.child)
 
             EventLogger.log_event(
@@ -124,6 +145,7 @@ class OTOStrategy(ModifyOrderMixin, StrategyProtocol):
                 user_id=order.user_id,
                 related_id=order.id,
                 instrument_id=ctx.instrument_id,
+                details=details,
             )
             EventLogger.log_event(
                 EventType.ORDER_CANCELLED,
@@ -134,22 +156,24 @@ class OTOStrategy(ModifyOrderMixin, StrategyProtocol):
             )
         elif order.parent:
             if order.triggered:
-                ctx.orderbook.remove(order, order.price)
+                remove_order(order, ctx)
                 EventLogger.log_event(
                     EventType.ORDER_CANCELLED,
                     user_id=order.user_id,
                     related_id=order.id,
                     instrument_id=ctx.instrument_id,
+                    details=details,
                 )
             else:
                 parent = order.parent
-                ctx.orderbook.remove(parent, parent.price)
+                remove_order(parent, ctx)
                 ctx.order_store.remove(parent)
                 EventLogger.log_event(
                     EventType.ORDER_CANCELLED,
                     user_id=parent.user_id,
                     related_id=parent.id,
                     instrument_id=ctx.instrument_id,
+                    details=details,
                 )
                 EventLogger.log_event(
                     EventType.ORDER_CANCELLED,
@@ -174,7 +198,7 @@ class OTOStrategy(ModifyOrderMixin, StrategyProtocol):
                     user_id=order.user_id,
                     related_id=order.id,
                     instrument_id=ctx.instrument_id,
-                    details={"price": order.price},
+                    details={"price": ctx.to_price(order.price)},
                 )
             return
 
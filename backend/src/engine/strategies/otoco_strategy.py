@@ -7,7 +7,7 @@ from ..mixins import ModifyOrderMixin
 from ..models import NewOTOCOOrder
 from ..orders import OTOCOOrder
 from ..typing import MatchResult
-from ..utils import get_price_key, limit_crossable, stop_crossable
+from ..utils import append_order, get_price_key, limit_crossable, remove_order
 
 
 class OTOCOStrategy(ModifyOrderMixin, StrategyProtocol):
@@ -62,9 +62,8 @@ class OTOCOStrategy(ModifyOrderMixin, StrategyProtocol):
                 parent_data["limit_price"], parent_order.side, ctx.orderbook
             )
         if parent_data["order_type"] == OrderType.STOP:
-            matchable = stop_crossable(
-                parent_data["stop_price"], parent_order.side, ctx.orderbook
-            )
+            # Stops wait in the stop book until the last trade price reaches them.
+            matchable = False
 
         if matchable:
             result: MatchResult = ctx.engine.match(parent_order, ctx)
@@ -75,35 +74,28 @@ class OTOCOStrategy(ModifyOrderMixin, StrategyProtocol):
 
             if result.outcome == MatchOutcome.SUCCESS:
                 ctx.order_store.remove(parent_order)
-                ctx.orderbook.append(child_a, child_a.price)
-                ctx.orderbook.append(child_b, child_b.price)
-                EventLogger.log_event(
-                    EventType.ORDER_PLACED,
-                    user_id=child_a.user_id,
-                    related_id=child_a.id,
-                    instrument_id=ctx.instrument_id,
-                    details={
-                        "executed_quantity": child_a.executed_quantity,
-                        "quantity": child_a.quantity,
-                        "price": child_a.price,
-                        "side": child_a.side,
-                    },
-                )
+                # Already placed by handle_filled if the fill went through
+                # the engine.
+                if not child_a.triggered:
+                    self._place_children(parent_order, ctx)
+                return
+
+        if not append_order(parent_order, ctx):
+            for order, reason in (
+                (parent_order, "Insufficient funds"),
+                (child_a, "Parent order cancelled."),
+                (child_b, "Parent order cancelled."),
+            ):
+                ctx.order_store.remove(order)
                 EventLogger.log_event(
-                    EventType.ORDER_PLACED,
-                    user_id=child_b.user_id,
-                    related_id=child_b.id,
+                    EventType.ORDER_CANCELLED,
+                    user_id=order.user_id,
+                    related_id=order.id,
                     instrument_id=ctx.instrument_id,
-                    details={
-                        "executed_quantity": child_b.executed_quantity,
-                        "quantity": child_b.quantity,
-                        "price": child_b.price,
-                        "side": child_b.side,
-                    },
+                    details={"reason": reason},
                 )
-                return
+            return
 
-        ctx.orderbook.append(parent_order, parent_order.price)
         EventLogger.log_event(
             EventType.ORDER_PLACED,
             user_id=parent_order.user_id,
@@ -112,7 +104,7 @@ class OTOCOStrategy(ModifyOrderMixin, StrategyProtocol):
             details={
                 "executed_quantity": parent_order.executed_quantity,
                 "quantity": parent_order.quantity,
-                "price": parent_order.price,
+                "price": ctx.to_price(parent_order.price),
                 "side": parent_order.side,
             },
         )
@@ -123,45 +115,14 @@ class OTOCOStrategy(ModifyOrderMixin, StrategyProtocol):
         # If the parent is filled, trigger the OCO children
         if order.child_a and order.executed_quantity == order.quantity:
             order.triggered = False  # Set to false for .cancel logic
-            child = order.child_a
-            child.triggered = True
-            ctx.orderbook.append(child, child.price)
-            EventLogger.log_event(
-                EventType.ORDER_PLACED,
-                user_id=child.user_id,
-                related_id=child.id,
-                instrument_id=ctx.instrument_id,
-                details={
-                    "executed_quantity": child.executed_quantity,
-                    "quantity": child.quantity,
-                    "price": child.price,
-                    "side": child.side,
-                },
-            )
-
-            child = order.child_b
-            child.triggered = True
-            ctx.orderbook.append(child, child.price)
-            EventLogger.log_event(
-                EventType.ORDER_PLACED,
-                user_id=child.user_id,
-                related_id=child.id,
-                instrument_id=ctx.instrument_id,
-                details={
-                    "executed_quantity": child.executed_quantity,
-                    "quantity": child.quantity,
-                    "price": child.price,
-                    "side": child.side,
-                },
-            )
-
             ctx.order_store.remove(order)
+            self._place_children(order, ctx)
             return
 
         # If a child is filled, cancel its counterparty
         if order.counterparty and order.executed_quantity == order.quantity:
             counterparty = order.counterparty
-            ctx.orderbook.remove(counterparty, counterparty.price)
+            remove_order(counterparty, ctx)
             ctx.order_store.remove(order)
             ctx.order_store.remove(counterparty)
             EventLogger.log_event(
@@ -172,9 +133,47 @@ class OTOCOStrategy(ModifyOrderMixin, StrategyProtocol):
                 details={"reason": f"OCO peer {order.id} was filled."},
             )
 
-    def cancel(self, order: OTOCOOrder, ctx: ExecutionContext) -> None:
+    def _place_children(self, parent: OTOCOOrder, ctx: ExecutionContext) -> None:
+        """
+        Rests the OCO children of a filled parent, or cancels both if either
+        is unfunded.
+        """
+        child_a, child_b = parent.child_a, parent.child_b
+        child_a.triggered = child_b.triggered = True
+
+        if not append_order(child_a, ctx) or not append_order(child_b, ctx):
+            remove_order(child_a, ctx)
+            for child in (child_a, child_b):
+                ctx.order_store.remove(child)
+                EventLogger.log_event(
+                    EventType.ORDER_CANCELLED,
+                    user_id=child.user_id,
+                    related_id=child.id,
+                    instrument_id=ctx.instrument_id,
+                    details={"reason": "Insufficient funds"},
+                )
+            return
+
+        for child in (child_a, child_b):
+            EventLogger.log_event(
+                EventType.ORDER_PLACED,
+                user_id=child.user_id,
+                related_id=child.id,
+                instrument_id=ctx.instrument_id,
+                details={
+                    "executed_quantity": child.executed_quantity,
+                    "quantity": child.quantity,
+                    "price": ctx.to_price(child.price),
+                    "side": child.side,
+                },
+            )
+
+    def cancel(
+        self, order: OTOCOOrder, ctx: ExecutionContext, reason: str | None = None
+    ) -> None:
+        details = {"reason": reason} if reason is not None else None
         if order.child_a:  # Must beparent
-            ctx.orderbook.remove(order, order.price)
+            remove_order(order, ctx)
             ctx.order_store.remove(order)
             ctx.order_store.remove(order.child_a)
             ctx.order_store.remove(order.child_b)
@@ -183,6 +182,7 @@ class OTOCOStrategy(ModifyOrderMixin, StrategyProtocol):
                 user_id=order.user_id,
                 related_id=order.id,
                 instrument_id=ctx.instrument_id,
+                details=details,
             )
             EventLogger.log_event(
                 EventType.ORDER_CANCELLED,
@@ -208,14 +208,18 @@ class OTOCOStrategy(ModifyOrderMixin, StrategyProtocol):
 
         if order.triggered:
             counterparty = order.counterparty
-            ctx.orderbook.remove(order, order.price)
-            ctx.orderbook.remove(counterparty, counterparty.price)
+            remove_order(order, ctx)
+            remove_order(counterparty, ctx)
         else:
-            ctx.orderbook.remove(order.parent, order.parent.price)
+            remove_order(order.parent, ctx)
 
         if order.parent.triggered:
             EventLogger.log_event(
-                EventType.ORDER_CANCELLED, user_id=order.user_id, related_id=order.id
+                EventType.ORDER_CANCELLED,
+                user_id=order.user_id,
+                related_id=order.id,
+                instrument_id=ctx.instrument_id,
+                details=details,
             )
 
         EventLogger.log_event(
@@ -223,12 +227,14 @@ class OTOCOStrategy(ModifyOrderMixin, StrategyProtocol):
             user_id=order.user_id,
             related_id=order.id,
             instrument_id=ctx.instrument_id,
+            details=details,
         )
         EventLogger.log_event(
             EventType.ORDER_CANCELLED,
             user_id=counterparty.user_id,
             related_id=counterparty.id,
             instrument_id=ctx.instrument_id,
+            details=details,
         )
 
     def modify(self, details, order: OTOCOOrder, ctx: ExecutionContext):
@@ -241,5 +247,5 @@ class OTOCOStrategy(ModifyOrderMixin, StrategyProtocol):
                 user_id=order.user_id,
                 related_id=order.id,
                 instrument_id=ctx.instrument_id,
-                details={"price": order.price},
+                details={"price": ctx.to_price(order.price)},
             )
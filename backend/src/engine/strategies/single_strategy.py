@@ -1,4 +1,4 @@
-from enums import EventType, OrderType, StrategyType
+from enums import EventType, OrderType, Side, StrategyType, TimeInForce
 from ..enums import MatchOutcome
 from ..event_logger import EventLogger
 from ..execution_context import ExecutionContext
@@ -7,7 +7,11 @@ from ..models import NewSingleOrder
 from ..orders import Order
 from ..protocols import StrategyProtocol
 from ..typing import MatchResult
-from ..utils import get_price_key, limit_crossable, stop_crossable
+from ..utils import append_order, get_price_key, limit_crossable, remove_order
+
+
+# Never rest: whatever doesn't trade on arrival is cancelled.
+IMMEDIATE_TIFS = (TimeInForce.IOC, TimeInForce.FOK)
 
 
 class SingleOrderStrategy(ModifyOrderMixin, StrategyProtocol):
@@ -23,15 +27,20 @@ class SingleOrderStrategy(ModifyOrderMixin, StrategyProtocol):
             price=order_data[get_price_key(order_data["order_type"])],
         )
 
+        tif = TimeInForce(order_data.get("time_in_force") or TimeInForce.GTC)
+        if tif == TimeInForce.FOK and not self._fillable(order, ctx):
+            # Killed before touching the book or any balance.
+            self._cancel_unfilled(order, ctx, "FOK order could not be filled in full.")
+            return
+
         matchable = True
-        if order_data["order_type"] == OrderType.LIMIT:
+        if order_data["order_type"] == OrderType.LIMIT and tif not in IMMEDIATE_TIFS:
             matchable = limit_crossable(
                 order_data["limit_price"], order.side, ctx.orderbook
             )
         if order_data["order_type"] == OrderType.STOP:
-            matchable = stop_crossable(
-                order_data["stop_price"], order.side, ctx.orderbook
-            )
+            # Stops wait in the stop book until the last trade price reaches them.
+            matchable = False
 
         if matchable:
             result: MatchResult = ctx.engine.match(order, ctx)
@@ -50,8 +59,15 @@ class SingleOrderStrategy(ModifyOrderMixin, StrategyProtocol):
             if result.outcome == MatchOutcome.SUCCESS:
                 return
 
+        if tif in IMMEDIATE_TIFS:
+            self._cancel_unfilled(order, ctx, f"{tif.value} order remainder cancelled.")
+            return
+
+        if not append_order(order, ctx):
+            self._cancel_unfilled(order, ctx, "Insufficient funds")
+            return
+
         ctx.order_store.add(order)
-        ctx.orderbook.append(order, order.price)
 
         EventLogger.log_event(
             EventType.ORDER_PLACED,
@@ -61,26 +77,50 @@ class SingleOrderStrategy(ModifyOrderMixin, StrategyProtocol):
             details={
                 "executed_quantity": order.executed_quantity,
                 "quantity": order.quantity,
-                "price": order.price,
+                "price": ctx.to_price(order.price),
                 "side": order.side,
             },
         )
 
+    def _fillable(self, order: Order, ctx: ExecutionContext) -> bool:
+        """Whether the opposite side holds the full quantity within the limit."""
+        opposite_side = Side.ASK if order.side == Side.BID else Side.BID
+        limit = order.price if order.order_type == OrderType.LIMIT else None
+        available = ctx.orderbook.available_quantity(
+            opposite_side, limit, order.quantity
+        )
+        return available >= order.quantity
+
+    def _cancel_unfilled(self, order: Order, ctx: ExecutionContext, reason: str):
+        EventLogger.log_event(
+            EventType.ORDER_CANCELLED,
+            user_id=order.user_id,
+            related_id=order.id,
+            instrument_id=ctx.instrument_id,
+            details={
+                "executed_quantity": order.executed_quantity,
+                "quantity": order.quantity,
+                "reason": reason,
+            },
+        )
+
     def handle_filled(
         self, quantity: int, price: float, order: Order, ctx: ExecutionContext
     ) -> None:
         if order.executed_quantity == order.quantity:
             ctx.order_store.remove(order)
 
-    def cancel(self, order: Order, ctx: ExecutionContext) -> None:
-        ctx.orderbook.remove(order, order.price)
+    def cancel(
+        self, order: Order, ctx: ExecutionContext, reason: str = "Insufficient funds"
+    ) -> None:
+        remove_order(order, ctx)
         ctx.order_store.remove(order)
         EventLogger.log_event(
             EventType.ORDER_CANCELLED,
             user_id=order.user_id,
             related_id=order.id,
             instrument_id=ctx.instrument_id,
-            details={"reason": "Insufficient funds"},
+            details={"reason": reason},
         )
 
     def modify(self, details, order: Order, ctx: ExecutionContext):
@@ -0,0 +1,162 @@
+import math
+from typing import Hashable, Iterator
+
+
+class TimerWheel:
+    """
+    Hierarchical timer wheel that hands back keys once their deadline has
+    passed.
+
+    Deadlines are rounded up to whole ticks of `resolution` seconds, so a
+    key is never returned early and at most one tick late. Level 0 holds
+    one slot per tick and every level above it one slot per full turn of
+    the level below, so a key due within `slots ** levels` ticks sits in
+    the lowest level whose slot it can be told apart in. As the wheel
+    turns, the slot a higher level reaches is re-filed into the levels
+    below it. Scheduling and cancelling are O(1). Advancing jumps straight
+    to the next tick that reaches an occupied slot, so it costs a scan of
+    at most one turn of each level per occupied slot reached plus one move
+    per key cascaded or returned, however long the wheel sat idle. Keys
+    due beyond the top level wait in an overflow set that is re-filed
+    every full turn of the wheel.
+
+    Attributes:
+        _now (int | None): Last tick advanced to, or None before the wheel
+            has been advanced.
+        _wheels (list[list[set]]): Slots of every level, lowest first.
+        _entries (dict[Hashable, tuple[float, set]]): Deadline and holding
+            slot of every scheduled key.
+    """
+
+    def __init__(
+        self, resolution: float = 1.0, slot_bits: int = 6, levels: int = 4
+    ) -> None:
+        """
+        Args:
+            resolution (float, optional): Seconds per tick.
+            slot_bits (int, optional): log2 of the slots per level.
+            levels (int, optional): Number of levels.
+        """
+        if resolution <= 0:
+            raise ValueError(f"Invalid resolution: {resolution}")
+
+        self.resolution = resolution
+        self._bits = slot_bits
+        self._mask = (1 << slot_bits) - 1
+        self._now: int | None = None
+        self._wheels: list[list[set]] = [
+            [set() for _ in range(1 << slot_bits)] for _ in range(levels)
+        ]
+        self._overflow: set = set()
+        self._due: set = set()
+        self._entries: dict[Hashable, tuple[float, set]] = {}
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._entries
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @property
+    def now(self) -> float | None:
+        """Time the wheel was last advanced to, in whole ticks."""
+        return None if self._now is None else self._now * self.resolution
+
+    def items(self) -> Iterator[tuple[Hashable, float]]:
+        """Yields every scheduled key with its deadline."""
+        for key, (deadline, _) in self._entries.items():
+            yield key, deadline
+
+    def schedule(self, key: Hashable, deadline: float) -> None:
+        """Schedules `key` for `deadline`, replacing any earlier deadline."""
+        self.cancel(key)
+        self._file(key, deadline, math.ceil(deadline / self.resolution))
+
+    def cancel(self, key: Hashable) -> None:
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            entry[1].discard(key)
+
+    def advance(self, now: float) -> list[Hashable]:
+        """
+        Turns the wheel to `now` and returns the keys that have come due,
+        earliest deadline first. They are no longer scheduled afterwards.
+        """
+        target = math.floor(now / self.resolution)
+        if self._now is None:
+            self._now = target
+            pending, self._overflow = self._overflow, set()
+            self._refile_all(pending)
+
+        due = []
+        span = self._bits * len(self._wheels)
+        while self._now < target:
+            self._now = tick = self._next_tick(target)
+
+            if not tick & ((1 << span) - 1):
+                pending, self._overflow = self._overflow, set()
+                self._refile_all(pending)
+
+            # Re-file the slots the higher levels just reached, top first.
+            for level in range(len(self._wheels) - 1, 0, -1):
+                shift = self._bits * level
+                if tick & ((1 << shift) - 1):
+                    continue
+                wheel = self._wheels[level]
+                idx = (tick >> shift) & self._mask
+                slot, wheel[idx] = wheel[idx], set()
+                self._refile_all(slot)
+
+            slot = self._wheels[0][tick & self._mask]
+            due.extend(slot)
+            slot.clear()
+
+        # Keys filed at or before the current tick.
+        due.extend(self._due)
+        self._due.clear()
+
+        entries = self._entries
+        due.sort(key=lambda k: entries[k][0])
+        for key in due:
+            del entries[key]
+        return due
+
+    def _next_tick(self, target: int) -> int:
+        """
+        Returns the first tick after the current one, but no later than
+        `target`, at which an occupied slot is reached or the overflow set
+        is re-filed. Nothing happens on the ticks in between.
+        """
+        now = self._now
+        for level, wheel in enumerate(self._wheels):
+            shift = self._bits * level
+            # Slots at or before the current one in this turn are empty.
+            idx = (now >> shift) & self._mask
+            for offset in range(1, len(wheel) - idx):
+                if wheel[idx + offset]:
+                    return min(target, ((now >> shift) + offset) << shift)
+
+        span = self._bits * len(self._wheels)
+        return min(target, ((now >> span) + 1) << span)
+
+    def _refile_all(self, keys: set) -> None:
+        for key in keys:
+            deadline = self._entries[key][0]
+            self._file(key, deadline, math.ceil(deadline / self.resolution))
+
+    def _file(self, key: Hashable, deadline: float, tick: int) -> None:
+        if self._now is None:
+            # Filed properly once the wheel learns the time.
+            slot = self._overflow
+        elif tick <= self._now:
+            slot = self._due
+        else:
+            slot = self._overflow
+            for level, wheel in enumerate(self._wheels):
+                shift = self._bits * (level + 1)
+                if tick >> shift == self._now >> shift:
+                    slot = wheel[(tick >> (shift - self._bits)) & self._mask]
+                    break
+
+        slot.add(key)
+        self._entries[key] = (deadline, slot)
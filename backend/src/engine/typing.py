@@ -1,3 +1,4 @@
 from collections import namedtuple
 
 MatchResult = namedtuple("MatchResult", ("outcome", "quantity", "price"))
+DepthLevel = namedtuple("DepthLevel", ("price", "quantity", "order_count"))
@@ -1,5 +1,11 @@
 from enums import OrderType, Side
-from .orderbook import OrderBook
+from .balance_manager import BalanceManager
+from .execution_context import ExecutionContext
+from .orderbook import LadderOrderBook, OrderBook
+from .orders import Order
+
+
+PRICE_KEYS = ("price", "limit_price", "stop_price")
 
 
 def get_price_key(ot: OrderType) -> str | None:
@@ -13,6 +19,33 @@ def get_price_key(ot: OrderType) -> str | None:
     return m.get(ot)
 
 
+def order_priced(order: dict) -> bool:
+    """Returns False if the order lacks the price its order type trades at."""
+    return order.get(get_price_key(order["order_type"])) is not None
+
+
+def order_prices_to_ticks(order: dict, ctx: ExecutionContext) -> None:
+    """Converts every price within the order payload to ticks, in place."""
+    for key in PRICE_KEYS:
+        if order.get(key) is not None:
+            order[key] = ctx.to_ticks(order[key])
+
+
+def order_prices_on_tick(order: dict, ctx: ExecutionContext) -> bool:
+    return all(ctx.on_tick(order.get(key)) for key in PRICE_KEYS)
+
+
+def price_in_band(price: float | None, ob: OrderBook) -> bool:
+    """Returns False if the book has a bounded price band and price lies outside it."""
+    if price is None or not isinstance(ob, LadderOrderBook):
+        return True
+    return ob.min_price <= price <= ob.max_price
+
+
+def order_prices_in_band(order: dict, ob: OrderBook) -> bool:
+    return all(price_in_band(order.get(key), ob) for key in PRICE_KEYS)
+
+
 def limit_crossable(price: float, side: Side, ob: OrderBook) -> bool:
     return (side == Side.BID and ob.price is not None and price >= ob.price) or (
         side == Side.ASK and ob.price is not None and price <= ob.price
@@ -23,3 +56,85 @@ def stop_crossable(price: float, side: Side, ob: OrderBook) -> bool:
     return (side == Side.BID and ob.price is not None and price <= ob.price) or (
         side == Side.ASK and ob.price is not None and price >= ob.price
     )
+
+
+def reserve_escrow(order: Order, ctx: ExecutionContext) -> bool:
+    """
+    Escrows what the unfilled part of an order needs to trade at its price,
+    returning False if the user can't cover it. A market order's price is
+    the reference price the HTTP API quoted it at.
+    """
+    return BalanceManager.reserve(
+        order.user_id,
+        ctx.instrument_id,
+        order.side,
+        order.quantity - order.executed_quantity,
+        ctx.to_price(order.price),
+    )
+
+
+def release_escrow(order: Order, ctx: ExecutionContext) -> None:
+    """Releases what `reserve_escrow` escrowed for the unfilled part of an order."""
+    BalanceManager.release(
+        order.user_id,
+        ctx.instrument_id,
+        order.side,
+        order.quantity - order.executed_quantity,
+        ctx.to_price(order.price),
+    )
+
+
+def reprice_escrow(order: Order, price: float, ctx: ExecutionContext) -> bool:
+    """
+    Moves the escrow of an order resting in the order book over to `price`,
+    returning False, and leaving it as it was, if the user can't cover the
+    difference. Only bids escrow by value, asks hold the same quantity.
+    """
+    if order.side == Side.ASK:
+        return True
+
+    quantity = order.quantity - order.executed_quantity
+    diff = ctx.to_price(price) - ctx.to_price(order.price)
+    if diff > 0:
+        return BalanceManager.reserve(
+            order.user_id, ctx.instrument_id, order.side, quantity, diff
+        )
+    if diff < 0:
+        BalanceManager.release(
+            order.user_id, ctx.instrument_id, order.side, quantity, -diff
+        )
+    return True
+
+
+def rest_order(order: Order, ctx: ExecutionContext) -> bool:
+    """
+    Rests an order in the order book, escrowing what it could trade so that
+    matching against it needs no balance check. Returns False, leaving it
+    off the book, if the user can't cover it.
+    """
+    if not reserve_escrow(order, ctx):
+        return False
+    ctx.orderbook.append(order, order.price)
+    return True
+
+
+def append_order(order: Order, ctx: ExecutionContext) -> bool:
+    """
+    Rests an order: stops in the stop book, everything else in the order
+    book by way of `rest_order`. Returns False if it couldn't be rested.
+    """
+    if order.order_type == OrderType.STOP:
+        ctx.stop_book.append(order, order.price)
+        return True
+    return rest_order(order, ctx)
+
+
+def remove_order(order: Order, ctx: ExecutionContext) -> None:
+    """
+    Removes an order from whichever book it's resting in, releasing the
+    escrow of one taken off the order book.
+    """
+    if order in ctx.stop_book:
+        ctx.stop_book.remove(order, order.price)
+    elif ctx.orderbook.remove(order, order.price):
+        release_escrow(order, ctx)
@@ -12,10 +12,12 @@ class OrderType(str, Enum):
     STOP = "stop"
 
 
-class TimeInForce(Enum):
+class TimeInForce(str, Enum):
     GTC = "GTC"  # Good Till Cancelled
     IOC = "IOC"  # Immediate Or Cancel
     FOK = "FOK"  # Fill Or Kill
+    GTD = "GTD"  # Good Till Date
+    DAY = "DAY"  # Good for the trading day
 
 
 class StrategyType(str, Enum):
@@ -38,6 +40,8 @@ class EventType(str, Enum):
     ORDER_MODIFIED = "order_modified"
     ORDER_MODIFY_REJECTED = "order_modify_rejected"
     NEW_TRADE = "new_trade"
+    EXECUTION = "execution"
+    FILL_SUMMARY = "fill_summary"
 
 
 class InstrumentEventType(Enum):
@@ -1,33 +1,69 @@
 import json
 from datetime import datetime
 from decimal import Decimal
-from uuid import UUID
+from uuid import UUID, uuid4
 
 from sqlalchemy.orm import Session
 from sqlalchemy import select
 
-from config import INSTRUMENT_EVENT_CHANNEL, ORDER_UPDATE_CHANNEL, REDIS_CLIENT
-from db_models import Orders, Trades, Users, Transactions, Events, AssetBalances
+from config import (
+    EVENT_CACHE_SIZE,
+    INSTRUMENT_EVENT_CHANNEL,
+    ORDER_UPDATE_CHANNEL,
+    REDIS_CLIENT,
+)
+from db_models import Base, Orders, Trades, Users, Transactions, Events, AssetBalances
 from engine.balance_manager import BalanceManager
 from engine.models import Event
+from event_router import partition_for
 from enums import (
     EventType,
     InstrumentEventType,
+    LiquidityRole,
     OrderStatus,
     Side,
     TransactionType,
     OrderType,
 )
 from models import OrderEvent, InstrumentEvent, PriceEvent, TradeEvent
+from utils.bulk_writer import BulkWriter
+from utils.entity_cache import EntityCache
+from utils.utils import get_datetime
 
 
 class EventHandler:
     """
     Processes events emitted by the matching engine, persisting changes to the database
     and handling all bookkeeping and accounting for both cash and assets.
+
+    The Events, Trades and Transactions rows an event produces, and the
+    Redis messages it publishes, are held until its transaction commits.
+    The rows are then written with COPY ahead of the commit. `process_batch`
+    uses this to apply many events in one transaction with a single
+    publishing pipeline.
+
+    Orders are kept in an LRU cache between transactions, as once an order
+    reaches the engine the handler is the only writer of its row. Users and
+    asset balances are not: the API escrows funds into them at any time.
+    They're loaded afresh in every transaction and locked until it commits,
+    so a concurrent escrow waits and then applies on top of what the
+    handler wrote.
+
+    With several partitions, each handler applies the events of the users
+    that hash to its `partition`. An EXECUTION reaches the partitions of
+    both its users; each books its own side, and the one owning the user
+    the event is recorded under writes its Events row and publishes the
+    trade.
     """
 
-    def __init__(self) -> None:
+    def __init__(
+        self,
+        cache_size: int = EVENT_CACHE_SIZE,
+        partition: int = 0,
+        partitions: int = 1,
+    ) -> None:
+        self.partition = partition
+        self.partitions = partitions
         self.handlers = {
             EventType.ORDER_PLACED: self._handle_order_status_update,
             EventType.ORDER_PARTIALLY_FILLED: self._handle_order_status_update,
@@ -36,62 +72,295 @@ class EventHandler:
             EventType.ORDER_MODIFIED: self._handle_order_modified,
             EventType.ORDER_MODIFY_REJECTED: self._handle_generic_log,
             EventType.NEW_TRADE: self._handle_new_trade,
+            EventType.EXECUTION: self._handle_execution,
+            EventType.FILL_SUMMARY: self._handle_generic_log,
         }
+        self._writer = BulkWriter((Events, Trades, Transactions))
+        self.cache = EntityCache(cache_size)
+        self._rows: dict[tuple, Base] = {}
+        self._reset()
+
+    def _reset(self) -> None:
+        self._writer.clear()
+        # (event type, user id, instrument id, order) per order update.
+        self._order_updates: list[tuple[EventType, str, str, dict]] = []
+        self._instrument_messages: list[str] = []
+        # Rows attached to the open transaction, by cache key.
+        self._rows.clear()
+
+    def process_events(self, events: list[Event], session: Session) -> None:
+        """
+        Process engine events in the order they were emitted, each in its
+        own transaction.
+        """
+        for event in events:
+            self.process_event(event, session)
 
     def process_event(self, event: Event, session: Session) -> None:
+        """Handles one event within its own atomic transaction."""
+        try:
+            self._apply(event, session)
+            self._commit(session)
+        except Exception as e:
+            print(
+                f"Error processing event {event.event_type.value} ({event.related_id}): {e}"
+            )
+            self._discard(session)
+            return
+
+        self._publish()
+
+    def process_batch(self, events: list[Event], session: Session) -> None:
+        """
+        Handles `events` within a single transaction, inserting the rows
+        they produce in bulk and publishing their messages on one Redis
+        pipeline. If the batch fails it's retried one event at a time, so
+        a bad event only loses itself.
+        """
+        try:
+            # Changes are flushed once, on commit, instead of before every read.
+            with session.no_autoflush:
+                self._prefetch(events, session)
+                for event in events:
+                    self._apply(event, session)
+            self._commit(session)
+        except Exception as e:
+            print(f"Error processing batch of {len(events)} events: {e}")
+            self._discard(session)
+            self.process_events(events, session)
+            return
+
+        self._publish()
+
+    def _prefetch(self, events: list[Event], session: Session) -> None:
+        """
+        Attaches the cached orders `events` touch and loads the rest, along
+        with the users and asset balances they touch, with one query per
+        model, so the handlers find them without a round trip.
+        """
+        order_ids, user_ids, asset_keys = set(), set(), set()
+        for event in events:
+            parties = [(event.user_id, event.related_id)]
+            if event.event_type == EventType.EXECUTION:
+                details = event.details
+                parties.append((details["maker_user_id"], details["maker_order_id"]))
+
+            for user_id, order_id in parties:
+                if self._owns(user_id):
+                    order_ids.add(order_id)
+                    user_ids.add(user_id)
+                    asset_keys.add((user_id, event.instrument_id))
+
+        missing = self._attach(session, [(Orders, str(i)) for i in order_ids])
+        if missing:
+            for order in session.scalars(
+                select(Orders).where(Orders.order_id.in_([k[1] for k in missing]))
+            ):
+                self._cache(Orders, order, str(order.order_id))
+
+        user_ids = [i for i in user_ids if (Users, str(i)) not in self._rows]
+        if user_ids:
+            for user in session.scalars(
+                self._lock(select(Users).where(Users.user_id.in_(user_ids)))
+            ):
+                self._rows[(Users, str(user.user_id))] = user
+
+        asset_keys = [
+            (user_id, instrument_id)
+            for user_id, instrument_id in asset_keys
+            if (AssetBalances, str(user_id), instrument_id) not in self._rows
+        ]
+        if asset_keys:
+            for asset_balance in session.scalars(
+                self._lock(
+                    select(AssetBalances).where(
+                        AssetBalances.user_id.in_({k[0] for k in asset_keys}),
+                        AssetBalances.instrument_id.in_({k[1] for k in asset_keys}),
+                    )
+                )
+            ):
+                key = (
+                    AssetBalances,
+                    str(asset_balance.user_id),
+                    asset_balance.instrument_id,
+                )
+                self._rows[key] = asset_balance
+
+    def _attach(self, session: Session, keys: list[tuple]) -> list[tuple]:
+        """Adds the cached rows for `keys` to `session`, returning the keys missed."""
+        missing = []
+        for key in keys:
+            if key in self._rows:
+                continue
+            row = self.cache.get(key)
+            if row is None:
+                missing.append(key)
+                continue
+            session.add(row)
+            self._rows[key] = row
+        return missing
+
+    def _cache(self, model: type[Base], row: Base, *pk: str) -> None:
+        key = (model, *pk)
+        if key not in self._rows:
+            self.cache.put(key, row)
+            self._rows[key] = row
+
+    @staticmethod
+    def _lock(stmt):
+        """
+        Locks the balance rows `stmt` selects until the transaction ends,
+        refreshing any the session already holds.
+        """
+        return stmt.with_for_update().execution_options(populate_existing=True)
+
+    def _get(self, session: Session, model: type, key) -> Orders | Users | None:
         """
-        Process a list of events from the engine. Each event is handled
-        within its own atomic transaction.
+        `session.get`, served from the entity cache where possible. Users
+        aren't cached, and are locked as `_prefetch` locks them.
         """
-        if event.user_id == "layer":
+        cache_key = (model, str(key))
+        row = self._rows.get(cache_key)
+        if row is not None:
+            return row
+
+        if model is not Orders:
+            row = session.get(model, key, with_for_update=True, populate_existing=True)
+            if row is not None:
+                self._rows[cache_key] = row
+            return row
+
+        row = self.cache.get(cache_key)
+        if row is not None:
+            session.add(row)
+            self._rows[cache_key] = row
+            return row
+
+        row = session.get(model, key)
+        if row is not None:
+            self._cache(model, row, str(key))
+        return row
+
+    def _owns(self, user_id: str) -> bool:
+        if user_id == "layer":
+            return False
+        return (
+            self.partitions == 1
+            or partition_for(user_id, self.partitions) == self.partition
+        )
+
+    def _apply(self, event: Event, session: Session) -> None:
+        user_id, related_id = event.user_id, event.related_id
+        if event.event_type == EventType.EXECUTION and user_id == "layer":
+            # Seeded liquidity took, but the maker may still be a real user.
+            user_id = event.details["maker_user_id"]
+            related_id = event.details["maker_order_id"]
+        if user_id == "layer":
+            return
+        # Executions concern two users, which other partitions may own.
+        if event.event_type != EventType.EXECUTION and not self._owns(user_id):
             return
         handler = self.handlers.get(event.event_type)
         if not handler:
             return
 
-        try:
-            db_event = Events(
-                event_type=event.event_type.value,
-                user_id=event.user_id,
-                related_id=event.related_id,
-                details=json.dumps(event.details) if event.details else None,
+        if self._owns(user_id):
+            self._writer.add(
+                Events,
+                {
+                    "event_type": event.event_type.value,
+                    "user_id": user_id,
+                    "related_id": related_id,
+                    "details": json.dumps(event.details) if event.details else None,
+                },
             )
-            session.add(db_event)
+        handler(event, session)
 
-            handler(event, session)
-            session.commit()
-        except Exception as e:
-            print(
-                f"Error processing event {event.event_type.value} ({event.related_id}): {e}"
-            )
-            session.rollback()
+        if event.event_type == EventType.NEW_TRADE:
+            return
 
-        if event.event_type != EventType.NEW_TRADE:
-            order = session.get(Orders, event.related_id)
-            b = BalanceManager.get_available_asset_balance(
-                event.user_id, event.instrument_id
+        # The taker hears about a sweep once, from its fill summary, while
+        # each maker hears about the execution that filled it.
+        event_type = event.event_type
+        if event_type == EventType.EXECUTION:
+            details = event.details
+            user_id = details["maker_user_id"]
+            related_id = details["maker_order_id"]
+            event_type = self._fill_event_type(
+                details["maker_executed_quantity"], details["maker_order_quantity"]
             )
-            REDIS_CLIENT.publish(
-                ORDER_UPDATE_CHANNEL,
-                OrderEvent(
-                    event_type=event.event_type,
-                    available_balance=BalanceManager.get_available_cash_balance(
-                        event.user_id
-                    ),
-                    available_asset_balance=b,
-                    data=order.dump(),
-                ).model_dump_json(),
+        elif event_type == EventType.FILL_SUMMARY:
+            event_type = self._fill_event_type(
+                event.details["executed_quantity"], event.details["quantity"]
+            )
+
+        if not self._owns(user_id):
+            return
+        order = self._get(session, Orders, related_id)
+        if order is not None:
+            self._order_updates.append(
+                (event_type, user_id, event.instrument_id, order.dump())
             )
 
+    def _commit(self, session: Session) -> None:
+        self._writer.flush(session)
+        session.commit()
+
+    def _discard(self, session: Session) -> None:
+        session.rollback()
+        # Rolling back leaves these rows out of step with the database.
+        for key in self._rows:
+            self.cache.discard(key)
+        self._reset()
+
+    def _publish(self) -> None:
+        """Sends the messages of everything committed since the last reset."""
+        order_updates = self._order_updates
+        instrument_messages = self._instrument_messages
+        self._reset()
+        if not order_updates and not instrument_messages:
+            return
+
+        balances = BalanceManager.get_available_balances(
+            [(user_id, instrument_id) for _, user_id, instrument_id, _ in order_updates]
+        )
+        with REDIS_CLIENT.pipeline(transaction=False) as pipe:
+            for (event_type, _, _, order), (cash, asset) in zip(
+                order_updates, balances
+            ):
+                pipe.publish(
+                    ORDER_UPDATE_CHANNEL,
+                    OrderEvent(
+                        event_type=event_type,
+                        available_balance=cash,
+                        available_asset_balance=asset,
+                        data=order,
+                    ).model_dump_json(),
+                )
+            for message in instrument_messages:
+                pipe.publish(INSTRUMENT_EVENT_CHANNEL, message)
+            pipe.execute()
+
+    @staticmethod
+    def _fill_event_type(executed_quantity: float, quantity: float) -> EventType:
+        if executed_quantity == quantity:
+            return EventType.ORDER_FILLED
+        return EventType.ORDER_PARTIALLY_FILLED
+
     def _get_asset_balance(
         self, session: Session, user_id: UUID, instrument_id: str, event: Event
     ) -> AssetBalances:
         """Helper to fetch or create an asset balance record."""
+        key = (AssetBalances, str(user_id), instrument_id)
+        asset_balance = self._rows.get(key)
+        if asset_balance is not None:
+            return asset_balance
+
         stmt = select(AssetBalances).where(
             AssetBalances.user_id == user_id,
             AssetBalances.instrument_id == instrument_id,
         )
-        asset_balance = session.execute(stmt).scalar_one_or_none()
+        asset_balance = session.execute(self._lock(stmt)).scalar_one_or_none()
         if asset_balance is None:
             asset_balance = AssetBalances(
                 user_id=user_id,
@@ -101,10 +370,11 @@ class EventHandler:
             )
             session.add(asset_balance)
 
+        self._rows[key] = asset_balance
         return asset_balance
 
     def _handle_order_status_update(self, event: Event, session: Session):
-        order = session.get(Orders, event.related_id)
+        order = self._get(session, Orders, event.related_id)
         if not order:
             return
 
@@ -118,12 +388,12 @@ class EventHandler:
         session.add(order)
 
     def _handle_order_cancelled(self, event: Event, session: Session):
-        order = session.get(Orders, event.related_id)
+        order = self._get(session, Orders, event.related_id)
         if not order:
             return
 
         order.status = OrderStatus.CANCELLED.value
-        user = session.get(Users, order.user_id)
+        user = self._get(session, Users, order.user_id)
         if not user:
             return
 
@@ -143,14 +413,16 @@ class EventHandler:
                 Decimal(str(user.escrow_balance)) - refund_amount
             )
 
-            refund_tx = Transactions(
-                user_id=user.user_id,
-                amount=float(refund_amount),
-                type=TransactionType.ESCROW.value,
-                related_id=str(order.order_id),
-                balance=user.cash_balance,
+            self._writer.add(
+                Transactions,
+                {
+                    "user_id": user.user_id,
+                    "amount": float(refund_amount),
+                    "type": TransactionType.ESCROW.value,
+                    "related_id": str(order.order_id),
+                    "balance": user.cash_balance,
+                },
             )
-            session.add(refund_tx)
             session.add(user)
 
         elif order.side == Side.ASK.value:
@@ -167,7 +439,7 @@ class EventHandler:
 
     def _handle_order_modified(self, event: Event, session: Session) -> None:
         # A full implementation must also adjust cash/asset escrow.
-        order = session.get(Orders, event.related_id)
+        order = self._get(session, Orders, event.related_id)
         if not order:
             return
 
@@ -184,25 +456,84 @@ class EventHandler:
 
     def _handle_new_trade(self, event: Event, session: Session) -> None:
         details = event.details
-        order = session.get(Orders, event.related_id)
-        user = session.get(Users, event.user_id)
+        order = self._get(session, Orders, event.related_id)
+        user = self._get(session, Users, event.user_id)
         if not order or not user:
             raise ValueError("Could not find Order or User for trade.")
 
+        trade = self._apply_fill(session, event, order, user, details["role"])
+        self._publish_instrument_events(event, order.side, trade["executed_at"])
+
+    def _handle_execution(self, event: Event, session: Session) -> None:
+        """
+        Books both sides of a trade: a Trades row, the order's fill and
+        the settlement for the taker and for the maker.
+        """
+        details = event.details
+        parties = (
+            (
+                event.user_id,
+                event.related_id,
+                LiquidityRole.TAKER,
+                details["executed_quantity"],
+                details["order_quantity"],
+            ),
+            (
+                details["maker_user_id"],
+                details["maker_order_id"],
+                LiquidityRole.MAKER,
+                details["maker_executed_quantity"],
+                details["maker_order_quantity"],
+            ),
+        )
+
+        for user_id, order_id, role, executed_quantity, quantity in parties:
+            if not self._owns(user_id):
+                continue
+
+            order = self._get(session, Orders, order_id)
+            user = self._get(session, Users, user_id)
+            if not order or not user:
+                raise ValueError("Could not find Order or User for trade.")
+
+            trade = self._apply_fill(session, event, order, user, role.value)
+            order.status = (
+                OrderStatus.FILLED.value
+                if executed_quantity == quantity
+                else OrderStatus.PARTIALLY_FILLED.value
+            )
+
+        recorded_by = event.user_id
+        if recorded_by == "layer":
+            recorded_by = details["maker_user_id"]
+        if self._owns(recorded_by):
+            self._publish_instrument_events(
+                event, details["side"], trade["executed_at"]
+            )
+
+    def _apply_fill(
+        self, session: Session, event: Event, order: Orders, user: Users, role: str
+    ) -> dict:
+        """
+        Records one side of a trade and settles the user's balances.
+        Returns the Trades row queued for insert.
+        """
+        details = event.details
         trade_price = Decimal(str(details["price"]))
         trade_quantity = Decimal(str(details["quantity"]))
         trade_value = trade_price * trade_quantity
 
-        new_trade = Trades(
-            order_id=order.order_id,
-            user_id=user.user_id,
-            instrument_id=order.instrument_id,
-            price=float(trade_price),
-            quantity=float(trade_quantity),
-            liquidity=details["role"],
-        )
-        session.add(new_trade)
-        session.flush()
+        new_trade = {
+            "trade_id": uuid4(),
+            "order_id": order.order_id,
+            "user_id": user.user_id,
+            "instrument_id": order.instrument_id,
+            "price": float(trade_price),
+            "quantity": float(trade_quantity),
+            "liquidity": role,
+            "executed_at": get_datetime(),
+        }
+        self._writer.add(Trades, new_trade)
 
         # Order state
         old_exec_qty = Decimal(str(order.executed_quantity))
@@ -231,13 +562,13 @@ class EventHandler:
             )
             session.add(asset_balance)
 
-            new_transaction = Transactions(
-                user_id=user.user_id,
-                amount=float(-trade_value),
-                type=TransactionType.TRADE.value,
-                related_id=str(new_trade.trade_id),
-                balance=user.cash_balance,
-            )
+            new_transaction = {
+                "user_id": user.user_id,
+                "amount": float(-trade_value),
+                "type": TransactionType.TRADE.value,
+                "related_id": str(new_trade["trade_id"]),
+                "balance": user.cash_balance,
+            }
         else:  # ASK order
             # SELLER: Settle from asset escrow, receive cash.
             asset_balance = self._get_asset_balance(
@@ -253,19 +584,18 @@ class EventHandler:
 
             user.cash_balance = float(Decimal(str(user.cash_balance)) + trade_value)
 
-            new_transaction = Transactions(
-                user_id=user.user_id,
-                amount=float(trade_value),
-                type=TransactionType.TRADE.value,
-                related_id=str(new_trade.trade_id),
-                balance=user.cash_balance,
-            )
+            new_transaction = {
+                "user_id": user.user_id,
+                "amount": float(trade_value),
+                "type": TransactionType.TRADE.value,
+                "related_id": str(new_trade["trade_id"]),
+                "balance": user.cash_balance,
+            }
 
         session.add(order)
         session.add(user)
-        session.add(new_transaction)
-
-        self._publish_instrument_events(event, order, new_trade.executed_at)
+        self._writer.add(Transactions, new_transaction)
+        return new_trade
 
     def _get_entry_price(self, order: Orders) -> float:
         if order.order_type == OrderType.MARKET.value:
@@ -275,7 +605,7 @@ class EventHandler:
         return order.stop_price
 
     def _publish_instrument_events(
-        self, event: Event, order: Orders, trade_executed: datetime
+        self, event: Event, side: Side, trade_executed: datetime
     ) -> None:
         details = event.details
         if "price" not in details:
@@ -283,23 +613,20 @@ class EventHandler:
 
         price_event = InstrumentEvent(
             event_type=InstrumentEventType.PRICE,
-            instrument_id=order.instrument_id,
+            instrument_id=event.instrument_id,
             data=PriceEvent(price=details["price"]),
         )
-        REDIS_CLIENT.publish(INSTRUMENT_EVENT_CHANNEL, price_event.model_dump_json())
+        self._instrument_messages.append(price_event.model_dump_json())
 
         if "quantity" in details:
             trade_event = InstrumentEvent(
                 event_type=InstrumentEventType.TRADES,
-                instrument_id=order.instrument_id,
+                instrument_id=event.instrument_id,
                 data=TradeEvent(
                     price=details["price"],
                     quantity=details["quantity"],
-                    side=order.side,
+                    side=side,
                     executed_at=trade_executed,
                 ),
             )
-
-            REDIS_CLIENT.publish(
-                INSTRUMENT_EVENT_CHANNEL, trade_event.model_dump_json()
-            )
+            self._instrument_messages.append(trade_event.model_dump_json())
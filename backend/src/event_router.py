@@ -0,0 +1,68 @@
+from zlib import crc32
+
+from engine.codec import decode_event, encode_event_batch, split_events
+from engine.models import Event
+from enums import EventType
+
+
+def partition_for(user_id: str, partitions: int) -> int:
+    """
+    Returns the event handler partition that owns a user. Uses crc32 rather
+    than `hash` so that every process agrees regardless of hash seeding.
+    """
+    return crc32(str(user_id).encode()) % partitions
+
+
+def partitions_for(event: Event, partitions: int) -> set[int]:
+    """
+    The partitions that apply `event`: its user's, and for an EXECUTION
+    its maker's as well. Seeded liquidity belongs to none.
+    """
+    user_ids = {event.user_id}
+    if event.event_type == EventType.EXECUTION:
+        user_ids.add(event.details["maker_user_id"])
+    user_ids.discard("layer")
+    return {partition_for(user_id, partitions) for user_id in user_ids}
+
+
+class EventRouter:
+    """
+    Splits event messages from the engine between the queues of the event
+    handler partitions, keeping each partition's events in the order the
+    engine emitted them. Events are forwarded still encoded, batched per
+    partition.
+
+    Attributes:
+        queues (list): One queue per partition.
+        routed (list[int]): Events put on each partition's queue so far.
+            Pass a shared array to read it from other processes.
+    """
+
+    def __init__(self, queues: list, routed=None) -> None:
+        if not queues:
+            raise ValueError("At least one partition queue is required")
+        self.queues = queues
+        self.routed = routed if routed is not None else [0] * len(queues)
+
+    @property
+    def partitions(self) -> int:
+        return len(self.queues)
+
+    def route(self, data: bytes) -> list[Event]:
+        """Forwards the events in `data` and returns them decoded."""
+        events = []
+        frames_by_partition: dict[int, list] = {}
+        for frame in split_events(data):
+            event = decode_event(frame)
+            events.append(event)
+            for partition in partitions_for(event, self.partitions):
+                frames_by_partition.setdefault(partition, []).append(frame)
+
+        for partition, frames in frames_by_partition.items():
+            # Counted first so the partition is never seen ahead of it.
+            self.routed[partition] += len(frames)
+            if len(frames) == 1:
+                self.queues[partition].put_nowait(bytes(frames[0]))
+            else:
+                self.queues[partition].put_nowait(encode_event_batch(frames))
+        return events
@@ -1,23 +1,71 @@
 import asyncio
+import json
+import os
 import time
 from multiprocessing import Process, Queue
+from multiprocessing.sharedctypes import RawArray
 from multiprocessing.queues import Queue as MPQueue
+from queue import Empty, Queue as LocalQueue
 from threading import Thread
 from uuid import uuid4
 
 import uvicorn
 from sqlalchemy import select
 
-from config import INSTRUMENT_EVENT_CHANNEL, REDIS_CLIENT
+from config import (
+    CASH_BALANCE_HKEY,
+    CASH_ESCROW_HKEY,
+    ENGINE_BATCH_SIZE,
+    ENGINE_BATCH_TIMEOUT,
+    ENGINE_EXPIRY_INTERVAL,
+    ENGINE_LEDGER_FLUSH_INTERVAL,
+    ENGINE_METRICS_CHANNEL,
+    ENGINE_METRICS_HKEY,
+    ENGINE_METRICS_INTERVAL,
+    ENGINE_METRICS_SAMPLE_EVERY,
+    ENGINE_QUEUE_HARD_LIMIT,
+    ENGINE_QUEUE_SOFT_LIMIT,
+    ENGINE_RETRY_AFTER,
+    ENGINE_SHARDS,
+    ENGINE_SNAPSHOT_INTERVAL,
+    ENGINE_STATE_DIR,
+    DB_ENGINE,
+    EVENT_BATCH_SIZE,
+    EVENT_BATCH_TIMEOUT,
+    EVENT_METRICS_HKEY,
+    EVENT_METRICS_INTERVAL,
+    EVENT_PARTITIONS,
+    INSTRUMENT_EVENT_CHANNEL,
+    IPC_TRANSPORT,
+    REDIS_CLIENT,
+    RING_BUFFER_CAPACITY,
+)
 from db_models import Instruments
 from engine import SpotEngine
+from engine.balance_ledger import BalanceLedger
+from engine.balance_manager import BalanceManager
+from engine.codec import decode_command, decode_events, encode_command
 from engine.enums import CommandType
-from engine.models import Command, Event, NewSingleOrder
+from engine.ingress import CommandIngress
+from engine.journal import CommandJournal
+from engine.metrics import EngineMetrics
+from engine.models import (
+    Command,
+    Event,
+    ExpireOrders,
+    NewInstrument,
+    NewSingleOrder,
+)
+from engine.router import ShardRouter, shard_for
+from engine.snapshot import recover_engine, write_snapshot
 from enums import InstrumentEventType, OrderStatus, OrderType, Side, StrategyType
 from event_handler import EventHandler
+from event_router import EventRouter
 from models import InstrumentEvent, OrderBookSnapshot
 from orderbook_duplicator import OrderBookReplicator
+from ring_buffer import RingBuffer
 from utils.db import get_db_session_sync
+from utils.entity_cache import EntityCache
 from utils.utils import get_instrument_balance_hkey, get_instrument_escrows_hkey
 
 
@@ -41,26 +89,182 @@ def publish_orderbooks(orderbooks: dict[str, OrderBookReplicator], delay: float
         time.sleep(delay)
 
 
-def run_event_handler(event_queue: MPQueue):
+def forward(source: MPQueue | RingBuffer, sink: LocalQueue) -> None:
+    while True:
+        sink.put(source.get())
+
+
+def drain_events(
+    event_queue: MPQueue | RingBuffer | LocalQueue,
+    batch_size: int,
+    timeout: float,
+    wait: float | None = None,
+) -> list[Event]:
+    """
+    Blocks for the next event message, then keeps taking messages until
+    `batch_size` events are held or `timeout` seconds have passed. With a
+    `wait`, gives up and returns no events if none arrives within `wait`
+    seconds.
+    """
+    try:
+        events = decode_events(event_queue.get(timeout=wait))
+    except Empty:
+        return []
+    deadline = time.perf_counter() + timeout
+
+    while len(events) < batch_size:
+        remaining = deadline - time.perf_counter()
+        if remaining <= 0:
+            break
+        try:
+            events.extend(decode_events(event_queue.get(timeout=remaining)))
+        except Empty:
+            break
+    return events
+
+
+def merge_event_queues(
+    event_queues: list[MPQueue | RingBuffer],
+) -> MPQueue | RingBuffer | LocalQueue:
+    """
+    Each shard's events arrive in order on its own queue, and every
+    instrument belongs to one shard, so merging them keeps each
+    instrument's events in order.
+    """
+    if len(event_queues) == 1:
+        return event_queues[0]
+
+    event_queue = LocalQueue()
+    for source in event_queues:
+        Thread(target=forward, args=(source, event_queue), daemon=True).start()
+    return event_queue
+
+
+def replicate(orderbooks: dict[str, OrderBookReplicator], events: list[Event]) -> None:
+    by_instrument: dict[str, list[Event]] = {}
+    for event in events:
+        by_instrument.setdefault(event.instrument_id, []).append(event)
+
+    for instrument_id, instrument_events in by_instrument.items():
+        if instrument_id not in orderbooks:
+            orderbooks[instrument_id] = OrderBookReplicator()
+        orderbooks[instrument_id].process_events(instrument_events)
+
+
+def run_event_handler(event_queues: list[MPQueue | RingBuffer]):
+    # Connections pooled before the fork belong to the parent.
+    DB_ENGINE.dispose(close=False)
     ev_handler = EventHandler()
     orderbooks: dict[str, OrderBookReplicator] = {}
 
     th = Thread(target=publish_orderbooks, args=(orderbooks,))
     th.start()
 
+    event_queue = merge_event_queues(event_queues)
     while True:
-        event: Event = event_queue.get()
+        events = drain_events(event_queue, EVENT_BATCH_SIZE, EVENT_BATCH_TIMEOUT)
 
         with get_db_session_sync() as sess:
-            ev_handler.process_event(event, sess)
-
-        if event.instrument_id not in orderbooks:
-            orderbooks[event.instrument_id] = OrderBookReplicator()
-        replicator = orderbooks[event.instrument_id]
-        replicator.process_event(event)
+            if EVENT_BATCH_SIZE > 1:
+                ev_handler.process_batch(events, sess)
+            else:
+                ev_handler.process_events(events, sess)
+
+        replicate(orderbooks, events)
+
+
+def run_event_dispatcher(
+    event_queues: list[MPQueue | RingBuffer],
+    partition_queues: list[MPQueue | RingBuffer],
+    routed,
+) -> None:
+    """
+    Routes engine events to the event handler partitions by user and keeps
+    the replicated orderbooks, which need every event of their instrument.
+    `routed` counts the events sent to each partition.
+    """
+    router = EventRouter(partition_queues, routed)
+    orderbooks: dict[str, OrderBookReplicator] = {}
 
+    th = Thread(target=publish_orderbooks, args=(orderbooks,))
+    th.start()
 
-def lay_orders(engine: SpotEngine, instrument_id: str):
+    event_queue = merge_event_queues(event_queues)
+    while True:
+        replicate(orderbooks, router.route(event_queue.get()))
+
+
+def publish_partition_metrics(
+    partition: int, backlog: int, events: int, window: float, cache: EntityCache
+) -> None:
+    """
+    Stores an event handler partition's latest metrics for the /metrics
+    route. Lag is how long the partition would take to clear its `backlog`
+    at the rate it handled `events` over the `window`, None if it handled
+    none.
+    """
+    if not backlog:
+        lag = 0.0
+    elif events:
+        lag = backlog * window / events
+    else:
+        lag = None
+
+    data = {
+        "partition": partition,
+        "window_secs": window,
+        "queue_depth": backlog,
+        "lag_secs": lag,
+        "counters": {"events": events},
+        "cache": cache.stats(),
+    }
+    REDIS_CLIENT.hset(EVENT_METRICS_HKEY, str(partition), json.dumps(data))
+
+
+def run_event_worker(
+    partition: int,
+    partitions: int,
+    event_queue: MPQueue | RingBuffer,
+    routed,
+    handled,
+) -> None:
+    """
+    Applies the events routed to `partition`. `routed` and `handled` count
+    the events sent to and handled by each partition, their difference
+    being the partition's backlog.
+    """
+    # Connections pooled before the fork belong to the parent.
+    DB_ENGINE.dispose(close=False)
+    ev_handler = EventHandler(partition=partition, partitions=partitions)
+
+    events_since = 0
+    last_metrics = time.monotonic()
+    while True:
+        events = drain_events(
+            event_queue,
+            EVENT_BATCH_SIZE,
+            EVENT_BATCH_TIMEOUT,
+            wait=EVENT_METRICS_INTERVAL,
+        )
+        if events:
+            with get_db_session_sync() as sess:
+                ev_handler.process_batch(events, sess)
+            handled[partition] += len(events)
+            events_since += len(events)
+
+        if time.monotonic() - last_metrics >= EVENT_METRICS_INTERVAL:
+            publish_partition_metrics(
+                partition,
+                routed[partition] - handled[partition],
+                events_since,
+                time.monotonic() - last_metrics,
+                ev_handler.cache,
+            )
+            events_since = 0
+            last_metrics = time.monotonic()
+
+
+def lay_orders(engine: SpotEngine, instrument_id: str, journal: CommandJournal):
     REDIS_CLIENT.hset(get_instrument_balance_hkey(instrument_id), "layer", 2000)
     REDIS_CLIENT.hset(get_instrument_escrows_hkey(instrument_id), "layer", 0)
 
@@ -81,44 +285,229 @@ def lay_orders(engine: SpotEngine, instrument_id: str):
             },
         )
         cmd = Command(command_type=CommandType.NEW_ORDER, data=data)
+        journal.append(encode_command(cmd))
         engine.process_command(cmd)
-
-
-def run_engine(command_queue: MPQueue, event_queue: MPQueue) -> None:
+    journal.mark_published()
+
+
+def drain_commands(
+    command_queue: CommandIngress | MPQueue | RingBuffer,
+    batch_size: int,
+    timeout: float,
+    journal: CommandJournal | None = None,
+    wait: float | None = None,
+) -> list[Command]:
+    """
+    Blocks for the next command, then takes whatever else is already queued
+    until `batch_size` commands are held or `timeout` seconds have passed.
+    Commands arrive encoded, are appended to `journal` as received and are
+    decoded here. With a `wait`, gives up and returns no commands if none
+    arrives within `wait` seconds.
+    """
+    try:
+        raw = [command_queue.get(timeout=wait)]
+    except Empty:
+        return []
+    deadline = time.perf_counter() + timeout
+
+    while len(raw) < batch_size and time.perf_counter() < deadline:
+        try:
+            raw.append(command_queue.get_nowait())
+        except Empty:
+            break
+
+    if journal is not None:
+        for data in raw:
+            journal.append(data)
+    return [decode_command(data) for data in raw]
+
+
+def publish_metrics(metrics: EngineMetrics, shard: int, queue_depth: int = 0) -> None:
+    """Stores a shard's latest metrics for the /metrics route and announces them."""
+    data = json.dumps({"shard": shard, **metrics.snapshot(queue_depth)})
+    with REDIS_CLIENT.pipeline() as pipe:
+        pipe.hset(ENGINE_METRICS_HKEY, str(shard), data)
+        pipe.publish(ENGINE_METRICS_CHANNEL, data)
+        pipe.execute()
+
+
+def run_engine(
+    command_queue: CommandIngress,
+    event_queue: MPQueue | RingBuffer,
+    shard: int = 0,
+    shards: int = 1,
+) -> None:
+    """Runs the engine for the instruments that belong to `shard`."""
     from engine.event_logger import EventLogger
 
     with get_db_session_sync() as sess:
-        insts = sess.execute(select(Instruments.instrument_id)).scalars().all()
-
-    engine = SpotEngine(insts)
-    EventLogger.queue = event_queue
+        rows = sess.execute(
+            select(
+                Instruments.instrument_id,
+                Instruments.tick_size,
+                Instruments.min_price,
+                Instruments.max_price,
+            )
+        ).all()
+
+    insts = [
+        NewInstrument(
+            instrument_id=instrument_id,
+            tick_size=tick_size,
+            min_price=min_price,
+            max_price=max_price,
+        )
+        for instrument_id, tick_size, min_price, max_price in rows
+        if shard_for(instrument_id, shards) == shard
+    ]
+    engine = SpotEngine(
+        instruments=insts, metrics=EngineMetrics(ENGINE_METRICS_SAMPLE_EVERY)
+    )
 
+    state_dir = os.path.join(ENGINE_STATE_DIR, f"shard-{shard}")
+    os.makedirs(state_dir, exist_ok=True)
+    snapshot_path = os.path.join(state_dir, "engine.snapshot")
+    journal = CommandJournal(os.path.join(state_dir, "commands.journal"))
+
+    # Once started, the engine reads and writes balances in this ledger
+    # only, except for cash when other shards spend it too.
+    cash_hkeys = [CASH_BALANCE_HKEY, CASH_ESCROW_HKEY]
+    shared = cash_hkeys if shards > 1 else []
+    ledger = BalanceLedger(ENGINE_LEDGER_FLUSH_INTERVAL, shared=shared)
+    hkeys = [hkey for hkey in cash_hkeys if hkey not in shared]
     for inst in insts:
-        lay_orders(engine, inst)
+        hkeys.append(get_instrument_balance_hkey(inst.instrument_id))
+        hkeys.append(get_instrument_escrows_hkey(inst.instrument_id))
 
+    # Set before recovery, which sends the events the crash held back.
+    EventLogger.queue = event_queue
+    if os.path.exists(snapshot_path) or journal.seq:
+        ledger.load(hkeys)
+        recover_engine(engine, snapshot_path, journal, ledger)
+    else:
+        for inst in insts:
+            lay_orders(engine, inst.instrument_id, journal)
+        ledger.load(hkeys)
+
+    ledger.start()
+    BalanceManager.ledger = ledger
+    write_snapshot(snapshot_path, engine, journal.seq)
+    journal.reset()
+
+    # Leave out the commands replayed on startup.
+    engine.metrics.reset()
+    last_snapshot = last_metrics = time.monotonic()
+    last_expiry = 0.0
     while True:
-        command: Command = command_queue.get()
-        engine.process_command(command)
-
-        if command.command_type == CommandType.NEW_INSTRUMENT:
-            lay_orders(engine, command.data.instrument_id)
-
-def run_server(command_queue: MPQueue):
+        batch = drain_commands(
+            command_queue,
+            ENGINE_BATCH_SIZE,
+            ENGINE_BATCH_TIMEOUT,
+            journal,
+            wait=ENGINE_EXPIRY_INTERVAL,
+        )
+        engine.process_commands(batch)
+        journal.mark_published()
+
+        # Expiry goes through the journal like any other command so that a
+        # replay cancels orders at the same point in the command stream.
+        now = time.time()
+        if len(engine.expiries) and now - last_expiry >= ENGINE_EXPIRY_INTERVAL:
+            cmd = Command(
+                command_type=CommandType.EXPIRE_ORDERS, data=ExpireOrders(now=now)
+            )
+            journal.append(encode_command(cmd))
+            engine.process_command(cmd)
+            journal.mark_published()
+            last_expiry = now
+
+        for command in batch:
+            if command.command_type == CommandType.NEW_INSTRUMENT:
+                lay_orders(engine, command.data.instrument_id, journal)
+
+        if time.monotonic() - last_metrics >= ENGINE_METRICS_INTERVAL:
+            publish_metrics(engine.metrics, shard, command_queue.depth)
+            engine.metrics.reset()
+            last_metrics = time.monotonic()
+
+        if time.monotonic() - last_snapshot >= ENGINE_SNAPSHOT_INTERVAL:
+            write_snapshot(snapshot_path, engine, journal.seq)
+            journal.reset()
+            last_snapshot = time.monotonic()
+
+
+def run_server(
+    command_queues: list[CommandIngress], port: int = 80, access_log: bool = True
+):
     import config
 
-    config.COMMAND_QUEUE = command_queue
-    uvicorn.run("server.app:app", port=80)
+    if len(command_queues) == 1:
+        config.COMMAND_QUEUE = command_queues[0]
+    else:
+        config.COMMAND_QUEUE = ShardRouter(command_queues)
+    uvicorn.run("server.app:app", port=port, access_log=access_log)
+
+
+def make_queue() -> MPQueue | RingBuffer:
+    """Returns a channel for the transport chosen by IPC_TRANSPORT."""
+    if IPC_TRANSPORT == "ring":
+        return RingBuffer(RING_BUFFER_CAPACITY)
+    if IPC_TRANSPORT == "queue":
+        return Queue()
+    raise ValueError(f"Unknown IPC transport: {IPC_TRANSPORT}")
+
+
+def build_processes(
+    port: int = 80, access_log: bool = True
+) -> tuple[list[tuple], list[CommandIngress], list[MPQueue | RingBuffer]]:
+    """
+    Returns the (target, args, name) of every process, the HTTP server, the
+    event handler and an engine per shard, along with the command and event
+    queues between them. With EVENT_PARTITIONS above 1 the event handler is
+    a dispatcher feeding a worker per partition.
+    """
+    command_queues = [
+        CommandIngress(
+            make_queue(),
+            ENGINE_QUEUE_SOFT_LIMIT,
+            ENGINE_QUEUE_HARD_LIMIT,
+            ENGINE_RETRY_AFTER,
+        )
+        for _ in range(ENGINE_SHARDS)
+    ]
+    # Ring buffers only allow one producer, so each shard gets its own.
+    if IPC_TRANSPORT == "ring":
+        ev_queues = [make_queue() for _ in range(ENGINE_SHARDS)]
+    else:
+        ev_queues = [make_queue()]
+
+    p_configs = [(run_server, (command_queues, port, access_log), "http server")]
+    partition_queues = []
+    if EVENT_PARTITIONS > 1:
+        partition_queues = [make_queue() for _ in range(EVENT_PARTITIONS)]
+        routed = RawArray("q", EVENT_PARTITIONS)
+        handled = RawArray("q", EVENT_PARTITIONS)
+        p_configs.append(
+            (
+                run_event_dispatcher,
+                (ev_queues, partition_queues, routed),
+                "event dispatcher",
+            )
+        )
+        for partition, partition_queue in enumerate(partition_queues):
+            args = (partition, EVENT_PARTITIONS, partition_queue, routed, handled)
+            p_configs.append((run_event_worker, args, f"event handler {partition}"))
+    else:
+        p_configs.append((run_event_handler, (ev_queues,), "event handler"))
 
+    for shard, command_queue in enumerate(command_queues):
+        args = (command_queue, ev_queues[shard % len(ev_queues)], shard, ENGINE_SHARDS)
+        p_configs.append((run_engine, args, f"spot engine {shard}"))
+    return p_configs, command_queues, [*ev_queues, *partition_queues]
 
-async def main():
-    command_queue = Queue()
-    ev_queue = Queue()
 
-    p_configs = (
-        (run_server, (command_queue,), "http server"),
-        (run_engine, (command_queue, ev_queue), "spot engine"),
-        (run_event_handler, (ev_queue,), "event handler"),
-    )
+async def main():
+    p_configs, command_queues, ev_queues = build_processes()
     ps = [Process(target=func, args=args, name=name) for func, args, name in p_configs]
 
     for p in ps:
@@ -146,6 +535,11 @@ async def main():
             p.kill()
             p.join()
 
+        for q in (*(c.queue for c in command_queues), *ev_queues):
+            if isinstance(q, RingBuffer):
+                q.close()
+                q.unlink()
+
 
 if __name__ == "__main__":
     asyncio.run(main())
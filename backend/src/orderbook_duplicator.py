@@ -34,8 +34,13 @@ class OrderBookReplicator:
             EventType.ORDER_FILLED: self._handle_order_filled,
             EventType.ORDER_CANCELLED: self._handle_order_cancelled,
             EventType.ORDER_MODIFIED: self._handle_order_modified,
+            EventType.EXECUTION: self._handle_execution,
         }
 
+    def process_events(self, events: list[Event]) -> None:
+        for event in events:
+            self.process_event(event)
+
     def process_event(self, event: Event) -> None:
         handler = self._handlers.get(event.event_type)
         if handler:
@@ -73,21 +78,36 @@ class OrderBookReplicator:
 
     def _handle_order_filled(self, event: Event):
         details = event.details
-        order = self._orders.get(event.related_id)
+        self._fill(event.related_id, details["quantity"], details["executed_quantity"])
+
+    def _handle_execution(self, event: Event):
+        details = event.details
+        self._fill(
+            details["maker_order_id"],
+            details["maker_order_quantity"],
+            details["maker_executed_quantity"],
+        )
+        # Takers are only on the book when they rested before trading.
+        self._fill(
+            event.related_id, details["order_quantity"], details["executed_quantity"]
+        )
+
+    def _fill(self, order_id: str, quantity: float, executed_quantity: float) -> None:
+        order = self._orders.get(order_id)
         if not order:
             return
 
         prev_remaining = order.quantity - order.executed_quantity
-        new_remaining = details["quantity"] - details["executed_quantity"]
+        new_remaining = quantity - executed_quantity
 
         delta = new_remaining - prev_remaining
         self._update_level(self._get_book(order.side), order.price, delta)
 
-        order.quantity = details["quantity"]
-        order.executed_quantity = details["executed_quantity"]
+        order.quantity = quantity
+        order.executed_quantity = executed_quantity
 
         if order.quantity == order.executed_quantity:
-            self._orders.pop(event.related_id)
+            self._orders.pop(order_id)
 
     def _handle_order_cancelled(self, event: Event):
         order = self._orders.pop(event.related_id, None)
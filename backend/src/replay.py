@@ -0,0 +1,110 @@
+"""
+Replays recorded or synthetic commands through a SpotEngine at full speed.
+
+    python replay.py --journal engine-state/shard-0/commands.journal \\
+        --snapshot engine-state/shard-0/engine.snapshot
+    python replay.py --synthetic 200000 --instruments 4 --seed 1
+    python replay.py --synthetic 200000 --record /tmp/flow.journal
+
+Prints commands per second, latency percentiles per command type and a
+digest of the final books. Runs over the same input report the same
+digest, so comparing digests checks that matching is deterministic.
+"""
+
+import argparse
+import json
+
+from engine import SpotEngine
+from engine.journal import CommandJournal
+from engine.simulation import (
+    ensure_instruments,
+    generate_commands,
+    run_simulation,
+)
+from engine.snapshot import load_snapshot
+
+
+def parse_args(argv: list[str] | None = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    source = parser.add_mutually_exclusive_group(required=True)
+    source.add_argument("--journal", help="CommandJournal file to replay.")
+    source.add_argument(
+        "--synthetic", type=int, metavar="N", help="Generate N commands instead."
+    )
+    parser.add_argument(
+        "--snapshot", help="Engine snapshot to start from, as written by the engine."
+    )
+    parser.add_argument("--instruments", type=int, default=1)
+    parser.add_argument("--users", type=int, default=100)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument(
+        "--record", help="Also write the synthetic commands to this journal file."
+    )
+    parser.add_argument(
+        "--batch-size",
+        type=int,
+        default=1,
+        help="Process commands in batches, as the engine process does. "
+        "Latencies are only measured per command with a batch size of 1.",
+    )
+    parser.add_argument("--json", action="store_true", help="Print the report as JSON.")
+    return parser.parse_args(argv)
+
+
+def load_commands(args: argparse.Namespace, after: int = 0) -> list[bytes]:
+    """Returns the encoded commands to replay, those after seq `after` of a journal."""
+    if args.journal:
+        journal = CommandJournal(args.journal)
+        try:
+            return [bytes(data) for _, data in journal.replay(after)]
+        finally:
+            journal.close()
+
+    instrument_ids = [f"SIM-{i}" for i in range(args.instruments)]
+    raw = list(
+        generate_commands(
+            args.synthetic, instrument_ids, seed=args.seed, users=args.users
+        )
+    )
+    if args.record:
+        journal = CommandJournal(args.record)
+        for data in raw:
+            journal.append(data)
+        journal.close()
+    return raw
+
+
+def main(argv: list[str] | None = None) -> None:
+    args = parse_args(argv)
+
+    engine = SpotEngine()
+    seq = load_snapshot(args.snapshot, engine) if args.snapshot else 0
+    raw = load_commands(args, seq)
+    ensure_instruments(engine, raw)
+
+    report = run_simulation(engine, raw, args.batch_size)
+    result = {
+        "commands": report.commands,
+        "elapsed_secs": report.elapsed,
+        "commands_per_sec": report.throughput,
+        "event_messages": report.messages,
+        "latency_us": report.percentiles(),
+        "digest": report.digest,
+    }
+
+    if args.json:
+        print(json.dumps(result, indent=2))
+        return
+
+    print(f"[INFO]: Processed {report.commands} commands in {report.elapsed:.3f}s")
+    print(f"[INFO]: {report.throughput:,.0f} commands/s")
+    for label, stats in result["latency_us"].items():
+        cols = "  ".join(
+            f"{key}={value:.1f}" for key, value in stats.items() if key != "count"
+        )
+        print(f"[INFO]: {label:<20} n={stats['count']:<8} {cols} (us)")
+    print(f"[INFO]: Book digest {report.digest}")
+
+
+if __name__ == "__main__":
+    main()
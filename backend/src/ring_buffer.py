@@ -0,0 +1,170 @@
+import os
+import struct
+import time
+from multiprocessing import shared_memory
+from queue import Empty, Full
+
+
+_COUNTER = struct.Struct("<Q")
+_LENGTH = struct.Struct("<I")
+
+# Read and write counters sit on separate cache lines so the producer and
+# consumer don't invalidate each other's line on every update.
+_HEAD_OFFSET = 0
+_TAIL_OFFSET = 64
+_CAPACITY_OFFSET = 128
+_DATA_OFFSET = 192
+
+
+class RingBuffer:
+    """
+    Single-producer/single-consumer byte ring over shared memory, usable
+    in place of a multiprocessing Queue for bytes messages.
+
+    The producer owns the tail counter and the consumer owns the head
+    counter. Both only ever increase, so `tail - head` is the number of
+    bytes in flight and neither side needs a lock. Each message is a u32
+    length followed by its payload, wrapping around the end of the ring.
+
+    Only one process (and thread) may put and only one may get.
+    """
+
+    # Spinning only pays off when the other side runs on another core.
+    spin_count = 200 if (os.cpu_count() or 1) > 1 else 0
+    yield_count = 50
+    max_backoff = 0.001
+
+    def __init__(
+        self, capacity: int = 1 << 20, *, name: str | None = None, create: bool = True
+    ):
+        if create:
+            if capacity <= 0 or capacity & (capacity - 1):
+                raise ValueError("capacity must be a power of two")
+            self._shm = shared_memory.SharedMemory(
+                name=name, create=True, size=_DATA_OFFSET + capacity
+            )
+            self._shm.buf[:_DATA_OFFSET] = bytes(_DATA_OFFSET)
+            _COUNTER.pack_into(self._shm.buf, _CAPACITY_OFFSET, capacity)
+        else:
+            self._shm = shared_memory.SharedMemory(name=name)
+            capacity = _COUNTER.unpack_from(self._shm.buf, _CAPACITY_OFFSET)[0]
+
+        self._capacity = capacity
+        self._mask = capacity - 1
+        self._owner = create
+
+    def __getstate__(self):
+        return {"name": self._shm.name}
+
+    def __setstate__(self, state):
+        self.__init__(name=state["name"], create=False)
+
+    @property
+    def name(self) -> str:
+        return self._shm.name
+
+    @property
+    def capacity(self) -> int:
+        return self._capacity
+
+    def qsize(self) -> int:
+        """Returns the number of bytes held, including length prefixes."""
+        return self._load(_TAIL_OFFSET) - self._load(_HEAD_OFFSET)
+
+    def empty(self) -> bool:
+        return self.qsize() == 0
+
+    def _load(self, offset: int) -> int:
+        return _COUNTER.unpack_from(self._shm.buf, offset)[0]
+
+    def _store(self, offset: int, value: int) -> None:
+        _COUNTER.pack_into(self._shm.buf, offset, value)
+
+    def _write(self, pos: int, data: bytes) -> None:
+        buf = self._shm.buf
+        start = pos & self._mask
+        first = min(len(data), self._capacity - start)
+        buf[_DATA_OFFSET + start : _DATA_OFFSET + start + first] = data[:first]
+        if first < len(data):
+            rest = len(data) - first
+            buf[_DATA_OFFSET : _DATA_OFFSET + rest] = data[first:]
+
+    def _read(self, pos: int, size: int) -> bytes:
+        buf = self._shm.buf
+        start = pos & self._mask
+        first = min(size, self._capacity - start)
+        data = bytes(buf[_DATA_OFFSET + start : _DATA_OFFSET + start + first])
+        if first < size:
+            data += bytes(buf[_DATA_OFFSET : _DATA_OFFSET + size - first])
+        return data
+
+    def _wait(self, ready, block: bool, timeout: float | None) -> bool:
+        """
+        Busy-polls `ready` for `spin_count` attempts, yields the CPU for
+        `yield_count` more, then sleeps with an exponential back-off capped
+        at `max_backoff` until it holds or the timeout expires.
+        """
+        if ready():
+            return True
+        if not block:
+            return False
+
+        for _ in range(self.spin_count):
+            if ready():
+                return True
+
+        for _ in range(self.yield_count):
+            os.sched_yield()
+            if ready():
+                return True
+
+        deadline = None if timeout is None else time.perf_counter() + timeout
+        delay = 0.00001
+        while not ready():
+            if deadline is not None:
+                remaining = deadline - time.perf_counter()
+                if remaining <= 0:
+                    return False
+                delay = min(delay, remaining)
+            time.sleep(delay)
+            delay = min(delay * 2, self.max_backoff)
+        return True
+
+    def put(self, data: bytes, block: bool = True, timeout: float | None = None):
+        size = _LENGTH.size + len(data)
+        if size > self._capacity:
+            raise ValueError("Message larger than the ring buffer")
+
+        tail = self._load(_TAIL_OFFSET)
+        fits = lambda: self._capacity - (tail - self._load(_HEAD_OFFSET)) >= size
+        if not self._wait(fits, block, timeout):
+            raise Full
+
+        self._write(tail, _LENGTH.pack(len(data)))
+        self._write(tail + _LENGTH.size, data)
+        # Publish only once the payload is in place.
+        self._store(_TAIL_OFFSET, tail + size)
+
+    def put_nowait(self, data: bytes) -> None:
+        self.put(data, block=False)
+
+    def get(self, block: bool = True, timeout: float | None = None) -> bytes:
+        head = self._load(_HEAD_OFFSET)
+        if not self._wait(lambda: self._load(_TAIL_OFFSET) != head, block, timeout):
+            raise Empty
+
+        length = _LENGTH.unpack(self._read(head, _LENGTH.size))[0]
+        data = self._read(head + _LENGTH.size, length)
+        self._store(_HEAD_OFFSET, head + _LENGTH.size + length)
+        return data
+
+    def get_nowait(self) -> bytes:
+        return self.get(block=False)
+
+    def close(self) -> None:
+        self._shm.close()
+
+    def unlink(self) -> None:
+        """Releases the shared memory block. Only the creator should call this."""
+        if self._owner:
+            self._shm.unlink()
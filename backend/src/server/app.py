@@ -2,10 +2,12 @@ from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import JSONResponse
 
-from server.exc import JWTError
+from engine.ingress import IngressOverloaded
+from server.exc import InvalidPriceError, JWTError
 from .routes import (
     auth_route,
     instruments_route,
+    metrics_route,
     orders_route,
     user_route,
 )
@@ -17,6 +19,7 @@ app = FastAPI()
 
 app.include_router(auth_route)
 app.include_router(instruments_route)
+app.include_router(metrics_route)
 app.include_router(orders_route)
 app.include_router(user_route)
 app.include_router(ws_route)
@@ -34,3 +37,17 @@ app.add_middleware(
 @app.exception_handler(JWTError)
 async def jwt_error_hanlder(req: Request, exc: JWTError):
     return JSONResponse(status_code=403, content={"error": str(exc)})
+
+
+@app.exception_handler(InvalidPriceError)
+async def invalid_price_handler(req: Request, exc: InvalidPriceError):
+    return JSONResponse(status_code=400, content={"error": str(exc)})
+
+
+@app.exception_handler(IngressOverloaded)
+async def ingress_overloaded_handler(req: Request, exc: IngressOverloaded):
+    return JSONResponse(
+        status_code=exc.status_code,
+        content={"error": str(exc)},
+        headers={"Retry-After": str(exc.retry_after)},
+    )
@@ -1,3 +1,8 @@
 class JWTError(Exception):
     """Custom exception for JWT errors."""
-    pass
\ No newline at end of file
+    pass
+
+
+class InvalidPriceError(Exception):
+    """Raised for an order price the instrument can't trade at."""
+    pass
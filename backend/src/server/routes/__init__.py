@@ -1,4 +1,5 @@
 from .auth.route import route as auth_route
 from .instruments.route import route as instruments_route
+from .metrics.route import route as metrics_route
 from .orders.route import route as orders_route
 from .user.route import route as user_route
\ No newline at end of file
@@ -5,6 +5,8 @@ class InstrumentCreate(BaseModel):
     instrument_id: str
     symbol: str
     tick_size: float = 1.0
+    min_price: float | None = None
+    max_price: float | None = None
 
 
 class Stats24h(BaseModel):
@@ -7,6 +7,7 @@ from config import COMMAND_QUEUE, PAGE_SIZE
 from db_models import Instruments, Orders, Trades
 from engine.enums import CommandType
 from engine import CommandType, Command, NewInstrument
+from engine.codec import encode_command
 from enums import TimeFrame
 from models import TradeEvent
 from server.models import PaginatedResponse
@@ -31,12 +32,16 @@ async def create_instrument(
     try:
         await db_sess.execute(insert(Instruments).values(**details.model_dump()))
         await db_sess.commit()
-        COMMAND_QUEUE.put_nowait(
-            Command(
-                command_type=CommandType.NEW_INSTRUMENT,
-                data=NewInstrument(instrument_id=details.instrument_id),
-            )
+        command = Command(
+            command_type=CommandType.NEW_INSTRUMENT,
+            data=NewInstrument(
+                instrument_id=details.instrument_id,
+                tick_size=details.tick_size,
+                min_price=details.min_price,
+                max_price=details.max_price,
+            ),
         )
+        COMMAND_QUEUE.put_nowait(encode_command(command))
     except IntegrityError:
         raise HTTPException(status_code=409, detail="Instrument already exists.")
 
@@ -0,0 +1,28 @@
+import json
+
+from fastapi import APIRouter
+
+from config import ENGINE_METRICS_HKEY, EVENT_METRICS_HKEY, REDIS_CLIENT_ASYNC
+
+
+route = APIRouter(prefix="/metrics", tags=["metrics"])
+
+
+@route.get("/")
+async def get_metrics():
+    """
+    Returns the latest metrics published by every engine shard: sampled
+    latency percentiles in microseconds per command type and engine call,
+    and counters, all covering the shard's last publishing interval.
+
+    With a partitioned event handler, also returns each partition's
+    backlog, lag and entity cache hits and misses.
+    """
+    published = await REDIS_CLIENT_ASYNC.hgetall(ENGINE_METRICS_HKEY)
+    shards = [json.loads(data) for data in published.values()]
+    published = await REDIS_CLIENT_ASYNC.hgetall(EVENT_METRICS_HKEY)
+    partitions = [json.loads(data) for data in published.values()]
+    return {
+        "shards": sorted(shards, key=lambda m: m["shard"]),
+        "event_partitions": sorted(partitions, key=lambda m: m["partition"]),
+    }
@@ -4,14 +4,17 @@ from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from db_models import Orders
+from engine.codec import encode_command
 from engine.models import (
     Command,
     CommandType,
+    CancelAllCommand,
     CancelOrderCommand,
     ModifyOrderCommand,
 )
-from enums import OrderStatus
+from enums import Side
 from .models import OrderModify
+from .order_service import OrderService
 from config import COMMAND_QUEUE
 
 
@@ -30,30 +33,21 @@ async def cancel_order(
 
     cmd_data = CancelOrderCommand(order_id=str(order_id), symbol=order.instrument_id)
     command = Command(command_type=CommandType.CANCEL_ORDER, data=cmd_data)
-    COMMAND_QUEUE.put_nowait(command)
+    COMMAND_QUEUE.put_nowait(encode_command(command))
 
     return str(order.order_id)
 
 
-async def cancel_all_orders(user_id: UUID, db_sess: AsyncSession) -> None:
-    """Cancels all active orders for a user for a given instrument."""
-    result = await db_sess.execute(
-        select(Orders.order_id, Orders.instrument_id).where(
-            Orders.user_id == user_id,
-            Orders.status.in_(
-                (OrderStatus.PENDING.value, OrderStatus.PARTIALLY_FILLED.value)
-            ),
-        )
-    )
-    orders_to_cancel = result.all()
-
-    if not orders_to_cancel:
-        return
-
-    for order_id, instrument_id in orders_to_cancel:
-        cmd_data = CancelOrderCommand(order_id=str(order_id), symbol=instrument_id)
-        command = Command(command_type=CommandType.CANCEL_ORDER, data=cmd_data)
-        COMMAND_QUEUE.put_nowait(command)
+async def cancel_all_orders(
+    user_id: UUID, instrument_id: str | None = None, side: Side | None = None
+) -> None:
+    """
+    Creates a single command for the engine to cancel all of a user's open
+    orders, optionally only those for an instrument or side.
+    """
+    cmd_data = CancelAllCommand(user_id=str(user_id), symbol=instrument_id, side=side)
+    command = Command(command_type=CommandType.CANCEL_ALL, data=cmd_data)
+    COMMAND_QUEUE.put_nowait(encode_command(command))
 
 
 async def modify_order(
@@ -63,6 +57,10 @@ async def modify_order(
     order = await db_sess.get(Orders, order_id)
     if not order or str(order.user_id) != user_id:
         return None
+    COMMAND_QUEUE.admit(CommandType.MODIFY_ORDER, order.instrument_id)
+    await OrderService.check_prices(
+        db_sess, order.instrument_id, [details.limit_price, details.stop_price]
+    )
 
     kw = {}
     if details.stop_price is not None:
@@ -74,6 +72,6 @@ async def modify_order(
         order_id=str(order_id), symbol=order.instrument_id, **kw
     )
     command = Command(command_type=CommandType.MODIFY_ORDER, data=cmd_data)
-    COMMAND_QUEUE.put_nowait(command)
+    COMMAND_QUEUE.put_nowait(encode_command(command))
 
     return {"order_id": str(order_id), "message": "Modify request accepted"}
@@ -1,11 +1,12 @@
 from uuid import UUID
-from datetime import datetime
+from datetime import UTC, datetime, time, timedelta
 
 from pydantic import BaseModel, Field, field_validator, model_validator
 
-from enums import OrderType, Side, OrderStatus
+from enums import OrderType, Side, OrderStatus, TimeInForce
 from models import CustomBaseModel
 from server.models import PaginatedResponse
+from utils.utils import get_datetime
 
 
 class OrderBase(BaseModel):
@@ -18,10 +19,16 @@ class OrderBase(BaseModel):
 class OrderCreate(OrderBase):
     limit_price: float | None = Field(None, ge=0)
     stop_price: float | None = Field(None, ge=0)
+    time_in_force: TimeInForce = TimeInForce.GTC
+    expires_at: datetime | None = None
 
     @model_validator(mode="before")
     def validate_order_details(cls, values):
         ot = values.get("order_type")
+        tif = values.get("time_in_force", TimeInForce.GTC.value)
+
+        if ot == OrderType.STOP.value and tif != TimeInForce.GTC.value:
+            raise ValueError("Stop orders must be GTC.")
 
         if ot == OrderType.MARKET.value:
             return values
@@ -34,6 +41,29 @@ class OrderCreate(OrderBase):
 
         return values
 
+    @model_validator(mode="after")
+    def validate_expiry(self):
+        tif = self.time_in_force
+
+        if tif == TimeInForce.DAY:
+            # Day orders expire at the next UTC midnight.
+            tomorrow = get_datetime().date() + timedelta(days=1)
+            self.expires_at = datetime.combine(tomorrow, time.min, tzinfo=UTC)
+            return self
+
+        if tif != TimeInForce.GTD:
+            if self.expires_at is not None:
+                raise ValueError("Only GTD orders can have an expires_at.")
+            return self
+
+        if self.expires_at is None:
+            raise ValueError("Must provide expires_at for GTD orders.")
+        if self.expires_at.tzinfo is None:
+            self.expires_at = self.expires_at.replace(tzinfo=UTC)
+        if self.expires_at <= get_datetime():
+            raise ValueError("expires_at must be in the future.")
+        return self
+
 
 class OCOOrderCreate(BaseModel):
     legs: list[OrderCreate] = Field(min_length=2, max_length=2)
@@ -49,6 +79,8 @@ class OCOOrderCreate(BaseModel):
             raise ValueError("OCO legs must be for the same instrument.")
         if leg_a.quantity != leg_b.quantity:
             raise ValueError("OCO legs must have the same quantity.")
+        if any(l.time_in_force != TimeInForce.GTC for l in legs):
+            raise ValueError("OCO legs must be GTC.")
 
         return legs
 
@@ -67,6 +99,8 @@ class OTOOrderCreate(BaseModel):
             )
         if data.parent.quantity != data.child.quantity:
             raise ValueError("OTO parent and child must have the same quantity.")
+        if any(o.time_in_force != TimeInForce.GTC for o in (data.parent, data.child)):
+            raise ValueError("OTO parent and child must be GTC.")
         return data
 
 
@@ -86,10 +120,14 @@ class OTOCOOrderCreate(BaseModel):
             raise ValueError(
                 "OTOCO parent and leg orders must be have the same quantity."
             )
-        if any(leg.order_type != OrderType.MARKET for leg in data.oco_legs):
+        if any(leg.order_type == OrderType.MARKET for leg in data.oco_legs):
             raise ValueError(
                 "OTOCO parent and leg orders must be LIMIT or STOP orders."
             )
+        if any(
+            o.time_in_force != TimeInForce.GTC for o in (data.parent, *data.oco_legs)
+        ):
+            raise ValueError("OTOCO parent and leg orders must be GTC.")
         return data
 
 
@@ -108,6 +146,8 @@ class OrderRead(OrderBase, CustomBaseModel):
     limit_price: float | None
     stop_price: float | None
     price: float | None
+    time_in_force: TimeInForce | None = None
+    expires_at: datetime | None = None
 
 
 class PaginatedOrderResponse(PaginatedResponse):
@@ -4,9 +4,10 @@ from uuid import UUID
 from sqlalchemy import insert, select, update
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from config import CASH_ESCROW_HKEY, REDIS_CLIENT_ASYNC, COMMAND_QUEUE
+from config import COMMAND_QUEUE
 from db_models import AssetBalances, Instruments, Orders, Trades, Users
 from enums import OrderStatus, OrderType, Side, StrategyType
+from engine.codec import encode_command
 from engine.models import (
     Command,
     CommandType,
@@ -15,7 +16,8 @@ from engine.models import (
     NewOTOOrder,
     NewSingleOrder,
 )
-from utils.utils import get_instrument_escrows_hkey
+from server.exc import InvalidPriceError
+from utils.utils import is_tick_multiple, snap_to_tick
 from .models import OCOOrderCreate, OTOCOOrderCreate, OTOOrderCreate, OrderCreate
 
 
@@ -36,6 +38,8 @@ class OrderService:
     async def handle_escrow(
         cls, user_id, db_sess, instrument_id, quantity, price, side: Side
     ):
+        # Only the database copy is escrowed here. The engine owns the
+        # balances in Redis and escrows the order itself when it arrives.
         if side == Side.BID:
             total_value = quantity * price
             res = await db_sess.execute(
@@ -53,10 +57,6 @@ class OrderService:
                 .where(Users.user_id == user_id)
                 .values(escrow_balance=Users.escrow_balance + total_value)
             )
-
-            await REDIS_CLIENT_ASYNC.hincrbyfloat(
-                CASH_ESCROW_HKEY, user_id, total_value
-            )
             return
 
         res = await db_sess.execute(
@@ -79,9 +79,40 @@ class OrderService:
         )
         await db_sess.flush()
 
-        await REDIS_CLIENT_ASYNC.hincrbyfloat(
-            get_instrument_escrows_hkey(instrument_id), user_id, quantity
+    @classmethod
+    async def check_prices(
+        cls, db_sess: AsyncSession, instrument_id: str, prices: list[float | None]
+    ) -> None:
+        """
+        Raises InvalidPriceError if any of `prices` isn't a multiple of the
+        instrument's tick size or lies outside its price band. The engine
+        would otherwise trade the order at a price other than the one stored
+        for it, or turn it away once it had been escrowed.
+        """
+        res = await db_sess.execute(
+            select(
+                Instruments.tick_size, Instruments.min_price, Instruments.max_price
+            ).where(Instruments.instrument_id == instrument_id)
         )
+        row = res.one_or_none()
+        if row is None:
+            return
+
+        tick_size, min_price, max_price = row
+        for price in prices:
+            if price is None:
+                continue
+            if tick_size is not None and not is_tick_multiple(price, tick_size):
+                raise InvalidPriceError(
+                    f"Price {price} is not a multiple of the tick size {tick_size}."
+                )
+            if (min_price is not None and price < min_price) or (
+                max_price is not None and price > max_price
+            ):
+                raise InvalidPriceError(
+                    f"Price {price} is outside the price band "
+                    f"[{min_price}, {max_price}]."
+                )
 
     @classmethod
     async def fetch_last_trade_price(cls, db_sess, instrument_id: str) -> float | None:
@@ -96,7 +127,7 @@ class OrderService:
     @classmethod
     async def _create_order(
         cls, user_id: str, db_sess: AsyncSession, details: OrderCreate
-    ) -> list[str]:
+    ) -> tuple[Command, list[str]]:
         order_data = details.model_dump()
 
         if details.order_type == OrderType.MARKET:
@@ -110,10 +141,14 @@ class OrderService:
 
             if price is None:
                 res = await db_sess.execute(
-                    select(Instruments.starting_price)
+                    select(Instruments.starting_price, Instruments.tick_size)
                     .where(Instruments.instrument_id == details.instrument_id)
                 )
-                price = res.scalar_one()
+                price, tick_size = res.one()
+                # Trades print on the tick grid, the starting price may not.
+                # The engine turns away an order priced off it.
+                if tick_size is not None:
+                    price = snap_to_tick(price, tick_size)
 
             order_data["price"] = price
             await cls.handle_escrow(
@@ -140,22 +175,20 @@ class OrderService:
         order = res.scalar()
         await db_sess.flush()
 
-        COMMAND_QUEUE.put_nowait(
-            Command(
-                command_type=CommandType.NEW_ORDER,
-                data=NewSingleOrder(
-                    strategy_type=StrategyType.SINGLE,
-                    instrument_id=details.instrument_id,
-                    order=order.dump_serialised(),
-                ),
-            )
+        command = Command(
+            command_type=CommandType.NEW_ORDER,
+            data=NewSingleOrder(
+                strategy_type=StrategyType.SINGLE,
+                instrument_id=details.instrument_id,
+                order=order.dump_serialised(),
+            ),
         )
-        return [str(order.order_id)]
+        return command, [str(order.order_id)]
 
     @classmethod
     async def _create_oco_order(
         cls, user_id, db_sess, details: OCOOrderCreate
-    ) -> list[str]:
+    ) -> tuple[Command, list[str]]:
         db_orders = []
         instrument_id = details.legs[0].instrument_id
         for leg_details in details.legs:
@@ -177,30 +210,31 @@ class OrderService:
 
         await db_sess.flush()
 
-        COMMAND_QUEUE.put_nowait(
-            Command(
-                command_type=CommandType.NEW_ORDER,
-                data=NewOCOOrder(
-                    strategy_type=StrategyType.OCO,
-                    instrument_id=instrument_id,
-                    legs=[o.dump_serialised() for o in db_orders],
-                ),
-            )
+        command = Command(
+            command_type=CommandType.NEW_ORDER,
+            data=NewOCOOrder(
+                strategy_type=StrategyType.OCO,
+                instrument_id=instrument_id,
+                legs=[o.dump_serialised() for o in db_orders],
+            ),
         )
-        return [str(o.order_id) for o in db_orders]
+        return command, [str(o.order_id) for o in db_orders]
 
     @classmethod
     async def _create_oto_order(
         cls, user_id, db_sess, details: OTOOrderCreate
-    ) -> list[str]:
+    ) -> tuple[Command, list[str]]:
         parent_details = details.parent
         instrument_id = parent_details.instrument_id
+        parent_data = parent_details.model_dump()
         if parent_details.order_type == OrderType.MARKET:
             entry_price = await cls.fetch_last_trade_price(db_sess, instrument_id)
             if entry_price is None:
                 raise ValueError(
                     f"No last trade price for market order on {instrument_id}"
                 )
+            # The engine escrows and matches the order at this price.
+            parent_data["price"] = entry_price
 
         res = await db_sess.execute(
             insert(Orders)
@@ -208,7 +242,7 @@ class OrderService:
                 user_id=user_id,
                 **{
                     k: (v.value if isinstance(v, Enum) else v)
-                    for k, v in parent_details.model_dump().items()
+                    for k, v in parent_data.items()
                 },
             )
             .returning(Orders)
@@ -230,31 +264,32 @@ class OrderService:
         child_order = res.scalar()
         await db_sess.flush()
 
-        COMMAND_QUEUE.put_nowait(
-            Command(
-                command_type=CommandType.NEW_ORDER,
-                data=NewOTOOrder(
-                    strategy_type=StrategyType.OTO,
-                    instrument_id=instrument_id,
-                    parent=parent_order.dump_serialised(),
-                    child=child_order.dump_serialised(),
-                ),
-            )
+        command = Command(
+            command_type=CommandType.NEW_ORDER,
+            data=NewOTOOrder(
+                strategy_type=StrategyType.OTO,
+                instrument_id=instrument_id,
+                parent=parent_order.dump_serialised(),
+                child=child_order.dump_serialised(),
+            ),
         )
-        return [str(parent_order.order_id), str(child_order.order_id)]
+        return command, [str(parent_order.order_id), str(child_order.order_id)]
 
     @classmethod
     async def _create_otoco_order(
         cls, user_id, db_sess, details: OTOCOOrderCreate
-    ) -> list[str]:
+    ) -> tuple[Command, list[str]]:
         parent_details = details.parent
         instrument_id = parent_details.instrument_id
+        parent_data = parent_details.model_dump()
         if parent_details.order_type == OrderType.MARKET:
             entry_price = await cls.fetch_last_trade_price(db_sess, instrument_id)
             if entry_price is None:
                 raise ValueError(
                     f"No last trade price for market order on {instrument_id}"
                 )
+            # The engine escrows and matches the order at this price.
+            parent_data["price"] = entry_price
             await cls.handle_escrow(
                 user_id,
                 db_sess,
@@ -270,7 +305,7 @@ class OrderService:
                 user_id=user_id,
                 **{
                     k: (v.value if isinstance(v, Enum) else v)
-                    for k, v in parent_details.model_dump().items()
+                    for k, v in parent_data.items()
                 },
             )
             .returning(Orders)
@@ -294,18 +329,18 @@ class OrderService:
 
         await db_sess.flush()
 
-        COMMAND_QUEUE.put_nowait(
-            Command(
-                command_type=CommandType.NEW_ORDER,
-                data=NewOTOCOOrder(
-                    strategy_type=StrategyType.OTOCO,
-                    instrument_id=instrument_id,
-                    parent=parent_order.dump_serialised(),
-                    oco_legs=[o.dump_serialised() for o in oco_leg_orders],
-                ),
-            )
+        command = Command(
+            command_type=CommandType.NEW_ORDER,
+            data=NewOTOCOOrder(
+                strategy_type=StrategyType.OTOCO,
+                instrument_id=instrument_id,
+                parent=parent_order.dump_serialised(),
+                oco_legs=[o.dump_serialised() for o in oco_leg_orders],
+            ),
         )
-        return [str(parent_order.order_id)] + [str(o.order_id) for o in oco_leg_orders]
+        order_ids = [str(parent_order.order_id)]
+        order_ids.extend(str(o.order_id) for o in oco_leg_orders)
+        return command, order_ids
 
     @classmethod
     async def create(cls, user_id: str, details, db_sess: AsyncSession) -> dict:
@@ -321,7 +356,28 @@ class OrderService:
         if not creator:
             raise ValueError(f"Unsupported order type: {type(details)}")
 
-        order_ids = await creator(user_id, db_sess, details)
+        if isinstance(details, OrderCreate):
+            orders = [details]
+        elif isinstance(details, OCOOrderCreate):
+            orders = details.legs
+        elif isinstance(details, OTOOrderCreate):
+            orders = [details.parent, details.child]
+        else:
+            orders = [details.parent, *details.oco_legs]
+        instrument_id = orders[0].instrument_id
+
+        # Turn the order away before it touches the database if the engine
+        # is too far behind.
+        COMMAND_QUEUE.admit(CommandType.NEW_ORDER, instrument_id)
+        await cls.check_prices(
+            db_sess,
+            instrument_id,
+            [price for o in orders for price in (o.limit_price, o.stop_price)],
+        )
+
+        command, order_ids = await creator(user_id, db_sess, details)
         balances = await cls.fetch_balance(user_id, db_sess)
         await db_sess.commit()
+        # Only once committed, so the event handler finds the orders.
+        COMMAND_QUEUE.put_nowait(encode_command(command))
         return {"order_ids": order_ids, **balances}
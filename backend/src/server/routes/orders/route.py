@@ -153,11 +153,15 @@ async def modify_order(
 
 @route.delete("/", status_code=202, summary="Cancel all active orders for the user")
 async def cancel_all_orders(
+    instrument: str | None = Query(None),
+    side: Side | None = Query(None),
     jwt: JWTPayload = Depends(verify_jwt),
-    db_sess: AsyncSession = Depends(depends_db_session),
 ):
-    """Sends requests to cancel all PENDING or PARTIALLY_FILLED orders."""
-    await cancel_all_orders_controller(jwt.sub, db_sess)
+    """
+    Sends a request to cancel all of the user's open orders, optionally
+    only those for an instrument or side.
+    """
+    await cancel_all_orders_controller(jwt.sub, instrument, side)
 
 
 @route.delete("/{order_id}", status_code=202, summary="Cancel a specific order")
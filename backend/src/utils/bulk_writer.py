@@ -0,0 +1,99 @@
+from datetime import datetime
+from io import StringIO
+from typing import Iterable
+
+from sqlalchemy import Table, insert
+from sqlalchemy.orm import Session
+
+from db_models import Base
+
+
+_ESCAPES = str.maketrans({"\\": "\\\\", "\t": "\\t", "\n": "\\n", "\r": "\\r"})
+
+
+def _copy_value(value) -> str:
+    """Formats a value for COPY's text format."""
+    if value is None:
+        return "\\N"
+    if isinstance(value, str):
+        return value.translate(_ESCAPES)
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return str(value)
+
+
+class BulkWriter:
+    """
+    Buffers rows for append-only tables and writes them on the connection
+    of the session they're flushed through, so they commit or roll back
+    with everything else in its transaction.
+
+    On PostgreSQL the rows are sent with COPY, elsewhere with one
+    executemany INSERT per table. Column defaults such as generated ids
+    and timestamps are filled in as rows are added, since COPY doesn't
+    run them.
+    """
+
+    def __init__(self, models: Iterable[type[Base]]) -> None:
+        self._tables: dict[type[Base], Table] = {
+            model: model.__table__ for model in models
+        }
+        self._rows: dict[type[Base], list[dict]] = {
+            model: [] for model in self._tables
+        }
+
+    def __len__(self) -> int:
+        return sum(len(rows) for rows in self._rows.values())
+
+    def add(self, model: type[Base], row: dict) -> dict:
+        """Buffers `row` for `model`'s table and returns it with its defaults."""
+        for column in self._tables[model].columns:
+            if column.key in row or column.default is None:
+                continue
+            default = column.default
+            row[column.key] = default.arg(None) if default.is_callable else default.arg
+
+        self._rows[model].append(row)
+        return row
+
+    def clear(self) -> None:
+        for rows in self._rows.values():
+            rows.clear()
+
+    def flush(self, session: Session) -> int:
+        """
+        Writes every buffered row within `session`'s transaction, after
+        its pending ORM changes, and returns how many were written.
+        """
+        written = len(self)
+        if not written:
+            return 0
+
+        session.flush()
+        connection = session.connection()
+        copy = connection.dialect.name == "postgresql"
+
+        for model, rows in self._rows.items():
+            if not rows:
+                continue
+            table = self._tables[model]
+            if copy:
+                self._copy(connection.connection.dbapi_connection, table, rows)
+            else:
+                connection.execute(insert(table), rows)
+
+        self.clear()
+        return written
+
+    @staticmethod
+    def _copy(dbapi_connection, table: Table, rows: list[dict]) -> None:
+        keys = [column.key for column in table.columns]
+        buf = StringIO()
+        for row in rows:
+            buf.write("\t".join([_copy_value(row.get(key)) for key in keys]))
+            buf.write("\n")
+        buf.seek(0)
+
+        columns = ", ".join(f'"{column.name}"' for column in table.columns)
+        with dbapi_connection.cursor() as cursor:
+            cursor.copy_expert(f'COPY "{table.name}" ({columns}) FROM STDIN', buf)
@@ -0,0 +1,62 @@
+from collections import Counter, OrderedDict
+
+from db_models import Base
+
+
+class EntityCache:
+    """
+    Least recently used cache of ORM instances, keyed by a tuple whose first
+    item names the kind of entity, e.g. `(Orders, order_id)`.
+
+    The cached instances are the ones the caller modifies, so once their
+    session commits the cache already holds what was written. Entries
+    touched by a transaction that rolls back must be discarded, as their
+    attributes no longer match the database.
+
+    Hits and misses are counted per kind.
+    """
+
+    def __init__(self, size: int = 100_000) -> None:
+        self.size = size
+        self._entries: OrderedDict[tuple, Base] = OrderedDict()
+        self.hits: Counter[str] = Counter()
+        self.misses: Counter[str] = Counter()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, key: tuple) -> bool:
+        return key in self._entries
+
+    def get(self, key: tuple) -> Base | None:
+        entity = self._entries.get(key)
+        if entity is None:
+            self.misses[self._kind(key)] += 1
+            return None
+
+        self._entries.move_to_end(key)
+        self.hits[self._kind(key)] += 1
+        return entity
+
+    def put(self, key: tuple, entity: Base) -> None:
+        self._entries[key] = entity
+        self._entries.move_to_end(key)
+        if len(self._entries) > self.size:
+            self._entries.popitem(last=False)
+
+    def discard(self, key: tuple) -> None:
+        self._entries.pop(key, None)
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+    def stats(self) -> dict[str, dict[str, int]]:
+        """Hits and misses so far, by kind."""
+        return {
+            kind: {"hits": self.hits[kind], "misses": self.misses[kind]}
+            for kind in sorted(self.hits.keys() | self.misses.keys())
+        }
+
+    @staticmethod
+    def _kind(key: tuple) -> str:
+        return getattr(key[0], "__name__", str(key[0]))
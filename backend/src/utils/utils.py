@@ -1,4 +1,5 @@
 from datetime import UTC, datetime
+from decimal import Decimal
 
 
 def get_datetime():
@@ -13,5 +14,16 @@ def get_instrument_escrows_hkey(instrument_id: str) -> str:
     return f"{instrument_id}.escrows"
 
 
+def is_tick_multiple(price: float, tick_size: float) -> bool:
+    """Whether `price` is a whole number of ticks, allowing for float error."""
+    ticks = price / tick_size
+    return abs(ticks - round(ticks)) <= 1e-9 * max(1.0, abs(ticks))
+
+
+def snap_to_tick(price: float, tick_size: float) -> float:
+    """Rounds `price` to the nearest whole number of ticks."""
+    return float(Decimal(str(tick_size)) * round(price / tick_size))
+
+
 def get_default_cash_balance() -> float:
     return 10_000.00
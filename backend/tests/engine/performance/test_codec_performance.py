@@ -0,0 +1,85 @@
+import pickle
+import uuid
+
+import pytest
+
+from src.engine import Command, CommandType, NewSingleOrder
+from src.engine.codec import decode_command, decode_event, encode_command, encode_event
+from src.engine.models import Event
+from src.enums import EventType, LiquidityRole, OrderType, Side, StrategyType
+
+
+def _order_command() -> Command:
+    return Command(
+        command_type=CommandType.NEW_ORDER,
+        data=NewSingleOrder(
+            strategy_type=StrategyType.SINGLE,
+            instrument_id="BTC-USD",
+            order={
+                "order_id": str(uuid.uuid4()),
+                "user_id": str(uuid.uuid4()),
+                "order_type": OrderType.LIMIT,
+                "side": Side.BID,
+                "quantity": 10.0,
+                "limit_price": 101.5,
+                "stop_price": None,
+                "price": None,
+            },
+        ),
+    )
+
+
+EVENT_ARGS = (
+    EventType.NEW_TRADE,
+    str(uuid.uuid4()),
+    str(uuid.uuid4()),
+    "BTC-USD",
+    {"quantity": 5.0, "price": 101.5, "role": LiquidityRole.TAKER.value},
+)
+
+
+@pytest.mark.parametrize("wire", ["pickle", "codec"])
+def test_perf_command_round_trip(benchmark, wire):
+    """
+    Benchmark serialising and deserialising a NEW_ORDER command, comparing
+    pickled pydantic models with the binary codec.
+    """
+    command = _order_command()
+
+    if wire == "pickle":
+        op = lambda: pickle.loads(pickle.dumps(command))
+        size = len(pickle.dumps(command))
+    else:
+        op = lambda: decode_command(encode_command(command))
+        size = len(encode_command(command))
+
+    benchmark(op)
+    benchmark.extra_info["bytes"] = size
+
+
+@pytest.mark.parametrize("wire", ["pickle", "codec"])
+def test_perf_event_round_trip(benchmark, wire):
+    """
+    Benchmark producing and consuming a NEW_TRADE event. The pickle path
+    includes building the Event model, as EventLogger used to.
+    """
+    etype, user_id, related_id, instrument_id, details = EVENT_ARGS
+
+    if wire == "pickle":
+
+        def op():
+            ev = Event(
+                event_type=etype,
+                user_id=user_id,
+                related_id=related_id,
+                instrument_id=instrument_id,
+                details=details,
+            )
+            return pickle.loads(pickle.dumps(ev))
+
+    else:
+
+        def op():
+            return decode_event(encode_event(*EVENT_ARGS))
+
+    benchmark(op)
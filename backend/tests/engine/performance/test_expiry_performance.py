@@ -0,0 +1,82 @@
+import uuid
+
+from src.engine import (
+    Command,
+    CommandType,
+    ExpireOrders,
+    NewInstrument,
+    SpotEngine,
+)
+from src.engine.event_logger import EventLogger
+from src.engine.orders import Order
+from src.engine.simulation import NullQueue
+from src.engine.timer_wheel import TimerWheel
+from src.enums import OrderType, Side, StrategyType
+
+
+EXPIRING_ORDERS = 100_000
+LEVELS = 1_000
+NOW = 1_750_000_000.0
+DEADLINE = NOW + 3_600
+
+
+def test_perf_timer_wheel_schedule_and_expire(benchmark):
+    """
+    Benchmark scheduling 100k keys an hour out, then turning the wheel to
+    the instant they all come due.
+    """
+    keys = [str(uuid.uuid4()) for _ in range(EXPIRING_ORDERS)]
+
+    def run():
+        wheel = TimerWheel()
+        wheel.advance(NOW)
+        for key in keys:
+            wheel.schedule(key, DEADLINE)
+        return wheel.advance(DEADLINE)
+
+    due = benchmark.pedantic(run, rounds=5, iterations=1)
+    assert len(due) == EXPIRING_ORDERS
+
+
+def test_perf_engine_expire_orders_same_instant(benchmark):
+    """
+    Benchmark a single EXPIRE_ORDERS command cancelling 100k resting GTD
+    orders that all expire at the same instant.
+    """
+
+    def setup():
+        engine = SpotEngine(instruments=[NewInstrument(instrument_id="BTC-USD")])
+        ctx = engine.contexts["BTC-USD"]
+        engine.expiries.advance(NOW)
+
+        for i in range(EXPIRING_ORDERS):
+            side = Side.BID if i % 2 else Side.ASK
+            offset = (i // 2) % LEVELS + 1
+            price = 100.0 - offset * 0.01 if side == Side.BID else 100.0 + offset * 0.01
+            order = Order(
+                str(uuid.uuid4()),
+                f"user_{i % 1000}",
+                StrategyType.SINGLE,
+                OrderType.LIMIT,
+                side,
+                10,
+                round(price, 2),
+            )
+            ctx.orderbook.append(order, order.price)
+            ctx.order_store.add(order)
+            engine.expiries.schedule(("BTC-USD", order.id), DEADLINE)
+
+        command = Command(
+            command_type=CommandType.EXPIRE_ORDERS, data=ExpireOrders(now=DEADLINE)
+        )
+        return (engine, command), {}
+
+    def expire(engine, command):
+        engine.process_commands([command])
+        assert len(engine.contexts["BTC-USD"].order_store) == 0
+
+    queue, EventLogger.queue = EventLogger.queue, NullQueue()
+    try:
+        benchmark.pedantic(expire, setup=setup, rounds=3, iterations=1)
+    finally:
+        EventLogger.queue = queue
@@ -0,0 +1,176 @@
+import gc
+import tracemalloc
+import uuid
+
+import pytest
+
+from src.engine.orderbook import LadderOrderBook, OrderBook, StopBook
+from src.engine.orders import Order
+from src.enums import OrderType, Side, StrategyType
+
+
+BAND_TICKS = 1_000_000
+ORDERS_PER_LEVEL = 10
+MEMORY_ORDERS = 1_000_000
+
+# deep: 5,000 contiguous levels per side.
+# sparse: 200 levels per side spread across the whole band.
+BOOK_SHAPES = {
+    "deep": (5_000, 1),
+    "sparse": (200, 2_500),
+}
+
+
+def _make_order(side: Side) -> Order:
+    return Order(
+        str(uuid.uuid4()), "u1", StrategyType.SINGLE, OrderType.LIMIT, side, 1
+    )
+
+
+def _make_book(kind: str):
+    if kind == "ladder":
+        return LadderOrderBook(0, BAND_TICKS, price=BAND_TICKS // 2)
+    return OrderBook(price=BAND_TICKS // 2)
+
+
+@pytest.fixture(
+    params=[
+        (kind, shape) for shape in BOOK_SHAPES for kind in ("sorted", "ladder")
+    ],
+    ids=lambda p: f"{p[0]}-{p[1]}",
+)
+def populated_book(request):
+    """
+    Returns a book of the requested implementation and shape, with bids
+    below and asks above the mid.
+    """
+    kind, shape = request.param
+    levels, gap = BOOK_SHAPES[shape]
+    ob = _make_book(kind)
+    mid = BAND_TICKS // 2
+
+    for i in range(1, levels + 1):
+        for _ in range(ORDERS_PER_LEVEL):
+            ob.append(_make_order(Side.BID), mid - i * gap)
+            ob.append(_make_order(Side.ASK), mid + i * gap)
+
+    return ob
+
+
+def test_perf_orderbook_append_remove(benchmark, populated_book):
+    """
+    Benchmark append/remove cycles on existing levels behind the top of book.
+    """
+    ob = populated_book
+    prices = list(ob.bid_levels)[-100:-1]
+    orders = [_make_order(Side.BID) for _ in prices]
+
+    def operation():
+        for order, price in zip(orders, prices):
+            ob.append(order, price)
+        for order, price in zip(orders, prices):
+            ob.remove(order, price)
+
+    benchmark(operation)
+
+
+def test_perf_orderbook_best_price_churn(benchmark, populated_book):
+    """
+    Benchmark repeatedly clearing and restoring the best level on each side,
+    which forces the book to find the next best price every cycle.
+    """
+    ob = populated_book
+    sides = (
+        (Side.BID, ob.best_bid),
+        (Side.ASK, ob.best_ask),
+    )
+    levels = {side: list(ob.get_orders(price, side)) for side, price in sides}
+
+    def operation():
+        for side, price in sides:
+            for order in levels[side]:
+                ob.remove(order, price)
+            for order in levels[side]:
+                ob.append(order, price)
+
+    benchmark(operation)
+
+
+def test_perf_orderbook_drain(benchmark, populated_book):
+    """
+    Benchmark sweeping the top 100 levels of the ask side, as an aggressive
+    taker would, then restoring them.
+    """
+    ob = populated_book
+    prices = list(ob.ask_levels)[:100]
+    resting = [(price, list(ob.get_orders(price, Side.ASK))) for price in prices]
+
+    def operation():
+        for price, orders in resting:
+            for order in orders:
+                ob.remove(order, price)
+        for price, orders in resting:
+            for order in orders:
+                ob.append(order, price)
+
+    benchmark(operation)
+
+
+@pytest.mark.parametrize("kind", ["sorted", "ladder"])
+def test_perf_orderbook_memory_per_order(benchmark, kind):
+    """
+    Measures the bytes retained per resting order (the Order, its
+    PriceLevelNode and its level's tracker entry) for 1M resting orders
+    spread over 10,000 levels per side.
+    """
+    result = {}
+
+    def operation():
+        gc.collect()
+        tracemalloc.start()
+        ob = _make_book(kind)
+        mid = BAND_TICKS // 2
+        base, _ = tracemalloc.get_traced_memory()
+
+        for i in range(MEMORY_ORDERS // 2):
+            offset = (i % 10_000) + 1
+            ob.append(_make_order(Side.BID), mid - offset)
+            ob.append(_make_order(Side.ASK), mid + offset)
+
+        gc.collect()
+        current, _ = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        result["bytes_per_order"] = (current - base) / MEMORY_ORDERS
+        return ob
+
+    benchmark.pedantic(operation, rounds=1, iterations=1)
+    benchmark.extra_info.update(result)
+    print(f"\n[INFO] {kind}: {result['bytes_per_order']:.1f} bytes per resting order")
+
+
+@pytest.mark.parametrize("stops", [1_000, 100_000])
+def test_perf_stop_book_trigger(benchmark, stops):
+    """
+    Benchmark finding and removing the stops crossed by one price move,
+    with `stops` buy and sell stops resting away from it.
+    """
+    book = StopBook()
+    mid = BAND_TICKS // 2
+    for i in range(1, stops // 2 + 1):
+        for side, price in ((Side.BID, mid + i), (Side.ASK, mid - i)):
+            order = _make_order(side)
+            order.price = price
+            book.append(order, price)
+
+    def trigger():
+        # Crosses the nearest 10 buy stop levels and puts them back.
+        price = mid + 10
+        crossed = book.triggered(price)
+        for order in crossed:
+            book.remove(order, order.price)
+        for order in crossed:
+            book.append(order, order.price)
+        return crossed
+
+    crossed = benchmark(trigger)
+    assert len(crossed) == 10
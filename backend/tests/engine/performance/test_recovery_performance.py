@@ -0,0 +1,104 @@
+import time
+import uuid
+
+import pytest
+
+from src.engine import (
+    Command,
+    CommandType,
+    NewInstrument,
+    NewSingleOrder,
+    SpotEngine,
+)
+from src.engine.balance_manager import BalanceManager
+from src.engine.codec import encode_command
+from src.engine.journal import CommandJournal
+from src.engine.orders import Order
+from src.engine.snapshot import recover_engine, write_snapshot
+from src.enums import OrderType, Side, StrategyType
+
+
+RESTING_ORDERS = 1_000_000
+JOURNAL_TAIL = 10_000
+LEVELS = 2_000
+
+
+def _populated_engine() -> SpotEngine:
+    """An engine with RESTING_ORDERS orders spread over LEVELS per side."""
+    engine = SpotEngine(instruments=[NewInstrument(instrument_id="BTC-USD")])
+    ctx = engine.contexts["BTC-USD"]
+    ob, store = ctx.orderbook, ctx.order_store
+
+    for i in range(RESTING_ORDERS):
+        side = Side.BID if i % 2 else Side.ASK
+        offset = (i // 2) % LEVELS + 1
+        price = 100.0 - offset * 0.01 if side == Side.BID else 100.0 + offset * 0.01
+        order = Order(
+            str(uuid.uuid4()),
+            f"user_{i % 1000}",
+            StrategyType.SINGLE,
+            OrderType.LIMIT,
+            side,
+            10,
+            round(price, 2),
+        )
+        ob.append(order, order.price)
+        store.add(order)
+    return engine
+
+
+def _tail_command() -> bytes:
+    return encode_command(
+        Command(
+            command_type=CommandType.NEW_ORDER,
+            data=NewSingleOrder(
+                strategy_type=StrategyType.SINGLE,
+                instrument_id="BTC-USD",
+                order={
+                    "order_id": str(uuid.uuid4()),
+                    "user_id": "tail_user",
+                    "order_type": OrderType.LIMIT,
+                    "side": Side.BID,
+                    "quantity": 10,
+                    "limit_price": 50.0,
+                },
+            ),
+        )
+    )
+
+
+def test_perf_restart_from_snapshot_and_journal(benchmark, tmp_path):
+    """
+    Benchmark engine restart time with 1M resting orders: loading the
+    snapshot, then replaying a 10k command journal tail.
+    """
+    snapshot_path = str(tmp_path / "engine.snapshot")
+    journal = CommandJournal(str(tmp_path / "commands.journal"))
+
+    engine = _populated_engine()
+    start = time.perf_counter()
+    write_snapshot(snapshot_path, engine, journal.seq)
+    snapshot_secs = time.perf_counter() - start
+    del engine
+
+    # Enough for every replayed order to escrow what it needs to rest.
+    BalanceManager.increase_cash_balance("tail_user", JOURNAL_TAIL * 10 * 50.0)
+    for _ in range(JOURNAL_TAIL):
+        journal.append(_tail_command())
+
+    def restart():
+        engine = SpotEngine()
+        recover_engine(engine, snapshot_path, journal)
+        return engine
+
+    engine = benchmark.pedantic(restart, rounds=1, iterations=1)
+    ctx = engine.contexts["BTC-USD"]
+    assert len(ctx.order_store) == RESTING_ORDERS + JOURNAL_TAIL
+
+    benchmark.extra_info["snapshot_write_secs"] = snapshot_secs
+    benchmark.extra_info["snapshot_mb"] = (tmp_path / "engine.snapshot").stat().st_size / 1e6
+    print(
+        f"\n[INFO] snapshot write {snapshot_secs:.2f}s, "
+        f"restart {benchmark.stats.stats.mean:.2f}s"
+    )
+    journal.close()
@@ -0,0 +1,105 @@
+import time
+import uuid
+from multiprocessing import Process, Queue
+
+import pytest
+
+from src.engine import Command, CommandType, NewInstrument, NewSingleOrder, SpotEngine
+from src.engine.codec import decode_command, encode_command
+from src.engine.router import ShardRouter, shard_for
+from src.enums import OrderType, Side, StrategyType
+
+
+INSTRUMENTS = [f"SHARD-{i}-USD" for i in range(32)]
+COMMANDS = 20_000
+STOP = b""
+
+
+def _shard_worker(shard: int, shards: int, commands: Queue, done: Queue) -> None:
+    engine = SpotEngine(
+        instruments=[
+            NewInstrument(instrument_id=instrument_id)
+            for instrument_id in INSTRUMENTS
+            if shard_for(instrument_id, shards) == shard
+        ]
+    )
+    done.put(shard)
+
+    while True:
+        batch = [commands.get()]
+        while len(batch) < 256 and not commands.empty():
+            batch.append(commands.get())
+
+        stop = batch[-1] == STOP
+        engine.process_commands([decode_command(raw) for raw in batch if raw != STOP])
+        if stop:
+            break
+
+    done.put(shard)
+
+
+def _resting_orders() -> list[bytes]:
+    """Non-crossing limit orders spread evenly across the instruments."""
+    encoded = []
+    for i in range(COMMANDS):
+        side = Side.BID if i % 2 else Side.ASK
+        encoded.append(
+            encode_command(
+                Command(
+                    command_type=CommandType.NEW_ORDER,
+                    data=NewSingleOrder(
+                        strategy_type=StrategyType.SINGLE,
+                        instrument_id=INSTRUMENTS[i % len(INSTRUMENTS)],
+                        order={
+                            "order_id": str(uuid.uuid4()),
+                            "user_id": str(uuid.uuid4()),
+                            "order_type": OrderType.LIMIT,
+                            "side": side,
+                            "quantity": 10,
+                            "limit_price": 90.0 if side == Side.BID else 110.0,
+                        },
+                    ),
+                )
+            )
+        )
+    return encoded
+
+
+@pytest.mark.parametrize("shards", [1, 2, 4])
+def test_perf_sharded_throughput(benchmark, shards):
+    """
+    Benchmark commands per second across 32 instruments when routed to 1,
+    2 and 4 engine processes. The clock runs from the first command being
+    routed until every shard has processed its share.
+    """
+    encoded = _resting_orders()
+    timings = []
+
+    def run():
+        queues = [Queue() for _ in range(shards)]
+        done = Queue()
+        workers = [
+            Process(target=_shard_worker, args=(i, shards, queues[i], done))
+            for i in range(shards)
+        ]
+        for w in workers:
+            w.start()
+        for _ in workers:
+            done.get()
+
+        router = ShardRouter(queues)
+        start = time.perf_counter()
+        for raw in encoded:
+            router.put_nowait(raw)
+        for q in queues:
+            q.put(STOP)
+        for _ in workers:
+            done.get()
+        timings.append(time.perf_counter() - start)
+
+        for w in workers:
+            w.join()
+
+    benchmark.pedantic(run, rounds=3)
+    benchmark.extra_info["commands_per_sec"] = COMMANDS / min(timings)
+    print(f"\n[INFO] shards={shards}: {COMMANDS / min(timings):,.0f} commands/sec")
@@ -1,4 +1,5 @@
 import copy
+import time
 import uuid
 
 import pytest
@@ -7,31 +8,69 @@ from src.engine import (
     SpotEngine,
     CommandType,
     Command,
+    NewInstrument,
     NewSingleOrder,
     NewOTOOrder,
     NewOCOOrder,
     NewOTOCOOrder,
     CancelOrderCommand,
 )
+from src.config import CASH_BALANCE_HKEY, CASH_ESCROW_HKEY, REDIS_CLIENT
+from src.engine.balance_ledger import BalanceLedger
+from src.engine.balance_manager import BalanceManager
+from src.engine.event_logger import EventLogger
+from src.engine.orderbook import OrderBook
+from src.engine.orders import Order
 from src.enums import OrderType, Side, StrategyType
+from src.utils.utils import get_instrument_balance_hkey, get_instrument_escrows_hkey
 
 
 ORDER_QUANTITIES = [10, 50, 100]
 PRICE_STEP = 0.01
 RESTING_ORDER_QTY = 10
+# Users of the orders placed by the benchmarks below.
+FIXED_USERS = ("taker", "test_user", "u1")
+
+
+def _fund(user_ids) -> None:
+    """
+    Gives every user ample cash and BTC-USD with nothing escrowed, so that
+    their orders can escrow what they need to rest.
+    """
+    with REDIS_CLIENT.pipeline() as pipe:
+        for user_id in user_ids:
+            pipe.hset(CASH_BALANCE_HKEY, user_id, 1_000_000_000)
+            pipe.hset(CASH_ESCROW_HKEY, user_id, 0)
+            pipe.hset(get_instrument_balance_hkey("BTC-USD"), user_id, 1_000_000_000)
+            pipe.hset(get_instrument_escrows_hkey("BTC-USD"), user_id, 0)
+        pipe.execute()
 
 
 @pytest.fixture(scope="session")
 def populated_engine_factory():
     """
     (Session-Scoped) Factory fixture to create a SpotEngine.
-    Returns a function that can create an engine with a specified book depth.
+    Returns a function that can create an engine with a specified book depth,
+    optionally running in tick-normalised price mode.
     """
-    engine = SpotEngine(instrument_ids=["BTC-USD"])
 
-    def _create_populated_engine(book_depth: int):
+    def _create_populated_engine(book_depth: int, tick_size: float | None = None):
+        engine = SpotEngine(
+            instruments=[NewInstrument(instrument_id="BTC-USD", tick_size=tick_size)]
+        )
         orders_per_side = book_depth // 2
         mid_price = (orders_per_side * PRICE_STEP) + 1.0
+        _fund(
+            [
+                *FIXED_USERS,
+                *(f"user_bid_{i}" for i in range(orders_per_side)),
+                *(f"user_ask_{i}" for i in range(orders_per_side)),
+            ]
+        )
+
+        # Anchor the last price at the mid so neither side crosses while seeding.
+        ctx = engine._ctxs["BTC-USD"]
+        ctx.orderbook.set_price(ctx.to_ticks(mid_price))
 
         # Populate bids
         for i in range(orders_per_side):
@@ -437,3 +476,302 @@ def test_perf_otoco_handle_new_parent_not_matching(benchmark, deep_book_engine):
         deep_book_engine.process_command(command)
 
     benchmark(operation)
+
+
+##### PRICE REPRESENTATION ####
+
+
+PRICE_MODES = {"float": None, "tick": PRICE_STEP}
+
+
+@pytest.fixture(scope="session")
+def _master_price_mode_engines(populated_engine_factory):
+    """
+    (Session-Scoped) One deeply populated engine per price mode, built from
+    identical float commands so that only the internal representation differs.
+    """
+    return {
+        mode: populated_engine_factory(10_000, tick_size=tick_size)
+        for mode, tick_size in PRICE_MODES.items()
+    }
+
+
+@pytest.fixture(params=list(PRICE_MODES))
+def price_mode_engine(request, _master_price_mode_engines):
+    return copy.deepcopy(_master_price_mode_engines[request.param])
+
+
+def test_perf_price_mode_orderbook_append_remove(benchmark, price_mode_engine):
+    """
+    Benchmark raw OrderBook append/remove cycles on the deep book, where the
+    keys are floats in float mode and ints in tick mode.
+    """
+    ob: OrderBook = price_mode_engine._ctxs["BTC-USD"].orderbook
+    prices = list(ob.bid_levels)[-100:]
+    orders = [
+        Order(str(uuid.uuid4()), "u1", StrategyType.SINGLE, OrderType.LIMIT, Side.BID, 1)
+        for _ in prices
+    ]
+
+    def operation():
+        for order, price in zip(orders, prices):
+            ob.append(order, price)
+        for order, price in zip(orders, prices):
+            ob.remove(order, price)
+
+    benchmark(operation)
+
+
+def test_perf_price_mode_handle_new_non_matching(benchmark, price_mode_engine):
+    """
+    Benchmark processing a new, non-matching limit order in each price mode,
+    including the edge conversion to ticks.
+    """
+    best_bid = price_mode_engine._ctxs["BTC-USD"].to_price(
+        price_mode_engine._ctxs["BTC-USD"].orderbook.best_bid
+    )
+
+    def setup():
+        cmd_data = NewSingleOrder(
+            strategy_type=StrategyType.SINGLE,
+            instrument_id="BTC-USD",
+            order={
+                "order_id": str(uuid.uuid4()),
+                "user_id": "test_user",
+                "order_type": OrderType.LIMIT,
+                "side": Side.BID,
+                "quantity": 10,
+                "limit_price": best_bid - 0.1 - 0.2,
+            },
+        )
+        command = Command(command_type=CommandType.NEW_ORDER, data=cmd_data)
+        return (command,), {}
+
+    def target_func(command):
+        price_mode_engine.process_command(command)
+
+    benchmark.pedantic(target=target_func, setup=setup, rounds=10_000)
+
+
+@pytest.mark.parametrize("order_quantity", ORDER_QUANTITIES)
+def test_perf_price_mode_match_and_fill(
+    benchmark, price_mode_engine, order_quantity
+):
+    """
+    Benchmark a taker sweeping `order_quantity` levels in each price mode.
+    """
+
+    def setup():
+        engine = copy.deepcopy(price_mode_engine)
+        ctx = engine._ctxs["BTC-USD"]
+        best_ask = ctx.to_price(ctx.orderbook.best_ask)
+
+        cmd_data = NewSingleOrder(
+            strategy_type=StrategyType.SINGLE,
+            instrument_id="BTC-USD",
+            order={
+                "order_id": str(uuid.uuid4()),
+                "user_id": "taker",
+                "order_type": OrderType.LIMIT,
+                "side": Side.BID,
+                "quantity": order_quantity,
+                "limit_price": best_ask + (order_quantity * PRICE_STEP),
+            },
+        )
+        command = Command(command_type=CommandType.NEW_ORDER, data=cmd_data)
+        return (engine, command), {}
+
+    def target_func(engine, cmd):
+        engine.process_command(cmd)
+
+    benchmark.pedantic(target=target_func, setup=setup, rounds=20, iterations=1)
+
+
+##### BATCHED PROCESSING ####
+
+BATCH_COMMANDS = 2_048
+
+
+def _crossing_commands(n: int) -> list[Command]:
+    """
+    Builds n commands alternating a resting ask and a bid that fills it, so
+    every second command settles a trade. Every user is funded up front.
+    """
+    commands = []
+    with REDIS_CLIENT.pipeline() as pipe:
+        for _ in range(n // 2):
+            maker, taker = f"maker_{uuid.uuid4()}", f"taker_{uuid.uuid4()}"
+            pipe.hset(get_instrument_balance_hkey("BTC-USD"), maker, RESTING_ORDER_QTY)
+            pipe.hset(CASH_BALANCE_HKEY, taker, RESTING_ORDER_QTY * 101.0)
+            for user_id, side in ((maker, Side.ASK), (taker, Side.BID)):
+                commands.append(
+                    Command(
+                        command_type=CommandType.NEW_ORDER,
+                        data=NewSingleOrder(
+                            strategy_type=StrategyType.SINGLE,
+                            instrument_id="BTC-USD",
+                            order={
+                                "order_id": str(uuid.uuid4()),
+                                "user_id": user_id,
+                                "order_type": OrderType.LIMIT,
+                                "side": side,
+                                "quantity": RESTING_ORDER_QTY,
+                                "limit_price": 101.0,
+                            },
+                        ),
+                    )
+                )
+        pipe.execute()
+    return commands
+
+
+@pytest.mark.parametrize("batch_size", [1, 16, 256])
+def test_perf_process_commands_batch_size(benchmark, batch_size):
+    """
+    Benchmark commands per second through `process_commands` when the
+    engine loop hands it batches of 1, 16 and 256 commands.
+    """
+    timings = []
+
+    def setup():
+        engine = SpotEngine(["BTC-USD"])
+        return (engine, _crossing_commands(BATCH_COMMANDS)), {}
+
+    def target_func(engine, commands):
+        start = time.perf_counter()
+        for i in range(0, len(commands), batch_size):
+            engine.process_commands(commands[i : i + batch_size])
+        timings.append(time.perf_counter() - start)
+
+    benchmark.pedantic(target=target_func, setup=setup, rounds=5)
+    benchmark.extra_info["commands_per_sec"] = BATCH_COMMANDS / min(timings)
+    print(
+        f"\n[INFO] batch_size={batch_size}: "
+        f"{BATCH_COMMANDS / min(timings):,.0f} commands/sec"
+    )
+
+
+@pytest.mark.parametrize("store", ["redis", "ledger"])
+def test_perf_process_commands_balance_store(benchmark, store):
+    """
+    Benchmark commands per second through `process_commands` with balances
+    read and written in Redis, or in an in-process ledger written behind.
+    """
+    timings = []
+
+    def setup():
+        engine = SpotEngine(["BTC-USD"])
+        commands = _crossing_commands(BATCH_COMMANDS)
+        BalanceManager.ledger = None
+        if store == "ledger":
+            # Loaded after funding, as the engine does at start up.
+            BalanceManager.ledger = BalanceLedger()
+            BalanceManager.ledger.load(
+                [
+                    CASH_BALANCE_HKEY,
+                    CASH_ESCROW_HKEY,
+                    get_instrument_balance_hkey("BTC-USD"),
+                    get_instrument_escrows_hkey("BTC-USD"),
+                ]
+            )
+        return (engine, commands), {}
+
+    def target_func(engine, commands):
+        start = time.perf_counter()
+        for i in range(0, len(commands), 256):
+            engine.process_commands(commands[i : i + 256])
+        timings.append(time.perf_counter() - start)
+
+    try:
+        benchmark.pedantic(target=target_func, setup=setup, rounds=5)
+    finally:
+        if BalanceManager.ledger is not None:
+            BalanceManager.ledger.flush()
+        BalanceManager.ledger = None
+
+    benchmark.extra_info["commands_per_sec"] = BATCH_COMMANDS / min(timings)
+    print(f"\n[INFO] {store}: {BATCH_COMMANDS / min(timings):,.0f} commands/sec")
+
+
+SWEEP_MAKERS = 20
+
+
+class CountingQueue:
+    """Stands in for the event queue, counting puts."""
+
+    def __init__(self):
+        self.puts = 0
+
+    def put_nowait(self, item) -> None:
+        self.puts += 1
+
+
+def _order_command(user_id: str, side: Side, quantity: float, price: float):
+    return Command(
+        command_type=CommandType.NEW_ORDER,
+        data=NewSingleOrder(
+            strategy_type=StrategyType.SINGLE,
+            instrument_id="BTC-USD",
+            order={
+                "order_id": str(uuid.uuid4()),
+                "user_id": user_id,
+                "order_type": OrderType.LIMIT,
+                "side": side,
+                "quantity": quantity,
+                "limit_price": price,
+            },
+        ),
+    )
+
+
+def _sweep_commands() -> tuple[list[Command], Command]:
+    """Builds SWEEP_MAKERS resting asks and a bid that fills all of them."""
+    taker = f"taker_{uuid.uuid4()}"
+    makers = [f"maker_{uuid.uuid4()}" for _ in range(SWEEP_MAKERS)]
+    quantity = RESTING_ORDER_QTY * SWEEP_MAKERS
+
+    with REDIS_CLIENT.pipeline() as pipe:
+        pipe.hset(CASH_BALANCE_HKEY, taker, quantity * 200.0)
+        for maker in makers:
+            pipe.hset(get_instrument_balance_hkey("BTC-USD"), maker, RESTING_ORDER_QTY)
+        pipe.execute()
+
+    resting = [
+        _order_command(maker, Side.ASK, RESTING_ORDER_QTY, 100.0 + i)
+        for i, maker in enumerate(makers)
+    ]
+    return resting, _order_command(taker, Side.BID, quantity, 200.0)
+
+
+@pytest.mark.parametrize("mode", ["per_event", "per_command"])
+def test_perf_event_queue_puts_per_trade(benchmark, mode):
+    """
+    Benchmark a bid sweeping 20 makers and record event queue puts per
+    trade. `per_event` calls the order handler directly, as the engine did
+    before events were buffered per command.
+    """
+    counters = []
+
+    def setup():
+        engine = SpotEngine(["BTC-USD"])
+        makers, sweep = _sweep_commands()
+        engine.process_commands(makers)
+        counter = CountingQueue()
+        EventLogger.queue = counter
+        counters.append(counter)
+        return (engine, sweep), {}
+
+    def target_func(engine, sweep):
+        if mode == "per_event":
+            engine._command_handlers[sweep.command_type](sweep.data)
+        else:
+            engine.process_command(sweep)
+
+    try:
+        benchmark.pedantic(target=target_func, setup=setup, rounds=10)
+    finally:
+        EventLogger.queue = None
+
+    puts_per_trade = counters[-1].puts / SWEEP_MAKERS
+    benchmark.extra_info["queue_puts_per_trade"] = puts_per_trade
+    print(f"\n[INFO] {mode}: {puts_per_trade:.2f} event queue puts per trade")
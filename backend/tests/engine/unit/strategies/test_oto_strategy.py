@@ -96,6 +96,41 @@ def test_handle_new_parent_fully_matching(oto_strategy, mock_execution_context):
     )  # Only child gets added
 
 
+def test_handle_new_parent_filled_through_engine(oto_strategy, mock_execution_context):
+    """
+    Test that a child already placed by handle_filled, as happens when the
+    engine fills the parent on entry, isn't placed a second time.
+    """
+    parent_data = {
+        "order_id": "p1",
+        "user_id": "u1",
+        "order_type": OrderType.LIMIT,
+        "side": Side.BID,
+        "quantity": 10,
+        "limit_price": 101.0,
+    }
+    child_data = {**parent_data, "order_id": "c1", "side": Side.ASK, "limit_price": 105.0}
+    details = NewOTOOrder(
+        strategy_type=StrategyType.OTO,
+        instrument_id="S",
+        parent=parent_data,
+        child=child_data,
+    )
+
+    def match(parent, ctx):
+        parent.executed_quantity = parent.quantity
+        oto_strategy.handle_filled(10, 100.5, parent, ctx)
+        return MatchResult(MatchOutcome.SUCCESS, 10, 100.5)
+
+    mock_execution_context.engine.match.side_effect = match
+    with patch("src.engine.strategies.oto_strategy.limit_crossable", return_value=True):
+        oto_strategy.handle_new(details, mock_execution_context)
+
+    mock_execution_context.orderbook.append.assert_called_once()
+    assert mock_execution_context.orderbook.append.call_args[0][0].id == "c1"
+    assert mock_execution_context.order_store.add.call_args[0][0].id == "c1"
+
+
 def test_handle_filled_parent(oto_strategy, mock_execution_context):
     """Test that a filled parent triggers its child."""
     child = OTOOrder(
@@ -106,11 +106,54 @@ def test_handle_new_parent_fully_matching(otoco_strategy, mock_execution_context
         otoco_strategy.handle_new(details, mock_execution_context)
 
     mock_execution_context.engine.match.assert_called_once()
-    assert mock_execution_context.orderbook.append.call_count == 2
+    # The stop leg waits in the stop book.
+    mock_execution_context.orderbook.append.assert_called_once()
+    mock_execution_context.stop_book.append.assert_called_once()
     mock_execution_context.order_store.remove.assert_called_once()
     assert mock_execution_context.order_store.remove.call_args[0][0].id == "p1"
 
 
+def test_handle_new_parent_filled_through_engine(
+    otoco_strategy, mock_execution_context
+):
+    """
+    Test that legs already placed by handle_filled, as happens when the
+    engine fills the parent on entry, aren't placed a second time.
+    """
+    parent_data = {
+        "order_id": "p1",
+        "user_id": "u1",
+        "order_type": OrderType.LIMIT,
+        "side": Side.BID,
+        "quantity": 10,
+        "limit_price": 101.0,
+    }
+    legs = [
+        {**parent_data, "order_id": "a1", "side": Side.ASK, "limit_price": 105.0},
+        {**parent_data, "order_id": "b1", "side": Side.ASK, "limit_price": 110.0},
+    ]
+    details = NewOTOCOOrder(
+        strategy_type=StrategyType.OTOCO,
+        instrument_id="S",
+        parent=parent_data,
+        oco_legs=legs,
+    )
+
+    def match(parent, ctx):
+        parent.executed_quantity = parent.quantity
+        otoco_strategy.handle_filled(10, 100.5, parent, ctx)
+        return MatchResult(MatchOutcome.SUCCESS, 10, 100.5)
+
+    mock_execution_context.engine.match.side_effect = match
+    with patch(
+        "src.engine.strategies.otoco_strategy.limit_crossable", return_value=True
+    ):
+        otoco_strategy.handle_new(details, mock_execution_context)
+
+    placed = [c[0][0].id for c in mock_execution_context.orderbook.append.call_args_list]
+    assert placed == ["a1", "b1"]
+
+
 def test_handle_filled_parent(otoco_strategy, mock_execution_context):
     """
     Test that a filled parent triggers its OCO children.
@@ -150,7 +193,9 @@ def test_handle_filled_parent(otoco_strategy, mock_execution_context):
 
     otoco_strategy.handle_filled(10, 100.0, parent, mock_execution_context)
 
-    assert mock_execution_context.orderbook.append.call_count == 2
+    # The stop leg waits in the stop book.
+    mock_execution_context.orderbook.append.assert_called_once()
+    mock_execution_context.stop_book.append.assert_called_once()
     mock_execution_context.order_store.remove.assert_called_once_with(parent)
     assert child_a.triggered is True
     assert child_b.triggered is True
@@ -0,0 +1,132 @@
+from unittest.mock import patch
+
+import pytest
+
+from src.config import CASH_BALANCE_HKEY, CASH_ESCROW_HKEY, REDIS_CLIENT
+from src.engine import balance_ledger
+from src.engine.balance_ledger import BalanceLedger
+from src.engine.balance_manager import BalanceManager
+from src.utils.utils import get_instrument_balance_hkey
+
+
+USER_ID = "ledger_user"
+INSTRUMENT_ID = "LEDGER-USD"
+ASSET_HKEY = get_instrument_balance_hkey(INSTRUMENT_ID)
+
+
+@pytest.fixture(autouse=True)
+def clean_redis():
+    keys = [CASH_BALANCE_HKEY, CASH_ESCROW_HKEY, ASSET_HKEY]
+    REDIS_CLIENT.delete(*keys)
+    yield
+    REDIS_CLIENT.delete(*keys)
+
+
+@pytest.fixture
+def ledger():
+    ledger = BalanceLedger()
+    BalanceManager.ledger = ledger
+    yield ledger
+    BalanceManager.ledger = None
+
+
+def redis_value(hkey: str, user_id: str = USER_ID) -> float | None:
+    value = REDIS_CLIENT.hget(hkey, user_id)
+    return float(value) if value is not None else None
+
+
+def test_load_and_lazy_read(ledger):
+    """Test that loaded entries and first time reads both come from Redis."""
+    REDIS_CLIENT.hset(CASH_BALANCE_HKEY, USER_ID, 100)
+    ledger.load([CASH_BALANCE_HKEY])
+    REDIS_CLIENT.hset(ASSET_HKEY, USER_ID, 7)
+
+    with patch.object(balance_ledger.REDIS_CLIENT, "hget") as hget:
+        assert ledger.get(CASH_BALANCE_HKEY, USER_ID) == 100.0
+        hget.assert_not_called()
+
+    assert ledger.get(ASSET_HKEY, USER_ID) == 7.0
+    assert ledger.get(ASSET_HKEY, "missing") == 0.0
+
+
+def test_writes_are_deferred_and_coalesced(ledger):
+    """Test that writes stay in memory and reach Redis as one delta per key."""
+    BalanceManager.increase_cash_balance(USER_ID, 100)
+    BalanceManager.settle_bid(USER_ID, INSTRUMENT_ID, 2, 10)
+    BalanceManager.settle_bid(USER_ID, INSTRUMENT_ID, 3, 10)
+
+    assert BalanceManager.get_available_cash_balance(USER_ID) == 100.0
+    assert ledger.get(CASH_BALANCE_HKEY, USER_ID) == 50.0
+    assert redis_value(CASH_BALANCE_HKEY) is None
+    assert ledger.pending == 3
+
+    ledger.flush()
+    assert ledger.pending == 0
+    assert redis_value(CASH_BALANCE_HKEY) == 50.0
+    assert redis_value(CASH_ESCROW_HKEY) == -50.0
+    assert redis_value(ASSET_HKEY) == 5.0
+
+
+def test_flush_keeps_external_writes(ledger):
+    """Test that deltas add to changes other processes make in Redis."""
+    REDIS_CLIENT.hset(CASH_ESCROW_HKEY, USER_ID, 10)
+    ledger.incr(CASH_ESCROW_HKEY, USER_ID, -4)
+    REDIS_CLIENT.hincrbyfloat(CASH_ESCROW_HKEY, USER_ID, 20)
+
+    ledger.flush()
+    assert redis_value(CASH_ESCROW_HKEY) == 26.0
+
+
+def test_failed_flush_is_retried(ledger):
+    """Test that deltas survive a failed flush and are sent by the next one."""
+    ledger.incr(CASH_BALANCE_HKEY, USER_ID, 5)
+
+    with patch.object(
+        balance_ledger.REDIS_CLIENT, "pipeline", side_effect=ConnectionError
+    ):
+        with pytest.raises(ConnectionError):
+            ledger.flush()
+    ledger.incr(CASH_BALANCE_HKEY, USER_ID, 1)
+
+    ledger.flush()
+    assert redis_value(CASH_BALANCE_HKEY) == 6.0
+
+
+def test_background_thread_writes_behind(ledger):
+    """Test that the flush thread sends deltas and stop drains the rest."""
+    ledger.flush_interval = 0.01
+    ledger.start()
+    try:
+        ledger.incr(CASH_BALANCE_HKEY, USER_ID, 3)
+    finally:
+        ledger.stop()
+
+    assert redis_value(CASH_BALANCE_HKEY) == 3.0
+
+
+def test_shared_cash_cannot_be_spent_twice():
+    """
+    Test that shards sharing cash read and escrow it in Redis, so the
+    second of two reservations of the same balance is refused.
+    """
+    shared = (CASH_BALANCE_HKEY, CASH_ESCROW_HKEY)
+    first, second = BalanceLedger(shared=shared), BalanceLedger(shared=shared)
+    REDIS_CLIENT.hset(CASH_BALANCE_HKEY, USER_ID, 100)
+    assert first.get(CASH_BALANCE_HKEY, USER_ID) == 100.0
+
+    assert first.reserve(CASH_BALANCE_HKEY, CASH_ESCROW_HKEY, USER_ID, 80)
+    assert not second.reserve(CASH_BALANCE_HKEY, CASH_ESCROW_HKEY, USER_ID, 80)
+    assert second.reserve(CASH_BALANCE_HKEY, CASH_ESCROW_HKEY, USER_ID, 20)
+
+    first.incr(CASH_ESCROW_HKEY, USER_ID, -80)
+    assert first.pending == 0
+    assert redis_value(CASH_ESCROW_HKEY) == 20.0
+
+
+def test_unshared_reserve_stays_in_memory(ledger):
+    REDIS_CLIENT.hset(CASH_BALANCE_HKEY, USER_ID, 100)
+
+    assert ledger.reserve(CASH_BALANCE_HKEY, CASH_ESCROW_HKEY, USER_ID, 60)
+    assert not ledger.reserve(CASH_BALANCE_HKEY, CASH_ESCROW_HKEY, USER_ID, 60)
+    assert redis_value(CASH_ESCROW_HKEY) is None
+    assert ledger.get(CASH_ESCROW_HKEY, USER_ID) == 60.0
@@ -148,3 +148,42 @@ def test_settle_ask_operation():
         float(REDIS_CLIENT.hget(get_instrument_escrows_hkey(INSTRUMENT_ID), USER_ID))
         == 0.0
     )
+
+
+def test_batched_settlement_is_deferred_until_flush():
+    """
+    Tests that settlements inside a batch are queued on one pipeline and
+    only reach Redis on flush.
+    """
+    BalanceManager.increase_cash_balance(USER_ID, 1000.0)
+    BalanceManager.increase_cash_escrow(USER_ID, 500.0)
+
+    BalanceManager.begin_batch()
+    try:
+        BalanceManager.settle_bid(USER_ID, INSTRUMENT_ID, 5, 100.0)
+        assert float(REDIS_CLIENT.hget(CASH_BALANCE_HKEY, USER_ID)) == 1000.0
+    finally:
+        BalanceManager.end_batch()
+
+    assert float(REDIS_CLIENT.hget(CASH_BALANCE_HKEY, USER_ID)) == 500.0
+    assert float(REDIS_CLIENT.hget(CASH_ESCROW_HKEY, USER_ID)) == 0.0
+    assert (
+        float(REDIS_CLIENT.hget(get_instrument_balance_hkey(INSTRUMENT_ID), USER_ID))
+        == 5
+    )
+
+
+def test_batched_settlement_is_visible_to_reads():
+    """
+    Tests that reading a balance with queued settlements flushes them first.
+    """
+    BalanceManager.increase_asset_balance(USER_ID, INSTRUMENT_ID, 10)
+    BalanceManager.increase_asset_escrow(USER_ID, INSTRUMENT_ID, 10)
+
+    BalanceManager.begin_batch()
+    try:
+        BalanceManager.settle_ask(USER_ID, INSTRUMENT_ID, 4, 100.0)
+        assert BalanceManager.get_available_cash_balance(USER_ID) == 400.0
+        assert BalanceManager.get_available_asset_balance(USER_ID, INSTRUMENT_ID) == 0
+    finally:
+        BalanceManager.end_batch()
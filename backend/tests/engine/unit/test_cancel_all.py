@@ -0,0 +1,120 @@
+import uuid
+
+import pytest
+
+from src.engine import (
+    CancelAllCommand,
+    Command,
+    CommandType,
+    NewOCOOrder,
+    NewSingleOrder,
+    SpotEngine,
+)
+from src.engine.balance_manager import BalanceManager
+from src.engine.codec import decode_events
+from src.enums import EventType, OrderType, Side, StrategyType
+
+
+@pytest.fixture
+def engine():
+    return SpotEngine(["BTC-USD", "ETH-USD"])
+
+
+@pytest.fixture
+def users():
+    """A market maker and another user, funded on both instruments."""
+    users = f"mm-{uuid.uuid4()}", f"other-{uuid.uuid4()}"
+    for user_id in users:
+        BalanceManager.increase_cash_balance(user_id, 100_000)
+        for instrument_id in ("BTC-USD", "ETH-USD"):
+            BalanceManager.increase_asset_balance(user_id, instrument_id, 1_000)
+    return users
+
+
+def limit(user_id: str, side: Side, price: float) -> dict:
+    return {
+        "order_id": str(uuid.uuid4()),
+        "user_id": user_id,
+        "order_type": OrderType.LIMIT,
+        "side": side,
+        "quantity": 10,
+        "limit_price": price,
+    }
+
+
+def place(engine, instrument_id: str, *orders: dict) -> None:
+    for order in orders:
+        engine.process_command(
+            Command(
+                command_type=CommandType.NEW_ORDER,
+                data=NewSingleOrder(
+                    strategy_type=StrategyType.SINGLE,
+                    instrument_id=instrument_id,
+                    order=order,
+                ),
+            )
+        )
+
+
+def cancel_all(engine, user_id: str, **kw) -> None:
+    engine.process_command(
+        Command(
+            command_type=CommandType.CANCEL_ALL,
+            data=CancelAllCommand(user_id=user_id, **kw),
+        )
+    )
+
+
+def test_cancel_all_by_side_in_one_batch(engine, event_queue, drain_events, users):
+    """Test that a user's bids, including OCO legs, go in a single event batch."""
+    mm, someone_else = users
+    ctx = engine.contexts["BTC-USD"]
+    bids = [limit(mm, Side.BID, 90.0 + i) for i in range(3)]
+    ask = limit(mm, Side.ASK, 110.0)
+    other = limit(someone_else, Side.BID, 95.0)
+    oco_legs = [limit(mm, Side.BID, 80.0), limit(mm, Side.BID, 81.0)]
+    place(engine, "BTC-USD", *bids, ask, other)
+    engine.process_command(
+        Command(
+            command_type=CommandType.NEW_ORDER,
+            data=NewOCOOrder(
+                strategy_type=StrategyType.OCO, instrument_id="BTC-USD", legs=oco_legs
+            ),
+        )
+    )
+    drain_events()
+
+    cancel_all(engine, mm, side=Side.BID)
+
+    events = decode_events(event_queue.get_nowait())
+    assert event_queue.empty()
+    cancelled = [o["order_id"] for o in (*bids, *oco_legs)]
+    assert all(e.event_type == EventType.ORDER_CANCELLED for e in events)
+    assert sorted(e.related_id for e in events) == sorted(cancelled)
+    assert all(e.details["reason"] == "Client requested cancel." for e in events)
+
+    assert all(ctx.order_store.get(order_id) is None for order_id in cancelled)
+    assert ctx.order_store.get(ask["order_id"]) is not None
+    assert ctx.order_store.get(other["order_id"]) is not None
+    assert ctx.orderbook.best_bid == 95.0
+
+
+def test_cancel_all_by_instrument(engine, event_queue, users):
+    """Test that a symbol limits the cancellation to that instrument."""
+    mm, _ = users
+    btc, eth = limit(mm, Side.BID, 90.0), limit(mm, Side.BID, 90.0)
+    place(engine, "BTC-USD", btc)
+    place(engine, "ETH-USD", eth)
+
+    cancel_all(engine, mm, symbol="ETH-USD")
+    assert engine.contexts["ETH-USD"].order_store.get(eth["order_id"]) is None
+    assert engine.contexts["BTC-USD"].order_store.get(btc["order_id"]) is not None
+
+    cancel_all(engine, mm)
+    assert len(engine.contexts["BTC-USD"].order_store) == 0
+
+
+def test_cancel_all_without_orders_is_noop(engine, event_queue):
+    cancel_all(engine, "nobody")
+    cancel_all(engine, "nobody", symbol="UNKNOWN")
+    assert event_queue.empty()
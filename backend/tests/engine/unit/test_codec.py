@@ -0,0 +1,294 @@
+import uuid
+from datetime import datetime, timezone
+
+import pytest
+
+from src.engine import (
+    CancelAllCommand,
+    CancelOrderCommand,
+    Command,
+    CommandType,
+    ExpireOrders,
+    ModifyOrderCommand,
+    NewInstrument,
+    NewOCOOrder,
+    NewOTOCOOrder,
+    NewOTOOrder,
+    NewSingleOrder,
+)
+from src.engine.codec import (
+    decode_command,
+    decode_event,
+    encode_command,
+    encode_event,
+    peek_instrument_id,
+)
+from src.engine.models import MODIFY_SENTINEL
+from src.enums import (
+    EventType,
+    LiquidityRole,
+    OrderType,
+    Side,
+    StrategyType,
+    TimeInForce,
+)
+
+
+def make_order(**kw) -> dict:
+    order = {
+        "order_id": str(uuid.uuid4()),
+        "user_id": str(uuid.uuid4()),
+        "order_type": OrderType.LIMIT,
+        "side": Side.BID,
+        "time_in_force": None,
+        "quantity": 10.0,
+        "limit_price": 101.5,
+        "stop_price": None,
+        "price": None,
+        "expires_at": None,
+    }
+    order.update(kw)
+    return order
+
+
+@pytest.mark.parametrize(
+    "data",
+    [
+        NewSingleOrder(
+            strategy_type=StrategyType.SINGLE,
+            instrument_id="BTC-USD",
+            order=make_order(user_id="layer", order_id="not-a-uuid"),
+        ),
+        NewSingleOrder(
+            strategy_type=StrategyType.SINGLE,
+            instrument_id="BTC-USD",
+            order=make_order(
+                order_type=OrderType.MARKET, limit_price=None, price=99.0
+            ),
+        ),
+        NewSingleOrder(
+            strategy_type=StrategyType.SINGLE,
+            instrument_id="BTC-USD",
+            order=make_order(time_in_force=TimeInForce.FOK),
+        ),
+        NewSingleOrder(
+            strategy_type=StrategyType.SINGLE,
+            instrument_id="BTC-USD",
+            order=make_order(time_in_force=TimeInForce.GTD, expires_at=1_750_000_000.5),
+        ),
+        NewOCOOrder(
+            strategy_type=StrategyType.OCO,
+            instrument_id="ETH-USD",
+            legs=[
+                make_order(side=Side.ASK),
+                make_order(
+                    side=Side.ASK,
+                    order_type=OrderType.STOP,
+                    limit_price=None,
+                    stop_price=90.0,
+                ),
+            ],
+        ),
+        NewOTOOrder(
+            strategy_type=StrategyType.OTO,
+            instrument_id="BTC-USD",
+            parent=make_order(),
+            child=make_order(side=Side.ASK, limit_price=120.0),
+        ),
+        NewOTOCOOrder(
+            strategy_type=StrategyType.OTOCO,
+            instrument_id="BTC-USD",
+            parent=make_order(),
+            oco_legs=[make_order(side=Side.ASK), make_order(side=Side.ASK)],
+        ),
+    ],
+    ids=["single", "market", "fok", "gtd", "oco", "oto", "otoco"],
+)
+def test_new_order_round_trip(data):
+    """Test that every order command decodes to an equal command."""
+    command = Command(command_type=CommandType.NEW_ORDER, data=data)
+    decoded = decode_command(encode_command(command))
+
+    assert decoded.command_type == CommandType.NEW_ORDER
+    assert type(decoded.data) is type(data)
+    assert decoded.data.model_dump() == data.model_dump()
+
+
+def test_new_order_keeps_engine_fields_only():
+    """Test that order payload fields the engine does not use are dropped."""
+    order = make_order(status="pending", instrument_id="BTC-USD")
+    command = Command(
+        command_type=CommandType.NEW_ORDER,
+        data=NewSingleOrder(
+            strategy_type=StrategyType.SINGLE, instrument_id="BTC-USD", order=order
+        ),
+    )
+    decoded = decode_command(encode_command(command)).data.order
+    assert "status" not in decoded
+    assert decoded["order_id"] == order["order_id"]
+
+
+def test_new_order_time_in_force_from_db_value():
+    """Test that a time in force serialised from the DB decodes to the enum."""
+    order = make_order(time_in_force=TimeInForce.IOC.value)
+    command = Command(
+        command_type=CommandType.NEW_ORDER,
+        data=NewSingleOrder(
+            strategy_type=StrategyType.SINGLE, instrument_id="BTC-USD", order=order
+        ),
+    )
+    decoded = decode_command(encode_command(command)).data.order
+    assert decoded["time_in_force"] == TimeInForce.IOC
+
+
+def test_new_order_expiry_from_db_value():
+    """Test that an expiry serialised from the DB decodes to a timestamp."""
+    expires_at = datetime(2026, 1, 2, 16, 30, tzinfo=timezone.utc)
+    order = make_order(
+        time_in_force=TimeInForce.GTD.value, expires_at=expires_at.isoformat()
+    )
+    command = Command(
+        command_type=CommandType.NEW_ORDER,
+        data=NewSingleOrder(
+            strategy_type=StrategyType.SINGLE, instrument_id="BTC-USD", order=order
+        ),
+    )
+    decoded = decode_command(encode_command(command)).data.order
+    assert decoded["expires_at"] == expires_at.timestamp()
+
+
+@pytest.mark.parametrize(
+    "command_type, data",
+    [
+        (
+            CommandType.CANCEL_ORDER,
+            CancelOrderCommand(order_id=str(uuid.uuid4()), symbol="BTC-USD"),
+        ),
+        (
+            CommandType.MODIFY_ORDER,
+            ModifyOrderCommand(
+                order_id=str(uuid.uuid4()), symbol="BTC-USD", limit_price=99.5
+            ),
+        ),
+        (
+            CommandType.MODIFY_ORDER,
+            ModifyOrderCommand(
+                order_id=str(uuid.uuid4()), symbol="BTC-USD", stop_price=80.0
+            ),
+        ),
+        (CommandType.NEW_INSTRUMENT, NewInstrument(instrument_id="SOL-USD")),
+        (CommandType.EXPIRE_ORDERS, ExpireOrders(now=1_750_000_000.25)),
+        (CommandType.CANCEL_ALL, CancelAllCommand(user_id=str(uuid.uuid4()))),
+        (
+            CommandType.CANCEL_ALL,
+            CancelAllCommand(user_id="mm", symbol="BTC-USD", side=Side.ASK),
+        ),
+        (
+            CommandType.NEW_INSTRUMENT,
+            NewInstrument(
+                instrument_id="SOL-USD", tick_size=0.01, min_price=1.0, max_price=500.0
+            ),
+        ),
+    ],
+)
+def test_other_commands_round_trip(command_type, data):
+    """Test the commands other than new orders, including sentinels."""
+    command = Command(command_type=command_type, data=data)
+    decoded = decode_command(encode_command(command))
+    assert decoded.command_type == command_type
+    assert decoded.data.model_dump() == data.model_dump()
+
+
+def test_modify_sentinel_survives():
+    """Test that an untouched modify price still reads as the sentinel."""
+    data = ModifyOrderCommand(order_id="abc", symbol="BTC-USD", limit_price=1.0)
+    decoded = decode_command(
+        encode_command(Command(command_type=CommandType.MODIFY_ORDER, data=data))
+    )
+    assert decoded.data.stop_price == MODIFY_SENTINEL
+
+
+@pytest.mark.parametrize(
+    "event_type, details",
+    [
+        (
+            EventType.ORDER_PLACED,
+            {
+                "executed_quantity": 0.0,
+                "quantity": 10.0,
+                "price": 101.5,
+                "side": Side.BID,
+            },
+        ),
+        (
+            EventType.NEW_TRADE,
+            {"quantity": 5.0, "price": 100.0, "role": LiquidityRole.MAKER.value},
+        ),
+        (
+            EventType.EXECUTION,
+            {
+                "executed_quantity": 4.0,
+                "quantity": 4.0,
+                "price": 100.0,
+                "side": Side.ASK,
+                "order_quantity": 10.0,
+                "maker_user_id": str(uuid.uuid4()),
+                "maker_order_id": "layer-order",
+                "maker_executed_quantity": 4.0,
+                "maker_order_quantity": 4.0,
+            },
+        ),
+        (EventType.ORDER_CANCELLED, {"reason": "Client requested cancel."}),
+        (EventType.ORDER_CANCELLED, None),
+        (EventType.ORDER_MODIFIED, {}),
+    ],
+)
+def test_event_round_trip(event_type, details):
+    """Test that events decode with identical details, including None and {}."""
+    user_id, related_id = str(uuid.uuid4()), str(uuid.uuid4())
+    raw = encode_event(event_type, user_id, related_id, "BTC-USD", details)
+    event = decode_event(raw)
+
+    assert event.event_type == event_type
+    assert (event.user_id, event.related_id, event.instrument_id) == (
+        user_id,
+        related_id,
+        "BTC-USD",
+    )
+    assert event.details == details
+    assert peek_instrument_id(raw) == "BTC-USD"
+
+
+def test_extended_details_leave_existing_events_unchanged():
+    """Test that only events with later detail fields carry the extension mask."""
+    details = {"executed_quantity": 0.0, "quantity": 1.0, "price": 1.0}
+    raw = encode_event(EventType.ORDER_PLACED, "u", "r", "BTC-USD", details)
+    assert raw[1] == 0x80 | 0b111
+
+    details["filled_quantity"] = 1.0
+    raw = encode_event(EventType.FILL_SUMMARY, "u", "r", "BTC-USD", details)
+    assert raw[1] == 0x80 | 0x40 | 0b111
+    assert decode_event(raw).details == details
+
+
+def test_unknown_event_detail_is_rejected():
+    """Test that details without a registered layout are not silently dropped."""
+    with pytest.raises(ValueError):
+        encode_event(EventType.ORDER_PLACED, "u", "r", "BTC-USD", {"foo": 1})
+
+
+@pytest.mark.parametrize(
+    "value",
+    [
+        "12345678-1234-1234-1234-123456789012",
+        "0123ABCD-0000-0000-0000-000000000000",
+        "0123abcd-0000-0000-0000-00000000000g",
+        "0123abcd 0000-0000-0000-000000000000",
+    ],
+)
+def test_id_round_trip(value):
+    """Test that ids come back verbatim whether or not they pack as UUIDs."""
+    raw = encode_event(EventType.ORDER_PLACED, value, value, "BTC-USD")
+    event = decode_event(raw)
+    assert event.user_id == value
+    assert event.related_id == value
@@ -0,0 +1,222 @@
+import uuid
+from unittest.mock import patch
+
+import pytest
+
+from src.config import CASH_ESCROW_HKEY, REDIS_CLIENT
+from src.engine import (
+    CancelOrderCommand,
+    Command,
+    CommandType,
+    ModifyOrderCommand,
+    NewOTOOrder,
+    SpotEngine,
+)
+from src.engine.balance_manager import BalanceManager
+from src.enums import EventType, OrderType, Side, StrategyType
+from src.utils.utils import get_instrument_escrows_hkey
+
+
+INSTRUMENT = "ESC-USD"
+
+
+@pytest.fixture
+def instrument_id():
+    return INSTRUMENT
+
+
+@pytest.fixture
+def engine():
+    return SpotEngine([INSTRUMENT])
+
+
+def order(user_id, side, quantity, price) -> dict:
+    return {
+        "order_id": str(uuid.uuid4()),
+        "user_id": user_id,
+        "order_type": OrderType.LIMIT,
+        "side": side,
+        "quantity": quantity,
+        "limit_price": price,
+    }
+
+
+def cash_escrow(user_id: str) -> float:
+    return float(REDIS_CLIENT.hget(CASH_ESCROW_HKEY, user_id) or 0)
+
+
+def asset_escrow(user_id: str) -> float:
+    hkey = get_instrument_escrows_hkey(INSTRUMENT)
+    return float(REDIS_CLIENT.hget(hkey, user_id) or 0)
+
+
+def test_resting_orders_escrow_until_cancelled(engine, users, place_order):
+    seller, buyer = users
+    bid_id = place_order(engine, buyer, Side.BID, 10, 95.0)
+    ask_id = place_order(engine, seller, Side.ASK, 4, 105.0)
+
+    assert cash_escrow(buyer) == 950.0
+    assert asset_escrow(seller) == 4
+    assert BalanceManager.get_available_cash_balance(buyer) == 9_050.0
+
+    for order_id in (bid_id, ask_id):
+        engine.process_command(
+            Command(
+                command_type=CommandType.CANCEL_ORDER,
+                data=CancelOrderCommand(order_id=order_id, symbol=INSTRUMENT),
+            )
+        )
+
+    assert cash_escrow(buyer) == 0
+    assert asset_escrow(seller) == 0
+
+
+def test_unfunded_order_is_not_rested(engine, users, place_order, drain_events):
+    _, buyer = users
+    order_id = place_order(engine, buyer, Side.BID, 200, 95.0)
+
+    ctx = engine.contexts[INSTRUMENT]
+    assert ctx.orderbook.best_bid is None
+    assert ctx.order_store.get(order_id) is None
+    assert cash_escrow(buyer) == 0
+
+    (event,) = drain_events()
+    assert event.event_type == EventType.ORDER_CANCELLED
+    assert event.details["reason"] == "Insufficient funds"
+
+
+def test_sweep_reads_no_maker_balances(engine, users, place_order):
+    """
+    Test that a taker sweeping many makers has its balance checked once
+    and that fills draw the makers' escrow down by what they sold.
+    """
+    seller, buyer = users
+    BalanceManager.increase_cash_balance(buyer, 10_000)
+    for i in range(50):
+        place_order(engine, seller, Side.ASK, 2, 100.0 + i)
+    assert asset_escrow(seller) == 100
+
+    with patch.object(
+        BalanceManager,
+        "get_available_asset_balance",
+        wraps=BalanceManager.get_available_asset_balance,
+    ) as asset_reads, patch.object(
+        BalanceManager,
+        "get_available_cash_balance",
+        wraps=BalanceManager.get_available_cash_balance,
+    ) as cash_reads:
+        place_order(engine, buyer, Side.BID, 99, 149.0)
+
+    asset_reads.assert_not_called()
+    cash_reads.assert_called_once_with(buyer)
+    assert engine.metrics.makers_touched == 50
+    assert asset_escrow(seller) == 1
+
+
+def test_partial_fill_rests_remainder_with_escrow(engine, users, place_order):
+    seller, buyer = users
+    place_order(engine, seller, Side.ASK, 4, 100.0)
+    order_id = place_order(engine, buyer, Side.BID, 10, 100.0)
+
+    assert asset_escrow(seller) == 0
+    assert engine.contexts[INSTRUMENT].orderbook.depth(Side.BID, 1) == [(100.0, 6, 1)]
+
+    escrow = cash_escrow(buyer)
+    engine.process_command(
+        Command(
+            command_type=CommandType.CANCEL_ORDER,
+            data=CancelOrderCommand(order_id=order_id, symbol=INSTRUMENT),
+        )
+    )
+    assert escrow - cash_escrow(buyer) == 600.0
+
+
+def test_taker_escrow_nets_out_at_trade_price(engine, users, place_order):
+    """
+    Test that a taker bid escrows at its own price and is left with no
+    escrow once filled below it.
+    """
+    seller, buyer = users
+    place_order(engine, seller, Side.ASK, 5, 98.0)
+    place_order(engine, buyer, Side.BID, 5, 100.0)
+
+    assert cash_escrow(buyer) == 0
+    assert BalanceManager.get_available_cash_balance(buyer) == 10_000 - 5 * 98.0
+
+
+def test_engine_escrows_market_orders(engine, users, place_order, drain_events):
+    seller, buyer = users
+    place_order(engine, seller, Side.ASK, 5, 101.0)
+    drain_events()
+
+    # Quoted at 100.0 by the HTTP API, which leaves the escrow to the engine.
+    place_order(engine, buyer, Side.BID, 5, 100.0, OrderType.MARKET)
+    assert cash_escrow(buyer) == 0
+    assert BalanceManager.get_available_cash_balance(buyer) == 10_000 - 5 * 101.0
+
+    order_id = place_order(engine, buyer, Side.BID, 1_000, 100.0, OrderType.MARKET)
+    events = drain_events()
+    assert events[-1].event_type == EventType.ORDER_CANCELLED
+    assert events[-1].related_id == order_id
+    assert events[-1].details["reason"] == "Insufficient funds"
+    assert cash_escrow(buyer) == 0
+
+
+def test_unpriced_order_is_rejected(engine, users, place_order, drain_events):
+    """Test that a market order sent without its reference price is cancelled."""
+    _, buyer = users
+    order_id = place_order(engine, buyer, Side.BID, 5, None, OrderType.MARKET)
+
+    (event,) = drain_events()
+    assert event.event_type == EventType.ORDER_CANCELLED
+    assert event.related_id == order_id
+    assert event.details["reason"] == "Order has no price."
+    assert cash_escrow(buyer) == 0
+
+
+def test_modify_moves_escrow(engine, users, place_order, drain_events):
+    _, buyer = users
+    order_id = place_order(engine, buyer, Side.BID, 10, 90.0)
+
+    def modify(price):
+        engine.process_command(
+            Command(
+                command_type=CommandType.MODIFY_ORDER,
+                data=ModifyOrderCommand(
+                    order_id=order_id, symbol=INSTRUMENT, limit_price=price
+                ),
+            )
+        )
+
+    modify(80.0)
+    assert cash_escrow(buyer) == 800.0
+
+    BalanceManager.decrease_cash_balance(buyer, 9_100)
+    drain_events()
+    modify(99.0)
+
+    (event,) = drain_events()
+    assert event.event_type == EventType.ORDER_MODIFY_REJECTED
+    assert cash_escrow(buyer) == 800.0
+    assert engine.contexts[INSTRUMENT].orderbook.best_bid == 80.0
+
+
+def test_oto_child_escrows_on_activation(engine, users, place_order):
+    seller, buyer = users
+    place_order(engine, seller, Side.ASK, 5, 100.0)
+
+    engine.process_command(
+        Command(
+            command_type=CommandType.NEW_ORDER,
+            data=NewOTOOrder(
+                strategy_type=StrategyType.OTO,
+                instrument_id=INSTRUMENT,
+                parent=order(buyer, Side.BID, 5, 100.0),
+                child=order(buyer, Side.ASK, 5, 110.0),
+            ),
+        )
+    )
+
+    # The child sells what the parent bought.
+    assert asset_escrow(buyer) == 5
+    assert engine.contexts[INSTRUMENT].orderbook.depth(Side.ASK, 1) == [(110.0, 5, 1)]
@@ -1,11 +1,15 @@
 import json
+import uuid
 from decimal import Decimal
+from unittest.mock import patch
 
 import pytest
-from sqlalchemy import select
+from sqlalchemy import select, update
 
 from src.db_models import Events, Orders, Trades, Transactions, Users, AssetBalances
 from src.engine.models import Event
+from src.event_handler import EventHandler
+from src.event_router import partition_for
 from src.enums import (
     EventType,
     OrderType,
@@ -14,6 +18,7 @@ from src.enums import (
     TransactionType,
     LiquidityRole,
 )
+from tests.config import smaker
 
 
 @pytest.mark.parametrize(
@@ -321,3 +326,277 @@ def test_new_trade_seller_event(
     ).scalar_one()
     assert tx.type == TransactionType.TRADE.value
     assert tx.amount == trade_value
+
+
+def test_execution_event_settles_both_sides(
+    user_factory_db, order_factory_db, event_handler, db_session, test_instrument
+):
+    """Test that one EXECUTION event books the trade for the taker and the maker."""
+    buyer = user_factory_db(cash_balance=10000.0)
+    buyer.escrow_balance = 1000.0
+    seller = user_factory_db(cash_balance=5000.0)
+    db_session.add_all(
+        [
+            buyer,
+            AssetBalances(
+                user_id=seller.user_id,
+                instrument_id="BTC-USD",
+                balance=100.0,
+                escrow_balance=10.0,
+            ),
+        ]
+    )
+    taker = order_factory_db(buyer, side=Side.BID.value, quantity=10, limit_price=100)
+    maker = order_factory_db(seller, side=Side.ASK.value, quantity=4, limit_price=98)
+    db_session.commit()
+
+    event = Event(
+        event_type=EventType.EXECUTION.value,
+        user_id=str(buyer.user_id),
+        related_id=str(taker.order_id),
+        instrument_id="BTC-USD",
+        details={
+            "executed_quantity": 4,
+            "quantity": 4,
+            "price": 98.0,
+            "side": Side.BID,
+            "order_quantity": 10,
+            "maker_user_id": str(seller.user_id),
+            "maker_order_id": str(maker.order_id),
+            "maker_executed_quantity": 4,
+            "maker_order_quantity": 4,
+        },
+    )
+    event_handler.process_event(event, db_session)
+
+    for obj in (buyer, seller, taker, maker):
+        db_session.refresh(obj)
+
+    trades = db_session.execute(
+        select(Trades).where(Trades.order_id.in_([taker.order_id, maker.order_id]))
+    ).scalars()
+    assert {t.liquidity for t in trades} == {
+        LiquidityRole.TAKER.value,
+        LiquidityRole.MAKER.value,
+    }
+
+    assert taker.status == OrderStatus.PARTIALLY_FILLED.value
+    assert maker.status == OrderStatus.FILLED.value
+    assert taker.executed_quantity == maker.executed_quantity == 4
+
+    assert buyer.cash_balance == 10000.0 - 4 * 100
+    assert seller.cash_balance == 5000.0 + 4 * 98.0
+
+    events = db_session.execute(
+        select(Events).where(Events.related_id == taker.order_id)
+    ).scalars()
+    assert [e.event_type for e in events] == [EventType.EXECUTION.value]
+
+
+def _fills(
+    user_factory_db, order_factory_db, db_session, count: int
+) -> tuple[Users, list[Event]]:
+    """A funded seller and `count` EXECUTION events against its resting ask."""
+    buyer = user_factory_db(cash_balance=10000.0)
+    buyer.escrow_balance = 100.0 * count
+    seller = user_factory_db(cash_balance=1.0)
+    db_session.add_all(
+        [
+            buyer,
+            AssetBalances(
+                user_id=seller.user_id,
+                instrument_id="BTC-USD",
+                balance=count,
+                escrow_balance=count,
+            ),
+        ]
+    )
+    maker = order_factory_db(seller, side=Side.ASK.value, quantity=count)
+    db_session.commit()
+
+    events = []
+    for i in range(1, count + 1):
+        taker = order_factory_db(buyer, quantity=1, limit_price=100)
+        events.append(
+            Event(
+                event_type=EventType.EXECUTION.value,
+                user_id=str(buyer.user_id),
+                related_id=str(taker.order_id),
+                instrument_id="BTC-USD",
+                details={
+                    "executed_quantity": 1,
+                    "quantity": 1,
+                    "price": 100.0,
+                    "side": Side.BID,
+                    "order_quantity": 1,
+                    "maker_user_id": str(seller.user_id),
+                    "maker_order_id": str(maker.order_id),
+                    "maker_executed_quantity": i,
+                    "maker_order_quantity": count,
+                },
+            )
+        )
+    return seller, events
+
+
+def test_process_batch_commits_once(
+    user_factory_db, order_factory_db, event_handler, db_session, test_instrument
+):
+    """Test that a batch is applied in a single transaction."""
+    seller, events = _fills(user_factory_db, order_factory_db, db_session, 5)
+
+    with patch.object(db_session, "commit", wraps=db_session.commit) as commit:
+        event_handler.process_batch(events, db_session)
+
+    commit.assert_called_once()
+    db_session.refresh(seller)
+    assert seller.cash_balance == 1.0 + 5 * 100.0
+
+    trades = db_session.execute(
+        select(Trades).where(Trades.user_id == seller.user_id)
+    ).scalars()
+    assert len(list(trades)) == 5
+
+
+def test_process_batch_falls_back_per_event(
+    user_factory_db, order_factory_db, event_handler, db_session, test_instrument
+):
+    """Test that a failing batch still applies every event that can be."""
+    seller, events = _fills(user_factory_db, order_factory_db, db_session, 3)
+    bad = events[1].model_copy(update={"related_id": str(uuid.uuid4())})
+    events.insert(1, bad)
+
+    with patch.object(db_session, "commit", wraps=db_session.commit) as commit:
+        event_handler.process_batch(events, db_session)
+
+    assert commit.call_count == 3
+    db_session.refresh(seller)
+    assert seller.cash_balance == 1.0 + 3 * 100.0
+
+
+def test_cache_serves_later_transactions(
+    user_factory_db, order_factory_db, event_handler, db_session, test_instrument
+):
+    """Test that rows loaded by one batch are served from memory to the next."""
+    seller, events = _fills(user_factory_db, order_factory_db, db_session, 4)
+
+    for batch in (events[:2], events[2:]):
+        with smaker() as sess:
+            event_handler.process_batch(batch, sess)
+
+    # The maker comes from the cache, the buyer's new orders are loaded.
+    # Balances are never cached, as the API writes them too.
+    assert event_handler.cache.hits["Orders"] == 1
+    assert event_handler.cache.misses["Orders"] == 5
+    assert list(event_handler.cache.stats()) == ["Orders"]
+
+    db_session.refresh(seller)
+    assert seller.cash_balance == 1.0 + 4 * 100.0
+
+
+def test_cache_reloads_balances_for_new_orders(
+    user_factory_db, order_factory_db, event_handler, db_session, test_instrument
+):
+    """Test that escrow the API adds for a new order isn't overwritten."""
+    _, events = _fills(user_factory_db, order_factory_db, db_session, 2)
+    buyer_id = uuid.UUID(events[0].user_id)
+
+    with smaker() as sess:
+        event_handler.process_batch(events[:1], sess)
+
+    db_session.execute(
+        update(Users)
+        .where(Users.user_id == buyer_id)
+        .values(escrow_balance=Users.escrow_balance + 250.0)
+    )
+    db_session.commit()
+
+    with smaker() as sess:
+        event_handler.process_batch(events[1:], sess)
+
+    escrow = db_session.scalar(
+        select(Users.escrow_balance).where(Users.user_id == buyer_id)
+    )
+    assert escrow == 2 * 100.0 + 250.0 - 2 * 100.0
+
+
+def test_balances_escrowed_by_the_api_are_kept(
+    user_factory_db, order_factory_db, event_handler, db_session, test_instrument
+):
+    """
+    Test that escrow the API adds for a user whose order is already cached
+    isn't overwritten by the next event for that order.
+    """
+    seller, events = _fills(user_factory_db, order_factory_db, db_session, 2)
+    asset_escrow = (
+        select(AssetBalances.escrow_balance)
+        .where(
+            AssetBalances.user_id == seller.user_id,
+            AssetBalances.instrument_id == "BTC-USD",
+        )
+        .execution_options(populate_existing=True)
+    )
+
+    with smaker() as sess:
+        event_handler.process_batch(events[:1], sess)
+
+    # The seller places another ask of 3.
+    db_session.execute(
+        update(AssetBalances)
+        .where(AssetBalances.user_id == seller.user_id)
+        .values(escrow_balance=AssetBalances.escrow_balance + 3)
+    )
+    db_session.commit()
+
+    with smaker() as sess:
+        event_handler.process_batch(events[1:], sess)
+
+    assert db_session.scalar(asset_escrow) == 2 - 2 + 3
+
+
+def test_cache_discards_rows_on_rollback(
+    user_factory_db, order_factory_db, event_handler, db_session, test_instrument
+):
+    """Test that rows touched by a failed transaction aren't cached."""
+    _, events = _fills(user_factory_db, order_factory_db, db_session, 1)
+    details = {**events[0].details, "maker_order_id": str(uuid.uuid4())}
+    event = events[0].model_copy(update={"details": details})
+
+    with smaker() as sess:
+        event_handler.process_event(event, sess)
+
+    assert (Orders, event.related_id) not in event_handler.cache
+    assert (Users, event.user_id) not in event_handler.cache
+
+
+def test_partitions_each_book_their_own_side(
+    user_factory_db, order_factory_db, db_session, test_instrument
+):
+    """Test that an execution split between partitions settles both users once."""
+    while True:
+        seller, events = _fills(user_factory_db, order_factory_db, db_session, 1)
+        event = events[0]
+        if partition_for(event.user_id, 2) != partition_for(str(seller.user_id), 2):
+            break
+
+    for partition in (1, 0):
+        with smaker() as sess:
+            EventHandler(partition=partition, partitions=2).process_batch([event], sess)
+
+    db_session.refresh(seller)
+    assert seller.cash_balance == 1.0 + 100.0
+    buyer = db_session.get(Users, uuid.UUID(event.user_id), populate_existing=True)
+    assert buyer.escrow_balance == 0.0
+
+    trades = db_session.scalars(
+        select(Trades.user_id).where(
+            Trades.order_id.in_(
+                [event.related_id, event.details["maker_order_id"]]
+            )
+        )
+    )
+    assert sorted(map(str, trades)) == sorted([event.user_id, str(seller.user_id)])
+    recorded = db_session.scalars(
+        select(Events).where(Events.related_id == event.related_id)
+    )
+    assert len(list(recorded)) == 1
@@ -0,0 +1,123 @@
+import uuid
+
+from src.engine import Command, CommandType, NewSingleOrder, SpotEngine
+from src.engine.balance_manager import BalanceManager
+from src.engine.codec import decode_events, encode_event, encode_event_batch
+from src.engine.event_logger import EventLogger
+from src.enums import EventType, OrderType, Side, StrategyType
+
+
+def log(order_id: str, instrument_id: str = "BTC-USD") -> None:
+    EventLogger.log_event(
+        EventType.ORDER_PLACED,
+        user_id="u1",
+        related_id=order_id,
+        instrument_id=instrument_id,
+    )
+
+
+def order_command(user_id: str, side: Side, quantity: float, price: float):
+    return Command(
+        command_type=CommandType.NEW_ORDER,
+        data=NewSingleOrder(
+            strategy_type=StrategyType.SINGLE,
+            instrument_id="BATCH-USD",
+            order={
+                "order_id": str(uuid.uuid4()),
+                "user_id": user_id,
+                "order_type": OrderType.LIMIT,
+                "side": side,
+                "quantity": quantity,
+                "limit_price": price,
+            },
+        ),
+    )
+
+
+def test_unbuffered_puts_each_event(event_queue):
+    """Test that events outside a batch go straight to the queue."""
+    log("a")
+    log("b")
+    assert event_queue.qsize() == 2
+
+
+def test_emitted_counts_every_event(event_queue):
+    """Test that buffered and unbuffered events are counted alike."""
+    emitted = EventLogger.emitted
+    log("a")
+    EventLogger.begin_batch()
+    log("b")
+    EventLogger.end_batch()
+    assert EventLogger.emitted - emitted == 2
+
+    EventLogger.queue = None
+    log("c")
+    assert EventLogger.emitted - emitted == 2
+
+
+def test_buffered_events_flush_as_one_message(event_queue):
+    """Test that a batch is sent as a single message in emission order."""
+    EventLogger.begin_batch()
+    log("a")
+    log("b", "ETH-USD")
+    log("c")
+    assert event_queue.empty()
+    EventLogger.end_batch()
+
+    assert event_queue.qsize() == 1
+    events = decode_events(event_queue.get_nowait())
+    assert [e.related_id for e in events] == ["a", "b", "c"]
+    assert [e.instrument_id for e in events] == ["BTC-USD", "ETH-USD", "BTC-USD"]
+
+
+def test_empty_batch_sends_nothing(event_queue):
+    """Test that ending a batch without events puts nothing on the queue."""
+    EventLogger.begin_batch()
+    EventLogger.end_batch()
+    assert event_queue.empty()
+
+
+def test_decode_events_accepts_single_event():
+    """Test that a lone event decodes to a one element list."""
+    raw = encode_event(EventType.ORDER_PLACED, "u1", "a", "BTC-USD")
+    assert [e.related_id for e in decode_events(raw)] == ["a"]
+    assert decode_events(encode_event_batch([raw, raw]))[1].related_id == "a"
+
+
+def test_sweep_emits_one_message_per_command(event_queue):
+    """Test that a taker sweeping several makers produces a single put."""
+    engine = SpotEngine(["BATCH-USD"])
+    taker = f"taker-{uuid.uuid4()}"
+    BalanceManager.increase_cash_balance(taker, 100_000)
+
+    makers = [f"maker-{uuid.uuid4()}" for _ in range(5)]
+    for i, maker in enumerate(makers):
+        BalanceManager.increase_asset_balance(maker, "BATCH-USD", 10)
+        engine.process_command(order_command(maker, Side.ASK, 10, 100.0 + i))
+
+    for _ in range(len(makers)):
+        event_queue.get_nowait()
+
+    engine.process_command(order_command(taker, Side.BID, 50, 110.0))
+
+    assert event_queue.qsize() == 1
+    events = decode_events(event_queue.get_nowait())
+    assert [e.event_type for e in events] == [EventType.EXECUTION] * len(makers) + [
+        EventType.FILL_SUMMARY
+    ]
+    assert [e.details["maker_user_id"] for e in events[:-1]] == makers
+
+    summary = events[-1].details
+    assert summary["executed_quantity"] == summary["filled_quantity"] == 50
+    assert summary["price"] == 102.0
+
+
+def test_process_commands_emits_one_message(event_queue):
+    """Test that a batch of commands shares a single event message."""
+    engine = SpotEngine(["BATCH-USD"])
+    engine.process_commands(
+        [order_command("u1", Side.BID, 1, 90.0 + i) for i in range(3)]
+    )
+
+    assert event_queue.qsize() == 1
+    assert len(decode_events(event_queue.get_nowait())) == 3
@@ -0,0 +1,163 @@
+import uuid
+
+import pytest
+
+from src.engine import (
+    Command,
+    CommandType,
+    ModifyOrderCommand,
+    NewInstrument,
+    NewSingleOrder,
+    SpotEngine,
+)
+from src.engine.balance_manager import BalanceManager
+from src.engine.codec import decode_event
+from src.engine.execution_context import ExecutionContext
+from src.enums import EventType, OrderType, Side, StrategyType
+from src.utils.utils import snap_to_tick
+
+
+def make_ctx(tick_size=None):
+    return ExecutionContext(
+        engine=None,
+        orderbook=None,
+        order_store=None,
+        instrument_id="BTC-USD",
+        tick_size=tick_size,
+    )
+
+
+@pytest.mark.parametrize(
+    "tick_size, price, ticks",
+    [
+        (0.1, 0.1 + 0.2, 3),
+        (0.1, 0.3, 3),
+        (0.01, 101.37, 10137),
+        (0.25, 100.5, 402),
+        (1.0, 7.0, 7),
+    ],
+)
+def test_to_ticks(tick_size, price, ticks):
+    """Test that prices are normalised to integer ticks."""
+    ctx = make_ctx(tick_size)
+    result = ctx.to_ticks(price)
+    assert result == ticks
+    assert isinstance(result, int)
+
+
+@pytest.mark.parametrize(
+    "tick_size, ticks, price",
+    [(0.1, 3, 0.3), (0.01, 10137, 101.37), (0.25, 402, 100.5), (1.0, 7, 7.0)],
+)
+def test_to_price(tick_size, ticks, price):
+    """Test that ticks are converted back without floating point noise."""
+    assert make_ctx(tick_size).to_price(ticks) == price
+
+
+@pytest.mark.parametrize(
+    "tick_size, price, on_tick",
+    [
+        (0.1, 0.1 + 0.2, True),
+        (0.01, 101.37, True),
+        (0.25, 100.5, True),
+        (1.0, 100.6, False),
+        (0.25, 100.1, False),
+        (None, 100.6, True),
+    ],
+)
+def test_on_tick(tick_size, price, on_tick):
+    assert make_ctx(tick_size).on_tick(price) is on_tick
+
+
+@pytest.mark.parametrize(
+    "tick_size, price, snapped",
+    [(0.01, 101.374, 101.37), (0.25, 100.2, 100.25), (1.0, 100.6, 101.0)],
+)
+def test_snapped_price_is_on_tick(tick_size, price, snapped):
+    """Test that a reference price snapped by the API passes the engine's check."""
+    assert snap_to_tick(price, tick_size) == snapped
+    assert make_ctx(tick_size).on_tick(snap_to_tick(price, tick_size))
+
+
+def test_float_mode_is_passthrough():
+    """Test that a context without a tick size leaves prices untouched."""
+    ctx = make_ctx()
+    assert ctx.to_ticks(0.1 + 0.2) == 0.1 + 0.2
+    assert ctx.to_price(101.5) == 101.5
+    assert ctx.to_ticks(None) is None
+
+
+def test_invalid_tick_size():
+    """Test that a non-positive tick size is rejected."""
+    with pytest.raises(ValueError):
+        make_ctx(0)
+
+
+def test_tick_mode_prices_share_level(event_queue):
+    """
+    Test that prices which differ only by floating point error rest on the
+    same integer keyed level, and that events carry the external price.
+    """
+    engine = SpotEngine(
+        instruments=[NewInstrument(instrument_id="BTC-USD", tick_size=0.1)]
+    )
+    user_id = f"u-{uuid.uuid4()}"
+    BalanceManager.increase_cash_balance(user_id, 100)
+    for price in (0.1 + 0.2, 0.3):
+        engine.process_command(
+            Command(
+                command_type=CommandType.NEW_ORDER,
+                data=NewSingleOrder(
+                    strategy_type=StrategyType.SINGLE,
+                    instrument_id="BTC-USD",
+                    order={
+                        "order_id": str(uuid.uuid4()),
+                        "user_id": user_id,
+                        "order_type": OrderType.LIMIT,
+                        "side": Side.BID,
+                        "quantity": 10,
+                        "limit_price": price,
+                    },
+                ),
+            )
+        )
+
+    ob = engine._ctxs["BTC-USD"].orderbook
+    assert list(ob.bid_levels) == [3]
+    assert ob.best_bid == 3
+    assert len(list(ob.get_orders(3, Side.BID))) == 2
+
+    events = [decode_event(event_queue.get_nowait()) for _ in range(event_queue.qsize())]
+    assert [e.event_type for e in events] == [EventType.ORDER_PLACED] * 2
+    assert all(e.details["price"] == 0.3 for e in events)
+
+
+def test_off_tick_prices_are_rejected(event_queue, users, place_order):
+    """
+    Test that an order or modify priced between ticks is turned away
+    rather than rounded onto the nearest tick.
+    """
+    engine = SpotEngine(
+        instruments=[NewInstrument(instrument_id="BTC-USD", tick_size=1.0)]
+    )
+    _, buyer = users
+
+    place_order(engine, buyer, Side.BID, 10, 100.6)
+    order_id = place_order(engine, buyer, Side.BID, 10, 100.0)
+    engine.process_command(
+        Command(
+            command_type=CommandType.MODIFY_ORDER,
+            data=ModifyOrderCommand(
+                order_id=order_id, symbol="BTC-USD", limit_price=99.5
+            ),
+        )
+    )
+
+    assert engine.contexts["BTC-USD"].orderbook.depth(Side.BID, 5) == [(100, 10, 1)]
+    events = [decode_event(event_queue.get_nowait()) for _ in range(event_queue.qsize())]
+    assert [e.event_type for e in events] == [
+        EventType.ORDER_CANCELLED,
+        EventType.ORDER_PLACED,
+        EventType.ORDER_MODIFY_REJECTED,
+    ]
+    assert events[0].details["reason"] == events[2].details["reason"]
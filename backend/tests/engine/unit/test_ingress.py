@@ -0,0 +1,74 @@
+import queue
+
+import pytest
+
+from src.engine import CommandType
+from src.engine.ingress import CommandIngress, IngressOverloaded
+from src.engine.router import ShardRouter, shard_for
+
+
+def fill(ingress: CommandIngress, n: int) -> None:
+    for _ in range(n):
+        ingress.put_nowait(b"x")
+
+
+def test_depth_counts_commands_not_yet_taken():
+    ingress = CommandIngress(queue.Queue(), soft_limit=5, hard_limit=10)
+    fill(ingress, 3)
+    assert ingress.depth == 3
+
+    ingress.get_nowait()
+    ingress.get(timeout=0.1)
+    assert ingress.depth == 1
+
+    ingress.get_nowait()
+    with pytest.raises(queue.Empty):
+        ingress.get_nowait()
+    assert ingress.depth == 0
+
+
+def test_new_orders_refused_past_soft_limit():
+    ingress = CommandIngress(queue.Queue(), soft_limit=2, hard_limit=4, retry_after=3)
+    fill(ingress, 1)
+    ingress.admit(CommandType.NEW_ORDER)
+
+    fill(ingress, 1)
+    with pytest.raises(IngressOverloaded) as exc:
+        ingress.admit(CommandType.NEW_ORDER)
+    assert exc.value.status_code == 429
+    assert exc.value.retry_after == 3
+    ingress.admit(CommandType.MODIFY_ORDER)
+
+
+def test_only_cancels_admitted_past_hard_limit():
+    ingress = CommandIngress(queue.Queue(), soft_limit=2, hard_limit=4)
+    fill(ingress, 4)
+
+    for command_type in (CommandType.NEW_ORDER, CommandType.MODIFY_ORDER):
+        with pytest.raises(IngressOverloaded) as exc:
+            ingress.admit(command_type)
+        assert exc.value.status_code == 503
+    ingress.admit(CommandType.CANCEL_ORDER)
+    ingress.admit(CommandType.CANCEL_ALL)
+
+
+def test_invalid_watermarks():
+    with pytest.raises(ValueError):
+        CommandIngress(queue.Queue(), soft_limit=10, hard_limit=5)
+    with pytest.raises(ValueError):
+        CommandIngress(queue.Queue(), soft_limit=0, hard_limit=5)
+
+
+def test_router_admits_on_owning_shard():
+    """Test that only the busy shard turns orders away."""
+    ingresses = [CommandIngress(queue.Queue(), 1, 1) for _ in range(2)]
+    router = ShardRouter(ingresses)
+    busy = next(f"INST-{i}" for i in range(32) if shard_for(f"INST-{i}", 2) == 0)
+    idle = next(f"INST-{i}" for i in range(32) if shard_for(f"INST-{i}", 2) == 1)
+    fill(ingresses[0], 1)
+
+    router.admit(CommandType.NEW_ORDER, idle)
+    with pytest.raises(IngressOverloaded):
+        router.admit(CommandType.NEW_ORDER, busy)
+    with pytest.raises(IngressOverloaded):
+        router.admit(CommandType.NEW_ORDER)
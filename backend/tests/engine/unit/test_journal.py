@@ -0,0 +1,80 @@
+import pytest
+
+from src.engine.journal import CommandJournal
+
+
+@pytest.fixture
+def path(tmp_path):
+    return str(tmp_path / "commands.journal")
+
+
+def test_append_and_replay(path):
+    """Test that records replay in order with increasing sequence numbers."""
+    journal = CommandJournal(path, initial_size=64)
+    seqs = [journal.append(f"cmd-{i}".encode()) for i in range(20)]
+
+    assert seqs == list(range(1, 21))
+    assert [bytes(data) for _, data in journal.replay(15)] == [
+        f"cmd-{i}".encode() for i in range(15, 20)
+    ]
+    journal.close()
+
+
+def test_reopen_continues(path):
+    """Test that a reopened journal finds its records and carries on."""
+    journal = CommandJournal(path, initial_size=64)
+    for i in range(5):
+        journal.append(b"x" * i + b"!")
+    journal.close()
+
+    journal = CommandJournal(path, initial_size=64)
+    assert journal.seq == 5
+    assert journal.append(b"next") == 6
+    assert [seq for seq, _ in journal.replay()] == [1, 2, 3, 4, 5, 6]
+    journal.close()
+
+
+def test_torn_record_is_ignored(path):
+    """Test that a record whose length was never committed isn't replayed."""
+    journal = CommandJournal(path, initial_size=256)
+    journal.append(b"complete")
+    # A crash after the payload was copied but before its length was written.
+    offset = journal._offset
+    journal._mm[offset + 12 : offset + 16] = b"torn"
+    journal.close()
+
+    journal = CommandJournal(path)
+    assert [bytes(d) for _, d in journal.replay()] == [b"complete"]
+    journal.close()
+
+
+def test_reset_keeps_sequence(path):
+    """Test that reset drops records but never reuses sequence numbers."""
+    journal = CommandJournal(path, initial_size=256)
+    for _ in range(10):
+        journal.append(b"old-record")
+    journal.reset()
+    journal.append(b"new")
+    journal.close()
+
+    journal = CommandJournal(path)
+    assert [(s, bytes(d)) for s, d in journal.replay()] == [(11, b"new")]
+    assert journal.seq == 11
+    journal.close()
+
+
+def test_published_marker(path):
+    """Test that the published marker survives a reopen and isn't replayed."""
+    journal = CommandJournal(path, initial_size=64)
+    journal.append(b"sent")
+    journal.mark_published()
+    journal.append(b"held-back")
+    journal.close()
+
+    journal = CommandJournal(path, initial_size=64)
+    assert (journal.seq, journal.published) == (2, 1)
+    assert [bytes(d) for _, d in journal.replay()] == [b"sent", b"held-back"]
+
+    journal.reset()
+    assert journal.published == 2
+    journal.close()
@@ -0,0 +1,229 @@
+import random
+import uuid
+
+import pytest
+
+from src.engine import Command, CommandType, NewInstrument, NewSingleOrder, SpotEngine
+from src.engine.orderbook import LadderOrderBook, OrderBook
+from src.engine.orderbook.ladder_orderbook import OccupancyBitmap
+from src.enums import EventType, OrderType, Side, StrategyType
+
+
+@pytest.fixture
+def book():
+    """Returns a LadderOrderBook over ticks [0, 10_000] priced at 100."""
+    return LadderOrderBook(0, 10_000, price=100)
+
+
+def test_ladder_initialization(book):
+    """Test the initial state of the ladder book."""
+    assert book.price == 100
+    assert book.best_bid is None
+    assert book.best_ask is None
+    assert not book.bids
+    assert not book.asks
+
+
+def test_invalid_band():
+    """Test that an inverted band is rejected."""
+    with pytest.raises(ValueError):
+        LadderOrderBook(10, 9)
+
+
+def test_append_outside_band(book, order_factory):
+    """Test that prices outside the band or non-integer prices are rejected."""
+    with pytest.raises(ValueError):
+        book.append(order_factory(side=Side.BID, price=10_001), 10_001)
+    with pytest.raises(ValueError):
+        book.append(order_factory(side=Side.BID, price=99.5), 99.5)
+
+
+def test_append_and_get_orders(book, order_factory):
+    """Test appending orders and retrieving them in time priority."""
+    o1 = order_factory(side=Side.ASK, price=101)
+    o2 = order_factory(side=Side.ASK, price=101)
+    book.append(o1, 101)
+    book.append(o2, 101)
+
+    assert book.best_ask == 101
+    assert 101 in book.asks
+    assert [o.id for o in book.get_orders(101, Side.ASK)] == [o1.id, o2.id]
+    assert list(book.get_orders(102, Side.ASK)) == []
+
+
+def test_remove_updates_best_price_across_words(book, order_factory):
+    """Test that the best price skips empty words and summary blocks."""
+    far_bid = order_factory(side=Side.BID, price=3)
+    best_bid = order_factory(side=Side.BID, price=9_000)
+    book.append(far_bid, 3)
+    book.append(best_bid, 9_000)
+    assert book.best_bid == 9_000
+
+    book.remove(best_bid, 9_000)
+    assert book.best_bid == 3
+    book.remove(far_bid, 3)
+    assert book.best_bid is None
+
+    far_ask = order_factory(side=Side.ASK, price=9_999)
+    best_ask = order_factory(side=Side.ASK, price=64)
+    book.append(far_ask, 9_999)
+    book.append(best_ask, 64)
+
+    book.remove(best_ask, 64)
+    assert book.best_ask == 9_999
+
+
+def test_remove_from_empty_level(book, order_factory):
+    """Test that removing from an empty or out of band level does nothing."""
+    order = order_factory()
+    book.remove(order, 100)
+    book.remove(order, 50_000)
+
+    # Nor does removing an order that isn't on an occupied level.
+    resting = order_factory(side=Side.BID, price=100)
+    book.append(resting, 100)
+    book.remove(order_factory(side=Side.BID, price=100), 100)
+    assert book.best_bid == 100
+
+
+def test_levels_are_sorted(book, order_factory):
+    """Test that the level views list occupied prices in ascending order."""
+    for price in (500, 7, 4_096, 63, 64):
+        book.append(order_factory(side=Side.BID, price=price), price)
+
+    assert book.bid_levels == [7, 63, 64, 500, 4_096]
+    assert list(book.bids) == [7, 63, 64, 500, 4_096]
+
+
+def test_bitmap_matches_reference():
+    """Test bitmap scans against a brute force reference."""
+    rng = random.Random(7)
+    size = 20_000
+    bits = OccupancyBitmap(size)
+    occupied = set()
+
+    for _ in range(5_000):
+        idx = rng.randrange(size)
+        if idx in occupied:
+            bits.clear(idx)
+            occupied.discard(idx)
+        else:
+            bits.set(idx)
+            occupied.add(idx)
+
+        probe = rng.randrange(-5, size + 5)
+        above = [i for i in occupied if i >= probe]
+        below = [i for i in occupied if i <= probe]
+        assert bits.next_set(probe) == (min(above) if above else None)
+        assert bits.prev_set(probe) == (max(below) if below else None)
+
+
+def test_matches_sorted_book(order_factory):
+    """Test that random churn leaves both books with the same best prices."""
+    rng = random.Random(11)
+    ladder = LadderOrderBook(0, 5_000)
+    sorted_book = OrderBook(price=100)
+    resting = []
+
+    for _ in range(3_000):
+        if resting and rng.random() < 0.45:
+            order, price = resting.pop(rng.randrange(len(resting)))
+            ladder.remove(order, price)
+            sorted_book.remove(order, price)
+        else:
+            side = rng.choice((Side.BID, Side.ASK))
+            price = rng.randrange(5_001)
+            order = order_factory(side=side, price=price)
+            ladder.append(order, price)
+            sorted_book.append(order, price)
+            resting.append((order, price))
+
+        assert ladder.best_bid == sorted_book.best_bid
+        assert ladder.best_ask == sorted_book.best_ask
+
+    assert ladder.bid_levels == list(sorted_book.bid_levels)
+    assert ladder.ask_levels == list(sorted_book.ask_levels)
+    for side in (Side.BID, Side.ASK):
+        assert ladder.depth(side, 50) == sorted_book.depth(side, 50)
+
+
+@pytest.mark.parametrize("kind", ["sorted", "ladder"])
+def test_available_quantity(kind, order_factory):
+    """Test liquidity summed best price first, bounded by limit and quantity."""
+    book = LadderOrderBook(0, 1_000) if kind == "ladder" else OrderBook(price=100)
+    for side, price, qty in (
+        (Side.ASK, 101, 10),
+        (Side.ASK, 101, 5),
+        (Side.ASK, 103, 20),
+        (Side.ASK, 110, 50),
+        (Side.BID, 99, 7),
+        (Side.BID, 95, 30),
+    ):
+        book.append(order_factory(side=side, quantity=qty, price=price), price)
+
+    assert book.available_quantity(Side.ASK, 100, 10) == 0
+    assert book.available_quantity(Side.ASK, 101, 100) == 15
+    assert book.available_quantity(Side.ASK, 105, 100) == 35
+    assert book.available_quantity(Side.ASK, None, 1_000) == 85
+    # Stops at the first level that satisfies the quantity.
+    assert book.available_quantity(Side.ASK, None, 12) == 15
+    assert book.available_quantity(Side.BID, 99, 100) == 7
+    assert book.available_quantity(Side.BID, 90, 100) == 37
+    assert book.available_quantity(Side.BID, 100, 100) == 0
+
+
+def test_engine_selects_ladder_for_banded_instrument():
+    """Test that only instruments with a tick size and band get a ladder."""
+    engine = SpotEngine(
+        instruments=[
+            NewInstrument(
+                instrument_id="BANDED", tick_size=0.01, min_price=50.0, max_price=150.0
+            ),
+            NewInstrument(instrument_id="TICKED", tick_size=0.01),
+            NewInstrument(instrument_id="FLOAT"),
+        ]
+    )
+
+    ob = engine._ctxs["BANDED"].orderbook
+    assert isinstance(ob, LadderOrderBook)
+    assert (ob.min_price, ob.max_price, ob.price) == (5_000, 15_000, 10_000)
+    assert isinstance(engine._ctxs["TICKED"].orderbook, OrderBook)
+    assert isinstance(engine._ctxs["FLOAT"].orderbook, OrderBook)
+
+
+def test_engine_rejects_order_outside_band(drain_events):
+    """Test that an order priced outside the band is cancelled off the book."""
+    engine = SpotEngine(
+        instruments=[
+            NewInstrument(
+                instrument_id="BANDED", tick_size=0.01, min_price=50.0, max_price=150.0
+            )
+        ]
+    )
+    order_id = str(uuid.uuid4())
+    engine.process_command(
+        Command(
+            command_type=CommandType.NEW_ORDER,
+            data=NewSingleOrder(
+                strategy_type=StrategyType.SINGLE,
+                instrument_id="BANDED",
+                order={
+                    "order_id": order_id,
+                    "user_id": "u1",
+                    "order_type": OrderType.LIMIT,
+                    "side": Side.BID,
+                    "quantity": 10,
+                    "limit_price": 10.0,
+                },
+            ),
+        )
+    )
+
+    ctx = engine._ctxs["BANDED"]
+    assert ctx.orderbook.best_bid is None
+    assert not ctx.order_store._orders
+
+    (event,) = drain_events()
+    assert event.event_type == EventType.ORDER_CANCELLED
+    assert event.related_id == order_id
+    assert event.details["reason"] == "Price is outside the instrument's price band."
@@ -0,0 +1,96 @@
+import random
+
+import pytest
+
+from src.engine import SpotEngine
+from src.engine.metrics import EngineMetrics, Histogram
+from src.enums import Side
+
+
+def test_histogram_buckets_cover_every_value():
+    """Test that every value lands in a bucket within 1/16th above it."""
+    rng = random.Random(1)
+    for value in [*range(2_000), *(rng.randrange(10**12) for _ in range(2_000))]:
+        idx = Histogram.bucket_index(value)
+        upper = Histogram.bucket_upper_bound(idx)
+        assert value <= upper <= value + value / 16
+        if idx:
+            assert Histogram.bucket_upper_bound(idx - 1) < value
+
+
+def test_histogram_percentiles():
+    histogram = Histogram()
+    for value in range(1, 1_001):
+        histogram.record(value * 1_000)
+
+    assert histogram.count == 1_000
+    assert histogram.max == 1_000_000
+    for pct in (50, 90, 99):
+        expected = pct * 10_000
+        assert expected <= histogram.percentile(pct) <= expected * 1.0625
+    assert histogram.percentile(100) == 1_000_000
+    assert Histogram().percentile(99) == 0
+
+
+def test_histogram_clamps_huge_values():
+    histogram = Histogram()
+    histogram.record(1 << 50)
+    assert histogram.counts[-1] == 1
+    assert histogram.percentile(50) == 1 << 50
+
+
+def test_sampling_rate():
+    metrics = EngineMetrics(sample_every=4)
+    sampled = [metrics.sample() for _ in range(12)]
+    assert sampled == [False, False, False, True] * 3
+    assert metrics.commands == 12
+
+
+@pytest.fixture
+def instrument_id():
+    return "MET-USD"
+
+
+def test_engine_records_latencies_and_counters(users, place_order):
+    """Test that sampled commands time the hot path and counters are exact."""
+    metrics = EngineMetrics(sample_every=1)
+    engine = SpotEngine(["MET-USD"], metrics=metrics)
+    seller, buyer = users
+
+    for price in (101.0, 102.0, 103.0):
+        place_order(engine, seller, Side.ASK, 2, price)
+    place_order(engine, buyer, Side.BID, 5, 103.0)
+
+    snapshot = metrics.snapshot()
+    assert snapshot["counters"]["commands"] == 4
+    assert snapshot["counters"]["levels_crossed"] == 3
+    assert snapshot["counters"]["makers_touched"] == 3
+    latency = snapshot["latency_us"]
+    assert latency["command.NEW_ORDER.SINGLE"]["count"] == 4
+    assert latency["match"]["count"] == 1
+    assert latency["process_trade"]["count"] == 3
+    # Only the taker: makers escrowed their funds when they rested.
+    assert latency["reserve_escrow"]["count"] == 1
+
+    metrics.reset()
+    assert metrics.snapshot()["latency_us"] == {}
+    assert metrics.commands == 0
+
+
+def test_invalid_sample_rate():
+    with pytest.raises(ValueError):
+        EngineMetrics(sample_every=0)
+
+
+def test_snapshot_reports_queue_depth_and_lag():
+    metrics = EngineMetrics()
+    assert metrics.snapshot()["lag_secs"] == 0.0
+    # Nothing processed, so no rate to estimate from.
+    assert metrics.snapshot(queue_depth=10)["lag_secs"] is None
+
+    metrics.since -= 2.0
+    for _ in range(100):
+        metrics.sample()
+    snapshot = metrics.snapshot(queue_depth=500)
+    assert snapshot["queue_depth"] == 500
+    assert snapshot["lag_secs"] == pytest.approx(10.0, rel=0.01)
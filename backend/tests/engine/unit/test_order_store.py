@@ -36,3 +36,24 @@ def test_order_store_add_duplicate(order_factory):
     store.add(order2)  # Should not replace
     retrieved = store.get("order1")
     assert retrieved.quantity == 100
+
+
+def test_order_store_user_orders(order_factory):
+    """Test that the per-user index follows adds and removes."""
+    store = OrderStore()
+    first = order_factory(order_id="order1", user_id="user1")
+    second = order_factory(order_id="order2", user_id="user1")
+    other = order_factory(order_id="order3", user_id="user2")
+    for order in (first, second, other):
+        store.add(order)
+
+    assert store.get_user_orders("user1") == [first, second]
+    assert store.get_user_orders("user2") == [other]
+
+    store.remove(first)
+    store.remove(first)
+    assert store.get_user_orders("user1") == [second]
+
+    store.remove(other)
+    assert store.get_user_orders("user2") == []
+    assert store.get_user_orders("nobody") == []
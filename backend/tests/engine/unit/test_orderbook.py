@@ -1,6 +1,11 @@
+import uuid
+
 import pytest
+from src.engine import Command, CommandType, NewSingleOrder, SpotEngine
+from src.engine.balance_manager import BalanceManager
 from src.engine.orderbook import OrderBook
-from src.enums import Side
+from src.engine.orderbook.price_level_node import PriceLevelNodePool
+from src.enums import OrderType, Side, StrategyType
 
 
 @pytest.fixture
@@ -74,6 +79,17 @@ def test_remove_from_empty_level(book, order_factory):
     book.remove(order, 100.0)
 
 
+def test_remove_order_not_on_level(book, order_factory):
+    """Test that removing an order already taken off its level does nothing."""
+    resting = order_factory(side=Side.BID, price=99.0)
+    gone = order_factory(side=Side.BID, price=99.0)
+    book.append(resting, 99.0)
+
+    book.remove(gone, 99.0)
+    assert book.bids[99.0].order_count == 1
+    assert book.best_bid == 99.0
+
+
 def test_get_orders_from_level(book, order_factory):
     """Test retrieving all orders from a specific price level."""
     order1 = order_factory(price=101.0, side=Side.ASK)
@@ -91,3 +107,108 @@ def test_get_orders_from_empty_level(book):
     """Test retrieving orders from an empty or non-existent level."""
     orders = list(book.get_orders(105.0, Side.ASK))
     assert len(orders) == 0
+
+
+def test_remove_during_iteration(book, order_factory):
+    """
+    Test that removing and re-adding orders while iterating a level neither
+    skips the remaining orders nor follows a recycled node.
+    """
+    PriceLevelNodePool.clear()
+    orders = [order_factory(price=101.0, side=Side.ASK) for _ in range(3)]
+    for order in orders:
+        book.append(order, 101.0)
+
+    seen = []
+    for order in book.get_orders(101.0, Side.ASK):
+        seen.append(order.id)
+        book.remove(order, 101.0)
+        book.append(order_factory(price=102.0, side=Side.ASK), 102.0)
+
+    assert seen == [o.id for o in orders]
+    assert 101.0 not in book.asks
+    assert len(PriceLevelNodePool._free) == 3
+
+
+def test_nodes_are_reused(book, order_factory):
+    """Test that a removed order's node is handed to the next append."""
+    PriceLevelNodePool.clear()
+    first = order_factory(price=99.0)
+    book.append(first, 99.0)
+    node = book.bids[99.0].head
+    book.remove(first, 99.0)
+
+    second = order_factory(price=98.0)
+    book.append(second, 98.0)
+    assert book.bids[98.0].head is node
+    assert node.order is second
+    assert node.prev is None and node.next is None
+
+
+def test_orders_have_no_instance_dict(order_factory):
+    """Test that orders are slotted."""
+    with pytest.raises(AttributeError):
+        order_factory().__dict__
+
+
+def test_level_aggregates(book, order_factory):
+    """Test that a level's quantity and count follow appends, fills and removes."""
+    o1 = order_factory(price=99.0, quantity=10)
+    o2 = order_factory(price=99.0, quantity=5)
+    book.append(o1, 99.0)
+    book.append(o2, 99.0)
+
+    level = book.bids[99.0]
+    assert (level.total_remaining_qty, level.order_count) == (15, 2)
+
+    o1.executed_quantity += 4
+    book.reduce(o1, 99.0, 4)
+    assert level.total_remaining_qty == 11
+
+    book.remove(o1, 99.0)
+    assert (level.total_remaining_qty, level.order_count) == (5, 1)
+
+
+def test_depth(book, order_factory):
+    """Test that depth returns the top N levels, best price first."""
+    for price, qty in ((97.0, 1), (99.0, 2), (98.0, 3), (99.0, 4)):
+        book.append(order_factory(side=Side.BID, price=price, quantity=qty), price)
+    for price in (101.0, 103.0):
+        book.append(order_factory(side=Side.ASK, price=price, quantity=7), price)
+
+    assert book.depth(Side.BID, 2) == [(99.0, 6, 2), (98.0, 3, 1)]
+    assert book.depth(Side.ASK, 5) == [(101.0, 7, 1), (103.0, 7, 1)]
+    assert book.depth(Side.ASK, 0) == []
+
+
+def test_engine_fill_reduces_level_quantity():
+    """Test that a partial fill against a maker is reflected in its level."""
+    engine = SpotEngine(["AGG-USD"])
+    maker, taker = f"maker-{uuid.uuid4()}", f"taker-{uuid.uuid4()}"
+    BalanceManager.increase_asset_balance(maker, "AGG-USD", 30)
+    BalanceManager.increase_cash_balance(taker, 10_000)
+
+    for user_id, side, qty, price in (
+        (maker, Side.ASK, 30, 101.0),
+        (taker, Side.BID, 10, 102.0),
+    ):
+        engine.process_command(
+            Command(
+                command_type=CommandType.NEW_ORDER,
+                data=NewSingleOrder(
+                    strategy_type=StrategyType.SINGLE,
+                    instrument_id="AGG-USD",
+                    order={
+                        "order_id": str(uuid.uuid4()),
+                        "user_id": user_id,
+                        "order_type": OrderType.LIMIT,
+                        "side": side,
+                        "quantity": qty,
+                        "limit_price": price,
+                    },
+                ),
+            )
+        )
+
+    ob = engine._ctxs["AGG-USD"].orderbook
+    assert ob.depth(Side.ASK, 1) == [(101.0, 20, 1)]
@@ -0,0 +1,61 @@
+import queue
+
+import pytest
+
+from src.engine import CancelAllCommand, Command, CommandType, NewInstrument
+from src.engine.codec import encode_command, peek_instrument_id
+from src.engine.router import ShardRouter, shard_for
+
+
+def new_instrument(instrument_id: str) -> bytes:
+    return encode_command(
+        Command(
+            command_type=CommandType.NEW_INSTRUMENT,
+            data=NewInstrument(instrument_id=instrument_id),
+        )
+    )
+
+
+def test_shard_for_is_stable():
+    """Test that shard assignment doesn't depend on the process' hash seed."""
+    assert shard_for("BTC-USD", 4) == shard_for("BTC-USD", 4)
+    assert shard_for("BTC-USD", 1) == 0
+    assert {shard_for(f"INST-{i}", 4) for i in range(32)} == {0, 1, 2, 3}
+
+
+def test_router_puts_on_owning_shard():
+    """Test that every command for an instrument lands on the same queue."""
+    queues = [queue.Queue() for _ in range(4)]
+    router = ShardRouter(queues)
+    instruments = [f"INST-{i}" for i in range(32)]
+
+    for instrument_id in instruments * 2:
+        router.put_nowait(new_instrument(instrument_id))
+
+    total = 0
+    for shard, q in enumerate(queues):
+        routed = [peek_instrument_id(q.get_nowait()) for _ in range(q.qsize())]
+        assert all(shard_for(i, 4) == shard for i in routed)
+        total += len(routed)
+    assert total == 64
+
+
+def test_router_broadcasts_commands_without_instrument():
+    """Test that a CANCEL_ALL for every instrument reaches every shard."""
+    queues = [queue.Queue() for _ in range(4)]
+    router = ShardRouter(queues)
+    data = encode_command(
+        Command(
+            command_type=CommandType.CANCEL_ALL,
+            data=CancelAllCommand(user_id="u1"),
+        )
+    )
+
+    router.put_nowait(data)
+    assert [q.get_nowait() for q in queues] == [data] * 4
+
+
+def test_router_requires_a_queue():
+    """Test that a router without shards is rejected."""
+    with pytest.raises(ValueError):
+        ShardRouter([])
@@ -0,0 +1,62 @@
+from src.engine import SpotEngine
+from src.engine.balance_manager import BalanceManager
+from src.engine.event_logger import EventLogger
+from src.engine.simulation import (
+    book_digest,
+    ensure_instruments,
+    generate_commands,
+    run_simulation,
+)
+
+
+INSTRUMENTS = ["SIM-0", "SIM-1"]
+
+
+def simulate(raw: list[bytes], batch_size: int = 1):
+    engine = SpotEngine()
+    ensure_instruments(engine, raw)
+    return engine, run_simulation(engine, raw, batch_size)
+
+
+def test_generate_commands_is_deterministic():
+    a = list(generate_commands(500, INSTRUMENTS, seed=7))
+    b = list(generate_commands(500, INSTRUMENTS, seed=7))
+    c = list(generate_commands(500, INSTRUMENTS, seed=8))
+
+    assert a == b
+    assert a != c
+
+
+def test_replays_report_the_same_digest():
+    raw = list(generate_commands(2_000, INSTRUMENTS, seed=3))
+
+    engine, first = simulate(raw)
+    _, second = simulate(raw)
+    _, batched = simulate(raw, batch_size=64)
+
+    assert first.digest == second.digest == batched.digest
+    assert first.digest == book_digest(engine)
+    assert first.commands == 2_000
+    assert first.messages > 0
+    assert batched.latencies == {}
+
+    stats = first.percentiles()
+    assert sum(s["count"] for s in stats.values()) == 2_000
+    assert "NEW_ORDER.SINGLE" in stats
+    for s in stats.values():
+        assert s["p50"] <= s["p99"] <= s["max"]
+
+
+def test_different_flows_report_different_digests():
+    _, a = simulate(list(generate_commands(1_000, INSTRUMENTS, seed=1)))
+    _, b = simulate(list(generate_commands(1_000, INSTRUMENTS, seed=2)))
+
+    assert a.digest != b.digest
+
+
+def test_sinks_are_restored():
+    queue, ledger = EventLogger.queue, BalanceManager.ledger
+    simulate(list(generate_commands(100, INSTRUMENTS)))
+
+    assert EventLogger.queue is queue
+    assert BalanceManager.ledger is ledger
@@ -0,0 +1,261 @@
+import uuid
+
+import pytest
+
+from src.engine import (
+    CancelOrderCommand,
+    Command,
+    CommandType,
+    ExpireOrders,
+    NewInstrument,
+    NewOCOOrder,
+    NewOTOCOOrder,
+    NewOTOOrder,
+    NewSingleOrder,
+    SpotEngine,
+)
+from src.config import CASH_BALANCE_HKEY, CASH_ESCROW_HKEY, REDIS_CLIENT
+from src.engine.balance_ledger import BalanceLedger
+from src.engine.balance_manager import BalanceManager
+from src.engine.codec import encode_command
+from src.engine.journal import CommandJournal
+from src.engine.snapshot import (
+    capture_context,
+    load_snapshot,
+    recover_engine,
+    write_snapshot,
+)
+from src.enums import OrderType, Side, StrategyType, TimeInForce
+
+
+INSTRUMENTS = [
+    NewInstrument(instrument_id="FLOAT"),
+    NewInstrument(instrument_id="TICK", tick_size=0.01),
+    NewInstrument(instrument_id="LADDER", tick_size=0.5, min_price=50, max_price=150),
+]
+USER_ID = f"u-{uuid.uuid4()}"
+
+
+def leg(side: Side, price: float) -> dict:
+    return {
+        "order_id": str(uuid.uuid4()),
+        "user_id": USER_ID,
+        "order_type": OrderType.LIMIT,
+        "side": side,
+        "quantity": 10,
+        "limit_price": price,
+    }
+
+
+def stop_leg(side: Side, price: float) -> dict:
+    order = leg(side, price)
+    del order["limit_price"]
+    return {**order, "order_type": OrderType.STOP, "stop_price": price}
+
+
+def order_commands(instrument_id: str) -> list[Command]:
+    """Resting orders of every strategy, none of which cross."""
+    data = [
+        NewSingleOrder(
+            strategy_type=StrategyType.SINGLE,
+            instrument_id=instrument_id,
+            order=leg(Side.BID, 90.0),
+        ),
+        NewOCOOrder(
+            strategy_type=StrategyType.OCO,
+            instrument_id=instrument_id,
+            legs=[leg(Side.ASK, 110.0), stop_leg(Side.BID, 120.0)],
+        ),
+        NewOTOOrder(
+            strategy_type=StrategyType.OTO,
+            instrument_id=instrument_id,
+            parent=leg(Side.BID, 91.0),
+            child=leg(Side.ASK, 130.0),
+        ),
+        NewOTOCOOrder(
+            strategy_type=StrategyType.OTOCO,
+            instrument_id=instrument_id,
+            parent=leg(Side.BID, 92.5),
+            oco_legs=[leg(Side.ASK, 140.0), leg(Side.ASK, 111.0)],
+        ),
+    ]
+    return [Command(command_type=CommandType.NEW_ORDER, data=d) for d in data]
+
+
+@pytest.fixture(scope="module", autouse=True)
+def funded_user():
+    """Funds USER_ID for the escrow of every resting order."""
+    BalanceManager.increase_cash_balance(USER_ID, 1_000_000)
+    for inst in INSTRUMENTS:
+        BalanceManager.increase_asset_balance(USER_ID, inst.instrument_id, 10_000)
+
+
+@pytest.fixture
+def engine():
+    engine = SpotEngine(instruments=INSTRUMENTS)
+    for inst in INSTRUMENTS:
+        for command in order_commands(inst.instrument_id):
+            engine.process_command(command)
+    return engine
+
+
+def test_snapshot_round_trip(engine, tmp_path):
+    """Test that a restored engine captures exactly as the original did."""
+    path = str(tmp_path / "engine.snapshot")
+    write_snapshot(path, engine, seq=42)
+
+    restored = SpotEngine()
+    assert load_snapshot(path, restored) == 42
+    assert restored.contexts.keys() == engine.contexts.keys()
+
+    for instrument_id, ctx in engine.contexts.items():
+        other = restored.contexts[instrument_id]
+        assert type(other.orderbook) is type(ctx.orderbook)
+        assert capture_context(other) == capture_context(ctx)
+        assert len(other.stop_book) == len(ctx.stop_book) == 1
+        for side in (Side.BID, Side.ASK):
+            assert other.orderbook.depth(side, 10) == ctx.orderbook.depth(side, 10)
+
+
+def test_restored_links_are_live(engine, tmp_path):
+    """Test that contingent links still work after a restore."""
+    path = str(tmp_path / "engine.snapshot")
+    write_snapshot(path, engine, seq=0)
+    restored = SpotEngine()
+    load_snapshot(path, restored)
+
+    ctx = restored.contexts["FLOAT"]
+    oco_leg = next(o for o in ctx.order_store if o.strategy_type == StrategyType.OCO)
+    counterparty = oco_leg.counterparty
+    assert counterparty.counterparty is oco_leg
+
+    restored.process_command(
+        Command(
+            command_type=CommandType.CANCEL_ORDER,
+            data=CancelOrderCommand(order_id=oco_leg.id, symbol="FLOAT"),
+        )
+    )
+    assert ctx.order_store.get(oco_leg.id) is None
+    assert ctx.order_store.get(counterparty.id) is None
+
+
+def test_snapshot_keeps_expiries(engine, tmp_path):
+    """Test that resting orders still expire after a restore."""
+    now = 1_750_000_000.0
+    expiring = {
+        **leg(Side.BID, 80.0),
+        "time_in_force": TimeInForce.GTD,
+        "expires_at": now + 30,
+    }
+    for command in (
+        Command(command_type=CommandType.EXPIRE_ORDERS, data=ExpireOrders(now=now)),
+        Command(
+            command_type=CommandType.NEW_ORDER,
+            data=NewSingleOrder(
+                strategy_type=StrategyType.SINGLE,
+                instrument_id="TICK",
+                order=expiring,
+            ),
+        ),
+    ):
+        engine.process_command(command)
+
+    path = str(tmp_path / "engine.snapshot")
+    write_snapshot(path, engine, seq=0)
+    restored = SpotEngine()
+    load_snapshot(path, restored)
+
+    ctx = restored.contexts["TICK"]
+    assert restored.expiries.now == now
+    assert dict(restored.expiries.items()) == {
+        ("TICK", expiring["order_id"]): now + 30
+    }
+    restored.process_command(
+        Command(
+            command_type=CommandType.EXPIRE_ORDERS, data=ExpireOrders(now=now + 30)
+        )
+    )
+    assert ctx.order_store.get(expiring["order_id"]) is None
+
+
+def test_recover_replays_journal_tail(engine, tmp_path):
+    """Test that recovery applies the commands journaled after the snapshot."""
+    path = str(tmp_path / "engine.snapshot")
+    journal = CommandJournal(str(tmp_path / "commands.journal"))
+    write_snapshot(path, engine, seq=journal.seq)
+
+    tail = order_commands("TICK")
+    for command in tail:
+        journal.append(encode_command(command))
+        engine.process_command(command)
+
+    restored = SpotEngine()
+    assert recover_engine(restored, path, journal) == len(tail)
+    for instrument_id, ctx in engine.contexts.items():
+        assert capture_context(restored.contexts[instrument_id]) == capture_context(
+            ctx
+        )
+    journal.close()
+
+
+def test_recover_sends_unpublished_events(engine, tmp_path, drain_events):
+    """
+    Test that recovery sends the events of commands journaled after the last
+    published marker, and only those.
+    """
+    path = str(tmp_path / "engine.snapshot")
+    journal = CommandJournal(str(tmp_path / "commands.journal"))
+    write_snapshot(path, engine, seq=journal.seq)
+
+    sent, held_back = order_commands("TICK")[:2]
+    journal.append(encode_command(sent))
+    journal.mark_published()
+    # The crash comes before the batch holding this command is flushed.
+    journal.append(encode_command(held_back))
+    drain_events()
+
+    assert recover_engine(SpotEngine(), path, journal) == 2
+    assert {e.related_id for e in drain_events()} == {
+        leg["order_id"] for leg in held_back.data.legs
+    }
+    journal.close()
+
+
+def test_recover_replays_against_snapshot_balances(tmp_path):
+    """
+    Test that the journal tail sees the balances in the snapshot rather
+    than what Redis holds after the crash, and that recovery writes the
+    replayed balances, changes never flushed included, to Redis.
+    """
+    user_id = f"u-{uuid.uuid4()}"
+    path = str(tmp_path / "engine.snapshot")
+    journal = CommandJournal(str(tmp_path / "commands.journal"))
+    bid = {**leg(Side.BID, 90.0), "user_id": user_id}
+    command = Command(
+        command_type=CommandType.NEW_ORDER,
+        data=NewSingleOrder(
+            strategy_type=StrategyType.SINGLE, instrument_id="FLOAT", order=bid
+        ),
+    )
+
+    BalanceManager.ledger = BalanceLedger()
+    try:
+        BalanceManager.increase_cash_balance(user_id, 1_000)
+        engine = SpotEngine(instruments=INSTRUMENTS[:1])
+        write_snapshot(path, engine, seq=journal.seq)
+        journal.append(encode_command(command))
+        engine.process_command(command)
+    finally:
+        BalanceManager.ledger = None
+
+    # Nothing reached Redis before the crash, and it now holds an escrow
+    # that would leave the bid unfunded.
+    REDIS_CLIENT.hset(CASH_ESCROW_HKEY, user_id, 1_000)
+
+    restored, ledger = SpotEngine(), BalanceLedger()
+    assert recover_engine(restored, path, journal, ledger) == 1
+    assert restored.contexts["FLOAT"].order_store.get(bid["order_id"]) is not None
+    assert ledger.get(CASH_ESCROW_HKEY, user_id) == 900.0
+    assert float(REDIS_CLIENT.hget(CASH_ESCROW_HKEY, user_id)) == 900.0
+    assert float(REDIS_CLIENT.hget(CASH_BALANCE_HKEY, user_id)) == 1_000.0
+    journal.close()
@@ -0,0 +1,164 @@
+import uuid
+
+import pytest
+
+from src.engine import CancelOrderCommand, Command, CommandType, SpotEngine
+from src.engine.balance_manager import BalanceManager
+from src.engine.orderbook import StopBook
+from src.enums import OrderType, Side
+
+
+@pytest.fixture
+def book():
+    return StopBook()
+
+
+def test_append_and_remove(book, order_factory):
+    order = order_factory(order_type=OrderType.STOP, side=Side.BID, price=105.0)
+    book.append(order, order.price)
+
+    assert order in book
+    assert len(book) == 1
+    assert list(book.bid_levels) == [105.0]
+
+    book.remove(order, order.price)
+    assert order not in book
+    assert len(book) == 0
+    assert list(book.bid_levels) == []
+
+
+def test_remove_missing_order_is_noop(book, order_factory):
+    order = order_factory(order_type=OrderType.STOP, price=105.0)
+    book.remove(order, order.price)
+    assert len(book) == 0
+
+
+def test_append_duplicate_raises(book, order_factory):
+    order = order_factory(order_type=OrderType.STOP, price=105.0)
+    book.append(order, order.price)
+    with pytest.raises(ValueError):
+        book.append(order, order.price)
+
+
+def test_triggered_selects_crossed_stops(book, order_factory):
+    """Buy stops trigger at or below the price, sell stops at or above it."""
+    buys = [
+        order_factory(order_type=OrderType.STOP, side=Side.BID, price=p)
+        for p in (104.0, 101.0, 102.0, 106.0)
+    ]
+    sells = [
+        order_factory(order_type=OrderType.STOP, side=Side.ASK, price=p)
+        for p in (96.0, 103.0, 99.0)
+    ]
+    for order in (*buys, *sells):
+        book.append(order, order.price)
+
+    triggered = book.triggered(102.0)
+    assert [o.price for o in triggered] == [101.0, 102.0, 103.0]
+    # Nothing is removed until the caller activates them.
+    assert len(book) == 7
+
+    assert [o.price for o in book.triggered(98.0)] == [103.0, 99.0]
+    assert book.triggered(None) == []
+
+
+def test_triggered_keeps_arrival_order_within_level(book, order_factory):
+    orders = [
+        order_factory(order_type=OrderType.STOP, side=Side.ASK, price=95.0)
+        for _ in range(3)
+    ]
+    for order in orders:
+        book.append(order, order.price)
+
+    assert book.triggered(95.0) == orders
+
+
+@pytest.fixture
+def instrument_id():
+    return "STOP-USD"
+
+
+@pytest.fixture
+def users(users):
+    stopper = f"st-{uuid.uuid4()}"
+    BalanceManager.increase_cash_balance(stopper, 10_000)
+    return (*users, stopper)
+
+
+def test_stop_waits_until_last_trade_price_crosses(users, place_order):
+    """A buy stop rests off-book until a trade prints at its stop price."""
+    seller, buyer, stopper = users
+    engine = SpotEngine(["STOP-USD"])
+    ctx = engine.contexts["STOP-USD"]
+
+    place_order(engine, seller, Side.ASK, 10, 101.0)
+    place_order(engine, seller, Side.ASK, 10, 102.0)
+    stop_id = place_order(engine, stopper, Side.BID, 5, 102.0, OrderType.STOP)
+
+    stop = ctx.order_store.get(stop_id)
+    assert stop in ctx.stop_book
+    assert list(ctx.orderbook.bid_levels) == []
+
+    # Trades at 101 don't reach the stop.
+    place_order(engine, buyer, Side.BID, 10, 101.0)
+    assert ctx.orderbook.price == 101.0
+    assert stop in ctx.stop_book
+
+    # A trade at 102 triggers it, and it fills against the rest of 102.
+    place_order(engine, buyer, Side.BID, 2, 102.0)
+    assert ctx.orderbook.price == 102.0
+    assert stop not in ctx.stop_book
+    assert stop.executed_quantity == 5
+    assert ctx.orderbook.depth(Side.ASK, 1) == [(102.0, 3, 1)]
+
+
+def test_triggered_stops_cascade(users, place_order):
+    """Trades made by a triggered stop trigger further stops."""
+    seller, buyer, stopper = users
+    engine = SpotEngine(["STOP-USD"])
+    ctx = engine.contexts["STOP-USD"]
+
+    for price in (101.0, 102.0, 103.0):
+        place_order(engine, seller, Side.ASK, 5, price)
+    first = place_order(engine, stopper, Side.BID, 5, 101.0, OrderType.STOP)
+    second = place_order(engine, stopper, Side.BID, 5, 102.0, OrderType.STOP)
+
+    place_order(engine, buyer, Side.BID, 5, 101.0)
+
+    assert len(ctx.stop_book) == 0
+    assert ctx.order_store.get(first) is None
+    assert ctx.order_store.get(second) is None
+    assert ctx.orderbook.price == 103.0
+    assert ctx.orderbook.depth(Side.ASK, 5) == []
+
+
+def test_unfilled_triggered_stop_rests_in_book(users, place_order):
+    seller, buyer, stopper = users
+    engine = SpotEngine(["STOP-USD"])
+    ctx = engine.contexts["STOP-USD"]
+
+    place_order(engine, seller, Side.ASK, 5, 101.0)
+    stop_id = place_order(engine, stopper, Side.BID, 5, 101.0, OrderType.STOP)
+    place_order(engine, buyer, Side.BID, 5, 101.0)
+
+    stop = ctx.order_store.get(stop_id)
+    assert stop not in ctx.stop_book
+    assert list(ctx.orderbook.get_orders(101.0, Side.BID)) == [stop]
+
+
+def test_cancel_removes_stop_from_stop_book(users, place_order):
+    _, _, stopper = users
+    engine = SpotEngine(["STOP-USD"])
+    ctx = engine.contexts["STOP-USD"]
+
+    stop_id = place_order(engine, stopper, Side.BID, 5, 110.0, OrderType.STOP)
+    stop = ctx.order_store.get(stop_id)
+    engine.process_command(
+        Command(
+            command_type=CommandType.CANCEL_ORDER,
+            data=CancelOrderCommand(order_id=stop_id, symbol="STOP-USD"),
+        )
+    )
+
+    assert stop not in ctx.stop_book
+    assert ctx.order_store.get(stop_id) is None
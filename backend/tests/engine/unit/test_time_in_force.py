@@ -0,0 +1,122 @@
+from unittest.mock import patch
+
+import pytest
+
+from src.engine import SpotEngine
+from src.enums import EventType, OrderType, Side, TimeInForce
+
+
+INSTRUMENT = "TIF-USD"
+
+
+@pytest.fixture
+def instrument_id():
+    return INSTRUMENT
+
+
+@pytest.fixture
+def engine():
+    return SpotEngine([INSTRUMENT])
+
+
+def test_limit_order_does_not_trade_through_its_price(engine, users, place_order):
+    seller, buyer = users
+    place_order(engine, seller, Side.ASK, 10, 101.0)
+    place_order(engine, seller, Side.ASK, 10, 102.0)
+    place_order(engine, buyer, Side.BID, 15, 101.0)
+
+    ob = engine.contexts[INSTRUMENT].orderbook
+    assert ob.depth(Side.ASK, 5) == [(102.0, 10, 1)]
+    assert ob.depth(Side.BID, 5) == [(101.0, 5, 1)]
+
+
+def test_ioc_cancels_remainder(engine, users, place_order, drain_events):
+    seller, buyer = users
+    place_order(engine, seller, Side.ASK, 10, 101.0)
+    drain_events()
+
+    order_id = place_order(
+        engine, buyer, Side.BID, 15, 101.0, time_in_force=TimeInForce.IOC
+    )
+
+    ctx = engine.contexts[INSTRUMENT]
+    assert ctx.order_store.get(order_id) is None
+    assert ctx.orderbook.depth(Side.BID, 5) == []
+    assert ctx.orderbook.depth(Side.ASK, 5) == []
+
+    events = [e for e in drain_events() if e.related_id == order_id]
+    assert events[-1].event_type == EventType.ORDER_CANCELLED
+    assert events[-1].details["executed_quantity"] == 10
+
+
+def test_ioc_without_liquidity_is_cancelled(engine, users, place_order, drain_events):
+    _, buyer = users
+    order_id = place_order(
+        engine, buyer, Side.BID, 5, 101.0, time_in_force=TimeInForce.IOC
+    )
+
+    assert engine.contexts[INSTRUMENT].order_store.get(order_id) is None
+    events = drain_events()
+    assert [e.event_type for e in events] == [EventType.ORDER_CANCELLED]
+
+
+def test_fok_fills_completely(engine, users, place_order):
+    seller, buyer = users
+    place_order(engine, seller, Side.ASK, 10, 101.0)
+    place_order(engine, seller, Side.ASK, 10, 102.0)
+
+    place_order(engine, buyer, Side.BID, 15, 102.0, time_in_force=TimeInForce.FOK)
+
+    ob = engine.contexts[INSTRUMENT].orderbook
+    assert ob.depth(Side.ASK, 5) == [(102.0, 5, 1)]
+    assert ob.depth(Side.BID, 5) == []
+
+
+def test_rejected_fok_touches_nothing(engine, users, place_order, drain_events):
+    """
+    Test that a FOK without enough liquidity within its limit is killed
+    before any maker, balance or book is touched.
+    """
+    seller, buyer = users
+    place_order(engine, seller, Side.ASK, 10, 101.0)
+    place_order(engine, seller, Side.ASK, 10, 105.0)
+    drain_events()
+
+    ob = engine.contexts[INSTRUMENT].orderbook
+    depth = ob.depth(Side.ASK, 5)
+
+    with patch.object(
+        SpotEngine, "_reserve_taker_escrow", autospec=True
+    ) as balance_check:
+        order_id = place_order(
+            engine, buyer, Side.BID, 15, 102.0, time_in_force=TimeInForce.FOK
+        )
+
+    balance_check.assert_not_called()
+    assert ob.depth(Side.ASK, 5) == depth
+    assert ob.depth(Side.BID, 5) == []
+    assert ob.price == 100.0
+
+    events = drain_events()
+    assert len(events) == 1
+    assert events[0].event_type == EventType.ORDER_CANCELLED
+    assert events[0].related_id == order_id
+    assert events[0].details["executed_quantity"] == 0
+
+
+def test_market_fok_ignores_price(engine, users, place_order):
+    seller, buyer = users
+    place_order(engine, seller, Side.ASK, 10, 101.0)
+    place_order(engine, seller, Side.ASK, 10, 150.0)
+
+    place_order(
+        engine,
+        buyer,
+        Side.BID,
+        20,
+        100.0,
+        OrderType.MARKET,
+        time_in_force=TimeInForce.FOK,
+    )
+
+    assert engine.contexts[INSTRUMENT].orderbook.depth(Side.ASK, 5) == []
@@ -0,0 +1,181 @@
+import random
+
+import pytest
+
+from src.engine import Command, CommandType, ExpireOrders, SpotEngine
+from src.engine.codec import decode_events
+from src.engine.timer_wheel import TimerWheel
+from src.enums import EventType, Side, TimeInForce
+
+
+INSTRUMENT = "GTD-USD"
+NOW = 1_750_000_000.0
+
+
+@pytest.fixture
+def wheel():
+    wheel = TimerWheel()
+    wheel.advance(NOW)
+    return wheel
+
+
+def test_key_is_returned_once_due(wheel):
+    wheel.schedule("a", NOW + 10.5)
+
+    assert wheel.advance(NOW + 10) == []
+    assert wheel.advance(NOW + 11) == ["a"]
+    assert "a" not in wheel
+    assert wheel.advance(NOW + 100) == []
+
+
+def test_past_deadline_is_due_on_next_advance(wheel):
+    wheel.schedule("a", NOW - 60)
+    assert wheel.advance(NOW) == ["a"]
+
+
+def test_due_keys_come_back_earliest_first(wheel):
+    wheel.schedule("c", NOW + 3.0)
+    wheel.schedule("a", NOW + 2.1)
+    wheel.schedule("b", NOW + 2.5)
+
+    assert wheel.advance(NOW + 5) == ["a", "b", "c"]
+
+
+def test_cancel_and_reschedule(wheel):
+    wheel.schedule("a", NOW + 5)
+    wheel.schedule("b", NOW + 5)
+    wheel.cancel("a")
+    wheel.schedule("b", NOW + 50)
+
+    assert wheel.advance(NOW + 10) == []
+    assert dict(wheel.items()) == {"b": NOW + 50}
+    assert wheel.advance(NOW + 50) == ["b"]
+
+
+def test_keys_scheduled_before_first_advance():
+    wheel = TimerWheel()
+    wheel.schedule("a", NOW - 1)
+    wheel.schedule("b", NOW + 1)
+
+    assert wheel.advance(NOW) == ["a"]
+    assert wheel.advance(NOW + 1) == ["b"]
+
+
+def test_matches_brute_force_across_levels():
+    """Deadlines spread over every level and the overflow set all fire on time."""
+    rng = random.Random(7)
+    wheel = TimerWheel(slot_bits=2, levels=3)
+    now = 1_000.0
+    wheel.advance(now)
+    pending = {}
+
+    for _ in range(500):
+        for _ in range(rng.randint(0, 3)):
+            key = rng.randrange(200)
+            pending[key] = now + rng.choice((rng.uniform(-2, 20), rng.uniform(0, 500)))
+            wheel.schedule(key, pending[key])
+
+        now += rng.choice((0, 0.5, 1, 7, 90))
+        due = wheel.advance(now)
+        expected = {key for key, deadline in pending.items() if deadline <= now // 1}
+
+        assert set(due) == expected
+        for key in due:
+            del pending[key]
+        assert len(wheel) == len(pending)
+
+
+def test_advance_skips_idle_ticks(wheel):
+    """Test that a long idle costs a step per occupied slot, not per tick."""
+    wheel.schedule("a", NOW + 30 * 86_400)
+    steps = 0
+    next_tick = wheel._next_tick
+
+    def count(target):
+        nonlocal steps
+        steps += 1
+        return next_tick(target)
+
+    wheel._next_tick = count
+    assert wheel.advance(NOW + 29 * 86_400) == []
+    assert wheel.advance(NOW + 30 * 86_400) == ["a"]
+    assert wheel.advance(NOW + 365 * 86_400) == []
+    assert steps < 50
+
+
+@pytest.fixture
+def instrument_id():
+    return INSTRUMENT
+
+
+def expire(engine, now):
+    engine.process_command(
+        Command(command_type=CommandType.EXPIRE_ORDERS, data=ExpireOrders(now=now))
+    )
+
+
+def test_engine_cancels_expired_orders(event_queue, users, place_order):
+    _, buyer = users
+    engine = SpotEngine([INSTRUMENT])
+    ctx = engine.contexts[INSTRUMENT]
+    expire(engine, NOW)
+
+    gtd_id = place_order(
+        engine,
+        buyer,
+        Side.BID,
+        5,
+        90.0,
+        time_in_force=TimeInForce.GTD,
+        expires_at=NOW + 30,
+    )
+    gtc_id = place_order(engine, buyer, Side.BID, 5, 90.0)
+    while not event_queue.empty():
+        event_queue.get()
+
+    expire(engine, NOW + 29)
+    assert ctx.order_store.get(gtd_id) is not None
+
+    expire(engine, NOW + 30)
+    events = decode_events(event_queue.get_nowait())
+    assert [(e.event_type, e.related_id) for e in events] == [
+        (EventType.ORDER_CANCELLED, gtd_id)
+    ]
+    assert events[0].details["reason"] == "Order expired."
+    assert ctx.order_store.get(gtd_id) is None
+    assert ctx.order_store.get(gtc_id) is not None
+    assert list(ctx.orderbook.get_orders(90.0, Side.BID))[0].id == gtc_id
+
+
+def test_filled_orders_are_not_scheduled_or_cancelled(
+    event_queue, users, place_order
+):
+    seller, buyer = users
+    engine = SpotEngine([INSTRUMENT])
+    expire(engine, NOW)
+
+    place_order(
+        engine,
+        seller,
+        Side.ASK,
+        5,
+        100.0,
+        time_in_force=TimeInForce.GTD,
+        expires_at=NOW + 30,
+    )
+    # Fills on arrival, so never rests.
+    place_order(
+        engine,
+        buyer,
+        Side.BID,
+        5,
+        100.0,
+        time_in_force=TimeInForce.DAY,
+        expires_at=NOW + 30,
+    )
+    while not event_queue.empty():
+        event_queue.get()
+
+    assert len(engine.expiries) == 1
+    expire(engine, NOW + 60)
+    assert event_queue.empty()
@@ -0,0 +1,51 @@
+import json
+import time
+import uuid
+
+import pytest
+from sqlalchemy import insert
+
+from src.db_models import Events
+from src.utils.bulk_writer import BulkWriter
+
+
+DETAILS = json.dumps({"executed_quantity": 1.0, "quantity": 1.0, "price": 100.0})
+
+
+@pytest.mark.parametrize("rows", [10_000, 100_000, 1_000_000])
+@pytest.mark.parametrize("method", ["insert", "copy"])
+def test_perf_bulk_write_events(benchmark, db_session, user_factory_db, method, rows):
+    """
+    Measures writing `rows` Events rows in one transaction, either as an
+    executemany INSERT or with COPY through BulkWriter. The transaction
+    is rolled back afterwards so the table doesn't grow between runs.
+    """
+    user = user_factory_db()
+    writer = BulkWriter([Events])
+    for _ in range(rows):
+        writer.add(
+            Events,
+            {
+                "event_type": "execution",
+                "user_id": user.user_id,
+                "related_id": uuid.uuid4(),
+                "details": DETAILS,
+            },
+        )
+    buffered = writer._rows[Events]
+
+    def run():
+        start = time.perf_counter()
+        if method == "copy":
+            writer.flush(db_session)
+        else:
+            db_session.execute(insert(Events), buffered)
+        return time.perf_counter() - start
+
+    try:
+        elapsed = benchmark.pedantic(run, rounds=1, iterations=1)
+    finally:
+        db_session.rollback()
+
+    benchmark.extra_info["rows_per_sec"] = round(rows / elapsed)
+    print(f"\n{method} {rows:,} rows: {elapsed:.2f}s, {rows / elapsed:,.0f} rows/s")
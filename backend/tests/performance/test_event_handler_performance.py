@@ -0,0 +1,116 @@
+import time
+import uuid
+
+import pytest
+from sqlalchemy import insert
+
+from src.db_models import AssetBalances, Orders, Users
+from src.engine.models import Event
+from src.enums import EventType, OrderStatus, OrderType, Side
+
+
+EVENTS = 2_000
+BATCH = 512
+
+
+def _executions(db_session) -> list[Event]:
+    """EVENTS executions of 1 unit between fresh users, with their orders."""
+    buyer, seller = uuid.uuid4(), uuid.uuid4()
+    db_session.execute(
+        insert(Users),
+        [
+            {
+                "user_id": user_id,
+                "username": f"perf-{user_id}",
+                "password": "hashed_password",
+                "cash_balance": 1e9,
+                "escrow_balance": 1e9 if user_id == buyer else 0,
+            }
+            for user_id in (buyer, seller)
+        ],
+    )
+    db_session.execute(
+        insert(AssetBalances),
+        [
+            {
+                "user_id": seller,
+                "instrument_id": "BTC-USD",
+                "balance": EVENTS,
+                "escrow_balance": EVENTS,
+            },
+            {
+                "user_id": buyer,
+                "instrument_id": "BTC-USD",
+                "balance": 0,
+                "escrow_balance": 0,
+            },
+        ],
+    )
+
+    maker_id = uuid.uuid4()
+    taker_ids = [uuid.uuid4() for _ in range(EVENTS)]
+    db_session.execute(
+        insert(Orders),
+        [
+            {
+                "order_id": order_id,
+                "user_id": user_id,
+                "instrument_id": "BTC-USD",
+                "side": side.value,
+                "order_type": OrderType.LIMIT.value,
+                "quantity": quantity,
+                "limit_price": 100.0,
+                "status": OrderStatus.PLACED.value,
+            }
+            for order_id, user_id, side, quantity in [
+                (maker_id, seller, Side.ASK, EVENTS),
+                *((taker_id, buyer, Side.BID, 1) for taker_id in taker_ids),
+            ]
+        ],
+    )
+    db_session.commit()
+
+    return [
+        Event(
+            event_type=EventType.EXECUTION,
+            user_id=str(buyer),
+            related_id=str(taker_id),
+            instrument_id="BTC-USD",
+            details={
+                "executed_quantity": 1,
+                "quantity": 1,
+                "price": 100.0,
+                "side": Side.BID,
+                "order_quantity": 1,
+                "maker_user_id": str(seller),
+                "maker_order_id": str(maker_id),
+                "maker_executed_quantity": i,
+                "maker_order_quantity": EVENTS,
+            },
+        )
+        for i, taker_id in enumerate(taker_ids, start=1)
+    ]
+
+
+@pytest.mark.parametrize("mode", ["per_event", "batched"])
+def test_perf_event_handler_throughput(
+    benchmark, db_session, event_handler, test_instrument, mode
+):
+    """
+    Measures EXECUTION events applied per second when each event gets its
+    own transaction and when BATCH events share one.
+    """
+    events = _executions(db_session)
+
+    def run():
+        start = time.perf_counter()
+        if mode == "per_event":
+            event_handler.process_events(events, db_session)
+        else:
+            for i in range(0, len(events), BATCH):
+                event_handler.process_batch(events[i : i + BATCH], db_session)
+        return time.perf_counter() - start
+
+    elapsed = benchmark.pedantic(run, rounds=1, iterations=1)
+    benchmark.extra_info["events_per_sec"] = round(EVENTS / elapsed)
+    print(f"\n{mode}: {EVENTS / elapsed:,.0f} events/s")
@@ -0,0 +1,176 @@
+import time
+import uuid
+from multiprocessing import Process, Queue
+
+import pytest
+from sqlalchemy import insert
+
+from src.db_models import AssetBalances, Orders, Users
+from src.engine.codec import decode_events, encode_event, encode_event_batch
+from src.enums import EventType, OrderStatus, OrderType, Side
+from src.event_handler import EventHandler
+from src.event_router import EventRouter
+
+
+EVENTS = 4_000
+PAIRS = 64
+# Events per engine message, and at most per transaction in a worker.
+MESSAGE = 64
+BATCH = 512
+STOP = b""
+
+
+def _worker(partition: int, partitions: int, events: Queue, done: Queue) -> None:
+    from tests.config import engine, smaker
+
+    # Leave the parent's pooled connections alone.
+    engine.dispose(close=False)
+    handler = EventHandler(partition=partition, partitions=partitions)
+    done.put(partition)
+
+    stop = False
+    while not stop:
+        batch = []
+        raw = events.get()
+        while True:
+            if raw == STOP:
+                stop = True
+                break
+            batch.extend(decode_events(raw))
+            if len(batch) >= BATCH or events.empty():
+                break
+            raw = events.get()
+
+        if batch:
+            with smaker() as sess:
+                handler.process_batch(batch, sess)
+
+    done.put(partition)
+
+
+def _messages(db_session) -> list[bytes]:
+    """
+    EVENTS executions of 1 unit spread over PAIRS buyer and seller pairs,
+    with their users and orders, encoded as the engine sends them.
+    """
+    buyers = [uuid.uuid4() for _ in range(PAIRS)]
+    sellers = [uuid.uuid4() for _ in range(PAIRS)]
+    per_pair = EVENTS // PAIRS
+    db_session.execute(
+        insert(Users),
+        [
+            {
+                "user_id": user_id,
+                "username": f"perf-{user_id}",
+                "password": "hashed_password",
+                "cash_balance": 1e9,
+                "escrow_balance": 1e9 if user_id in buyers else 0,
+            }
+            for user_id in (*buyers, *sellers)
+        ],
+    )
+    db_session.execute(
+        insert(AssetBalances),
+        [
+            {
+                "user_id": user_id,
+                "instrument_id": "BTC-USD",
+                "balance": per_pair if user_id in sellers else 0,
+                "escrow_balance": per_pair if user_id in sellers else 0,
+            }
+            for user_id in (*buyers, *sellers)
+        ],
+    )
+
+    orders, frames = [], []
+    makers = [uuid.uuid4() for _ in range(PAIRS)]
+    for pair in range(PAIRS):
+        orders.append((makers[pair], sellers[pair], Side.ASK, per_pair))
+    for i in range(per_pair * PAIRS):
+        pair = i % PAIRS
+        taker_id = uuid.uuid4()
+        orders.append((taker_id, buyers[pair], Side.BID, 1))
+        frames.append(
+            encode_event(
+                EventType.EXECUTION,
+                str(buyers[pair]),
+                str(taker_id),
+                "BTC-USD",
+                {
+                    "executed_quantity": 1.0,
+                    "quantity": 1.0,
+                    "price": 100.0,
+                    "side": Side.BID,
+                    "order_quantity": 1.0,
+                    "maker_user_id": str(sellers[pair]),
+                    "maker_order_id": str(makers[pair]),
+                    "maker_executed_quantity": float(i // PAIRS + 1),
+                    "maker_order_quantity": float(per_pair),
+                },
+            )
+        )
+
+    db_session.execute(
+        insert(Orders),
+        [
+            {
+                "order_id": order_id,
+                "user_id": user_id,
+                "instrument_id": "BTC-USD",
+                "side": side.value,
+                "order_type": OrderType.LIMIT.value,
+                "quantity": quantity,
+                "limit_price": 100.0,
+                "status": OrderStatus.PLACED.value,
+            }
+            for order_id, user_id, side, quantity in orders
+        ],
+    )
+    db_session.commit()
+
+    return [
+        encode_event_batch(frames[i : i + MESSAGE])
+        for i in range(0, len(frames), MESSAGE)
+    ]
+
+
+@pytest.mark.parametrize("workers", [1, 2, 4])
+def test_perf_partitioned_event_handler(
+    benchmark, db_session, test_instrument, workers
+):
+    """
+    Measures EXECUTION events applied per second by 1, 2 and 4 event
+    handler partitions. The clock runs from the first engine message being
+    routed until every partition has committed its share.
+    """
+    messages = _messages(db_session)
+    queues = [Queue() for _ in range(workers)]
+    done = Queue()
+    processes = [
+        Process(target=_worker, args=(i, workers, queues[i], done))
+        for i in range(workers)
+    ]
+    for p in processes:
+        p.start()
+    for _ in processes:
+        done.get()
+
+    def run():
+        router = EventRouter(queues)
+        start = time.perf_counter()
+        for message in messages:
+            router.route(message)
+        for q in queues:
+            q.put(STOP)
+        for _ in processes:
+            done.get()
+        return time.perf_counter() - start
+
+    try:
+        elapsed = benchmark.pedantic(run, rounds=1, iterations=1)
+    finally:
+        for p in processes:
+            p.join()
+
+    benchmark.extra_info["events_per_sec"] = round(EVENTS / elapsed)
+    print(f"\n[INFO] workers={workers}: {EVENTS / elapsed:,.0f} events/sec")
@@ -0,0 +1,59 @@
+import statistics
+import time
+from multiprocessing import Process, Queue
+
+import pytest
+
+from src.ring_buffer import RingBuffer
+
+
+HOPS = 20_000
+PAYLOAD = b"x" * 96  # Roughly an encoded NEW_ORDER command.
+
+
+def _echo(inbound, outbound, count: int) -> None:
+    for _ in range(count):
+        outbound.put(inbound.get())
+
+
+def _make(transport: str):
+    return RingBuffer(1 << 16) if transport == "ring" else Queue()
+
+
+def _release(q) -> None:
+    if isinstance(q, RingBuffer):
+        q.close()
+        q.unlink()
+
+
+@pytest.mark.parametrize("transport", ["mpqueue", "ring"])
+def test_perf_transport_hop_latency(benchmark, transport):
+    """
+    Measures the time for one message to cross a process boundary by
+    ping-ponging through an echoing child and halving the round trip.
+    Reports p50/p99 hop time in microseconds.
+    """
+    ping, pong = _make(transport), _make(transport)
+    p = Process(target=_echo, args=(ping, pong, HOPS))
+    p.start()
+
+    def run():
+        hops = []
+        for _ in range(HOPS):
+            start = time.perf_counter_ns()
+            ping.put(PAYLOAD)
+            pong.get()
+            hops.append((time.perf_counter_ns() - start) / 2_000)
+        return hops
+
+    try:
+        hops = benchmark.pedantic(run, rounds=1, iterations=1)
+    finally:
+        p.join(10)
+        _release(ping)
+        _release(pong)
+
+    quantiles = statistics.quantiles(hops, n=100)
+    benchmark.extra_info["p50_us"] = round(quantiles[49], 2)
+    benchmark.extra_info["p99_us"] = round(quantiles[98], 2)
+    print(f"\n{transport}: p50={quantiles[49]:.1f}us p99={quantiles[98]:.1f}us")
@@ -0,0 +1,52 @@
+import json
+
+import httpx
+import pytest
+
+from src.config import ENGINE_METRICS_HKEY, EVENT_METRICS_HKEY, REDIS_CLIENT
+from src.server.app import app
+
+
+@pytest.mark.asyncio
+async def test_get_metrics_returns_every_shard_and_partition():
+    """
+    Tests that /metrics returns what each engine shard and event handler
+    partition last published.
+    """
+    published = {
+        shard: {"shard": shard, "counters": {"commands": shard}, "latency_us": {}}
+        for shard in (1, 0)
+    }
+    partitions = {
+        partition: {"partition": partition, "queue_depth": 3, "lag_secs": 0.5}
+        for partition in (1, 0)
+    }
+    REDIS_CLIENT.delete(ENGINE_METRICS_HKEY, EVENT_METRICS_HKEY)
+    for shard, data in published.items():
+        REDIS_CLIENT.hset(ENGINE_METRICS_HKEY, str(shard), json.dumps(data))
+    for partition, data in partitions.items():
+        REDIS_CLIENT.hset(EVENT_METRICS_HKEY, str(partition), json.dumps(data))
+
+    async with httpx.AsyncClient(
+        transport=httpx.ASGITransport(app=app), base_url="http://localhost:80"
+    ) as client:
+        response = await client.get("/metrics/")
+
+    REDIS_CLIENT.delete(ENGINE_METRICS_HKEY, EVENT_METRICS_HKEY)
+    assert response.status_code == 200
+    assert response.json() == {
+        "shards": [published[0], published[1]],
+        "event_partitions": [partitions[0], partitions[1]],
+    }
+
+
+@pytest.mark.asyncio
+async def test_overloaded_ingress_sets_retry_after():
+    """Tests that refused commands map to their status with a Retry-After."""
+    from src.server.app import IngressOverloaded, ingress_overloaded_handler
+
+    response = await ingress_overloaded_handler(
+        None, IngressOverloaded("Engine overloaded.", 503, 5)
+    )
+    assert response.status_code == 503
+    assert response.headers["Retry-After"] == "5"
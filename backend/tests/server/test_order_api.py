@@ -1,10 +1,12 @@
 
 import pytest
 import uuid
+from datetime import timedelta
 from faker import Faker
 
-from src.enums import OrderType, Side, OrderStatus
+from src.enums import OrderType, Side, OrderStatus, TimeInForce
 from src.engine import CommandType
+from src.engine.codec import decode_command
 from src.engine.models import (
     NewSingleOrder,
     NewOCOOrder,
@@ -15,6 +17,7 @@ from src.engine.models import (
 )
 from src.db_models import Orders, Trades, Users
 from src.config import PAGE_SIZE
+from src.utils.utils import get_datetime
 
 
 @pytest.mark.asyncio
@@ -38,7 +41,7 @@ async def test_create_single_limit_order(async_client, test_instrument, monkeypa
     assert uuid.UUID(json_response["order_id"])
 
     mock_queue.put_nowait.assert_called_once()
-    cmd = mock_queue.put_nowait.call_args[0][0]
+    cmd = decode_command(mock_queue.put_nowait.call_args[0][0])
     assert cmd.command_type.value == CommandType.NEW_ORDER.value
     assert type(cmd.data).__name__ == "NewSingleOrder"
     assert cmd.data.instrument_id == test_instrument.instrument_id
@@ -46,6 +49,70 @@ async def test_create_single_limit_order(async_client, test_instrument, monkeypa
     assert cmd.data.order["limit_price"] == 25000.0
 
 
+@pytest.mark.asyncio
+async def test_create_gtd_order(async_client, test_instrument):
+    """Tests that a GTD order's expiry reaches the engine as a timestamp."""
+    client, mock_queue, _ = async_client
+    expires_at = get_datetime() + timedelta(hours=1)
+
+    order_data = {
+        "instrument_id": test_instrument.instrument_id,
+        "order_type": OrderType.LIMIT.value,
+        "side": Side.BID.value,
+        "quantity": 1,
+        "limit_price": 25000.0,
+        "time_in_force": TimeInForce.GTD.value,
+        "expires_at": expires_at.isoformat(),
+    }
+
+    response = await client.post("/orders/", json=order_data)
+
+    assert response.status_code == 202
+    cmd = decode_command(mock_queue.put_nowait.call_args[0][0])
+    assert cmd.data.order["time_in_force"] == TimeInForce.GTD
+    assert cmd.data.order["expires_at"] == pytest.approx(expires_at.timestamp())
+
+
+@pytest.mark.asyncio
+async def test_create_gtd_order_requires_future_expiry(async_client, test_instrument):
+    """Tests that GTD orders without a future expires_at are rejected."""
+    client, mock_queue, _ = async_client
+    order_data = {
+        "instrument_id": test_instrument.instrument_id,
+        "order_type": OrderType.LIMIT.value,
+        "side": Side.BID.value,
+        "quantity": 1,
+        "limit_price": 25000.0,
+        "time_in_force": TimeInForce.GTD.value,
+    }
+
+    response = await client.post("/orders/", json=order_data)
+    assert response.status_code == 422
+
+    order_data["expires_at"] = (get_datetime() - timedelta(minutes=1)).isoformat()
+    response = await client.post("/orders/", json=order_data)
+    assert response.status_code == 422
+    mock_queue.put_nowait.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_create_order_rejects_off_tick_price(async_client, test_instrument):
+    """Tests that a price between the instrument's ticks is turned away."""
+    client, mock_queue, _ = async_client
+    order_data = {
+        "instrument_id": test_instrument.instrument_id,
+        "order_type": OrderType.LIMIT.value,
+        "side": Side.BID.value,
+        "quantity": 1,
+        "limit_price": 25000.0005,
+    }
+
+    response = await client.post("/orders/", json=order_data)
+    assert response.status_code == 400
+    assert "tick size" in response.json()["error"]
+    mock_queue.put_nowait.assert_not_called()
+
+
 @pytest.mark.asyncio(scope="session")
 async def test_create_market_order_with_escrow(
     async_client, async_db_session, test_instrument, order_factory_db
@@ -166,7 +233,7 @@ async def test_create_oco_order(async_client, test_instrument):
     assert len(order_ids) == 2
 
     mock_queue.put_nowait.assert_called_once()
-    cmd = mock_queue.put_nowait.call_args[0][0]
+    cmd = decode_command(mock_queue.put_nowait.call_args[0][0])
     assert cmd.command_type == CommandType.NEW_ORDER
     assert isinstance(cmd.data, NewOCOOrder)
     assert len(cmd.data.legs) == 2
@@ -202,7 +269,7 @@ async def test_create_oto_order(async_client, test_instrument):
     assert len(order_ids) == 2
 
     mock_queue.put_nowait.assert_called_once()
-    cmd = mock_queue.put_nowait.call_args[0][0]
+    cmd = decode_command(mock_queue.put_nowait.call_args[0][0])
     assert cmd.command_type == CommandType.NEW_ORDER
     assert isinstance(cmd.data, NewOTOOrder)
     assert cmd.data.parent["limit_price"] == 29000
@@ -246,7 +313,7 @@ async def test_create_otoco_order(async_client, test_instrument):
     assert len(order_ids) == 3
 
     mock_queue.put_nowait.assert_called_once()
-    cmd = mock_queue.put_nowait.call_args[0][0]
+    cmd = decode_command(mock_queue.put_nowait.call_args[0][0])
     assert cmd.command_type == CommandType.NEW_ORDER
     assert isinstance(cmd.data, NewOTOCOOrder)
     assert len(cmd.data.oco_legs) == 2
@@ -378,7 +445,7 @@ async def test_modify_order(async_client, async_db_session, test_instrument):
     assert response.json()["message"] == "Modify request accepted"
 
     mock_queue.put_nowait.assert_called_once()
-    cmd = mock_queue.put_nowait.call_args[0][0]
+    cmd = decode_command(mock_queue.put_nowait.call_args[0][0])
     assert cmd.command_type == CommandType.MODIFY_ORDER
     assert isinstance(cmd.data, ModifyOrderCommand)
     assert cmd.data.order_id == str(order.order_id)
@@ -406,7 +473,7 @@ async def test_cancel_single_order(async_client, async_db_session, test_instrume
     assert response.json()["order_id"] == str(order.order_id)
 
     mock_queue.put_nowait.assert_called_once()
-    cmd = mock_queue.put_nowait.call_args[0][0]
+    cmd = decode_command(mock_queue.put_nowait.call_args[0][0])
     assert cmd.command_type == CommandType.CANCEL_ORDER
     assert isinstance(cmd.data, CancelOrderCommand)
     assert cmd.data.order_id == str(order.order_id)
@@ -445,5 +512,10 @@ async def test_cancel_all_orders(async_client, async_db_session, test_instrument
     response = await client.delete("/orders/")
     assert response.status_code == 202
 
-    # Should only try to cancel the active orders
-    assert mock_queue.put_nowait.call_count == len(active_statuses)
\ No newline at end of file
+    # A single command, the engine finds the user's open orders itself.
+    mock_queue.put_nowait.assert_called_once()
+    cmd = decode_command(mock_queue.put_nowait.call_args[0][0])
+    assert cmd.command_type.value == CommandType.CANCEL_ALL.value
+    assert cmd.data.user_id == str(user.user_id)
+    assert cmd.data.symbol is None
+    assert cmd.data.side is None
\ No newline at end of file
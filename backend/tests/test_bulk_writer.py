@@ -0,0 +1,68 @@
+import uuid
+
+from sqlalchemy import func, select
+
+from src.db_models import Events, Transactions
+from src.utils.bulk_writer import BulkWriter
+
+
+def test_add_fills_column_defaults():
+    """Test that generated ids and timestamps are set as rows are buffered."""
+    writer = BulkWriter([Events])
+    row = writer.add(Events, {"event_type": "x", "user_id": uuid.uuid4()})
+
+    assert isinstance(row["event_id"], uuid.UUID)
+    assert row["created_at"] is not None
+    assert len(writer) == 1
+
+
+def test_flush_copies_rows(db_session, user_factory_db):
+    """Test that rows round trip through COPY, escaping and NULLs included."""
+    user = user_factory_db()
+    writer = BulkWriter([Events, Transactions])
+    details = 'tab\there\nnewline \\N back\\slash "quoted"'
+    event = writer.add(
+        Events,
+        {
+            "event_type": "order_placed",
+            "user_id": user.user_id,
+            "related_id": str(uuid.uuid4()),
+            "details": details,
+        },
+    )
+    writer.add(
+        Transactions,
+        {"user_id": user.user_id, "amount": -1.5, "type": "TRADE", "balance": 10.0},
+    )
+
+    assert writer.flush(db_session) == 2
+    assert len(writer) == 0
+
+    stored = db_session.get(Events, event["event_id"])
+    assert stored.details == details
+    assert stored.created_at == event["created_at"]
+
+    tx = db_session.execute(
+        select(Transactions).where(Transactions.user_id == user.user_id)
+    ).scalar_one()
+    assert tx.related_id is None
+    assert tx.amount == -1.5
+    db_session.commit()
+
+
+def test_rollback_discards_copied_rows(db_session, user_factory_db):
+    """Test that copied rows belong to the session's transaction."""
+    user = user_factory_db()
+    writer = BulkWriter([Events])
+    for _ in range(3):
+        writer.add(
+            Events,
+            {"event_type": "x", "user_id": user.user_id, "related_id": uuid.uuid4()},
+        )
+    writer.flush(db_session)
+    db_session.rollback()
+
+    count = db_session.execute(
+        select(func.count()).select_from(Events).where(Events.user_id == user.user_id)
+    ).scalar_one()
+    assert count == 0
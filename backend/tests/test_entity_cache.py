@@ -0,0 +1,40 @@
+from src.db_models import Orders, Users
+from src.utils.entity_cache import EntityCache
+
+
+def test_get_counts_hits_and_misses():
+    """Test that lookups are counted per kind of entity."""
+    cache = EntityCache()
+    user = Users(username="u")
+    cache.put((Users, "1"), user)
+
+    assert cache.get((Users, "1")) is user
+    assert cache.get((Users, "2")) is None
+    assert cache.get((Orders, "1")) is None
+
+    assert cache.stats() == {
+        "Orders": {"hits": 0, "misses": 1},
+        "Users": {"hits": 1, "misses": 1},
+    }
+
+
+def test_evicts_least_recently_used():
+    """Test that the least recently read or written entry is evicted."""
+    cache = EntityCache(size=2)
+    cache.put((Users, "1"), Users(username="a"))
+    cache.put((Users, "2"), Users(username="b"))
+    cache.get((Users, "1"))
+    cache.put((Users, "3"), Users(username="c"))
+
+    assert len(cache) == 2
+    assert (Users, "1") in cache
+    assert (Users, "2") not in cache
+
+
+def test_discard():
+    cache = EntityCache()
+    cache.put((Users, "1"), Users(username="a"))
+    cache.discard((Users, "1"))
+    cache.discard((Users, "1"))
+
+    assert len(cache) == 0
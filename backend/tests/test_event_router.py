@@ -0,0 +1,93 @@
+import uuid
+from queue import Queue
+
+from src.engine.codec import decode_events, encode_event, encode_event_batch
+from src.enums import EventType, Side
+from src.event_router import EventRouter, partition_for, partitions_for
+from src.engine.models import Event
+
+
+def _users_in_partitions(partitions: int) -> list[str]:
+    """A user id for each partition."""
+    users: dict[int, str] = {}
+    while len(users) < partitions:
+        user_id = str(uuid.uuid4())
+        users.setdefault(partition_for(user_id, partitions), user_id)
+    return [users[p] for p in range(partitions)]
+
+
+def _execution(taker: str, maker: str) -> bytes:
+    return encode_event(
+        EventType.EXECUTION,
+        taker,
+        str(uuid.uuid4()),
+        "BTC-USD",
+        {
+            "executed_quantity": 1.0,
+            "quantity": 1.0,
+            "price": 100.0,
+            "side": Side.BID,
+            "order_quantity": 1.0,
+            "maker_user_id": maker,
+            "maker_order_id": str(uuid.uuid4()),
+            "maker_executed_quantity": 1.0,
+            "maker_order_quantity": 2.0,
+        },
+    )
+
+
+def test_partition_for_is_stable():
+    """Test that a user always maps to the same partition in range."""
+    user_id = str(uuid.uuid4())
+    assert partition_for(user_id, 4) == partition_for(user_id, 4)
+    assert 0 <= partition_for(user_id, 4) < 4
+    assert partition_for(user_id, 1) == 0
+
+
+def test_execution_goes_to_both_users_partitions():
+    """Test that an execution reaches its taker's and maker's partitions."""
+    a, b = _users_in_partitions(2)
+    event = Event(
+        event_type=EventType.EXECUTION,
+        user_id=a,
+        related_id="x",
+        instrument_id="BTC-USD",
+        details={"maker_user_id": b},
+    )
+    assert partitions_for(event, 2) == {0, 1}
+
+    layered = event.model_copy(update={"details": {"maker_user_id": "layer"}})
+    assert partitions_for(layered, 2) == {0}
+
+
+def test_route_keeps_order_per_partition():
+    """Test that each partition receives its events in emitted order."""
+    a, b = _users_in_partitions(2)
+    frames = [
+        encode_event(EventType.ORDER_PLACED, a, "o1", "BTC-USD"),
+        encode_event(EventType.ORDER_PLACED, b, "o2", "BTC-USD"),
+        _execution(a, b),
+        encode_event(EventType.ORDER_CANCELLED, a, "o3", "BTC-USD"),
+        encode_event(EventType.ORDER_PLACED, "layer", "o4", "BTC-USD"),
+    ]
+    queues = [Queue(), Queue()]
+    router = EventRouter(queues)
+
+    events = router.route(encode_event_batch(frames))
+
+    assert len(events) == 5
+    assert router.routed == [3, 2]
+    first = decode_events(queues[0].get_nowait())
+    second = decode_events(queues[1].get_nowait())
+    assert [e.related_id for e in first] == ["o1", events[2].related_id, "o3"]
+    assert [e.related_id for e in second] == ["o2", events[2].related_id]
+    assert queues[0].empty() and queues[1].empty()
+
+
+def test_route_single_event():
+    a, _ = _users_in_partitions(2)
+    queues = [Queue(), Queue()]
+    EventRouter(queues).route(encode_event(EventType.ORDER_PLACED, a, "o1", "BTC-USD"))
+
+    assert decode_events(queues[0].get_nowait())[0].related_id == "o1"
+    assert queues[1].empty()
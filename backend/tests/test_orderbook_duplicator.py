@@ -313,3 +313,78 @@ def test_processing_event_for_unknown_order(replicator: OrderBookReplicator):
 
     assert replicator.snapshot() == {"bids": {}, "asks": {}}
     assert "unknown_order" not in replicator._orders
+
+
+def test_process_events_applies_in_order(replicator: OrderBookReplicator):
+    """Tests that a batch is applied exactly as the events one by one."""
+    placed = MockEvent(
+        event_type=EventType.ORDER_PLACED,
+        related_id="order1",
+        details={
+            "executed_quantity": 0.0,
+            "quantity": 10.0,
+            "price": 100.0,
+            "side": Side.BID,
+        },
+    )
+    filled = MockEvent(
+        event_type=EventType.ORDER_PARTIALLY_FILLED,
+        related_id="order1",
+        details={"executed_quantity": 4.0, "quantity": 10.0, "price": 100.0},
+    )
+    replicator.process_events([placed, filled])
+
+    assert replicator.snapshot()["bids"] == {100.0: 6.0}
+
+
+def test_handle_execution_fills_maker(replicator: OrderBookReplicator):
+    """Tests that an execution reduces the maker it traded against."""
+    replicator.process_event(
+        MockEvent(
+            event_type=EventType.ORDER_PLACED,
+            related_id="maker1",
+            details={
+                "executed_quantity": 0.0,
+                "quantity": 10.0,
+                "price": 101.0,
+                "side": Side.ASK,
+            },
+        )
+    )
+
+    def execution(quantity: float, executed_quantity: float) -> MockEvent:
+        return MockEvent(
+            event_type=EventType.EXECUTION,
+            related_id="taker1",
+            details={
+                "executed_quantity": executed_quantity,
+                "quantity": quantity,
+                "price": 101.0,
+                "side": Side.BID,
+                "order_quantity": 10.0,
+                "maker_user_id": "user1",
+                "maker_order_id": "maker1",
+                "maker_executed_quantity": executed_quantity,
+                "maker_order_quantity": 10.0,
+            },
+        )
+
+    replicator.process_event(execution(4.0, 4.0))
+    assert replicator.snapshot()["asks"] == {101.0: 6.0}
+
+    replicator.process_event(execution(6.0, 10.0))
+    assert replicator.snapshot()["asks"] == {}
+    assert "maker1" not in replicator._orders
+    # The taker never rested so it isn't tracked.
+    assert "taker1" not in replicator._orders
+
+
+def test_fill_summary_is_ignored(replicator: OrderBookReplicator):
+    """Tests that the taker's fill summary doesn't touch the book."""
+    event = MockEvent(
+        EventType.FILL_SUMMARY,
+        "taker1",
+        {"executed_quantity": 10.0, "quantity": 10.0, "price": 101.0},
+    )
+    replicator.process_event(event)
+    assert replicator.snapshot() == {"bids": {}, "asks": {}}
@@ -0,0 +1,88 @@
+import pickle
+from multiprocessing import Process
+from queue import Empty, Full
+
+import pytest
+
+from src.ring_buffer import RingBuffer
+
+
+@pytest.fixture
+def ring():
+    ring = RingBuffer(64)
+    yield ring
+    ring.close()
+    ring.unlink()
+
+
+def test_capacity_must_be_power_of_two():
+    """Test that a capacity that can't be masked is rejected."""
+    with pytest.raises(ValueError):
+        RingBuffer(100)
+
+
+def test_put_get_in_order(ring):
+    """Test that messages come back in the order they were put."""
+    for i in range(3):
+        ring.put_nowait(f"msg-{i}".encode())
+
+    assert [ring.get_nowait() for _ in range(3)] == [b"msg-0", b"msg-1", b"msg-2"]
+    assert ring.empty()
+
+
+def test_empty_and_full(ring):
+    """Test that the non-blocking calls raise the queue module's exceptions."""
+    with pytest.raises(Empty):
+        ring.get_nowait()
+    with pytest.raises(Empty):
+        ring.get(timeout=0.01)
+
+    ring.put_nowait(b"x" * 60)
+    with pytest.raises(Full):
+        ring.put_nowait(b"y")
+    with pytest.raises(Full):
+        ring.put(b"y", timeout=0.01)
+
+    with pytest.raises(ValueError):
+        ring.put_nowait(b"z" * 61)
+
+
+def test_messages_wrap_around(ring):
+    """Test that payloads and length prefixes split across the end survive."""
+    for i in range(50):
+        msg = bytes([i]) * (i % 23 + 1)
+        ring.put_nowait(msg)
+        assert ring.get_nowait() == msg
+    assert ring.qsize() == 0
+
+
+def test_pickled_handle_attaches(ring):
+    """Test that an unpickled handle shares the creator's memory."""
+    clone = pickle.loads(pickle.dumps(ring))
+    ring.put_nowait(b"hello")
+
+    assert clone.capacity == ring.capacity
+    assert clone.get_nowait() == b"hello"
+    assert ring.empty()
+    clone.close()
+
+
+def _echo(inbound: RingBuffer, outbound: RingBuffer, count: int) -> None:
+    for _ in range(count):
+        outbound.put(inbound.get())
+
+
+def test_across_processes(ring):
+    """Test a round trip through an echoing child process."""
+    reply = RingBuffer(64)
+    p = Process(target=_echo, args=(ring, reply, 100))
+    p.start()
+
+    try:
+        for i in range(100):
+            ring.put(str(i).encode(), timeout=5)
+            assert reply.get(timeout=5) == str(i).encode()
+    finally:
+        p.join(5)
+        reply.close()
+        reply.unlink()
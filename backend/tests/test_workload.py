@@ -0,0 +1,102 @@
+from collections import Counter
+
+import pytest
+
+from tools.workload import ORDER_MIX, generate_workload, parse_mix
+from src.server.routes.orders.models import (
+    OCOOrderCreate,
+    OrderCreate,
+    OrderModify,
+    OTOCOOrderCreate,
+    OTOOrderCreate,
+)
+
+
+INSTRUMENTS = ["BTC-USD", "ETH-USD"]
+MODELS = {
+    "limit": OrderCreate,
+    "market": OrderCreate,
+    "modify": OrderModify,
+    "oco": OCOOrderCreate,
+    "oto": OTOOrderCreate,
+    "otoco": OTOCOOrderCreate,
+}
+
+
+def test_same_seed_same_flow():
+    """Test that a flow can be replayed from its seed."""
+
+    def flow(seed):
+        return [
+            (op.at, op.kind, op.user, op.instrument_id, op.payload, op.ref)
+            for op in generate_workload(500, INSTRUMENTS, seed=seed)
+        ]
+
+    assert flow(1) == flow(1)
+    assert flow(1) != flow(2)
+
+
+def test_arrival_rate():
+    """Test that requests arrive at the requested rate on average."""
+    ops = list(generate_workload(20_000, INSTRUMENTS, rate=500, seed=3))
+    assert [op.seq for op in ops] == list(range(20_000))
+    assert all(a.at < b.at for a, b in zip(ops, ops[1:]))
+    assert len(ops) / ops[-1].at == pytest.approx(500, rel=0.05)
+
+
+def test_mix_proportions():
+    """Test that request kinds follow the mix."""
+    ops = list(generate_workload(20_000, INSTRUMENTS, seed=4))
+    counts = Counter(op.kind for op in ops)
+    for kind, weight in ORDER_MIX.items():
+        assert counts[kind] / len(ops) == pytest.approx(weight, abs=0.02)
+
+
+def test_payloads_are_accepted_by_routes():
+    """Test that every request body validates against its route's model."""
+    for op in generate_workload(5_000, INSTRUMENTS, seed=5):
+        if op.kind == "cancel":
+            assert op.payload is None
+            continue
+        MODELS[op.kind].model_validate(op.payload)
+
+
+def test_cancels_and_modifies_refer_to_earlier_limits():
+    """
+    Test that cancels and modifies are for a limit order placed earlier by
+    the same user for the same instrument, and that none is cancelled twice.
+    """
+    ops = list(generate_workload(5_000, INSTRUMENTS, seed=6))
+    cancelled = set()
+
+    for op in ops:
+        if op.kind not in ("cancel", "modify"):
+            assert op.ref is None
+            continue
+
+        placed = ops[op.ref]
+        assert op.ref < op.seq
+        assert placed.kind == "limit"
+        assert (placed.user, placed.instrument_id) == (op.user, op.instrument_id)
+        assert op.ref not in cancelled
+        if op.kind == "cancel":
+            cancelled.add(op.ref)
+
+    assert cancelled
+
+
+def test_cancel_only_mix_falls_back_to_limits():
+    """Test that a cancel with nothing to cancel becomes a limit order."""
+    ops = list(generate_workload(10, ["BTC-USD"], mix={"cancel": 1.0}, seed=7))
+    assert [op.kind for op in ops[:2]] == ["limit", "cancel"]
+
+
+def test_parse_mix():
+    assert parse_mix("limit=0.7, market=0.3") == {"limit": 0.7, "market": 0.3}
+
+    with pytest.raises(ValueError):
+        parse_mix("limit=0.7,iceberg=0.3")
+    with pytest.raises(ValueError):
+        list(generate_workload(1, INSTRUMENTS, mix={"limit": 0}))
+    with pytest.raises(ValueError):
+        list(generate_workload(1, INSTRUMENTS, rate=0))
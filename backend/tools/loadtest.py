@@ -0,0 +1,522 @@
+"""
+Drives a synthetic order flow through the full topology of main.py: the
+HTTP server, the event handler and an engine per shard, each in its own
+process, as in production.
+
+    python tools/loadtest.py --requests 20000 --rate 500 --users 50
+    python tools/loadtest.py --requests 5000 --mix limit=0.6,market=0.2,cancel=0.2
+
+Needs the dev dependencies: pip install -e ".[dev]".
+
+Redis is replaced by a fakeredis server and Postgres by a scratch database
+created on the configured server for the run and dropped after it, so
+nothing outside the run is touched. Prints requests and orders accepted per
+second and latency percentiles from sending a request to its HTTP response
+and, for new orders, to the first update for the order on the orders
+websocket.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import shutil
+import socket
+import sys
+import tempfile
+import time
+from multiprocessing import Process
+from uuid import uuid4
+
+import httpx
+import psycopg2
+import websockets
+from dotenv import load_dotenv
+
+SRC_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src")
+# The topology is imported from the application's own source tree.
+sys.path.insert(0, SRC_DIR)
+
+from enums import OrderType, Side
+from workload import (
+    NEW_ORDER_KINDS,
+    ORDER_MIX,
+    WorkloadOp,
+    generate_workload,
+    order_body,
+    parse_mix,
+)
+
+
+STARTING_CASH = 1e12
+STARTING_ASSETS = 1e9
+PASSWORD = "loadtest"
+HEARTBEAT_SECS = 2.0
+
+
+def parse_args(argv: list[str] | None = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--requests", type=int, default=5_000)
+    parser.add_argument(
+        "--rate", type=float, default=500.0, help="Mean requests sent per second."
+    )
+    parser.add_argument(
+        "--mix",
+        type=parse_mix,
+        default=ORDER_MIX,
+        help="Weights of each kind of request, e.g. limit=0.7,market=0.2,cancel=0.1.",
+    )
+    parser.add_argument("--instruments", type=int, default=1)
+    parser.add_argument("--users", type=int, default=20)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--port", type=int, default=0, help="HTTP port, free if 0.")
+    parser.add_argument(
+        "--drain-timeout",
+        type=float,
+        default=30.0,
+        help="Seconds to wait for outstanding websocket updates after the last request.",
+    )
+    parser.add_argument("--json", action="store_true", help="Print the report as JSON.")
+    return parser.parse_args(argv)
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def serve_redis(port: int) -> None:
+    from fakeredis import TcpFakeServer
+
+    TcpFakeServer(("127.0.0.1", port), server_type="redis").serve_forever()
+
+
+def wait_for_port(port: int, timeout: float = 10.0) -> None:
+    deadline = time.perf_counter() + timeout
+    while True:
+        try:
+            socket.create_connection(("127.0.0.1", port)).close()
+            return
+        except OSError:
+            if time.perf_counter() > deadline:
+                raise
+            time.sleep(0.05)
+
+
+def admin_connection():
+    """Autocommit connection to the configured server's postgres database."""
+    conn = psycopg2.connect(
+        host=os.getenv("DB_HOST"),
+        port=os.getenv("DB_PORT"),
+        user=os.getenv("DB_USERNAME"),
+        password=os.getenv("DB_PASSWORD"),
+        dbname="postgres",
+    )
+    conn.autocommit = True
+    return conn
+
+
+def prepare_environment(redis_port: int, state_dir: str) -> str:
+    """
+    Creates the scratch database and points config at it, the fakeredis
+    server and `state_dir`. Has to run before config is first imported.
+    Returns the database's name.
+    """
+    load_dotenv(os.path.join(SRC_DIR, ".env"))
+    db_name = f"loadtest_{uuid4().hex[:12]}"
+    conn = admin_connection()
+    try:
+        with conn.cursor() as cur:
+            cur.execute(f'CREATE DATABASE "{db_name}"')
+    finally:
+        conn.close()
+
+    os.environ.update(
+        DB_NAME=db_name,
+        REDIS_HOST="127.0.0.1",
+        REDIS_PORT=str(redis_port),
+        REDIS_DB="0",
+        ENGINE_STATE_DIR=state_dir,
+    )
+    return db_name
+
+
+def drop_database(db_name: str) -> None:
+    conn = admin_connection()
+    try:
+        with conn.cursor() as cur:
+            cur.execute(f'DROP DATABASE IF EXISTS "{db_name}" WITH (FORCE)')
+    finally:
+        conn.close()
+
+
+def seed(instrument_ids: list[str], users: int) -> list[str]:
+    """
+    Creates the schema, the instruments and `users` users who can afford
+    any order, in the database and in Redis for the engine. Returns their
+    usernames.
+    """
+    from config import CASH_BALANCE_HKEY, DB_ENGINE, REDIS_CLIENT
+    from db_models import AssetBalances, Base, Instruments, Users
+    from utils.db import get_db_session_sync
+    from utils.utils import get_instrument_balance_hkey
+
+    Base.metadata.create_all(DB_ENGINE)
+    usernames = [f"loadtest-{i}" for i in range(users)]
+
+    with get_db_session_sync() as sess:
+        sess.add_all(
+            Instruments(instrument_id=iid, symbol=iid, tick_size=0.01)
+            for iid in instrument_ids
+        )
+        db_users = [
+            Users(username=username, password=PASSWORD, cash_balance=STARTING_CASH)
+            for username in usernames
+        ]
+        sess.add_all(db_users)
+        sess.flush()
+        sess.add_all(
+            AssetBalances(user_id=user.user_id, instrument_id=iid, balance=STARTING_ASSETS)
+            for user in db_users
+            for iid in instrument_ids
+        )
+        user_ids = [str(user.user_id) for user in db_users]
+        sess.commit()
+
+    with REDIS_CLIENT.pipeline() as pipe:
+        for user_id in user_ids:
+            pipe.hset(CASH_BALANCE_HKEY, user_id, STARTING_CASH)
+            for iid in instrument_ids:
+                pipe.hset(get_instrument_balance_hkey(iid), user_id, STARTING_ASSETS)
+        pipe.execute()
+
+    return usernames
+
+
+def percentiles(samples: list[float]) -> dict[str, float]:
+    """Count and percentiles of `samples`, given in seconds, in milliseconds."""
+    from engine.metrics import PERCENTILES
+
+    samples = sorted(samples)
+    stats = {"count": len(samples)}
+    if not samples:
+        return stats
+    for pct in PERCENTILES:
+        # Nearest rank.
+        idx = max(0, min(len(samples) - 1, int(len(samples) * pct / 100)))
+        stats[f"p{pct:g}"] = samples[idx] * 1_000
+    stats["max"] = samples[-1] * 1_000
+    return stats
+
+
+class LoadReport:
+    """What a run sent, what came back and how long it took."""
+
+    def __init__(self) -> None:
+        self.sent = 0
+        self.skipped = 0
+        self.accepted = 0
+        self.orders_accepted = 0
+        self.statuses: dict[int, int] = {}
+        self.response_latency: dict[str, list[float]] = {}
+        self.update_latency: dict[str, list[float]] = {}
+        self.elapsed = 0.0
+        self.undelivered = 0
+        self.disconnects = 0
+
+    def to_dict(self) -> dict:
+        elapsed = self.elapsed or float("inf")
+        return {
+            "requests_sent": self.sent,
+            "requests_skipped": self.skipped,
+            "requests_accepted": self.accepted,
+            "orders_accepted": self.orders_accepted,
+            "status_codes": {str(k): v for k, v in sorted(self.statuses.items())},
+            "elapsed_secs": self.elapsed,
+            "requests_per_sec": self.accepted / elapsed,
+            "orders_per_sec": self.orders_accepted / elapsed,
+            "updates_missing": self.undelivered,
+            "websocket_disconnects": self.disconnects,
+            "response_latency_ms": {
+                kind: percentiles(samples)
+                for kind, samples in sorted(self.response_latency.items())
+            },
+            "update_latency_ms": {
+                kind: percentiles(samples)
+                for kind, samples in sorted(self.update_latency.items())
+            },
+        }
+
+
+class LoadDriver:
+    """
+    Sends workload requests as the users they belong to, at the times they
+    arrive, and matches orders' first websocket updates to the requests
+    that placed them.
+    """
+
+    def __init__(self, base_url: str, usernames: list[str]) -> None:
+        self.base_url = base_url
+        self.ws_url = base_url.replace("http", "ws", 1) + "/ws/orders"
+        self.usernames = usernames
+        self.clients: list[httpx.AsyncClient] = []
+        self.sockets = []
+        self.report = LoadReport()
+        # seq of each accepted new order request -> its first order id.
+        self._order_ids: dict[int, str] = {}
+        # Order id -> (kind, time sent) while awaiting its first update.
+        self._pending: dict[str, tuple[str, float]] = {}
+        # Order id -> time of updates that beat their HTTP response.
+        self._early: dict[str, float] = {}
+        self._tasks: list[asyncio.Task] = []
+
+    async def connect(self) -> None:
+        for username in self.usernames:
+            client = httpx.AsyncClient(base_url=self.base_url, timeout=60)
+            rsp = await client.post(
+                "/auth/login", json={"username": username, "password": PASSWORD}
+            )
+            rsp.raise_for_status()
+            token = (await client.get("/auth/access-token")).json()["access_token"]
+
+            ws = await websockets.connect(self.ws_url)
+            await ws.send(token)
+            if await ws.recv() != "connected":
+                raise RuntimeError(f"Orders websocket refused {username}")
+
+            self.clients.append(client)
+            self.sockets.append(ws)
+            self._tasks.append(asyncio.create_task(self._listen(ws)))
+        self._tasks.append(asyncio.create_task(self._heartbeat()))
+
+    async def close(self) -> None:
+        for task in self._tasks:
+            task.cancel()
+        for ws in self.sockets:
+            await ws.close()
+        for client in self.clients:
+            await client.aclose()
+
+    async def _heartbeat(self) -> None:
+        while True:
+            await asyncio.sleep(HEARTBEAT_SECS)
+            for ws in self.sockets:
+                try:
+                    await ws.send("ping")
+                except websockets.ConnectionClosed:
+                    pass
+
+    async def _listen(self, ws) -> None:
+        try:
+            async for message in ws:
+                received = time.perf_counter()
+                order_id = json.loads(message)["data"]["order_id"]
+                pending = self._pending.pop(order_id, None)
+                if pending is not None:
+                    kind, sent = pending
+                    latency = self.report.update_latency.setdefault(kind, [])
+                    latency.append(received - sent)
+                elif order_id not in self._early:
+                    self._early[order_id] = received
+        except websockets.ConnectionClosed:
+            pass
+        # The server closed it, e.g. after missing heartbeats while overloaded.
+        self.report.disconnects += 1
+
+    async def send(self, op: WorkloadOp) -> None:
+        client = self.clients[op.user]
+        if op.kind in NEW_ORDER_KINDS:
+            path = "/orders/" if op.kind in ("limit", "market") else f"/orders/{op.kind}"
+            request = client.post(path, json=op.payload)
+        else:
+            order_id = self._order_ids.get(op.ref)
+            if order_id is None:
+                # The order's request failed or is still in flight.
+                self.report.skipped += 1
+                return
+            if op.kind == "cancel":
+                request = client.delete(f"/orders/{order_id}")
+            else:
+                request = client.patch(f"/orders/{order_id}", json=op.payload)
+
+        self.report.sent += 1
+        sent = time.perf_counter()
+        rsp = await request
+        received = time.perf_counter()
+
+        report = self.report
+        report.statuses[rsp.status_code] = report.statuses.get(rsp.status_code, 0) + 1
+        if rsp.status_code != 202:
+            return
+        report.accepted += 1
+        report.response_latency.setdefault(op.kind, []).append(received - sent)
+
+        if op.kind in NEW_ORDER_KINDS:
+            report.orders_accepted += 1
+            order_id = rsp.json()["order_ids"][0]
+            self._order_ids[op.seq] = order_id
+            early = self._early.pop(order_id, None)
+            if early is None:
+                self._pending[order_id] = (op.kind, sent)
+            else:
+                report.update_latency.setdefault(op.kind, []).append(early - sent)
+
+    async def warm_up(self, instrument_id: str, timeout: float = 120.0) -> None:
+        """
+        Places an order and waits for its update, which only comes once the
+        engines are up, so that their start up isn't timed. Leaves the
+        report untouched.
+        """
+        body = order_body(instrument_id, OrderType.LIMIT, Side.BID, 1, limit_price=0.01)
+        rsp = await self.clients[0].post("/orders/", json=body)
+        rsp.raise_for_status()
+        order_id = rsp.json()["order_ids"][0]
+
+        deadline = time.perf_counter() + timeout
+        while order_id not in self._early:
+            if time.perf_counter() > deadline:
+                raise TimeoutError("No update for the warm up order")
+            await asyncio.sleep(0.1)
+        self._early.clear()
+
+    async def run(self, ops: list[WorkloadOp], drain_timeout: float) -> LoadReport:
+        """Sends `ops` on schedule, then waits for their outstanding updates."""
+        requests = []
+        start = time.perf_counter()
+        for op in ops:
+            delay = start + op.at - time.perf_counter()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            requests.append(asyncio.create_task(self.send(op)))
+
+        await asyncio.gather(*requests)
+        self.report.elapsed = time.perf_counter() - start
+
+        deadline = time.perf_counter() + drain_timeout
+        while self._pending and time.perf_counter() < deadline:
+            await asyncio.sleep(0.1)
+        self.report.undelivered = len(self._pending)
+        return self.report
+
+
+async def wait_for_server(base_url: str, timeout: float = 60.0) -> None:
+    deadline = time.perf_counter() + timeout
+    async with httpx.AsyncClient(base_url=base_url) as client:
+        while True:
+            try:
+                await client.get("/metrics/")
+                return
+            except httpx.TransportError:
+                if time.perf_counter() > deadline:
+                    raise
+                await asyncio.sleep(0.2)
+
+
+async def drive(
+    args: argparse.Namespace,
+    base_url: str,
+    instrument_ids: list[str],
+    usernames: list[str],
+) -> LoadReport:
+    ops = list(
+        generate_workload(
+            args.requests,
+            instrument_ids,
+            rate=args.rate,
+            mix=args.mix,
+            seed=args.seed,
+            users=len(usernames),
+        )
+    )
+
+    await wait_for_server(base_url)
+    driver = LoadDriver(base_url, usernames)
+    await driver.connect()
+    try:
+        await driver.warm_up(instrument_ids[0])
+        return await driver.run(ops, args.drain_timeout)
+    finally:
+        await driver.close()
+
+
+def print_report(result: dict) -> None:
+    print(
+        f"[INFO]: Sent {result['requests_sent']} requests in "
+        f"{result['elapsed_secs']:.3f}s, skipped {result['requests_skipped']}"
+    )
+    print(f"[INFO]: Status codes {result['status_codes']}")
+    print(
+        f"[INFO]: {result['requests_per_sec']:,.0f} requests/s, "
+        f"{result['orders_per_sec']:,.0f} orders/s accepted"
+    )
+    for title, key in (
+        ("HTTP response", "response_latency_ms"),
+        ("Websocket update", "update_latency_ms"),
+    ):
+        for kind, stats in result[key].items():
+            cols = "  ".join(
+                f"{name}={value:.1f}" for name, value in stats.items() if name != "count"
+            )
+            print(f"[INFO]: {title:<16} {kind:<7} n={stats['count']:<7} {cols} (ms)")
+    if result["updates_missing"]:
+        print(f"[WARN]: {result['updates_missing']} orders never got an update")
+    if result["websocket_disconnects"]:
+        print(
+            f"[WARN]: {result['websocket_disconnects']} orders websockets "
+            "closed during the run"
+        )
+
+
+def main(argv: list[str] | None = None) -> None:
+    args = parse_args(argv)
+    port = args.port or free_port()
+    redis_port = free_port()
+    state_dir = tempfile.mkdtemp(prefix="loadtest-")
+
+    redis = Process(target=serve_redis, args=(redis_port,), daemon=True)
+    redis.start()
+    wait_for_port(redis_port)
+    db_name = prepare_environment(redis_port, state_dir)
+    ps = []
+    try:
+        # Imported here so that config picks up the stand-ins.
+        from main import build_processes
+        from ring_buffer import RingBuffer
+
+        instrument_ids = [f"LOAD-{i}" for i in range(args.instruments)]
+        usernames = seed(instrument_ids, args.users)
+
+        p_configs, command_queues, ev_queues = build_processes(port, access_log=False)
+        ps = [Process(target=t, args=a, name=n) for t, a, n in p_configs]
+        for p in ps:
+            p.start()
+
+        base_url = f"http://127.0.0.1:{port}"
+        report = asyncio.run(drive(args, base_url, instrument_ids, usernames))
+    finally:
+        for p in ps:
+            p.kill()
+            p.join()
+        if ps:
+            for q in (*(c.queue for c in command_queues), *ev_queues):
+                if isinstance(q, RingBuffer):
+                    q.close()
+                    q.unlink()
+
+        from config import DB_ENGINE
+
+        DB_ENGINE.dispose()
+        drop_database(db_name)
+        redis.kill()
+        shutil.rmtree(state_dir, ignore_errors=True)
+
+    result = report.to_dict()
+    if args.json:
+        print(json.dumps(result, indent=2))
+        return
+    print_report(result)
+
+
+if __name__ == "__main__":
+    main()
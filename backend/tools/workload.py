@@ -0,0 +1,224 @@
+"""
+Synthetic order flow for load testing through the HTTP API.
+
+Requests arrive as a Poisson process and are drawn from a configurable mix
+of limit, market, cancel and modify requests and OCO, OTO and OTOCO
+orders. Prices follow a geometric random walk per instrument, so the book
+drifts over a run instead of sitting on one price. Bodies are what the
+order routes accept, except that cancels and modifies refer to the earlier
+request that placed their order, since order ids are only known once the
+server has answered.
+"""
+
+import math
+import random
+from functools import partial
+from typing import Iterator
+
+from enums import OrderType, Side
+
+
+ORDER_MIX = {
+    "limit": 0.55,
+    "market": 0.10,
+    "cancel": 0.15,
+    "modify": 0.07,
+    "oco": 0.04,
+    "oto": 0.05,
+    "otoco": 0.04,
+}
+NEW_ORDER_KINDS = ("limit", "market", "oco", "oto", "otoco")
+
+
+class WorkloadOp:
+    def __init__(
+        self,
+        seq: int,
+        at: float,
+        kind: str,
+        user: int,
+        instrument_id: str,
+        payload: dict | None = None,
+        ref: int | None = None,
+    ) -> None:
+        """
+        Args:
+            seq (int): Position in the flow.
+            at (float): Seconds after the start of the flow it's sent.
+            kind (str): One of ORDER_MIX's keys.
+            user (int): Index of the simulated user sending it.
+            instrument_id (str): Instrument it's for.
+            payload (dict | None): JSON body of the request, None for cancels.
+            ref (int | None): `seq` of the request that placed the order a
+                cancel or modify is for.
+        """
+        self.seq = seq
+        self.at = at
+        self.kind = kind
+        self.user = user
+        self.instrument_id = instrument_id
+        self.payload = payload
+        self.ref = ref
+
+
+class PriceWalk:
+    """
+    Geometric random walk of an instrument's mid price. `volatility` is the
+    standard deviation of log returns over one second.
+    """
+
+    def __init__(
+        self, rng: random.Random, price: float, volatility: float, tick_size: float
+    ) -> None:
+        self.rng = rng
+        self.price = price
+        self.volatility = volatility
+        self.tick_size = tick_size
+
+    def step(self, dt: float) -> float:
+        """Moves the price on by `dt` seconds."""
+        shock = self.rng.gauss(0.0, 1.0) * self.volatility * math.sqrt(dt)
+        self.price *= math.exp(shock)
+        return self.price
+
+    def quote(self, ticks: int) -> float:
+        """Returns the price `ticks` ticks above the mid, at least one tick."""
+        ticks = max(1, round(self.price / self.tick_size) + ticks)
+        return round(ticks * self.tick_size, 8)
+
+
+def order_body(
+    instrument_id: str, order_type: OrderType, side: Side, quantity: int, **prices
+) -> dict:
+    """Body of a single order, as the order routes accept it."""
+    return {
+        "instrument_id": instrument_id,
+        "order_type": order_type.value,
+        "side": side.value,
+        "quantity": quantity,
+        **prices,
+    }
+
+
+def parse_mix(spec: str) -> dict[str, float]:
+    """Parses a mix such as "limit=0.7,market=0.2,cancel=0.1"."""
+    mix = {}
+    for part in spec.split(","):
+        kind, _, weight = part.partition("=")
+        kind = kind.strip()
+        if kind not in ORDER_MIX:
+            raise ValueError(f"Unknown request kind: {kind}")
+        mix[kind] = float(weight)
+    return mix
+
+
+def generate_workload(
+    count: int,
+    instrument_ids: list[str],
+    *,
+    rate: float = 1_000.0,
+    mix: dict[str, float] = ORDER_MIX,
+    seed: int = 0,
+    users: int = 100,
+    price: float = 100.0,
+    volatility: float = 0.002,
+    tick_size: float = 0.01,
+    spread: int = 50,
+) -> Iterator[WorkloadOp]:
+    """
+    Yields `count` requests arriving at `rate` a second on average, the
+    same ones for the same arguments.
+
+    Limit prices are within `spread` ticks of the mid, skewed so that some
+    cross it. Cancels and modifies are for limit orders placed earlier by
+    the same user, which may since have filled, and fall back to a new
+    limit order while there are none.
+    """
+    if rate <= 0:
+        raise ValueError(f"Invalid rate: {rate}")
+    kinds = [kind for kind, weight in mix.items() if weight > 0]
+    if not kinds:
+        raise ValueError("Mix has no request kinds")
+    weights = [mix[kind] for kind in kinds]
+
+    rng = random.Random(seed)
+    walks = {
+        iid: PriceWalk(rng, price, volatility, tick_size) for iid in instrument_ids
+    }
+    # (seq, user, side) of limit orders not yet cancelled, per instrument.
+    resting: dict[str, list[tuple[int, int, Side]]] = {
+        iid: [] for iid in instrument_ids
+    }
+    at = 0.0
+
+    for seq in range(count):
+        dt = rng.expovariate(rate)
+        at += dt
+        for walk in walks.values():
+            walk.step(dt)
+
+        instrument_id = rng.choice(instrument_ids)
+        walk = walks[instrument_id]
+        orders = resting[instrument_id]
+        kind = rng.choices(kinds, weights)[0]
+        if kind in ("cancel", "modify") and not orders:
+            kind = "limit"
+
+        if kind == "cancel":
+            idx = rng.randrange(len(orders))
+            orders[idx], orders[-1] = orders[-1], orders[idx]
+            ref, user, _ = orders.pop()
+            yield WorkloadOp(seq, at, kind, user, instrument_id, ref=ref)
+            continue
+
+        if kind == "modify":
+            ref, user, side = rng.choice(orders)
+            offset = rng.randint(1, spread)
+            payload = {"limit_price": walk.quote(-offset if side == Side.BID else offset)}
+            yield WorkloadOp(seq, at, kind, user, instrument_id, payload, ref)
+            continue
+
+        user = rng.randrange(users)
+        side = rng.choice((Side.BID, Side.ASK))
+        exit_side = Side.ASK if side == Side.BID else Side.BID
+        # Ticks towards the side's own half of the book.
+        away = -1 if side == Side.BID else 1
+        quantity = rng.randint(1, 10)
+
+        order = partial(order_body, instrument_id, quantity=quantity)
+
+        if kind == "market":
+            payload = order(OrderType.MARKET, side)
+        elif kind == "limit":
+            offset = rng.randint(-spread // 5, spread)
+            payload = order(OrderType.LIMIT, side, limit_price=walk.quote(away * offset))
+            orders.append((seq, user, side))
+        elif kind == "oco":
+            # A limit to get in on a pullback or a stop to chase a breakout.
+            offset = rng.randint(1, spread)
+            payload = {
+                "legs": [
+                    order(OrderType.LIMIT, side, limit_price=walk.quote(away * offset)),
+                    order(OrderType.STOP, side, stop_price=walk.quote(-away * offset)),
+                ]
+            }
+        else:
+            entry = walk.quote(away * rng.randint(0, spread // 5))
+            target = round(entry - away * rng.randint(1, spread) * tick_size, 8)
+            parent = order(OrderType.LIMIT, side, limit_price=entry)
+            if kind == "oto":
+                payload = {
+                    "parent": parent,
+                    "child": order(OrderType.LIMIT, exit_side, limit_price=target),
+                }
+            else:
+                stop = round(entry + away * rng.randint(1, spread) * tick_size, 8)
+                payload = {
+                    "parent": parent,
+                    "oco_legs": [
+                        order(OrderType.LIMIT, exit_side, limit_price=target),
+                        order(OrderType.STOP, exit_side, stop_price=max(stop, tick_size)),
+                    ],
+                }
+
+        yield WorkloadOp(seq, at, kind, user, instrument_id, payload)